@@ -0,0 +1,349 @@
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.parsers.config_tree import ConfigNode, parse_config_tree
+from app.parsers.lazy_config import LazyConfig
+from app.parsers.set_parser import PROMPT_RE, SET_COMMANDS, is_set_format, split_set_line
+
+ADDED = "added"
+REMOVED = "removed"
+CHANGED = "changed"
+
+# Interface fields compared for the model-level effect of a change
+INTERFACE_FIELDS = ("ip", "description", "status", "port_mode", "vlan_members")
+
+
+def _label(node: ConfigNode) -> str:
+    prefix = "inactive: " if node.inactive else ""
+    if node.protected:
+        prefix += "protect: "
+    return prefix + node.name
+
+
+def _statement_count(node: ConfigNode) -> int:
+    if not node.is_block():
+        return 1
+    return sum(_statement_count(child) for child in node.children)
+
+
+def _statement_counts(nodes: Iterable[ConfigNode]) -> Counter:
+    return Counter(node.keyword for node in nodes if not node.is_block())
+
+
+def _keyed(olds: List[ConfigNode], news: List[ConfigNode],
+           counts: Optional[Tuple[Counter, Counter]] = None) -> Tuple[Dict[tuple, ConfigNode], Dict[tuple, ConfigNode]]:
+    """
+    Match siblings. Blocks are identified by their full name (``unit 0``).
+    A statement whose keyword occurs once on each side is identified by the
+    keyword alone, so ``description a`` -> ``description b`` is a change;
+    repeated keywords (``members a; members b;``) by their full words.
+    ``counts`` are the statement keyword counts of each side's complete
+    sibling list, for when only some of the siblings are passed in.
+    """
+    counts = counts or (_statement_counts(olds), _statement_counts(news))
+
+    def key(node: ConfigNode) -> tuple:
+        if not node.is_block() and counts[0][node.keyword] <= 1 and counts[1][node.keyword] <= 1:
+            return ("statement", node.keyword)
+        return ("block" if node.is_block() else "statement", *node.words)
+
+    sides = []
+    for nodes in (olds, news):
+        keyed: Dict[tuple, ConfigNode] = {}
+        seen: Counter = Counter()
+        for node in nodes:
+            base = key(node)
+            # Duplicate names stay distinct by their order of appearance
+            keyed[(base, seen[base])] = node
+            seen[base] += 1
+        sides.append(keyed)
+    return sides[0], sides[1]
+
+
+class TreeDiff:
+    """
+    Structural diff of two config trees. Siblings are matched by name and a
+    pair with equal Merkle digests is skipped without descending, so the
+    work done is proportional to the changed subtrees, not the config size.
+    """
+
+    def __init__(self):
+        self.changes: List[dict] = []
+        self.nodes_compared = 0
+        self.subtrees_skipped = 0
+
+    def compare(self, olds: Iterable[ConfigNode], news: Iterable[ConfigNode], path: Tuple[str, ...] = (),
+                counts: Optional[Tuple[Counter, Counter]] = None) -> None:
+        old_keyed, new_keyed = _keyed(list(olds), list(news), counts)
+        for key, old in old_keyed.items():
+            new = new_keyed.get(key)
+            if new is None:
+                self._record(REMOVED, path, old=old)
+                continue
+            self.nodes_compared += 1
+            if old.digest == new.digest:
+                self.subtrees_skipped += 1
+                continue
+            if old.is_block() and new.is_block():
+                if old._header_digest() != new._header_digest():
+                    self._record(CHANGED, path, old=old, new=new)
+                self.compare(old.children, new.children, path + (new.name,))
+            else:
+                self._record(CHANGED, path, old=old, new=new)
+        for key, new in new_keyed.items():
+            if key not in old_keyed:
+                self._record(ADDED, path, new=new)
+
+    def _record(self, change: str, path: Tuple[str, ...], old: Optional[ConfigNode] = None,
+                new: Optional[ConfigNode] = None) -> None:
+        entry = {"change": change, "path": list(path)}
+        node = new if new is not None else old
+        if change == CHANGED:
+            entry["old"] = _label(old)
+            entry["new"] = _label(new)
+        else:
+            entry["node"] = _label(node)
+        if node.is_block() and change != CHANGED:
+            entry["statements"] = _statement_count(node)
+        self.changes.append(entry)
+
+
+def _changed_children(olds: List[str], news: List[str]) -> Tuple[List[str], List[str], List[str]]:
+    """
+    Split child texts into those only on the old side, those only on the
+    new side and those on both; identical text is an identical subtree
+    """
+    unmatched = Counter(news)
+    old_changed = []
+    for text in olds:
+        if unmatched[text]:
+            unmatched[text] -= 1
+        else:
+            old_changed.append(text)
+    remaining = Counter(olds)
+    new_changed = []
+    for text in news:
+        if remaining[text]:
+            remaining[text] -= 1
+        else:
+            new_changed.append(text)
+    unchanged = list((Counter(news) - Counter(new_changed)).elements())
+    return old_changed, new_changed, unchanged
+
+
+def _parse_children(texts: List[str]) -> List[ConfigNode]:
+    return [node for text in texts for node in parse_config_tree(text).children]
+
+
+def _sibling_counts(olds: List[ConfigNode], news: List[ConfigNode],
+                    unchanged: List[str]) -> Tuple[Counter, Counter]:
+    """
+    Statement keyword counts of each side's full child list, when only the
+    changed children were parsed. Unchanged children are on both sides, so
+    they add the same to each; only the unchanged statements that may share
+    a keyword with a changed one are parsed to find out.
+    """
+    old_counts, new_counts = _statement_counts(olds), _statement_counts(news)
+    keywords = old_counts.keys() | new_counts.keys()
+    shared = _statement_counts(_parse_children([
+        text for text in unchanged
+        if text.rstrip().endswith(";") and any(keyword in text for keyword in keywords)
+    ]))
+    return old_counts + shared, new_counts + shared
+
+
+def _set_lines(config_text: str) -> List[Tuple[str, ...]]:
+    lines = []
+    for line in config_text.splitlines():
+        line = line.strip()
+        if line.startswith(SET_COMMANDS) and not PROMPT_RE.match(line):
+            words = tuple(split_set_line(line))
+            if len(words) > 1:
+                lines.append(words)
+    return lines
+
+
+def _set_label(words: Tuple[str, ...]) -> str:
+    prefix = "inactive: " if words[0] == "deactivate" else ""
+    return prefix + " ".join(words[2:])
+
+
+def diff_set_configs(old_text: str, new_text: str) -> dict:
+    """
+    ``diff_configs`` for two ``display set`` configurations. Each set line
+    is a full path, so lines present on both sides are dropped and the
+    rest are matched the way tree siblings are: a line whose path up to its
+    last word occurs once on each side is a change of that value, anything
+    else is added or removed whole. Changes are placed under their stanza.
+    """
+    olds, news = _set_lines(old_text), _set_lines(new_text)
+    unchanged = Counter(olds) & Counter(news)
+    counts = [Counter(words[:-1] for words in lines) for lines in (olds, news)]
+
+    def key(words: Tuple[str, ...]) -> tuple:
+        if counts[0][words[:-1]] <= 1 and counts[1][words[:-1]] <= 1:
+            return ("value", words[:-1])
+        return ("line", words)
+
+    sides = []
+    for lines in (olds, news):
+        remaining = Counter(unchanged)
+        keyed: Dict[tuple, Tuple[str, ...]] = {}
+        seen: Counter = Counter()
+        for words in lines:
+            if remaining[words]:
+                remaining[words] -= 1
+                continue
+            base = key(words)
+            keyed[(base, seen[base])] = words
+            seen[base] += 1
+        sides.append(keyed)
+    old_keyed, new_keyed = sides
+
+    changes = []
+    for line_key, words in old_keyed.items():
+        new_words = new_keyed.get(line_key)
+        if new_words is None:
+            changes.append({"change": REMOVED, "path": [words[1]], "node": _set_label(words)})
+        else:
+            changes.append({"change": CHANGED, "path": [words[1]], "old": _set_label(words),
+                            "new": _set_label(new_words)})
+    for line_key, words in new_keyed.items():
+        if line_key not in old_keyed:
+            changes.append({"change": ADDED, "path": [words[1]], "node": _set_label(words)})
+
+    stanzas = list(dict.fromkeys(words[1] for words in olds + news))
+    touched = {change["path"][0] for change in changes}
+    summary = Counter(change["change"] for change in changes)
+    return {
+        "summary": {change: summary.get(change, 0) for change in (ADDED, REMOVED, CHANGED)},
+        "changes": changes,
+        "stats": {
+            "stanzas": len(stanzas),
+            "stanzas_unchanged": len(stanzas) - len(touched),
+            "children_unchanged": sum(unchanged.values()),
+            "nodes_compared": sum(1 for key in old_keyed if key in new_keyed),
+            "subtrees_skipped": 0
+        }
+    }
+
+
+def diff_configs(old_text: str, new_text: str) -> dict:
+    """
+    Added, removed and changed statements between two configurations, by
+    stanza and key path. Stanzas whose raw text hashes equal are skipped
+    without being parsed. Within a changed stanza, direct children whose
+    text is unchanged are dropped before parsing, and the rest are compared
+    by subtree digest, so cost follows the size of the change.
+
+    Two ``display set`` configurations are compared line by line instead;
+    raises ValueError when only one of them is in set format.
+    """
+    old_set, new_set = is_set_format(old_text), is_set_format(new_text)
+    if old_set and new_set:
+        return diff_set_configs(old_text, new_text)
+    if old_set or new_set:
+        raise ValueError("Cannot diff a display set configuration against a curly-brace one")
+    old, new = LazyConfig(old_text), LazyConfig(new_text)
+    names = old.section_names + [name for name in new.section_names if name not in old]
+    tree_diff = TreeDiff()
+    unchanged = 0
+    children_unchanged = 0
+    for name in names:
+        if name in old and name in new:
+            if old.section_digest(name) == new.section_digest(name):
+                unchanged += 1
+                continue
+            old_split, new_split = old.split_section(name), new.split_section(name)
+            if old_split is not None and new_split is not None and old_split[0] == new_split[0]:
+                old_children, new_children, same = _changed_children(old_split[1], new_split[1])
+                children_unchanged += len(same)
+                header = parse_config_tree(new_split[0] + "\n}").children[0]
+                olds, news = _parse_children(old_children), _parse_children(new_children)
+                # Keyed as if every child had been parsed, so the result matches a full-tree diff
+                tree_diff.compare(olds, news, (header.name,), _sibling_counts(olds, news, same))
+                continue
+        olds = [node for node in (old.section(name),) if node is not None]
+        news = [node for node in (new.section(name),) if node is not None]
+        tree_diff.compare(olds, news)
+
+    summary = Counter(change["change"] for change in tree_diff.changes)
+    return {
+        "summary": {change: summary.get(change, 0) for change in (ADDED, REMOVED, CHANGED)},
+        "changes": tree_diff.changes,
+        "stats": {
+            "stanzas": len(names),
+            "stanzas_unchanged": unchanged,
+            "children_unchanged": children_unchanged,
+            "nodes_compared": tree_diff.nodes_compared,
+            "subtrees_skipped": tree_diff.subtrees_skipped
+        }
+    }
+
+
+def _vlan_members(device: dict) -> Dict[str, set]:
+    vlans = (device.get("routing") or {}).get("vlans", [])
+    members = {vlan["name"]: set(vlan.get("interfaces") or []) for vlan in vlans}
+    for interface in device["interfaces"]:
+        for vlan_name in interface.get("vlan_members") or []:
+            members.setdefault(vlan_name, set()).add(interface["name"])
+    return members
+
+
+def _routes(device: dict) -> Dict[tuple, dict]:
+    routes = (device.get("routing") or {}).get("routes", [])
+    return {(route["destination"], route["next_hop"]): route for route in routes}
+
+
+def model_effects(old_network: dict, new_network: dict) -> dict:
+    """Interfaces, VLAN memberships and routes that differ between two stored networks"""
+    old_devices = {device["hostname"]: device for device in old_network["devices"]}
+    new_devices = {device["hostname"]: device for device in new_network["devices"]}
+    effects = {
+        "devices": {ADDED: sorted(set(new_devices) - set(old_devices)),
+                    REMOVED: sorted(set(old_devices) - set(new_devices))},
+        "interfaces": {ADDED: [], REMOVED: [], CHANGED: []},
+        "vlan_memberships": [],
+        "routes": {ADDED: [], REMOVED: [], CHANGED: []}
+    }
+    empty = {"interfaces": [], "routing": None}
+    for hostname in sorted(set(old_devices) | set(new_devices)):
+        old_device = old_devices.get(hostname, empty)
+        new_device = new_devices.get(hostname, empty)
+
+        old_interfaces = {interface["name"]: interface for interface in old_device["interfaces"]}
+        new_interfaces = {interface["name"]: interface for interface in new_device["interfaces"]}
+        for name in new_interfaces.keys() - old_interfaces.keys():
+            effects["interfaces"][ADDED].append({"device": hostname, **new_interfaces[name]})
+        for name in old_interfaces.keys() - new_interfaces.keys():
+            effects["interfaces"][REMOVED].append({"device": hostname, **old_interfaces[name]})
+        for name in old_interfaces.keys() & new_interfaces.keys():
+            old_interface, new_interface = old_interfaces[name], new_interfaces[name]
+            fields = {
+                field: {"old": old_interface.get(field), "new": new_interface.get(field)}
+                for field in INTERFACE_FIELDS if old_interface.get(field) != new_interface.get(field)
+            }
+            if fields:
+                effects["interfaces"][CHANGED].append({"device": hostname, "interface": name, "fields": fields})
+
+        old_members, new_members = _vlan_members(old_device), _vlan_members(new_device)
+        for vlan_name in sorted(old_members.keys() | new_members.keys()):
+            before, after = old_members.get(vlan_name, set()), new_members.get(vlan_name, set())
+            if before != after:
+                effects["vlan_memberships"].append({"device": hostname, "vlan": vlan_name,
+                                                    ADDED: sorted(after - before), REMOVED: sorted(before - after)})
+
+        old_routes, new_routes = _routes(old_device), _routes(new_device)
+        for key in sorted(new_routes.keys() - old_routes.keys()):
+            effects["routes"][ADDED].append({"device": hostname, **new_routes[key]})
+        for key in sorted(old_routes.keys() - new_routes.keys()):
+            effects["routes"][REMOVED].append({"device": hostname, **old_routes[key]})
+        for key in sorted(old_routes.keys() & new_routes.keys()):
+            if old_routes[key] != new_routes[key]:
+                effects["routes"][CHANGED].append({"device": hostname, "old": old_routes[key], "new": new_routes[key]})
+
+    for group in ("interfaces", "routes"):
+        for change in (ADDED, REMOVED):
+            effects[group][change].sort(key=lambda item: (item["device"], item.get("name") or item.get("destination")))
+    effects["interfaces"][CHANGED].sort(key=lambda item: (item["device"], item["interface"]))
+    return effects
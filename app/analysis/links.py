@@ -0,0 +1,204 @@
+import ipaddress
+import re
+from itertools import zip_longest
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.models.network import Device
+
+# Descriptions are split into tokens on anything that cannot appear in a hostname
+DESCRIPTION_TOKEN_RE = re.compile(r'[^\w.-]+')
+# Separators inside a token, e.g. ``uplink-to-sw2`` or ``sw2.lab_xe-0/0/1``
+TOKEN_SEPARATOR_RE = re.compile(r'[-_.]')
+# Tokens with more separators than this are only matched whole
+MAX_TOKEN_PIECES = 8
+
+Endpoint = Dict[str, Optional[str]]
+
+
+class _Segment:
+    """Addresses sharing one network prefix, in the order they were swept"""
+    __slots__ = ("version", "start", "end", "network", "members", "parent")
+
+    def __init__(self, version: int, start: int, end: int, network, parent: Optional["_Segment"]):
+        self.version = version
+        self.start = start
+        self.end = end
+        self.network = network
+        self.members: List[Endpoint] = []
+        self.parent = parent
+
+    def devices(self) -> set:
+        return {member["device"] for member in self.members}
+
+
+def _address_entries(devices: Iterable[Device]) -> List[tuple]:
+    entries = []
+    for device in devices:
+        for interface in device.interfaces:
+            if not interface.ip:
+                continue
+            try:
+                address = ipaddress.ip_interface(interface.ip)
+            except ValueError:
+                continue
+            network = address.network
+            # Host routes (loopbacks) never describe a link
+            if network.prefixlen == network.max_prefixlen:
+                continue
+            entries.append((
+                network.version, int(network.network_address), network.prefixlen, network,
+                {"device": device.hostname, "interface": interface.name, "ip": interface.ip}
+            ))
+    return entries
+
+
+def build_segments(devices: Iterable[Device]) -> List[_Segment]:
+    """
+    Group interface addresses into subnets with one sorted sweep.
+    CIDR blocks are either nested or disjoint, so after sorting by (start,
+    prefix length) a stack of open blocks is enough to find the enclosing
+    subnet of every address; the whole pass is O(n log n). A segment whose
+    addresses all sit on one device folds into its enclosing segment, which
+    pairs up links configured with mismatched masks (e.g. /30 against /31).
+    """
+    entries = _address_entries(devices)
+    entries.sort(key=lambda entry: entry[:3])
+
+    segments: List[_Segment] = []
+    stack: List[_Segment] = []
+    for version, start, prefixlen, network, endpoint in entries:
+        while stack and (stack[-1].version != version or stack[-1].end < start):
+            stack.pop()
+        top = stack[-1] if stack else None
+        if top is None or top.start != start or top.network.prefixlen != prefixlen:
+            top = _Segment(version, start, start + network.num_addresses - 1, network, top)
+            stack.append(top)
+            segments.append(top)
+        top.members.append(endpoint)
+
+    # Children always follow their parents, so walking backwards bubbles lone addresses up
+    for segment in reversed(segments):
+        if segment.parent is not None and len(segment.devices()) == 1:
+            segment.parent.members.extend(segment.members)
+            segment.members = []
+    return [segment for segment in segments if segment.members]
+
+
+def _hostname_index(devices: Iterable[Device]) -> Dict[str, str]:
+    """Map lowercased hostnames, and their unambiguous short names, to the device hostname"""
+    index: Dict[str, str] = {}
+    short_names: Dict[str, Optional[str]] = {}
+    for device in devices:
+        name = device.hostname.lower()
+        if not name or name == "unknown":
+            continue
+        index[name] = device.hostname
+        short = name.split(".")[0]
+        if short != name:
+            short_names[short] = None if short in short_names else device.hostname
+    for short, hostname in short_names.items():
+        if hostname is not None:
+            index.setdefault(short, hostname)
+    return index
+
+
+def _named_hostnames(description: str, index: Dict[str, str]) -> List[str]:
+    """Hostnames mentioned in a description, longest match per token"""
+    found = []
+    for token in DESCRIPTION_TOKEN_RE.split(description.lower()):
+        if not token:
+            continue
+        if token in index:
+            found.append(index[token])
+            continue
+        separators = [match.start() for match in TOKEN_SEPARATOR_RE.finditer(token)]
+        if not separators or len(separators) >= MAX_TOKEN_PIECES:
+            continue
+        starts = [0] + [position + 1 for position in separators]
+        ends = separators + [len(token)]
+        candidates = [token[i:j] for i in starts for j in ends if j > i]
+        match = max((c for c in candidates if c in index), key=len, default=None)
+        if match is not None:
+            found.append(index[match])
+    return found
+
+
+def _subnet_connections(segments: List[_Segment]) -> List[dict]:
+    connections = []
+    for segment in segments:
+        if len(segment.devices()) < 2:
+            continue
+        connections.append({
+            "kind": "point-to-point" if len(segment.members) == 2 else "shared-segment",
+            "evidence": ["subnet"],
+            "subnet": str(segment.network),
+            "endpoints": segment.members
+        })
+    return connections
+
+
+def _description_connections(devices: List[Device], subnet_links: List[dict]) -> List[dict]:
+    index = _hostname_index(devices)
+    if len(index) < 2:
+        return []
+
+    # (device, interface) -> subnet connection, so descriptions can corroborate them
+    linked: Dict[Tuple[str, str], dict] = {}
+    for connection in subnet_links:
+        for endpoint in connection["endpoints"]:
+            linked[(endpoint["device"], endpoint["interface"])] = connection
+
+    claims: Dict[Tuple[str, str], List[str]] = {}
+    for device in devices:
+        for interface in device.interfaces:
+            if not interface.description:
+                continue
+            for neighbor in _named_hostnames(interface.description, index):
+                if neighbor == device.hostname:
+                    continue
+                connection = linked.get((device.hostname, interface.name))
+                if connection is not None and neighbor in {e["device"] for e in connection["endpoints"]}:
+                    if "description" not in connection["evidence"]:
+                        connection["evidence"].append("description")
+                    continue
+                claims.setdefault((device.hostname, neighbor), []).append(interface.name)
+                break
+
+    connections = []
+    seen = set()
+    for (local, neighbor), interfaces in claims.items():
+        pair = tuple(sorted((local, neighbor)))
+        if pair in seen:
+            continue
+        seen.add(pair)
+        first, second = pair
+        # Parallel links pair off in interface order; an unanswered claim points at the device
+        first_side = sorted(claims.get((first, second), []))
+        second_side = sorted(claims.get((second, first), []))
+        for first_interface, second_interface in zip_longest(first_side, second_side):
+            connections.append({
+                "kind": "point-to-point",
+                "evidence": ["description"],
+                "subnet": None,
+                "endpoints": [
+                    {"device": first, "interface": first_interface, "ip": None},
+                    {"device": second, "interface": second_interface, "ip": None}
+                ]
+            })
+    return connections
+
+
+def infer_connections(devices: List[Device]) -> List[dict]:
+    """
+    Infer links between devices from shared subnets and from interface
+    descriptions that name another device's hostname.
+
+    Each connection is a dict with ``kind`` (point-to-point or shared-segment),
+    ``evidence`` (subnet and/or description), ``subnet`` and ``endpoints``, a
+    list of ``{"device", "interface", "ip"}`` entries. ``interface`` is None
+    when only one side's description names the other device.
+    """
+    if len(devices) < 2:
+        return []
+    subnet_links = _subnet_connections(build_segments(devices))
+    return subnet_links + _description_connections(devices, subnet_links)
@@ -0,0 +1,200 @@
+import ipaddress
+import socket
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from app.models.network import Device
+
+# Junos default preferences; a lower value wins when two sources share a prefix
+DEFAULT_PREFERENCE = {"local": 0, "direct": 0, "static": 5}
+
+RouteEntry = Dict[str, Optional[Union[str, int]]]
+
+
+def _field(item, name: str):
+    """Read a field from a model or from its ``.dict()`` form kept in storage"""
+    return item.get(name) if isinstance(item, dict) else getattr(item, name, None)
+
+
+def address_to_int(address: str) -> Tuple[int, int]:
+    """Parse an address to ``(version, integer)``; raises ValueError if invalid"""
+    try:
+        return 4, int.from_bytes(socket.inet_pton(socket.AF_INET, address), "big")
+    except OSError:
+        pass
+    try:
+        return 6, int.from_bytes(socket.inet_pton(socket.AF_INET6, address), "big")
+    except OSError:
+        raise ValueError(f"'{address}' is not a valid IPv4 or IPv6 address") from None
+
+
+class _FamilyTable:
+    """Routes of one address family, bucketed by prefix length"""
+    __slots__ = ("bits", "buckets", "probes")
+
+    def __init__(self, bits: int):
+        self.bits = bits
+        self.buckets: Dict[int, Dict[int, RouteEntry]] = {}
+        # (mask, bucket) pairs, longest prefix first, built by compile()
+        self.probes: List[Tuple[int, Dict[int, RouteEntry]]] = []
+
+    def add(self, network, entry: RouteEntry) -> None:
+        bucket = self.buckets.setdefault(network.prefixlen, {})
+        key = int(network.network_address)
+        current = bucket.get(key)
+        if current is None or entry["preference"] < current["preference"]:
+            bucket[key] = entry
+
+    def compile(self) -> None:
+        full = (1 << self.bits) - 1
+        self.probes = [
+            (full ^ (full >> length), self.buckets[length])
+            for length in sorted(self.buckets, reverse=True)
+        ]
+
+    def lookup(self, value: int) -> Optional[RouteEntry]:
+        for mask, bucket in self.probes:
+            entry = bucket.get(value & mask)
+            if entry is not None:
+                return entry
+        return None
+
+
+class RouteTable:
+    """
+    Compiled longest-prefix-match table for one device.
+
+    Prefixes are bucketed into one hash table per prefix length, and a
+    lookup probes only the lengths that actually occur, longest first. A
+    device carries a handful of distinct lengths, so a lookup is a few
+    dict probes with no scan over the route list. Entries come from static
+    routes and from the subnets and addresses of the device's interfaces.
+    """
+
+    def __init__(self, hostname: str):
+        self.hostname = hostname
+        self.families = {4: _FamilyTable(32), 6: _FamilyTable(128)}
+        self.route_count = 0
+
+    @classmethod
+    def from_device(cls, device: Union[Device, dict]) -> "RouteTable":
+        table = cls(_field(device, "hostname"))
+        for interface in _field(device, "interfaces") or []:
+            ip = _field(interface, "ip")
+            if not ip:
+                continue
+            try:
+                address = ipaddress.ip_interface(ip)
+            except ValueError:
+                continue
+            name = _field(interface, "name")
+            table.add(address.network, next_hop=None, protocol="direct", interface=name)
+            table.add(ipaddress.ip_network(address.ip), next_hop=None, protocol="local", interface=name)
+
+        routing = _field(device, "routing") or {}
+        for route in routing.get("routes", []):
+            try:
+                network = ipaddress.ip_network(_field(route, "destination"), strict=False)
+            except ValueError:
+                continue
+            table.add(network, next_hop=_field(route, "next_hop"), protocol=_field(route, "protocol") or "static",
+                      preference=_field(route, "preference"))
+        table.compile()
+        return table
+
+    def add(self, network, next_hop: Optional[str], protocol: str, interface: Optional[str] = None,
+            preference: Optional[int] = None) -> None:
+        if preference is None:
+            preference = DEFAULT_PREFERENCE.get(protocol, DEFAULT_PREFERENCE["static"])
+        self.families[network.version].add(network, {
+            "prefix": str(network),
+            "next_hop": next_hop,
+            "protocol": protocol,
+            "interface": interface,
+            "preference": preference
+        })
+        self.route_count += 1
+
+    def compile(self) -> None:
+        """Freeze the probe order and resolve static next-hops to egress interfaces"""
+        for family in self.families.values():
+            family.compile()
+        for family in self.families.values():
+            for bucket in family.buckets.values():
+                for entry in bucket.values():
+                    if entry["interface"] is None and entry["next_hop"]:
+                        entry["interface"] = self._egress_interface(entry["next_hop"])
+
+    def _egress_interface(self, next_hop: str) -> Optional[str]:
+        try:
+            version, value = address_to_int(next_hop)
+        except ValueError:
+            return None
+        entry = self.families[version].lookup(value)
+        if entry is None or entry["protocol"] not in ("direct", "local"):
+            return None
+        return entry["interface"]
+
+    def lookup(self, destination: str) -> Optional[RouteEntry]:
+        """Return the best matching entry for one address, or None"""
+        version, value = address_to_int(destination)
+        return self.families[version].lookup(value)
+
+    def lookup_many(self, destinations: Iterable[str]) -> List[dict]:
+        """Resolve many addresses; invalid ones are reported per entry"""
+        families = self.families
+        results = []
+        for destination in destinations:
+            try:
+                version, value = address_to_int(destination)
+            except ValueError as e:
+                results.append({"destination": destination, "error": str(e)})
+                continue
+            entry = families[version].lookup(value)
+            if entry is None:
+                results.append({"destination": destination, "prefix": None, "next_hop": None,
+                                "protocol": None, "interface": None})
+            else:
+                results.append({"destination": destination, **entry})
+        return results
+
+
+class RouteTableCache:
+    """
+    Compiled route tables per config, hostname -> RouteTable, in an LRU
+    keyed by config ID. A stored config never changes, so entries only leave
+    on eviction or when the config is deleted.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, RouteTable]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, config_id: str) -> Optional[Dict[str, RouteTable]]:
+        with self._lock:
+            tables = self._entries.get(config_id)
+            if tables is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(config_id)
+                self.hits += 1
+            return tables
+
+    def put(self, config_id: str, tables: Dict[str, RouteTable]) -> None:
+        with self._lock:
+            self._entries[config_id] = tables
+            self._entries.move_to_end(config_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, config_id: str) -> None:
+        with self._lock:
+            self._entries.pop(config_id, None)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "max_entries": self.max_entries,
+                "hits": self.hits, "misses": self.misses}
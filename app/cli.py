@@ -0,0 +1,45 @@
+"""
+Command line entry points.
+
+    python -m app.cli ingest path/to/configs --workers 8 --output network.json
+"""
+import argparse
+import json
+import sys
+
+from app.parsers.batch_parser import BatchParser, iter_path
+
+
+def ingest(args: argparse.Namespace) -> int:
+    result = BatchParser(workers=args.workers).parse(iter_path(args.path))
+    summary = result.summary()
+
+    for error in result.errors:
+        print(f"error: {error['file']}: {error['error']}", file=sys.stderr)
+    print(f"Parsed {summary['file_count']} files into {summary['device_count']} devices "
+          f"with {summary['workers']} workers in {summary['elapsed_seconds']}s "
+          f"({summary['configs_per_second']} configs/sec, {summary['error_count']} errors)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(result.network.model_dump_json(indent=2))
+        print(f"Network written to {args.output}")
+    return 1 if result.errors and not result.network.devices else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Juniper Config Melter tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = subparsers.add_parser("ingest", help="Parse a directory or archive of configs")
+    ingest_parser.add_argument("path", help="Directory, .tar/.tar.gz/.tgz/.zip archive, or single config")
+    ingest_parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: available cores)")
+    ingest_parser.add_argument("--output", help="Write the merged Network as JSON to this file")
+    ingest_parser.set_defaults(func=ingest)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,27 +1,77 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException, Query
-from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
+from fastapi.responses import HTMLResponse, JSONResponse, FileResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+import asyncio
+from contextlib import asynccontextmanager
 import os
+import subprocess
 import tempfile
 import uuid
 import logging
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
+from pydantic import BaseModel
 
 from app.parsers.juniper_parser import JuniperParser
 from app.parsers.diagrams_generator import DiagramsGenerator
-from app.models.network import Network
+from app.parsers.grid_renderer import RasterizerMissingError
+from app.parsers.incremental import RevisionParse, parse_revision
+from app.parsers.lazy_config import LazyConfig
+from app.parsers.set_parser import is_set_format
+from app.parsers.streaming_parser import StreamingNetworkParser, ConfigTooLargeError, scan_hostname
+from app.parsers.batch_parser import BatchParser, available_cores, iter_archive, ARCHIVE_SUFFIXES
+from app.analysis.config_diff import diff_configs, model_effects
+from app.analysis.route_lookup import RouteTable, RouteTableCache
+from app.services.parse_cache import ParseCache, ConfigHasher
+from app.services.render_pool import RenderPool
+from app.services.storage import LIST_SORTS, ConfigStore, diagram_paths, open_store
+from app.services.search_index import FIELDS, SearchQuery
+from app.services.listings import RESOURCES, ListingCache, build_listing, device_summaries, page_items
+from app.services.pagination import decode_cursor, encode_cursor, paginate, parse_fields, project
+from app.services.serialization import dumps, model_json, parse_body
+from app.services.artifacts import ArtifactStore
+from app.services.mermaid_cache import MermaidCache
+from app.services.compression import (
+    MIN_COMPRESS_BYTES, CompressedBodies, CompressionStats, compress_all, compressed_siblings, negotiate
+)
+from app.services.http_cache import (
+    CachedFileResponse, content_etag, encoded_etag, encoding_headers, file_etag, not_modified,
+    not_modified_response, validator_headers
+)
+from app.services.jobs import Job, JobQueue, JobTimeout, QueueFullError, DONE, CANCELLED
+from app.models.compact import CompactNetwork
+from app.models.network import Network, network_from_dict
+from app import settings
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Juniper Config Melter", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Files no stored config refers to are removed at startup; anything younger than a
+    # job could run is left alone, since another server process may still be rendering it
+    removed = artifacts.sweep_orphans(config_storage.artifact_paths(), grace=settings.JOB_TIMEOUT)
+    logger.info(f"Removed {removed} orphaned diagram files")
+    yield
+
+app = FastAPI(title="Juniper Config Melter", version="1.0.0", lifespan=lifespan)
 
 # Initialize parsers
 parser = JuniperParser()
-generator = DiagramsGenerator()
+render_concurrency = settings.RENDER_CONCURRENCY or available_cores()
+render_pool = RenderPool(render_concurrency) if render_concurrency > 1 else None
+generator = DiagramsGenerator(
+    settings.DIAGRAM_DIR,
+    render_timeout=settings.RENDER_TIMEOUT,
+    render_pool=render_pool,
+    grid_threshold=settings.GRID_RENDER_THRESHOLD if settings.GRID_RENDER_THRESHOLD >= 0 else None
+)
+# Batch uploads parse their archives in one process pool shared by every request,
+# one worker per core; ?workers= caps how many of them one batch keeps busy
+batch_pool = RenderPool(available_cores())
 
 # Mount static files
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
@@ -29,8 +79,294 @@ app.mount("/static", StaticFiles(directory="app/static"), name="static")
 # Templates
 templates = Jinja2Templates(directory="app/templates")
 
-# In-memory storage for demo purposes (in production, use a database)
-config_storage: Dict[str, dict] = {}
+# Uploaded configs and their parsed networks, persisted across restarts and server processes
+config_storage: ConfigStore = open_store(settings.STORAGE_PATH)
+
+# Compiled per-device route tables, built on the first lookup against a config
+route_tables = RouteTableCache(max_entries=settings.ROUTE_TABLE_CACHE_ENTRIES)
+
+# Parsing and rendering run on these workers, never on the event loop
+jobs = JobQueue(workers=settings.JOB_WORKERS, max_pending=settings.JOB_QUEUE_SIZE, timeout=settings.JOB_TIMEOUT)
+
+# Identical uploads (ignoring commit headers and prompts) reuse an earlier parse
+parse_cache = ParseCache(max_entries=settings.PARSE_CACHE_ENTRIES, cache_dir=settings.PARSE_CACHE_DIR or None,
+                         max_disk_bytes=settings.PARSE_CACHE_MAX_BYTES)
+
+# Mermaid source per config, generated on first request and rendered by the browser
+mermaid_cache = MermaidCache(max_entries=settings.MERMAID_CACHE_ENTRIES)
+
+# Sorted, filtered interface/VLAN/route listings, so each later page is a slice
+listing_cache = ListingCache(max_entries=settings.LISTING_CACHE_ENTRIES)
+
+MERMAID_MEDIA_TYPE = "text/vnd.mermaid"
+
+# Compressed copies of JSON and Mermaid bodies, keyed by ETag; SVG copies are files next to each render
+compressed_bodies = CompressedBodies(max_entries=settings.COMPRESSED_BODY_ENTRIES)
+compression_stats = CompressionStats()
+
+# Rendered diagrams, bounded by total size and age
+artifacts = ArtifactStore(generator.output_dir, max_bytes=settings.ARTIFACT_MAX_BYTES, max_age=settings.ARTIFACT_MAX_AGE)
+
+class RouteLookupRequest(BaseModel):
+    destinations: List[str]
+    device: Optional[str] = None
+
+os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+
+def _remove_file(path: Optional[str]) -> None:
+    """Delete a file if it exists, ignoring races with other deletions"""
+    if path and os.path.exists(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def _read_config_text(config_data: dict) -> str:
+    """Load the raw configuration text spooled to disk at upload time"""
+    if not config_data.get("config_path"):
+        raise HTTPException(status_code=400, detail="Raw configuration text is only kept for single-config uploads")
+    with open(config_data["config_path"], "r", encoding="utf-8") as f:
+        return f.read()
+
+def _parse_spooled_config(config_path: str) -> Network:
+    """Stream a spooled upload from disk through the parser"""
+    stream = StreamingNetworkParser(max_bytes=settings.MAX_UPLOAD_BYTES)
+    with open(config_path, "rb") as f:
+        while True:
+            chunk = f.read(settings.UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            stream.feed_bytes(chunk)
+    return stream.close()
+
+def _render_eagerly(render: Optional[str]) -> bool:
+    return (render or settings.RENDER_MODE) == "eager"
+
+def _prepare_diagrams(network: Network, config_id: str, render: Optional[str]) -> Dict[str, Dict[str, str]]:
+    """Render every diagram now, or only work out where each will be rendered on first request"""
+    if _render_eagerly(render):
+        logger.info("Generating diagrams...")
+        diagrams = generator.generate_all_diagrams(network, config_id)
+        artifacts.record(diagram_paths(diagrams))
+        return diagrams
+    return generator.plan_all_diagrams(network)
+
+def _submit_job(kind: str, fn, on_finish=None, **metadata) -> Job:
+    try:
+        return jobs.submit(kind, fn, metadata=metadata, on_finish=on_finish)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+async def _mermaid_sources(config_id: str, config_data: dict) -> Dict[str, str]:
+    """Cached Mermaid source for every diagram type, generated on a job worker on a miss"""
+    sources = mermaid_cache.get(config_id)
+    if sources is not None:
+        return sources
+    
+    def generate(job: Job) -> Dict[str, str]:
+        with job.stage("generate"):
+            sources = mermaid_cache.get_or_generate(config_id, config_data["network"])
+        with job.stage("compress"):
+            for source in sources.values():
+                body = source.encode()
+                if len(body) >= MIN_COMPRESS_BYTES:
+                    _encodings(content_etag(body), body, config_id)
+        return sources
+    
+    job = _submit_job("mermaid", generate, config_id=config_id)
+    return await _job_result(job, "generating Mermaid diagrams")
+
+async def _job_result(job: Job, action: str):
+    """Wait for a job without blocking the event loop and map its failure to an HTTP error"""
+    await asyncio.wrap_future(job.future)
+    if job.state == DONE:
+        return job.result
+    
+    error = job.exception
+    if job.state == CANCELLED:
+        raise HTTPException(status_code=409, detail=f"Job {job.id} was cancelled")
+    if isinstance(error, HTTPException):
+        raise error
+    if isinstance(error, (JobTimeout, subprocess.TimeoutExpired)):
+        raise HTTPException(status_code=504, detail=f"Error {action}: {job.error}")
+    if isinstance(error, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Configuration file must be UTF-8 text")
+    logger.error(f"Error {action}: {job.error}", exc_info=error)
+    raise HTTPException(status_code=500, detail=f"Error {action}: {job.error}")
+
+def _previous_revision(hostname: Optional[str]) -> Optional[Tuple[str, dict]]:
+    """The latest stored single-config upload of a device; a new upload of it becomes its next revision"""
+    if not hostname or hostname == "unknown":
+        # Configs without a host-name are not revisions of each other
+        return None
+    after = None
+    while True:
+        # Newest first, one at a time: the latest upload is almost always the one wanted
+        summaries, after = config_storage.list_page(hostname=hostname, descending=True, after=after, limit=1)
+        for summary in summaries:
+            if summary["device_count"] != 1:
+                continue
+            record = config_storage.get(summary["config_id"])
+            if record is not None and record.get("config_path"):
+                return summary["config_id"], record
+        if after is None:
+            return None
+
+def _spooled_hostname(config_path: str) -> Optional[str]:
+    """Hostname of a spooled curly-brace upload, from a streaming scan that stops after its system stanza"""
+    with open(config_path, "rb") as f:
+        return scan_hostname(iter(lambda: f.read(settings.UPLOAD_CHUNK_SIZE), b""))
+
+def _parse_against_previous(config_path: str, previous: Tuple[str, dict]) -> Optional[RevisionParse]:
+    """
+    Parse only what changed since the previous revision of the uploaded
+    device, or None when a full parse is needed
+    """
+    try:
+        previous_text = _read_config_text(previous[1])
+    except OSError:
+        return None
+    with open(config_path, "r", encoding="utf-8") as f:
+        config_text = f.read()
+    return parse_revision(config_text, previous_text, previous[1]["network"])
+
+def _revision_result(previous: Optional[Tuple[str, dict]], revision: Optional[RevisionParse], diagrams: dict) -> dict:
+    """What a new revision reused from the previous one"""
+    parent_id, parent = previous
+    reused = [diagram_type for diagram_type, paths in diagrams.items() if parent["diagrams"].get(diagram_type) == paths]
+    return {
+        "parent_id": parent_id,
+        "incremental": revision is not None,
+        **(revision.summary() if revision is not None else {}),
+        "diagrams_reused": reused,
+        "diagrams_changed": [diagram_type for diagram_type in diagrams if diagram_type not in reused]
+    }
+
+def _ingest_config(job: Job, config_id: str, filename: str, config_path: str, digest: str,
+                   cached: Optional[CompactNetwork], render: Optional[str]) -> dict:
+    """
+    Job body for a single-config upload: parse (unless cached), prepare
+    diagrams, store. An upload of a device already stored is linked to its
+    latest revision and parsed incrementally against it; diagrams whose
+    inputs did not change keep their content-addressed files.
+    """
+    with job.stage("parse"):
+        previous, revision = None, None
+        if cached is not None:
+            network = cached.to_network()
+        else:
+            # The text is only read whole when there is a previous revision to diff against
+            previous = _previous_revision(_spooled_hostname(config_path))
+            revision = _parse_against_previous(config_path, previous) if previous is not None else None
+            if revision is not None:
+                logger.info(f"Parsed as a revision of {previous[0]}: {revision.summary()}")
+                network = network_from_dict(revision.network)
+            else:
+                logger.info("Streaming file content into parser...")
+                network = _parse_spooled_config(config_path)
+            logger.info(f"Configuration parsed successfully: {len(network.devices)} devices")
+        if previous is None and len(network.devices) == 1:
+            previous = _previous_revision(network.devices[0].hostname)
+    
+    with job.stage("render" if _render_eagerly(render) else "plan"):
+        diagrams = _prepare_diagrams(network, config_id, render)
+        logger.info(f"Diagrams prepared: {list(diagrams.keys())}")
+    
+    with job.stage("store"):
+        record = {
+            "filename": filename,
+            "config_path": config_path,
+            "digest": digest,
+            "network": revision.network if revision is not None else network.model_dump(mode="json"),
+            "network_json": dumps(revision.network) if revision is not None else model_json(network),
+            "diagrams": diagrams,
+            "parent_id": previous[0] if previous is not None else None
+        }
+        _precompress_parse(config_id, record)
+        config_storage.put(config_id, record)
+        parse_cache.put(digest, network, config_id)
+    
+    result = _upload_result(config_id, record)
+    if previous is not None:
+        result["revision"] = _revision_result(previous, revision, diagrams)
+    logger.info(f"Upload completed successfully: {result}")
+    return result
+
+async def _cached_response(request: Request, response: Response, last_modified: Optional[float],
+                           etag: Optional[str] = None, config_id: Optional[str] = None) -> Response:
+    """
+    Attach a strong ETag from the body's hash, unless one computed earlier is
+    given, and send the body in the best encoding the client accepts,
+    compressed once per ETag; answer 304 with no body when the client's copy
+    matches. A body derived from ``config_id`` has its encodings kept with
+    that config.
+    """
+    etag = etag or content_etag(response.body)
+    encoded = {} if len(response.body) < MIN_COMPRESS_BYTES else compressed_bodies.get(etag)
+    if encoded is None:
+        # Reading stored encodings or compressing a large body would stall every other request
+        encoded = await run_in_threadpool(_encodings, etag, response.body, config_id)
+    encoding = negotiate(request.headers.get("accept-encoding"), encoded)
+    etag = encoded_etag(etag, encoding)
+    headers = encoding_headers(encoding)
+    if not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified, headers=headers)
+    identity_bytes = len(response.body)
+    if encoding is not None:
+        response.body = encoded[encoding]
+        response.headers["content-length"] = str(len(response.body))
+    response.headers.update({**validator_headers(etag, last_modified), **headers})
+    compression_stats.record(encoding, identity_bytes, len(response.body))
+    return response
+
+def _encodings(etag: str, body: bytes, config_id: Optional[str] = None) -> Dict[str, bytes]:
+    """
+    Compressed encodings of a body: from memory, else as stored with its
+    config, else compressed now and, when it derives from ``config_id``,
+    stored with that config. Blocks, so callers keep it off the event loop.
+    """
+    encoded = compressed_bodies.get(etag)
+    if encoded is None:
+        encoded = config_storage.get_encoded(etag)
+        if not encoded:
+            encoded = compress_all(body)
+            if encoded and config_id is not None:
+                config_storage.put_encoded(config_id, etag, encoded)
+        compressed_bodies.put(etag, encoded)
+    return encoded
+
+def _precompress_parse(config_id: str, record: dict) -> None:
+    """
+    Build and compress a new config's ``/parse`` body at ingest, so no
+    request pays for it; its ETag and encodings are stored with the record
+    """
+    body = parse_body(config_id, record["filename"], record["network_json"])
+    etag = content_etag(body)
+    encoded = compress_all(body)
+    compressed_bodies.put(etag, encoded)
+    record["parse_etag"] = etag
+    record["encoded_bodies"] = {etag: encoded}
+
+def _page_position(sort: str, order: str, cursor: Optional[str]) -> Tuple[str, Optional[list]]:
+    """Cursor namespace for a sort order, and the key to resume after"""
+    cursor_sort = f"{sort}:{order}"
+    try:
+        return cursor_sort, decode_cursor(cursor, cursor_sort) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _upload_result(config_id: str, config_data: dict, cached: bool = False) -> dict:
+    """Summary returned by the upload endpoint"""
+    devices = config_data["network"]["devices"]
+    return {
+        "config_id": config_id,
+        "filename": config_data["filename"],
+        "device_count": len(devices),
+        "interface_count": sum(len(device["interfaces"]) for device in devices),
+        "vlan_count": sum(len((device["routing"] or {}).get("vlans", [])) for device in devices),
+        "diagram_types": list(config_data["diagrams"].keys()),
+        "cached": cached
+    }
 
 @app.get("/", response_class=HTMLResponse)
 async def root(request: Request):
@@ -45,7 +381,11 @@ async def health_check():
     return {"status": "healthy", "service": "juniper-config-melter"}
 
 @app.post("/upload")
-async def upload_config(file: UploadFile = File(...)):
+async def upload_config(
+    file: UploadFile = File(...),
+    render: Optional[str] = Query(None, pattern="^(lazy|eager)$", description="Render diagrams now (eager) or on first request (lazy)"),
+    background: bool = Query(False, description="Return 202 with a job to poll at /jobs/{job_id} instead of waiting")
+):
     """Upload and parse a Juniper configuration file"""
     logger.info(f"Upload request received for file: {file.filename}")
     
@@ -53,83 +393,246 @@ async def upload_config(file: UploadFile = File(...)):
         logger.warning(f"Invalid file type: {file.filename}")
         raise HTTPException(status_code=400, detail="Invalid file type. Please upload a .conf or .txt file")
     
+    # Generate unique ID for this configuration
+    config_id = str(uuid.uuid4())
+    logger.info(f"Generated config ID: {config_id}")
+    config_path = os.path.join(settings.UPLOAD_DIR, f"{config_id}.conf")
+    
     try:
-        # Read file content
-        logger.info("Reading file content...")
-        content = await file.read()
-        config_text = content.decode('utf-8')
-        logger.info(f"File read successfully, size: {len(config_text)} characters")
+        # Spool the upload to disk chunk by chunk while hashing its normalized
+        # content, so neither the whole file nor its decoded text is held
+        hasher = ConfigHasher()
+        with open(config_path, "wb") as spool:
+            while True:
+                chunk = await file.read(settings.UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                hasher.update(chunk)
+                if hasher.bytes_read > settings.MAX_UPLOAD_BYTES:
+                    raise ConfigTooLargeError(f"Configuration exceeds the {settings.MAX_UPLOAD_BYTES} byte limit")
+                spool.write(chunk)
+        digest = hasher.hexdigest()
         
-        # Generate unique ID for this configuration
-        config_id = str(uuid.uuid4())
-        logger.info(f"Generated config ID: {config_id}")
+        cached = parse_cache.get(digest)
+    except ConfigTooLargeError as e:
+        _remove_file(config_path)
+        logger.warning(f"Upload rejected: {str(e)}")
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        _remove_file(config_path)
+        logger.error(f"Error receiving configuration: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error processing configuration: {str(e)}")
+    
+    compact = None
+    if cached is not None:
+        compact, cached_config_id = cached
+        cached_config = config_storage.get(cached_config_id) if cached_config_id else None
+        if cached_config is not None:
+            # Same content as a stored upload: hand back its parse and diagrams
+            _remove_file(config_path)
+            logger.info(f"Upload matched cached config {cached_config_id}")
+            return _upload_result(cached_config_id, cached_config, cached=True)
+        logger.info("Configuration found in parse cache")
+    
+    def discard_upload(job: Job) -> None:
+        # A job that did not store the config, including one cancelled before it
+        # started, leaves nothing referring to the spooled upload
+        if job.state != DONE:
+            _remove_file(config_path)
+    
+    try:
+        job = _submit_job(
+            "ingest",
+            lambda job: _ingest_config(job, config_id, file.filename, config_path, digest, compact, render),
+            on_finish=discard_upload,
+            config_id=config_id
+        )
+    except HTTPException:
+        _remove_file(config_path)
+        raise
+    if background:
+        # The upload is already on disk, so the job outlives this request
+        return JSONResponse(status_code=202, content=job.to_dict())
+    return await _job_result(job, "processing configuration")
+
+@app.post("/upload/batch")
+async def upload_batch(
+    file: UploadFile = File(...),
+    workers: Optional[int] = Query(None, ge=1, le=batch_pool.max_workers),
+    render: Optional[str] = Query(None, pattern="^(lazy|eager)$", description="Render diagrams now (eager) or on first request (lazy)")
+):
+    """Upload a tar or zip archive of configurations and parse them into one multi-device network"""
+    logger.info(f"Batch upload request received for file: {file.filename}")
+    
+    if not file.filename or not file.filename.endswith(ARCHIVE_SUFFIXES):
+        logger.warning(f"Invalid archive type: {file.filename}")
+        raise HTTPException(status_code=400, detail="Invalid file type. Please upload a .tar, .tar.gz, .tgz or .zip archive")
+    
+    config_id = str(uuid.uuid4())
+    logger.info(f"Generated config ID: {config_id}")
+    
+    def ingest_archive(job: Job) -> dict:
+        with job.stage("parse"):
+            # Archive members are read one at a time from the spooled upload and fanned out to a process pool
+            items = iter_archive(file.file, file.filename, max_member_bytes=settings.MAX_UPLOAD_BYTES,
+                                 max_total_bytes=settings.MAX_ARCHIVE_BYTES)
+            batch = BatchParser(workers=workers, pool=batch_pool).parse(items)
+            network = batch.network
+            logger.info(f"Batch parsed: {batch.summary()}")
         
-        # Parse configuration
-        logger.info("Parsing configuration...")
-        network = parser.parse_config(config_text)
-        logger.info(f"Configuration parsed successfully: {len(network.devices)} devices")
+        if not network.devices:
+            raise HTTPException(status_code=400, detail={"message": "No configurations could be parsed", **batch.summary()})
         
-        # Generate diagrams
-        logger.info("Generating diagrams...")
-        diagrams = generator.generate_all_diagrams(network, config_id)
-        logger.info(f"Diagrams generated: {list(diagrams.keys())}")
+        with job.stage("render" if _render_eagerly(render) else "plan"):
+            diagrams = _prepare_diagrams(network, config_id, render)
         
-        # Store results
-        config_storage[config_id] = {
-            "filename": file.filename,
-            "network": network.dict(),
-            "diagrams": diagrams,
-            "timestamp": "2024-01-01T00:00:00Z"  # In production, use actual timestamp
-        }
+        with job.stage("store"):
+            record = {
+                "filename": file.filename,
+                "config_path": None,
+                "network": network.model_dump(mode="json"),
+                "network_json": model_json(network),
+                "diagrams": diagrams
+            }
+            _precompress_parse(config_id, record)
+            config_storage.put(config_id, record)
         
-        result = {
+        return {
             "config_id": config_id,
             "filename": file.filename,
-            "device_count": len(network.devices),
             "interface_count": sum(len(device.interfaces) for device in network.devices),
-            "vlan_count": sum(len(device.routing.get("vlans", [])) for device in network.devices),
-            "diagram_types": list(diagrams.keys())
+            "diagram_types": list(diagrams.keys()),
+            **batch.summary()
         }
-        
-        logger.info(f"Upload completed successfully: {result}")
-        return result
-        
-    except Exception as e:
-        logger.error(f"Error processing configuration: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Error processing configuration: {str(e)}")
+    
+    # The archive is read from the request's upload file, so wait for the job here
+    job = _submit_job("batch-ingest", ingest_archive, config_id=config_id)
+    return await _job_result(job, "processing archive")
 
 @app.get("/parse/{config_id}")
-async def get_parsed_config(config_id: str):
-    """Get parsed network data for a configuration"""
-    logger.info(f"Parse request for config: {config_id}")
-    if config_id not in config_storage:
+async def get_parsed_config(
+    request: Request,
+    config_id: str,
+    sections: Optional[str] = Query(None, description="Comma-separated top-level stanzas to return, e.g. interfaces,vlans")
+):
+    """Get parsed network data for a configuration, or a projection of selected stanzas"""
+    logger.info(f"Parse request for config: {config_id}, sections: {sections}")
+    # The network stays as the JSON bytes stored at ingest; it is never decoded here
+    config_data = config_storage.get_serialized(config_id)
+    if config_data is None:
         logger.warning(f"Configuration not found: {config_id}")
         raise HTTPException(status_code=404, detail="Configuration not found")
     
-    config_data = config_storage[config_id]
-    return {
-        "config_id": config_id,
-        "filename": config_data["filename"],
-        "network": config_data["network"]
-    }
+    if sections:
+        config_text = _read_config_text(config_data)
+        if is_set_format(config_text):
+            # A set line does not mark where block names end, so the stanza trees cannot be rebuilt from it
+            raise HTTPException(status_code=400,
+                                detail="sections is only supported for configs uploaded in curly-brace format")
+        # Only the requested stanzas are parsed; the rest of the config is never tokenized
+        view = LazyConfig(config_text)
+        requested = [name.strip() for name in sections.split(",") if name.strip()]
+        projection = {}
+        for name in requested:
+            node = view.section(name)
+            projection[name] = node.to_dict() if node is not None else None
+        response = JSONResponse({
+            "config_id": config_id,
+            "filename": config_data["filename"],
+            "sections": projection
+        })
+        return await _cached_response(request, response, config_data.get("uploaded_at"))
+    
+    body = parse_body(config_id, config_data["filename"], config_data["network_json"])
+    response = Response(content=body, media_type="application/json")
+    # A stored config never changes, so its upload time is also its last modification;
+    # configs stored before ETags were kept at ingest get theirs from the body's hash
+    return await _cached_response(request, response, config_data.get("uploaded_at"), config_data.get("parse_etag"),
+                                 config_id)
+
+@app.post("/routes/{config_id}/lookup")
+async def lookup_routes(config_id: str, request: RouteLookupRequest):
+    """Longest-prefix-match a batch of destinations against each device's routes and connected subnets"""
+    logger.info(f"Route lookup for config: {config_id}, {len(request.destinations)} destinations")
+    
+    def lookup() -> dict:
+        if config_id not in config_storage:
+            logger.warning(f"Configuration not found: {config_id}")
+            raise HTTPException(status_code=404, detail="Configuration not found")
+        
+        if len(request.destinations) > settings.MAX_LOOKUP_DESTINATIONS:
+            raise HTTPException(status_code=400, detail=f"At most {settings.MAX_LOOKUP_DESTINATIONS} destinations per request")
+        
+        tables = route_tables.get(config_id)
+        if tables is None:
+            devices = config_storage.get(config_id)["network"]["devices"]
+            tables = {device["hostname"]: RouteTable.from_device(device) for device in devices}
+            route_tables.put(config_id, tables)
+        
+        if request.device is not None:
+            if request.device not in tables:
+                raise HTTPException(status_code=404, detail=f"Device '{request.device}' not found")
+            tables = {request.device: tables[request.device]}
+        
+        return {
+            "config_id": config_id,
+            "results": {hostname: table.lookup_many(request.destinations) for hostname, table in tables.items()}
+        }
+    
+    # The store read, the table build and a batch of lookups all block, so none of them run on the event loop
+    return await run_in_threadpool(lookup)
+
+@app.get("/diff/{old_config_id}/{new_config_id}")
+async def diff_stored_configs(request: Request, old_config_id: str, new_config_id: str):
+    """Structural diff of two uploads by stanza and key path, with its effect on interfaces, VLANs and routes"""
+    logger.info(f"Diff request: {old_config_id} -> {new_config_id}")
+    old_data = config_storage.get(old_config_id)
+    new_data = config_storage.get(new_config_id)
+    if old_data is None or new_data is None:
+        logger.warning(f"Configuration not found: {old_config_id if old_data is None else new_config_id}")
+        raise HTTPException(status_code=404, detail="Configuration not found")
+    
+    def diff(job: Job) -> dict:
+        with job.stage("diff"):
+            old_text, new_text = _read_config_text(old_data), _read_config_text(new_data)
+            try:
+                structural = diff_configs(old_text, new_text)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        with job.stage("effects"):
+            effects = model_effects(old_data["network"], new_data["network"])
+        return {"old_config_id": old_config_id, "new_config_id": new_config_id, **structural, "effects": effects}
+    
+    job = _submit_job("diff", diff, old_config_id=old_config_id, new_config_id=new_config_id)
+    result = await _job_result(job, "diffing configurations")
+    # Both configs are immutable, so the diff between them is too
+    last_modified = max(old_data.get("uploaded_at") or 0, new_data.get("uploaded_at") or 0) or None
+    return await _cached_response(request, JSONResponse(result), last_modified)
 
 @app.get("/diagram/{config_id}")
 async def get_diagram(
+    request: Request,
     config_id: str, 
     diagram_type: str = "topology",
-    format: str = Query("png", description="Diagram format: png or svg")
+    format: str = Query("png", description="Diagram format: png, svg, or mermaid for Mermaid source to render client-side")
 ):
     """Get a specific diagram for a configuration"""
     logger.info(f"Diagram request for config: {config_id}, type: {diagram_type}, format: {format}")
     
-    if config_id not in config_storage:
+    if format not in ["png", "svg", "mermaid"]:
+        raise HTTPException(status_code=400, detail="Format must be 'png', 'svg' or 'mermaid'")
+    
+    config_data = config_storage.get(config_id)
+    if config_data is None:
         logger.warning(f"Configuration not found: {config_id}")
         raise HTTPException(status_code=404, detail="Configuration not found")
     
-    if format not in ["png", "svg"]:
-        raise HTTPException(status_code=400, detail="Format must be 'png' or 'svg'")
-    
-    config_data = config_storage[config_id]
+    if format == "mermaid":
+        sources = await _mermaid_sources(config_id, config_data)
+        if diagram_type not in sources:
+            raise HTTPException(status_code=400, detail=f"Diagram type '{diagram_type}' not available")
+        response = Response(content=sources[diagram_type], media_type=MERMAID_MEDIA_TYPE)
+        return await _cached_response(request, response, config_data.get("uploaded_at"), config_id=config_id)
     diagrams = config_data["diagrams"]
     
     if diagram_type not in diagrams:
@@ -138,14 +641,52 @@ async def get_diagram(
     
     # Get the diagram file path
     diagram_path = diagrams[diagram_type].get(format)
-    if not diagram_path or not os.path.exists(diagram_path):
-        logger.warning(f"Diagram file not found: {diagram_path}")
+    if not diagram_path:
+        logger.warning(f"Diagram format not available: {diagram_type}.{format}")
         raise HTTPException(status_code=404, detail="Diagram file not found")
     
-    # Return the file
-    return FileResponse(
-        path=diagram_path,
-        media_type=f"image/{format}",
+    if not os.path.exists(diagram_path):
+        # Pending: render on first access; concurrent requests share one render
+        logger.info(f"Rendering {diagram_type}.{format} on demand for config: {config_id}")
+        def render_diagram(job: Job) -> Dict[str, str]:
+            with job.stage("render"):
+                try:
+                    paths = generator.generate_diagram(network_from_dict(config_data["network"]), diagram_type,
+                                                       (format,))
+                except RasterizerMissingError as e:
+                    # Large diagrams are never laid out by Graphviz; their SVG is still available
+                    raise HTTPException(status_code=415, detail=f"{e}; request format=svg instead")
+                artifacts.record(paths.values())
+                return paths
+        
+        job = _submit_job("render", render_diagram, config_id=config_id, diagram_type=diagram_type, format=format)
+        paths = await _job_result(job, "rendering diagram")
+        diagram_path = paths[format]
+    
+    artifacts.touch(diagram_path)
+    # SVG renders carry compressed copies written at render time; serving one costs no CPU
+    siblings = compressed_siblings(diagram_path)
+    encoding = negotiate(request.headers.get("accept-encoding"), siblings)
+    served_path = siblings[encoding] if encoding is not None else diagram_path
+    try:
+        stat_result = os.stat(served_path)
+        identity_bytes = os.path.getsize(diagram_path) if encoding is not None else stat_result.st_size
+        etag = encoded_etag(file_etag(diagram_path), encoding)
+    except FileNotFoundError:
+        # Evicted between the check and here; it renders again on the next request
+        raise HTTPException(status_code=404, detail="Diagram file not found")
+    headers = encoding_headers(encoding) if siblings else {}
+    if not_modified(request, etag, stat_result.st_mtime):
+        return not_modified_response(etag, stat_result.st_mtime, headers=headers)
+    
+    compression_stats.record(encoding, identity_bytes, stat_result.st_size)
+    # Return the file; FileResponse also answers Range requests
+    return CachedFileResponse(
+        served_path,
+        stat_result=stat_result,
+        etag=etag,
+        headers=headers,
+        media_type="image/svg+xml" if format == "svg" else f"image/{format}",
         filename=f"{config_id}_{diagram_type}.{format}"
     )
 
@@ -153,41 +694,200 @@ async def get_diagram(
 async def get_all_diagrams(config_id: str):
     """Get all diagrams for a configuration"""
     logger.info(f"All diagrams request for config: {config_id}")
-    if config_id not in config_storage:
+    config_data = config_storage.get(config_id)
+    if config_data is None:
+        logger.warning(f"Configuration not found: {config_id}")
+        raise HTTPException(status_code=404, detail="Configuration not found")
+    
+    status = {
+        diagram_type: {
+            outformat: "materialized" if os.path.exists(path) else "pending"
+            for outformat, path in paths.items()
+        }
+        for diagram_type, paths in config_data["diagrams"].items()
+    }
+    return {
+        "config_id": config_id,
+        "filename": config_data["filename"],
+        "diagrams": config_data["diagrams"],
+        "status": status
+    }
+
+@app.get("/diagrams/{config_id}/mermaid")
+async def get_all_mermaid_diagrams(config_id: str):
+    """Mermaid source for every diagram type of a configuration, in one response"""
+    logger.info(f"Mermaid diagrams request for config: {config_id}")
+    config_data = config_storage.get(config_id)
+    if config_data is None:
         logger.warning(f"Configuration not found: {config_id}")
         raise HTTPException(status_code=404, detail="Configuration not found")
     
-    config_data = config_storage[config_id]
     return {
         "config_id": config_id,
         "filename": config_data["filename"],
-        "diagrams": config_data["diagrams"]
+        "diagrams": await _mermaid_sources(config_id, config_data)
     }
 
+@app.get("/jobs")
+async def get_job_stats():
+    """Queue depth and job counts by state"""
+    return jobs.stats()
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """State, per-stage timings and, once done, the result of a background job"""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@app.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """Cancel a job; queued jobs never start and running ones stop at their next stage"""
+    job = jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """Parse, render, Mermaid, listing and route table cache hit/miss counters, and bytes saved by compressed responses"""
+    return {"parse_cache": parse_cache.stats(), "render_cache": generator.render_cache.stats(),
+            "mermaid_cache": mermaid_cache.stats(), "listing_cache": listing_cache.stats(),
+            "route_table_cache": route_tables.stats(),
+            "compression": compression_stats.stats()}
+
+@app.get("/artifacts/stats")
+async def get_artifact_stats():
+    """Size, age and eviction counters for the rendered diagram files"""
+    return artifacts.stats()
+
 @app.get("/configs")
-async def list_configs():
-    """List all uploaded configurations"""
+async def list_configs(
+    filename: Optional[str] = Query(None, description="Only configs uploaded under this filename"),
+    hostname: Optional[str] = Query(None, description="Only configs containing a device with this hostname"),
+    sort: str = Query("uploaded_at", pattern=f"^({'|'.join(LIST_SORTS)})$"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    limit: int = Query(settings.PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. config_id,filename")
+):
+    """List uploaded configurations a page at a time, oldest first unless sorted otherwise"""
     logger.info("Config list request")
-    configs = []
-    for config_id, data in config_storage.items():
-        configs.append({
-            "config_id": config_id,
-            "filename": data["filename"],
-            "timestamp": data["timestamp"],
-            "device_count": len(data["network"]["devices"])
-        })
+    cursor_sort, after = _page_position(sort, order, cursor)
+    try:
+        configs, next_key = config_storage.list_page(filename=filename, hostname=hostname, sort=sort,
+                                                     descending=order == "desc", after=after, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     logger.info(f"Returning {len(configs)} configurations")
-    return {"configs": configs}
+    return {"configs": project(configs, parse_fields(fields)),
+            "next_cursor": encode_cursor(cursor_sort, next_key) if next_key is not None else None}
+
+@app.get("/configs/{config_id}")
+async def get_config_summary(request: Request, config_id: str):
+    """A config's listing entry with per-device interface, VLAN and route counts, without the model itself"""
+    config_data = config_storage.get(config_id)
+    if config_data is None:
+        logger.warning(f"Configuration not found: {config_id}")
+        raise HTTPException(status_code=404, detail="Configuration not found")
+    
+    network = config_data["network"]
+    body = {
+        "config_id": config_id,
+        "filename": config_data["filename"],
+        "timestamp": config_data["timestamp"],
+        "parent_id": config_data.get("parent_id"),
+        "devices": device_summaries(network)
+    }
+    return await _cached_response(request, JSONResponse(body), config_data.get("uploaded_at"))
+
+@app.get("/configs/{config_id}/{resource}")
+async def list_config_items(
+    request: Request,
+    config_id: str,
+    resource: str,
+    sort: str = Query("position", description="Field to sort by; position keeps config order"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    limit: int = Query(settings.PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. name,ip")
+):
+    """
+    A page of a config's interfaces, VLANs or routes. Any other query
+    parameter filters on a field of the resource, e.g. ``?port_mode=trunk``
+    """
+    spec = RESOURCES.get(resource)
+    if spec is None:
+        raise HTTPException(status_code=404, detail=f"Unknown resource '{resource}'; use one of: {', '.join(RESOURCES)}")
+    if sort not in spec.sorts:
+        raise HTTPException(status_code=400, detail=f"sort for {resource} must be one of: {', '.join(spec.sorts)}")
+    reserved = {"sort", "order", "limit", "cursor", "fields"}
+    filters = {name: value for name, value in request.query_params.items() if name not in reserved}
+    unknown = sorted(set(filters) - set(spec.filters))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Cannot filter {resource} on: {', '.join(unknown)}")
+    cursor_sort, after = _page_position(sort, order, cursor)
+    
+    key = ListingCache.key(config_id, resource, sort, filters)
+    listing = listing_cache.get(key)
+    if listing is None:
+        config_data = config_storage.get(config_id)
+        if config_data is None:
+            logger.warning(f"Configuration not found: {config_id}")
+            raise HTTPException(status_code=404, detail="Configuration not found")
+        listing = build_listing(spec, config_data["network"], sort, filters, config_data.get("uploaded_at"))
+        listing_cache.put(key, listing)
+    
+    try:
+        items, next_key = paginate(listing.keys, listing.items, after, limit, descending=order == "desc")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    body = {
+        "config_id": config_id,
+        "resource": resource,
+        "total": len(listing.items),
+        "items": page_items(items, parse_fields(fields)),
+        "next_cursor": encode_cursor(cursor_sort, next_key) if next_key is not None else None
+    }
+    return await _cached_response(request, JSONResponse(body), listing.last_modified)
+
+@app.get("/search")
+async def search_configs(
+    q: str = Query(..., description="Term, address or CIDR prefix to find"),
+    field: str = Query("hostname", description=f"Where to look: {', '.join(FIELDS)}"),
+    match: str = Query("exact", description="exact or prefix; for ip, exact, within or contains"),
+    limit: int = Query(100, ge=1, le=settings.MAX_SEARCH_RESULTS)
+):
+    """Find hostnames, interfaces, descriptions, VLANs, port modes or addresses across every stored config"""
+    logger.info(f"Search request: {field} {match} {q!r}")
+    try:
+        query = SearchQuery(field, q, match)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # One extra result tells whether the list was cut short
+    results = config_storage.search(query, limit + 1)
+    return {"field": field, "match": match, "q": q, "results": results[:limit], "truncated": len(results) > limit}
 
 @app.delete("/config/{config_id}")
 async def delete_config(config_id: str):
     """Delete a configuration"""
     logger.info(f"Delete request for config: {config_id}")
-    if config_id not in config_storage:
+    config_data = config_storage.delete(config_id)
+    if config_data is None:
         logger.warning(f"Configuration not found: {config_id}")
         raise HTTPException(status_code=404, detail="Configuration not found")
     
-    del config_storage[config_id]
+    route_tables.discard(config_id)
+    mermaid_cache.discard(config_id)
+    listing_cache.discard(config_id)
+    # Otherwise a re-upload of the same content would come back from the cache
+    parse_cache.discard(config_data.get("digest"))
+    _remove_file(config_data.get("config_path"))
+    # Diagrams are shared by content, so only remove those no other config still uses
+    paths = set(diagram_paths(config_data["diagrams"]))
+    artifacts.remove(paths - config_storage.referenced_artifacts(paths))
     logger.info(f"Configuration deleted: {config_id}")
     return {"message": "Configuration deleted successfully"}
 
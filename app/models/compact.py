@@ -0,0 +1,250 @@
+"""
+Columnar form of a parsed network for holding many configs in memory.
+
+Each device keeps its interfaces, routes and VLANs as tables of columns
+rather than one object per row. Repeated strings (interface names,
+port modes, protocols, VLAN names) are interned so every config shares one
+copy, IPv4 addresses are packed into integer arrays, and VLAN member lists
+are flattened into one list with offsets. The JSON dict form and the
+pydantic models are only built when a caller asks for them.
+"""
+import socket
+import sys
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+from app.models.network import Network, network_from_dict
+
+# Prefix length codes in an address column besides 0-32
+NO_ADDRESS = -1
+BARE_ADDRESS = -2  # an address without a prefix, such as a next-hop
+TEXT_ADDRESS = -3  # kept as text: IPv6, or anything that would not round-trip
+
+# Stands in for None in an integer column
+MISSING_INT = -(2 ** 63)
+
+
+def _value(entry, field: str):
+    """Read a field from a model or from its ``.dict()`` form"""
+    return entry.get(field) if isinstance(entry, dict) else getattr(entry, field)
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class _Strings:
+    """Optional strings, interned"""
+    __slots__ = ("values",)
+
+    def __init__(self):
+        self.values: List[Optional[str]] = []
+
+    def append(self, value) -> None:
+        self.values.append(_intern(value))
+
+    def __getitem__(self, index: int):
+        return self.values[index]
+
+
+class _Ints:
+    """Optional integers in a signed 64-bit array; anything else is kept aside"""
+    __slots__ = ("values", "other")
+
+    def __init__(self):
+        self.values = array("q")
+        self.other: Dict[int, object] = {}
+
+    def append(self, value) -> None:
+        if value is None:
+            self.values.append(MISSING_INT)
+        elif type(value) is int and MISSING_INT < value < 2 ** 63:
+            self.values.append(value)
+        else:
+            self.other[len(self.values)] = value
+            self.values.append(MISSING_INT)
+
+    def __getitem__(self, index: int):
+        value = self.values[index]
+        if value != MISSING_INT:
+            return value
+        return self.other.get(index)
+
+
+class _Addresses:
+    """
+    IPv4 ``address`` or ``address/prefix`` strings packed as a 32-bit
+    integer and a prefix length code. Values that would not format back to
+    the same text, such as IPv6 or ``discard``, are kept as text.
+    """
+    __slots__ = ("addresses", "prefixlens", "text")
+
+    def __init__(self):
+        self.addresses = array("L")
+        self.prefixlens = array("b")
+        self.text: Dict[int, str] = {}
+
+    def append(self, value) -> None:
+        if value is None:
+            self.addresses.append(0)
+            self.prefixlens.append(NO_ADDRESS)
+            return
+        address, _, prefix = value.partition("/")
+        try:
+            packed = socket.inet_aton(address)
+            prefixlen = int(prefix) if prefix else BARE_ADDRESS
+            # inet_aton accepts shorthand like ``10.1``, so check the text survives
+            if socket.inet_ntoa(packed) != address:
+                raise ValueError(value)
+            if prefix and (str(prefixlen) != prefix or not 0 <= prefixlen <= 32):
+                raise ValueError(value)
+        except (OSError, ValueError):
+            self.text[len(self.addresses)] = _intern(value)
+            self.addresses.append(0)
+            self.prefixlens.append(TEXT_ADDRESS)
+            return
+        self.addresses.append(int.from_bytes(packed, "big"))
+        self.prefixlens.append(prefixlen)
+
+    def __getitem__(self, index: int):
+        prefixlen = self.prefixlens[index]
+        if prefixlen == NO_ADDRESS:
+            return None
+        if prefixlen == TEXT_ADDRESS:
+            return self.text[index]
+        address = socket.inet_ntoa(self.addresses[index].to_bytes(4, "big"))
+        return address if prefixlen == BARE_ADDRESS else f"{address}/{prefixlen}"
+
+
+class _StringLists:
+    """Optional lists of interned strings, flattened into one list with offsets"""
+    __slots__ = ("values", "offsets", "missing")
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.offsets = array("L", [0])
+        # Row numbers whose list is None rather than empty
+        self.missing: set = set()
+
+    def append(self, value) -> None:
+        if value is None:
+            self.missing.add(len(self.offsets) - 1)
+        else:
+            self.values.extend(_intern(item) for item in value)
+        self.offsets.append(len(self.values))
+
+    def __getitem__(self, index: int):
+        if index in self.missing:
+            return None
+        return self.values[self.offsets[index]:self.offsets[index + 1]]
+
+
+class _Table:
+    """Rows of one model as columns; ``FIELDS`` names each column in model field order"""
+    __slots__ = ("columns", "size")
+    FIELDS = ()
+
+    def __init__(self, entries: Iterable = ()):
+        self.columns = [column() for _, column in self.FIELDS]
+        self.size = 0
+        for entry in entries:
+            self.append(entry)
+
+    def append(self, entry) -> None:
+        for (field, _), column in zip(self.FIELDS, self.columns):
+            column.append(_value(entry, field))
+        self.size += 1
+
+    def row(self, index: int) -> dict:
+        return {field: column[index] for (field, _), column in zip(self.FIELDS, self.columns)}
+
+    def rows(self) -> List[dict]:
+        return [self.row(index) for index in range(self.size)]
+
+    def column(self, field: str) -> list:
+        """Every value of one field, without building the rows"""
+        for (name, _), column in zip(self.FIELDS, self.columns):
+            if name == field:
+                return [column[index] for index in range(self.size)]
+        raise KeyError(field)
+
+    def __len__(self) -> int:
+        return self.size
+
+
+class InterfaceTable(_Table):
+    __slots__ = ()
+    FIELDS = (("name", _Strings), ("ip", _Addresses), ("description", _Strings), ("status", _Strings),
+              ("vlan_members", _StringLists), ("port_mode", _Strings))
+
+
+class RouteTable(_Table):
+    __slots__ = ()
+    FIELDS = (("destination", _Addresses), ("next_hop", _Addresses), ("protocol", _Strings),
+              ("metric", _Ints), ("preference", _Ints))
+
+
+class VLANTable(_Table):
+    __slots__ = ()
+    FIELDS = (("name", _Strings), ("vlan_id", _Ints), ("description", _Strings), ("interfaces", _StringLists))
+
+
+# Routing keys held as tables; any other key is kept as it came
+ROUTING_TABLES = {"routes": RouteTable, "vlans": VLANTable}
+
+
+class CompactDevice:
+    __slots__ = ("hostname", "interfaces", "routing")
+
+    def __init__(self, device):
+        self.hostname = _intern(_value(device, "hostname"))
+        self.interfaces = InterfaceTable(_value(device, "interfaces"))
+        routing = _value(device, "routing")
+        # Keys keep their order, so the dict form comes back byte-for-byte
+        self.routing = None if routing is None else {
+            key: ROUTING_TABLES[key](entries) if key in ROUTING_TABLES and entries is not None else entries
+            for key, entries in routing.items()
+        }
+
+    def to_dict(self) -> dict:
+        routing = None if self.routing is None else {
+            key: entries.rows() if isinstance(entries, _Table) else entries
+            for key, entries in self.routing.items()
+        }
+        return {"hostname": self.hostname, "interfaces": self.interfaces.rows(), "routing": routing}
+
+
+class CompactNetwork:
+    """
+    A network held as columns. Build one with ``from_network`` or
+    ``from_dict``. ``to_dict`` returns the same dict as
+    ``network.model_dump(mode="json")`` and ``to_network`` the models.
+    """
+    __slots__ = ("devices", "connections", "topology")
+
+    def __init__(self, devices: Iterable, connections: Optional[List[dict]] = None, topology: Optional[str] = None):
+        self.devices = [CompactDevice(device) for device in devices]
+        self.connections = connections
+        self.topology = topology
+
+    @classmethod
+    def from_network(cls, network: Network) -> "CompactNetwork":
+        return cls(network.devices, network.connections, network.topology)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CompactNetwork":
+        return cls(data["devices"], data.get("connections"), data.get("topology"))
+
+    def to_dict(self) -> dict:
+        return {"devices": [device.to_dict() for device in self.devices], "connections": self.connections,
+                "topology": self.topology}
+
+    def to_network(self) -> Network:
+        return network_from_dict(self.to_dict())
+
+    def hostnames(self) -> List[str]:
+        return [device.hostname for device in self.devices]
+
+    @property
+    def interface_count(self) -> int:
+        return sum(len(device.interfaces) for device in self.devices)
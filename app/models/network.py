@@ -1,6 +1,8 @@
 from pydantic import BaseModel
 from typing import List, Optional
 
+from app.models.juniper import Route, VLAN
+
 class Interface(BaseModel):
     name: str
     ip: Optional[str] = None
@@ -17,4 +19,19 @@ class Device(BaseModel):
 class Network(BaseModel):
     devices: List[Device]
     connections: Optional[List[dict]] = None
-    topology: Optional[str] = None 
\ No newline at end of file
+    topology: Optional[str] = None
+
+def network_from_dict(data: dict) -> Network:
+    """
+    Rebuild a Network from its ``.dict()``/JSON form.
+    ``Device.routing`` is a plain dict, so its Route and VLAN entries are
+    restored to models explicitly.
+    """
+    network = Network.model_validate(data)
+    for device in network.devices:
+        routing = device.routing or {}
+        if "routes" in routing:
+            routing["routes"] = [Route.model_validate(route) for route in routing["routes"]]
+        if "vlans" in routing:
+            routing["vlans"] = [VLAN.model_validate(vlan) for vlan in routing["vlans"]]
+    return network
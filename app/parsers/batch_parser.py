@@ -0,0 +1,199 @@
+import os
+import tarfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from app.analysis.links import infer_connections
+from app.models.network import Network, Device
+from app.parsers.juniper_parser import JuniperParser
+
+CONFIG_SUFFIXES = ('.conf', '.txt')
+ARCHIVE_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.zip')
+
+# Members are read one at a time, so this caps how many sit in memory at once
+IN_FLIGHT_PER_WORKER = 4
+
+
+def available_cores() -> int:
+    """Number of cores this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _is_config_name(name: str) -> bool:
+    base = os.path.basename(name)
+    return not base.startswith(".") and "__MACOSX" not in name and base.endswith(CONFIG_SUFFIXES)
+
+
+class ArchiveLimitError(ValueError):
+    """An archive member that was not read because it passed a size limit"""
+
+
+def _zip_members(archive: zipfile.ZipFile) -> Iterator[Tuple[str, int, Optional[Callable[[], bytes]]]]:
+    for info in archive.infolist():
+        # Members are read by offset, so the ones skipped here are never inflated.
+        # zipfile stops at a member's declared size, so the sizes can be trusted
+        if not info.is_dir() and _is_config_name(info.filename):
+            yield info.filename, info.file_size, lambda info=info: archive.read(info)
+
+
+def _tar_members(archive: tarfile.TarFile) -> Iterator[Tuple[str, int, Optional[Callable[[], bytes]]]]:
+    for member in archive:
+        # Getting past any member of a compressed tar inflates it, so every file counts
+        if member.isfile():
+            read = lambda member=member: archive.extractfile(member).read()
+            yield member.name, member.size, read if _is_config_name(member.name) else None
+
+
+def iter_archive(fileobj: BinaryIO, filename: str, max_member_bytes: Optional[int] = None,
+                 max_total_bytes: Optional[int] = None) -> Iterator[Tuple[str, Union[bytes, ArchiveLimitError]]]:
+    """
+    Yield (name, bytes) for every config file in a tar or zip archive.
+
+    A config larger than ``max_member_bytes`` is yielded with an
+    ``ArchiveLimitError`` in place of its bytes and the rest are still read.
+    Once the archive's uncompressed size passes ``max_total_bytes`` the
+    member that passed it is yielded with an error and nothing more is read.
+    """
+    if filename.endswith(".zip"):
+        archive, members = zipfile.ZipFile(fileobj), _zip_members
+    else:
+        archive, members = tarfile.open(fileobj=fileobj, mode="r:*"), _tar_members
+    with archive:
+        total = 0
+        for name, size, read in members(archive):
+            total += size
+            if max_total_bytes is not None and total > max_total_bytes:
+                yield name, ArchiveLimitError(f"archive exceeds the {max_total_bytes} byte limit at {name}; "
+                                              f"the members after it were not read")
+                return
+            if read is None:
+                continue
+            if max_member_bytes is not None and size > max_member_bytes:
+                yield name, ArchiveLimitError(f"{name} exceeds the {max_member_bytes} byte limit")
+                continue
+            yield name, read()
+
+
+def iter_directory(path: str) -> Iterator[Tuple[str, bytes]]:
+    """Yield (relative name, bytes) for every config file under a directory"""
+    for dirpath, dirnames, filenames in os.walk(path):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            full_path = os.path.join(dirpath, filename)
+            name = os.path.relpath(full_path, path)
+            if _is_config_name(name):
+                with open(full_path, "rb") as f:
+                    yield name, f.read()
+
+
+def iter_path(path: str) -> Iterator[Tuple[str, bytes]]:
+    """Yield configs from a directory, an archive or a single config file"""
+    if os.path.isdir(path):
+        yield from iter_directory(path)
+    elif path.endswith(ARCHIVE_SUFFIXES):
+        with open(path, "rb") as f:
+            yield from iter_archive(f, path)
+    else:
+        with open(path, "rb") as f:
+            yield os.path.basename(path), f.read()
+
+
+def parse_one(name: str, data: Union[bytes, ArchiveLimitError]) -> Tuple[str, List[Device], Optional[str]]:
+    """Parse a single config; errors are returned rather than raised so the batch continues"""
+    if isinstance(data, ArchiveLimitError):
+        return name, [], f"{type(data).__name__}: {data}"
+    try:
+        network = JuniperParser().parse_config(data.decode("utf-8"))
+        return name, network.devices, None
+    except Exception as e:
+        return name, [], f"{type(e).__name__}: {e}"
+
+
+class BatchResult:
+    """Merged outcome of a batch ingest"""
+
+    def __init__(self, network: Network, files: List[str], errors: List[Dict[str, str]],
+                 elapsed: float, workers: int):
+        self.network = network
+        self.files = files
+        self.errors = errors
+        self.elapsed = elapsed
+        self.workers = workers
+
+    @property
+    def configs_per_second(self) -> float:
+        return len(self.files) / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> dict:
+        return {
+            "file_count": len(self.files),
+            "device_count": len(self.network.devices),
+            "error_count": len(self.errors),
+            "errors": self.errors,
+            "workers": self.workers,
+            "elapsed_seconds": round(self.elapsed, 3),
+            "configs_per_second": round(self.configs_per_second, 1)
+        }
+
+
+class BatchParser:
+    """
+    Parses many configs across a process pool and merges them into one Network.
+    A file that fails to parse is reported in ``errors`` without stopping the batch.
+    Given a long-lived ``pool`` (anything with ``submit(fn, *args)``), files
+    are sent to it, ``workers`` at a time, instead of to a pool built for
+    this batch.
+    """
+
+    def __init__(self, workers: Optional[int] = None, pool=None):
+        self.workers = workers or getattr(pool, "max_workers", None) or available_cores()
+        self.pool = pool
+
+    def parse(self, items: Iterable[Tuple[str, bytes]]) -> BatchResult:
+        start = time.perf_counter()
+        if self.workers <= 1:
+            results = [parse_one(name, data) for name, data in items]
+        else:
+            results = self._parse_in_pool(items)
+
+        files = []
+        devices = []
+        errors = []
+        for name, file_devices, error in results:
+            files.append(name)
+            if error:
+                errors.append({"file": name, "error": error})
+            devices.extend(file_devices)
+
+        network = Network(devices=devices, connections=infer_connections(devices))
+        return BatchResult(network, files, errors, time.perf_counter() - start, self.workers)
+
+    def _parse_in_pool(self, items: Iterable[Tuple[str, bytes]]) -> List[Tuple[str, List[Device], Optional[str]]]:
+        # Submit lazily with a bounded window so a large archive is never fully in memory
+        results: Dict[int, Tuple[str, List[Device], Optional[str]]] = {}
+        if self.pool is not None:
+            self._submit_all(self.pool, items, results)
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                self._submit_all(executor, items, results)
+        return [results[index] for index in sorted(results)]
+
+    def _submit_all(self, pool, items: Iterable[Tuple[str, bytes]],
+                    results: Dict[int, Tuple[str, List[Device], Optional[str]]]) -> None:
+        max_in_flight = self.workers * IN_FLIGHT_PER_WORKER
+        pending = {}
+        for index, (name, data) in enumerate(items):
+            if isinstance(data, ArchiveLimitError):
+                results[index] = parse_one(name, data)
+                continue
+            pending[pool.submit(parse_one, name, data)] = index
+            if len(pending) >= max_in_flight:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[pending.pop(future)] = future.result()
+        for future in pending:
+            results[pending[future]] = future.result()
@@ -0,0 +1,298 @@
+import hashlib
+import re
+from typing import Iterator, List, Optional
+
+# One alternation covering every lexical element of the curly-brace format.
+# Prompt lines (``user@host> show configuration``) and trailing ``{master:0}``
+# markers are matched first so they never leak into statements.
+TOKEN_RE = re.compile(r'''
+    (?P<prompt>^[\w.-]+@[\w.-]+[>#%][^\n]*$|^\{[\w:.-]+\}[ \t]*$)
+  | (?P<comment>\#[^\n]*)
+  | (?P<annotation>/\*.*?\*/)
+  | (?P<string>"(?:[^"\\]|\\.)*")
+  | (?P<open>\{)
+  | (?P<close>\})
+  | (?P<semi>;)
+  | (?P<list>[\[\]])
+  | (?P<word>[^\s{};\[\]"]+)
+''', re.VERBOSE | re.MULTILINE | re.DOTALL)
+
+# Markers that may prefix a statement or block, e.g. ``inactive: ge-0/0/3 { ... }``
+INACTIVE_MARKER = "inactive:"
+PROTECT_MARKER = "protect:"
+
+
+def _hash(*parts: bytes) -> bytes:
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part)
+    return digest.digest()
+
+
+class ConfigNode:
+    """Base class for a statement or block in the configuration tree"""
+    __slots__ = ("words", "inactive", "protected", "annotation", "comments", "_digest")
+
+    def __init__(self, words: List[str], inactive: bool = False, protected: bool = False,
+                 annotation: Optional[str] = None, comments: Optional[List[str]] = None):
+        self.words = words
+        self.inactive = inactive
+        self.protected = protected
+        self.annotation = annotation
+        self.comments = comments
+        self._digest: Optional[bytes] = None
+
+    @property
+    def keyword(self) -> str:
+        """First word of the node, e.g. ``unit`` for ``unit 0``"""
+        return self.words[0] if self.words else ""
+
+    @property
+    def args(self) -> List[str]:
+        """Words following the keyword"""
+        return self.words[1:]
+
+    @property
+    def name(self) -> str:
+        """All words joined, e.g. ``unit 0`` or ``ge-0/0/0``"""
+        return " ".join(self.words)
+
+    @property
+    def value(self) -> Optional[str]:
+        """First argument, or None for bare keywords such as ``disable``"""
+        return self.words[1] if len(self.words) > 1 else None
+
+    def is_block(self) -> bool:
+        return False
+
+    def _header_digest(self) -> bytes:
+        # Words plus the markers that change meaning; comments are not configuration
+        flags = f"{int(self.inactive)}{int(self.protected)}{self.annotation or ''}"
+        return _hash("\x00".join(self.words).encode("utf-8"), b"\x01", flags.encode("utf-8"))
+
+    @property
+    def digest(self) -> bytes:
+        """
+        Merkle hash of the node: its words and markers, and for a block the
+        digests of its children in order. Two subtrees with equal digests are
+        equal, so a diff can skip them without looking inside. Computed on
+        first access, so the tree must be complete by then.
+        """
+        if self._digest is None:
+            self._digest = self._header_digest()
+        return self._digest
+
+    def _meta_dict(self) -> dict:
+        data = {"words": self.words}
+        if self.inactive:
+            data["inactive"] = True
+        if self.protected:
+            data["protected"] = True
+        if self.annotation:
+            data["annotation"] = self.annotation
+        if self.comments:
+            data["comments"] = self.comments
+        return data
+
+    def to_dict(self) -> dict:
+        return self._meta_dict()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.name!r})"
+
+
+class Statement(ConfigNode):
+    """A leaf statement terminated by ``;``"""
+    __slots__ = ()
+
+
+class Block(ConfigNode):
+    """A container node with nested children enclosed in ``{ }``"""
+    __slots__ = ("children",)
+
+    def __init__(self, words: List[str], **kwargs):
+        super().__init__(words, **kwargs)
+        self.children: List[ConfigNode] = []
+
+    def is_block(self) -> bool:
+        return True
+
+    @property
+    def digest(self) -> bytes:
+        if self._digest is None:
+            self._digest = _hash(b"{", self._header_digest(), *(child.digest for child in self.children))
+        return self._digest
+
+    def iter_nodes(self, keyword: Optional[str] = None, include_inactive: bool = False) -> Iterator[ConfigNode]:
+        """Iterate direct children, optionally filtered by keyword"""
+        for child in self.children:
+            if child.inactive and not include_inactive:
+                continue
+            if keyword is None or child.keyword == keyword:
+                yield child
+
+    def iter_blocks(self, keyword: Optional[str] = None, include_inactive: bool = False) -> Iterator["Block"]:
+        """Iterate direct child blocks, optionally filtered by keyword"""
+        for child in self.iter_nodes(keyword, include_inactive):
+            if child.is_block():
+                yield child
+
+    def get(self, keyword: str, *args: str) -> Optional[ConfigNode]:
+        """Return the first active child whose words start with keyword and args"""
+        prefix = [keyword, *args]
+        size = len(prefix)
+        for child in self.iter_nodes(keyword):
+            if child.words[:size] == prefix:
+                return child
+        return None
+
+    def find(self, *path: str) -> Optional["Block"]:
+        """
+        Walk a path of block names and return the block at the end.
+        Each path element is a full node name, e.g. ``find("interfaces", "ge-0/0/0", "unit 0")``.
+        """
+        node: Optional[Block] = self
+        for step in path:
+            words = step.split()
+            node = next((child for child in node.iter_blocks(words[0]) if child.words == words), None)
+            if node is None:
+                return None
+        return node
+
+    def get_value(self, keyword: str) -> Optional[str]:
+        """Return the first argument of the first active statement with keyword"""
+        node = self.get(keyword)
+        return node.value if node is not None else None
+
+    def has(self, keyword: str) -> bool:
+        return self.get(keyword) is not None
+
+    def walk(self, keyword: str) -> Iterator[ConfigNode]:
+        """Depth-first search for active descendants with keyword"""
+        for child in self.iter_nodes():
+            if child.keyword == keyword:
+                yield child
+            if child.is_block():
+                yield from child.walk(keyword)
+
+    def to_dict(self) -> dict:
+        data = self._meta_dict()
+        data["children"] = [child.to_dict() for child in self.children]
+        return data
+
+
+def _unquote(token: str) -> str:
+    body = token[1:-1]
+    if "\\" in body:
+        body = re.sub(r'\\(.)', r'\1', body)
+    return body
+
+
+class TreeBuilder:
+    """
+    Incremental tree builder driven by the tokenizer.
+    State is kept between ``feed`` calls so text can arrive in pieces, as long
+    as each piece ends on a token boundary. Subclasses can override the event
+    hooks to observe nodes as they complete.
+    """
+
+    def __init__(self):
+        self.root = Block([])
+        self.stack: List[Block] = [self.root]
+        self._words: List[str] = []
+        self._inactive = False
+        self._protected = False
+        self._annotation: Optional[str] = None
+        self._comments: Optional[List[str]] = None
+        self._last_node: Optional[ConfigNode] = None
+
+    def on_statement(self, node: Statement, parent: Block) -> None:
+        """Called after a statement is attached to its parent"""
+
+    def on_block_open(self, block: Block, parent: Block) -> None:
+        """Called after a block header is attached to its parent"""
+
+    def on_block_close(self, block: Block, parent: Block) -> None:
+        """Called when a block's closing brace is seen"""
+
+    def feed(self, config_text: str, pos: int = 0, endpos: Optional[int] = None) -> None:
+        """Tokenize ``config_text[pos:endpos]`` and extend the tree"""
+        if endpos is None:
+            endpos = len(config_text)
+
+        stack = self.stack
+        words = self._words
+        inactive = self._inactive
+        protected = self._protected
+        annotation = self._annotation
+        comments = self._comments
+        last_node = self._last_node
+        # None means a newline may have passed since the last node ended
+        last_end = None
+
+        for match in TOKEN_RE.finditer(config_text, pos, endpos):
+            kind = match.lastgroup
+            if kind == "word":
+                token = match.group()
+                if not words and token == INACTIVE_MARKER:
+                    inactive = True
+                elif not words and token == PROTECT_MARKER:
+                    protected = True
+                else:
+                    words.append(token)
+            elif kind == "semi":
+                if words:
+                    last_node = Statement(words, inactive, protected, annotation, comments)
+                    stack[-1].children.append(last_node)
+                    self.on_statement(last_node, stack[-1])
+                words, inactive, protected, annotation, comments = [], False, False, None, None
+                last_end = match.end()
+            elif kind == "open":
+                block = Block(words, inactive=inactive, protected=protected,
+                              annotation=annotation, comments=comments)
+                stack[-1].children.append(block)
+                self.on_block_open(block, stack[-1])
+                stack.append(block)
+                last_node = block
+                words, inactive, protected, annotation, comments = [], False, False, None, None
+                last_end = match.end()
+            elif kind == "close":
+                if len(stack) > 1:
+                    last_node = stack.pop()
+                    self.on_block_close(last_node, stack[-1])
+                words = []
+                last_end = match.end()
+            elif kind == "string":
+                words.append(_unquote(match.group()))
+            elif kind == "comment":
+                text = match.group().lstrip("#").strip()
+                # A comment on the same line as the previous node belongs to it,
+                # e.g. ``encrypted-password "..."; ## SECRET-DATA``
+                if (last_node is not None and not words and last_end is not None
+                        and "\n" not in config_text[last_end:match.start()]):
+                    last_node.comments = (last_node.comments or []) + [text]
+                elif text:
+                    comments = (comments or []) + [text]
+            elif kind == "annotation":
+                annotation = match.group()[2:-2].strip()
+            # prompt and list tokens carry no structure of their own
+
+        self._words = words
+        self._inactive = inactive
+        self._protected = protected
+        self._annotation = annotation
+        self._comments = comments
+        self._last_node = last_node
+
+
+def parse_config_tree(config_text: str, pos: int = 0, endpos: Optional[int] = None) -> Block:
+    """
+    Parse Junos curly-brace configuration text into a tree in a single pass.
+    Every character is visited once by the tokenizer, and each node is built
+    as soon as its terminating ``;`` or ``{`` is seen, so cost is linear in
+    the size of the input. ``pos``/``endpos`` restrict parsing to a slice of
+    the text without copying it.
+    """
+    builder = TreeBuilder()
+    builder.feed(config_text, pos, endpos)
+    return builder.root
@@ -1,16 +1,75 @@
-from diagrams import Diagram, Cluster
-from diagrams.generic.network import Router, Switch, Firewall
+from diagrams import Diagram, Cluster, Edge
+from diagrams.generic.network import Router, Switch, Firewall, Subnet
 from diagrams.onprem.compute import Server
 from diagrams.onprem.client import Client
 from diagrams.onprem.network import Internet
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Sequence
 import os
+import subprocess
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 
 from app.models.network import Network, Device, Interface
+from app.parsers.grid_renderer import GridRenderer, node_count
+from app.services.compression import PRECOMPRESSED_FORMATS, precompress_file
+from app.services.render_cache import RenderCache, stable_digest
+from app.services.render_pool import RenderPool
+
+# Bump when drawing code changes so cached renders are not reused
+RENDER_VERSION = 1
+
+# diagram type -> (title, direction, graph attribute profile)
+DIAGRAM_LAYOUTS = {
+    "topology": ("Network Topology", "TB", "general"),
+    "interfaces": ("Interface Diagram", "LR", "interfaces"),
+    "vlans": ("VLAN Diagram", "LR", "vlans"),
+    "routing": ("Routing Diagram", "TB", "general"),
+    "overview": ("Network Overview", "TB", "general")
+}
+
+def _attr(item, name: str):
+    return item.get(name) if isinstance(item, dict) else getattr(item, name, None)
+
+class LayoutOnceDiagram(Diagram):
+    """
+    Diagram that emits every requested format from a single Graphviz run.
+    ``dot`` lays the graph out once and then writes each ``-T``/``-o`` pair,
+    whereas the stock render invokes ``dot`` (and the layout) per format.
+    """
+
+    def __init__(self, *args, outformats: Sequence[str] = ("png", "svg"), timeout: Optional[float] = None, **kwargs):
+        super().__init__(*args, outformat=list(outformats), **kwargs)
+        self.timeout = timeout
+
+    def render(self) -> None:
+        self.dot.save(self.filename)
+        command = ["dot"]
+        for outformat in self.outformat:
+            command.extend([f"-T{outformat}", "-o", f"{self.filename}.{outformat}"])
+        command.append(self.filename)
+        subprocess.run(command, check=True, capture_output=True, timeout=self.timeout)
+
+def _draw_in_worker(output_dir: str, render_timeout: Optional[float], grid_threshold: Optional[int],
+                    diagram_type: str, network: Network, base: str, formats: Sequence[str]) -> None:
+    """Render pool entry point: build and lay out one diagram in a worker process"""
+    generator = DiagramsGenerator(output_dir, render_timeout=render_timeout, grid_threshold=grid_threshold)
+    generator._draw(diagram_type, network, base, formats)
 
 class DiagramsGenerator:
-    def __init__(self, output_dir: Optional[str] = None):
+    def __init__(self, output_dir: Optional[str] = None, render_cache: Optional[RenderCache] = None,
+                 render_timeout: Optional[float] = None, render_pool: Optional[RenderPool] = None,
+                 grid_threshold: Optional[int] = None):
         self.output_dir = output_dir or "generated_diagrams"
+        self.render_cache = render_cache or RenderCache()
+        # Seconds a single dot run may take before it is killed
+        self.render_timeout = render_timeout
+        # When set, diagrams are drawn in these worker processes and generate_all_diagrams
+        # renders every type at once; otherwise they are drawn here, one after another
+        self.render_pool = render_pool
+        # Interface and VLAN diagrams with at least this many nodes skip Graphviz and are
+        # drawn by GridRenderer; None always uses Graphviz
+        self.grid_threshold = grid_threshold
+        self.grid_renderer = GridRenderer()
         os.makedirs(self.output_dir, exist_ok=True)
 
     def _get_optimized_graph_attr(self, diagram_type: str = "general") -> Dict[str, str]:
@@ -24,7 +83,7 @@ class DiagramsGenerator:
             "splines": "ortho",    # Clean, straight edges
             "concentrate": "true"  # Merge parallel edges
         }
-        
+
         if diagram_type == "interfaces":
             # Optimized for interface diagrams with many nodes
             return {
@@ -45,124 +104,181 @@ class DiagramsGenerator:
             # General purpose attributes
             return base_attrs
 
+    def _render_subset(self, diagram_type: str, network: Network) -> dict:
+        """
+        The part of the model a diagram actually draws.
+        Render keys hash only this, so e.g. a route change leaves the VLAN
+        diagram's key, and therefore its cached files, untouched.
+        """
+        devices = []
+        for device in network.devices:
+            routing = device.routing or {}
+            entry = {"hostname": device.hostname}
+            if diagram_type in ("topology", "interfaces"):
+                entry["interfaces"] = [(i.name, i.ip, i.description) for i in device.interfaces]
+            elif diagram_type == "vlans":
+                entry["interfaces"] = [(i.name, i.ip, i.description, i.vlan_members) for i in device.interfaces]
+                entry["vlans"] = [(_attr(v, "name"), _attr(v, "vlan_id"), _attr(v, "description"))
+                                  for v in routing.get("vlans", [])]
+            elif diagram_type == "routing":
+                entry["routes"] = [(_attr(r, "destination"), _attr(r, "next_hop")) for r in routing.get("routes", [])]
+            elif diagram_type == "overview":
+                entry["interfaces"] = [(i.name, i.ip) for i in device.interfaces if i.ip][:5]
+                entry["vlans"] = [(_attr(v, "vlan_id"), _attr(v, "name")) for v in routing.get("vlans", [])]
+            devices.append(entry)
+        subset = {"version": RENDER_VERSION, "type": diagram_type, "devices": devices}
+        if self._uses_grid(diagram_type, network):
+            subset["renderer"] = "grid"
+        if diagram_type == "topology":
+            subset["connections"] = network.connections or []
+        return subset
+
+    def _uses_grid(self, diagram_type: str, network: Network) -> bool:
+        """Whether a diagram is large enough to be drawn by the grid renderer instead of Graphviz"""
+        return (self.grid_threshold is not None and diagram_type in GridRenderer.diagram_types
+                and node_count(diagram_type, network) >= self.grid_threshold)
+
+    def diagram_paths(self, network: Network, diagram_type: str, formats=("png", "svg")) -> Dict[str, str]:
+        """
+        Where a diagram's files live, without rendering them.
+        Paths are content-addressed by the model subset the diagram draws, so
+        identical inputs from different uploads share one set of files.
+        """
+        digest = stable_digest(self._render_subset(diagram_type, network))[:32]
+        base = os.path.join(self.output_dir, f"{diagram_type}_{digest}")
+        return {outformat: f"{base}.{outformat}" for outformat in formats}
+
+    def plan_all_diagrams(self, network: Network) -> Dict[str, Dict[str, str]]:
+        """Paths for every diagram type, for rendering later on demand"""
+        return {diagram_type: self.diagram_paths(network, diagram_type) for diagram_type in DIAGRAM_LAYOUTS}
+
+    def generate_diagram(self, network: Network, diagram_type: str, formats=("png", "svg")) -> Dict[str, str]:
+        """
+        Render one diagram type, reusing files already rendered from the same
+        model subset; missing formats are all produced from one layout.
+        """
+        if diagram_type not in DIAGRAM_LAYOUTS:
+            raise ValueError(f"Unknown diagram type: {diagram_type}")
+        paths = self.diagram_paths(network, diagram_type, formats)
+        base = os.path.splitext(next(iter(paths.values())))[0]
+
+        def render():
+            missing = [outformat for outformat, path in paths.items() if not os.path.exists(path)]
+            if self.render_pool is None:
+                self._draw(diagram_type, network, base, missing)
+            else:
+                self.render_pool.submit(
+                    _draw_in_worker, self.output_dir, self.render_timeout, self.grid_threshold,
+                    diagram_type, network, base, missing
+                ).result()
+
+        # Formats render lazily and separately, so a flight only coalesces callers asking for the same ones
+        self.render_cache.get_or_render(f"{base}:{','.join(sorted(paths))}", list(paths.values()), render)
+        return paths
+
+    def _generate_for_upload(self, network: Network, diagram_type: str) -> Dict[str, str]:
+        """
+        Render a diagram as part of a whole upload. Grid-rendered diagrams get
+        their SVG now and their PNG only when it is first requested.
+        """
+        if not self._uses_grid(diagram_type, network):
+            return self.generate_diagram(network, diagram_type)
+        self.generate_diagram(network, diagram_type, ("svg",))
+        return self.diagram_paths(network, diagram_type)
+
+    def _draw(self, diagram_type: str, network: Network, base: str, formats: Sequence[str]) -> None:
+        title, direction, profile = DIAGRAM_LAYOUTS[diagram_type]
+        # Render under a private name and move into place, so a reader never sees a partial file
+        tmp_base = os.path.join(self.output_dir, f".{uuid.uuid4().hex}")
+        if self._uses_grid(diagram_type, network):
+            # Never Graphviz: an orthogonal layout of this many nodes is the slow case the grid exists for,
+            # so without cairosvg a PNG fails with RasterizerMissingError
+            self.grid_renderer.write(diagram_type, title, network, tmp_base, formats)
+        else:
+            with LayoutOnceDiagram(title, show=False, filename=tmp_base, outformats=list(formats),
+                                   timeout=self.render_timeout, direction=direction,
+                                   graph_attr=self._get_optimized_graph_attr(profile)):
+                getattr(self, f"_draw_{diagram_type}")(network)
+        for outformat in formats:
+            if outformat in PRECOMPRESSED_FORMATS:
+                # Compressed once here, in the render worker; the copies land before the
+                # original, so a reader that finds the file also finds its encodings
+                for suffix in precompress_file(f"{tmp_base}.{outformat}"):
+                    os.replace(f"{tmp_base}.{outformat}{suffix}", f"{base}.{outformat}{suffix}")
+            os.replace(f"{tmp_base}.{outformat}", f"{base}.{outformat}")
+
     def generate_topology(self, network: Network, config_id: str) -> Dict[str, str]:
         """
         Generate a network topology diagram from the Network model.
         Returns paths to both PNG and SVG files.
         """
-        filename = f"{config_id}_topology"
-        png_path = os.path.join(self.output_dir, f"{filename}.png")
-        svg_path = os.path.join(self.output_dir, f"{filename}.svg")
-        
-        graph_attr = self._get_optimized_graph_attr("general")
-        
-        with Diagram("Network Topology", show=False, filename=os.path.join(self.output_dir, filename), 
-                     outformat="png", direction="TB", graph_attr=graph_attr):
-            # Create device nodes
-            device_nodes = {}
-            for device in network.devices:
-                # Use Router icon for all devices for now (can be improved)
-                node = Router(device.hostname)
-                device_nodes[device.hostname] = node
-                
-                # Add interfaces as Switches
-                for interface in device.interfaces:
-                    iface_label = interface.name
-                    if interface.ip:
-                        iface_label += f"\n{interface.ip}"
-                    if interface.description:
-                        iface_label += f"\n{interface.description}"
-                    iface_node = Switch(iface_label)
-                    node >> iface_node
-        
-        # Generate SVG version
-        with Diagram("Network Topology", show=False, filename=os.path.join(self.output_dir, filename), 
-                     outformat="svg", direction="TB", graph_attr=graph_attr):
-            # Create device nodes
-            device_nodes = {}
-            for device in network.devices:
-                node = Router(device.hostname)
-                device_nodes[device.hostname] = node
-                
-                for interface in device.interfaces:
-                    iface_label = interface.name
-                    if interface.ip:
-                        iface_label += f"\n{interface.ip}"
-                    if interface.description:
-                        iface_label += f"\n{interface.description}"
-                    iface_node = Switch(iface_label)
-                    node >> iface_node
-        
-        return {
-            "png": png_path,
-            "svg": svg_path
-        }
+        return self.generate_diagram(network, "topology")
+
+    def _draw_topology(self, network: Network) -> None:
+        """Draw devices, their interfaces and inferred links into the current Diagram"""
+        interface_nodes = {}
+        device_nodes = {}
+        for device in network.devices:
+            # Use Router icon for all devices for now (can be improved)
+            node = Router(device.hostname)
+            device_nodes[device.hostname] = node
+
+            # Add interfaces as Switches
+            for interface in device.interfaces:
+                iface_label = interface.name
+                if interface.ip:
+                    iface_label += f"\n{interface.ip}"
+                if interface.description:
+                    iface_label += f"\n{interface.description}"
+                iface_node = Switch(iface_label)
+                interface_nodes[(device.hostname, interface.name)] = iface_node
+                node >> iface_node
+
+        for connection in network.connections or []:
+            nodes = [
+                interface_nodes.get((endpoint["device"], endpoint["interface"])) or device_nodes.get(endpoint["device"])
+                for endpoint in connection["endpoints"]
+            ]
+            nodes = [node for node in nodes if node is not None]
+            label = connection.get("subnet") or "description"
+            if connection["kind"] == "shared-segment":
+                segment = Subnet(label)
+                for node in nodes:
+                    segment - Edge(color="darkgreen") - node
+            elif len(nodes) == 2:
+                nodes[0] - Edge(label=label, color="darkgreen", style="bold") - nodes[1]
 
     def generate_interface_diagram(self, network: Network, config_id: str) -> Dict[str, str]:
         """
         Generate an interface-focused diagram showing interface details.
         Uses horizontal layout for better space utilization.
         """
-        filename = f"{config_id}_interfaces"
-        png_path = os.path.join(self.output_dir, f"{filename}.png")
-        svg_path = os.path.join(self.output_dir, f"{filename}.svg")
-        
-        graph_attr = self._get_optimized_graph_attr("interfaces")
-        
-        with Diagram("Interface Diagram", show=False, filename=os.path.join(self.output_dir, filename), 
-                     outformat="png", direction="LR", graph_attr=graph_attr):
-            for device in network.devices:
-                with Cluster(f"Device: {device.hostname}"):
-                    # Group interfaces by type first
-                    interface_groups = {}
-                    for interface in device.interfaces:
-                        interface_type = interface.name.split('-')[0] if '-' in interface.name else "other"
-                        if interface_type not in interface_groups:
-                            interface_groups[interface_type] = []
-                        interface_groups[interface_type].append(interface)
-                    
-                    # Create interface layout without arbitrary grouping
-                    for interface_type, interfaces in interface_groups.items():
-                        with Cluster(f"{interface_type.upper()} Interfaces"):
-                            # Sort interfaces by port number for consistent ordering
-                            sorted_interfaces = sorted(interfaces, key=lambda x: self._extract_port_number(x.name))
-                            
-                            for interface in sorted_interfaces:
-                                iface_label = interface.name
-                                if interface.ip:
-                                    iface_label += f"\n{interface.ip}"
-                                if interface.description:
-                                    iface_label += f"\n{interface.description}"
-                                Switch(iface_label)
-        
-        # Generate SVG version
-        with Diagram("Interface Diagram", show=False, filename=os.path.join(self.output_dir, filename), 
-                     outformat="svg", direction="LR", graph_attr=graph_attr):
-            for device in network.devices:
-                with Cluster(f"Device: {device.hostname}"):
-                    interface_groups = {}
-                    for interface in device.interfaces:
-                        interface_type = interface.name.split('-')[0] if '-' in interface.name else "other"
-                        if interface_type not in interface_groups:
-                            interface_groups[interface_type] = []
-                        interface_groups[interface_type].append(interface)
-                    
-                    for interface_type, interfaces in interface_groups.items():
-                        with Cluster(f"{interface_type.upper()} Interfaces"):
-                            sorted_interfaces = sorted(interfaces, key=lambda x: self._extract_port_number(x.name))
-                            
-                            for interface in sorted_interfaces:
-                                iface_label = interface.name
-                                if interface.ip:
-                                    iface_label += f"\n{interface.ip}"
-                                if interface.description:
-                                    iface_label += f"\n{interface.description}"
-                                Switch(iface_label)
-        
-        return {
-            "png": png_path,
-            "svg": svg_path
-        }
+        return self._generate_for_upload(network, "interfaces")
+
+    def _draw_interfaces(self, network: Network) -> None:
+        for device in network.devices:
+            with Cluster(f"Device: {device.hostname}"):
+                # Group interfaces by type first
+                interface_groups = {}
+                for interface in device.interfaces:
+                    interface_type = interface.name.split('-')[0] if '-' in interface.name else "other"
+                    if interface_type not in interface_groups:
+                        interface_groups[interface_type] = []
+                    interface_groups[interface_type].append(interface)
+
+                # Create interface layout without arbitrary grouping
+                for interface_type, interfaces in interface_groups.items():
+                    with Cluster(f"{interface_type.upper()} Interfaces"):
+                        # Sort interfaces by port number for consistent ordering
+                        sorted_interfaces = sorted(interfaces, key=lambda x: self._extract_port_number(x.name))
+
+                        for interface in sorted_interfaces:
+                            iface_label = interface.name
+                            if interface.ip:
+                                iface_label += f"\n{interface.ip}"
+                            if interface.description:
+                                iface_label += f"\n{interface.description}"
+                            Switch(iface_label)
 
     def _extract_port_number(self, interface_name: str) -> int:
         """
@@ -184,273 +300,148 @@ class DiagramsGenerator:
         Uses horizontal layout for better space utilization.
         Shows ALL interfaces with their VLAN assignment status.
         """
-        filename = f"{config_id}_vlans"
-        png_path = os.path.join(self.output_dir, f"{filename}.png")
-        svg_path = os.path.join(self.output_dir, f"{filename}.svg")
-        
-        graph_attr = self._get_optimized_graph_attr("vlans")
-        
-        with Diagram("VLAN Diagram", show=False, filename=os.path.join(self.output_dir, filename), 
-                     outformat="png", direction="LR", graph_attr=graph_attr):
-            for device in network.devices:
-                with Cluster(f"Device: {device.hostname}"):
-                    # Collect all interfaces and their VLAN assignments
-                    vlan_assignments = {}
-                    all_vlan_interfaces = set()  # Track all interfaces that are part of named VLANs
-                    
-                    # Initialize VLAN assignments
-                    if device.routing and "vlans" in device.routing:
-                        for vlan in device.routing["vlans"]:
-                            vlan_assignments[vlan.name] = []
-                    
-                    # Process each interface
-                    for interface in device.interfaces:
-                        if interface.vlan_members and len(interface.vlan_members) > 0:
-                            # Interface is tagged to specific VLAN(s)
-                            for vlan_name in interface.vlan_members:
-                                if vlan_name in vlan_assignments:
-                                    vlan_assignments[vlan_name].append(interface)
-                                    all_vlan_interfaces.add(interface.name)
-                    
-                    # Create VLAN nodes with their interfaces grouped under each VLAN
-                    for vlan_name, interfaces in vlan_assignments.items():
-                        # Find VLAN details
-                        vlan_details = None
-                        if device.routing and "vlans" in device.routing:
-                            for vlan in device.routing["vlans"]:
-                                if vlan.name == vlan_name:
-                                    vlan_details = vlan
-                                    break
-                        
-                        if vlan_details:
-                            vlan_label = f"VLAN {vlan_details.vlan_id}\n{vlan_details.name}"
-                            if vlan_details.description:
-                                vlan_label += f"\n{vlan_details.description}"
-                        else:
-                            vlan_label = f"VLAN {vlan_name}"
-                        
-                        # Color code VLANs with lighter colors
-                        if "newlab" in vlan_name.lower():
-                            vlan_node = Switch(vlan_label, style="filled", fillcolor="lightcoral", fontcolor="black")
-                        elif "oob" in vlan_name.lower():
-                            vlan_node = Switch(vlan_label, style="filled", fillcolor="moccasin", fontcolor="black")
-                        else:
-                            vlan_node = Switch(vlan_label)
-                        
-                        # Group interfaces under their VLAN without arbitrary subgroups
-                        if interfaces:
-                            with Cluster(f"{vlan_name} Interfaces"):
-                                for interface in interfaces:
-                                    iface_label = interface.name
-                                    if interface.ip:
-                                        iface_label += f"\n{interface.ip}"
-                                    if interface.description:
-                                        iface_label += f"\n{interface.description}"
-                                    interface_node = Switch(iface_label)
-                                    vlan_node >> interface_node
-                    
-                    # Add untagged interfaces as a separate category (all interfaces not in named VLANs)
-                    untagged_interfaces = []
-                    for interface in device.interfaces:
-                        # Show interface if it's not part of any named VLAN
-                        if interface.name not in all_vlan_interfaces:
-                            untagged_interfaces.append(interface)
-                    
-                    if untagged_interfaces:
-                        with Cluster("Untagged Ports (Default VLAN)"):
-                            untagged_node = Switch("Default VLAN\n(Untagged)", style="filled", fillcolor="lightsteelblue", fontcolor="black")
-                            
-                            for interface in untagged_interfaces:
-                                iface_label = interface.name
-                                if interface.ip:
-                                    iface_label += f"\n{interface.ip}"
-                                if interface.description:
-                                    iface_label += f"\n{interface.description}"
-                                interface_node = Switch(iface_label)
-                                untagged_node >> interface_node
-        
-        # Generate SVG version
-        with Diagram("VLAN Diagram", show=False, filename=os.path.join(self.output_dir, filename), 
-                     outformat="svg", direction="LR", graph_attr=graph_attr):
-            for device in network.devices:
-                with Cluster(f"Device: {device.hostname}"):
-                    vlan_assignments = {}
-                    all_vlan_interfaces = set()
-                    
+        return self._generate_for_upload(network, "vlans")
+
+    def _draw_vlans(self, network: Network) -> None:
+        for device in network.devices:
+            with Cluster(f"Device: {device.hostname}"):
+                # Collect all interfaces and their VLAN assignments
+                vlan_assignments = {}
+                all_vlan_interfaces = set()  # Track all interfaces that are part of named VLANs
+
+                # Initialize VLAN assignments
+                if device.routing and "vlans" in device.routing:
+                    for vlan in device.routing["vlans"]:
+                        vlan_assignments[vlan.name] = []
+
+                # Process each interface
+                for interface in device.interfaces:
+                    if interface.vlan_members and len(interface.vlan_members) > 0:
+                        # Interface is tagged to specific VLAN(s)
+                        for vlan_name in interface.vlan_members:
+                            if vlan_name in vlan_assignments:
+                                vlan_assignments[vlan_name].append(interface)
+                                all_vlan_interfaces.add(interface.name)
+
+                # Create VLAN nodes with their interfaces grouped under each VLAN
+                for vlan_name, interfaces in vlan_assignments.items():
+                    # Find VLAN details
+                    vlan_details = None
                     if device.routing and "vlans" in device.routing:
                         for vlan in device.routing["vlans"]:
-                            vlan_assignments[vlan.name] = []
-                    
-                    for interface in device.interfaces:
-                        if interface.vlan_members and len(interface.vlan_members) > 0:
-                            for vlan_name in interface.vlan_members:
-                                if vlan_name in vlan_assignments:
-                                    vlan_assignments[vlan_name].append(interface)
-                                    all_vlan_interfaces.add(interface.name)
-                    
-                    for vlan_name, interfaces in vlan_assignments.items():
-                        vlan_details = None
-                        if device.routing and "vlans" in device.routing:
-                            for vlan in device.routing["vlans"]:
-                                if vlan.name == vlan_name:
-                                    vlan_details = vlan
-                                    break
-                        
-                        if vlan_details:
-                            vlan_label = f"VLAN {vlan_details.vlan_id}\n{vlan_details.name}"
-                            if vlan_details.description:
-                                vlan_label += f"\n{vlan_details.description}"
-                        else:
-                            vlan_label = f"VLAN {vlan_name}"
-                        
-                        # Color code VLANs with lighter colors
-                        if "newlab" in vlan_name.lower():
-                            vlan_node = Switch(vlan_label, style="filled", fillcolor="lightcoral", fontcolor="black")
-                        elif "oob" in vlan_name.lower():
-                            vlan_node = Switch(vlan_label, style="filled", fillcolor="moccasin", fontcolor="black")
-                        else:
-                            vlan_node = Switch(vlan_label)
-                        
-                        # Group interfaces under their VLAN without arbitrary subgroups
-                        if interfaces:
-                            with Cluster(f"{vlan_name} Interfaces"):
-                                for interface in interfaces:
-                                    iface_label = interface.name
-                                    if interface.ip:
-                                        iface_label += f"\n{interface.ip}"
-                                    if interface.description:
-                                        iface_label += f"\n{interface.description}"
-                                    interface_node = Switch(iface_label)
-                                    vlan_node >> interface_node
-                    
-                    # Add untagged interfaces as a separate category (all interfaces not in named VLANs)
-                    untagged_interfaces = []
-                    for interface in device.interfaces:
-                        if interface.name not in all_vlan_interfaces:
-                            untagged_interfaces.append(interface)
-                    
-                    if untagged_interfaces:
-                        with Cluster("Untagged Ports (Default VLAN)"):
-                            untagged_node = Switch("Default VLAN\n(Untagged)", style="filled", fillcolor="lightsteelblue", fontcolor="black")
-                            
-                            for interface in untagged_interfaces:
+                            if vlan.name == vlan_name:
+                                vlan_details = vlan
+                                break
+
+                    if vlan_details:
+                        vlan_label = f"VLAN {vlan_details.vlan_id}\n{vlan_details.name}"
+                        if vlan_details.description:
+                            vlan_label += f"\n{vlan_details.description}"
+                    else:
+                        vlan_label = f"VLAN {vlan_name}"
+
+                    # Color code VLANs with lighter colors
+                    if "newlab" in vlan_name.lower():
+                        vlan_node = Switch(vlan_label, style="filled", fillcolor="lightcoral", fontcolor="black")
+                    elif "oob" in vlan_name.lower():
+                        vlan_node = Switch(vlan_label, style="filled", fillcolor="moccasin", fontcolor="black")
+                    else:
+                        vlan_node = Switch(vlan_label)
+
+                    # Group interfaces under their VLAN without arbitrary subgroups
+                    if interfaces:
+                        with Cluster(f"{vlan_name} Interfaces"):
+                            for interface in interfaces:
                                 iface_label = interface.name
                                 if interface.ip:
                                     iface_label += f"\n{interface.ip}"
                                 if interface.description:
                                     iface_label += f"\n{interface.description}"
                                 interface_node = Switch(iface_label)
-                                untagged_node >> interface_node
-        
-        return {
-            "png": png_path,
-            "svg": svg_path
-        }
+                                vlan_node >> interface_node
+
+                # Add untagged interfaces as a separate category (all interfaces not in named VLANs)
+                untagged_interfaces = []
+                for interface in device.interfaces:
+                    # Show interface if it's not part of any named VLAN
+                    if interface.name not in all_vlan_interfaces:
+                        untagged_interfaces.append(interface)
+
+                if untagged_interfaces:
+                    with Cluster("Untagged Ports (Default VLAN)"):
+                        untagged_node = Switch("Default VLAN\n(Untagged)", style="filled", fillcolor="lightsteelblue", fontcolor="black")
+
+                        for interface in untagged_interfaces:
+                            iface_label = interface.name
+                            if interface.ip:
+                                iface_label += f"\n{interface.ip}"
+                            if interface.description:
+                                iface_label += f"\n{interface.description}"
+                            interface_node = Switch(iface_label)
+                            untagged_node >> interface_node
 
     def generate_routing_diagram(self, network: Network, config_id: str) -> Dict[str, str]:
         """
         Generate a routing-focused diagram showing routing information.
         """
-        filename = f"{config_id}_routing"
-        png_path = os.path.join(self.output_dir, f"{filename}.png")
-        svg_path = os.path.join(self.output_dir, f"{filename}.svg")
-        
-        graph_attr = self._get_optimized_graph_attr("general")
-        
-        with Diagram("Routing Diagram", show=False, filename=os.path.join(self.output_dir, filename), 
-                     outformat="png", direction="TB", graph_attr=graph_attr):
-            for device in network.devices:
-                with Cluster(f"Device: {device.hostname}"):
-                    device_node = Router(device.hostname)
-                    
-                    # Add routes if they exist
-                    if device.routing and "routes" in device.routing:
-                        for route in device.routing["routes"]:
-                            route_label = f"{route.destination}\nvia {route.next_hop}"
-                            route_node = Switch(route_label)
-                            device_node >> route_node
-        
-        # Generate SVG version
-        with Diagram("Routing Diagram", show=False, filename=os.path.join(self.output_dir, filename), 
-                     outformat="svg", direction="TB", graph_attr=graph_attr):
-            for device in network.devices:
-                with Cluster(f"Device: {device.hostname}"):
-                    device_node = Router(device.hostname)
-                    
-                    if device.routing and "routes" in device.routing:
-                        for route in device.routing["routes"]:
-                            route_label = f"{route.destination}\nvia {route.next_hop}"
-                            route_node = Switch(route_label)
-                            device_node >> route_node
-        
-        return {
-            "png": png_path,
-            "svg": svg_path
-        }
+        return self.generate_diagram(network, "routing")
+
+    def _draw_routing(self, network: Network) -> None:
+        for device in network.devices:
+            with Cluster(f"Device: {device.hostname}"):
+                device_node = Router(device.hostname)
+
+                # Add routes if they exist
+                if device.routing and "routes" in device.routing:
+                    for route in device.routing["routes"]:
+                        route_label = f"{route.destination}\nvia {route.next_hop}"
+                        route_node = Switch(route_label)
+                        device_node >> route_node
 
     def generate_overview_diagram(self, network: Network, config_id: str) -> Dict[str, str]:
         """
         Generate an overview diagram showing key network elements.
         """
-        filename = f"{config_id}_overview"
-        png_path = os.path.join(self.output_dir, f"{filename}.png")
-        svg_path = os.path.join(self.output_dir, f"{filename}.svg")
-        
-        graph_attr = self._get_optimized_graph_attr("general")
-        
-        with Diagram("Network Overview", show=False, filename=os.path.join(self.output_dir, filename), 
-                     outformat="png", direction="TB", graph_attr=graph_attr):
-            for device in network.devices:
-                with Cluster(f"Device: {device.hostname}"):
-                    device_node = Router(device.hostname)
-                    
-                    # Show key interfaces (first 5 with IP addresses)
-                    ip_interfaces = [i for i in device.interfaces if i.ip][:5]
-                    for interface in ip_interfaces:
-                        iface_label = f"{interface.name}\n{interface.ip}"
-                        iface_node = Switch(iface_label)
-                        device_node >> iface_node
-                    
-                    # Show VLANs if they exist
-                    if device.routing and "vlans" in device.routing:
-                        for vlan in device.routing["vlans"]:
-                            vlan_label = f"VLAN {vlan.vlan_id}\n{vlan.name}"
-                            vlan_node = Switch(vlan_label)
-                            device_node >> vlan_node
-        
-        # Generate SVG version
-        with Diagram("Network Overview", show=False, filename=os.path.join(self.output_dir, filename), 
-                     outformat="svg", direction="TB", graph_attr=graph_attr):
-            for device in network.devices:
-                with Cluster(f"Device: {device.hostname}"):
-                    device_node = Router(device.hostname)
-                    
-                    ip_interfaces = [i for i in device.interfaces if i.ip][:5]
-                    for interface in ip_interfaces:
-                        iface_label = f"{interface.name}\n{interface.ip}"
-                        iface_node = Switch(iface_label)
-                        device_node >> iface_node
-                    
-                    if device.routing and "vlans" in device.routing:
-                        for vlan in device.routing["vlans"]:
-                            vlan_label = f"VLAN {vlan.vlan_id}\n{vlan.name}"
-                            vlan_node = Switch(vlan_label)
-                            device_node >> vlan_node
-        
-        return {
-            "png": png_path,
-            "svg": svg_path
-        }
+        return self.generate_diagram(network, "overview")
+
+    def _draw_overview(self, network: Network) -> None:
+        for device in network.devices:
+            with Cluster(f"Device: {device.hostname}"):
+                device_node = Router(device.hostname)
+
+                # Show key interfaces (first 5 with IP addresses)
+                ip_interfaces = [i for i in device.interfaces if i.ip][:5]
+                for interface in ip_interfaces:
+                    iface_label = f"{interface.name}\n{interface.ip}"
+                    iface_node = Switch(iface_label)
+                    device_node >> iface_node
+
+                # Show VLANs if they exist
+                if device.routing and "vlans" in device.routing:
+                    for vlan in device.routing["vlans"]:
+                        vlan_label = f"VLAN {vlan.vlan_id}\n{vlan.name}"
+                        vlan_node = Switch(vlan_label)
+                        device_node >> vlan_node
 
     def generate_all_diagrams(self, network: Network, config_id: str) -> Dict[str, Dict[str, str]]:
         """
         Generate all types of diagrams for a network.
         Returns a dictionary mapping diagram types to their file paths.
         """
-        return {
-            "topology": self.generate_topology(network, config_id),
-            "interfaces": self.generate_interface_diagram(network, config_id),
-            "vlans": self.generate_vlan_diagram(network, config_id),
-            "routing": self.generate_routing_diagram(network, config_id),
-            "overview": self.generate_overview_diagram(network, config_id)
-        } 
\ No newline at end of file
+        if self.render_pool is None:
+            return {
+                "topology": self.generate_topology(network, config_id),
+                "interfaces": self.generate_interface_diagram(network, config_id),
+                "vlans": self.generate_vlan_diagram(network, config_id),
+                "routing": self.generate_routing_diagram(network, config_id),
+                "overview": self.generate_overview_diagram(network, config_id)
+            }
+        
+        # The types are independent: hand them all to the pool at once. These threads
+        # only wait on pool results; the pool's size is what bounds concurrent renders.
+        with ThreadPoolExecutor(max_workers=len(DIAGRAM_LAYOUTS)) as waiters:
+            futures = {
+                diagram_type: waiters.submit(self._generate_for_upload, network, diagram_type)
+                for diagram_type in DIAGRAM_LAYOUTS
+            }
+            return {diagram_type: future.result() for diagram_type, future in futures.items()}
@@ -0,0 +1,199 @@
+import re
+from typing import List, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+try:
+    import cairosvg
+except ImportError:  # PNG output from this renderer is optional
+    cairosvg = None
+
+from app.models.network import Device, Network, Interface
+
+# Cell geometry, in SVG user units
+CELL_WIDTH = 156
+CELL_HEIGHT = 48
+GAP = 6
+PADDING = 14
+GROUP_HEADER_HEIGHT = 24
+DEVICE_HEADER_HEIGHT = 30
+TITLE_HEIGHT = 40
+# Ports per row; rows wrap, so width stays fixed however many ports a group has
+COLUMNS = 8
+# Characters of a description shown in a cell; the full text is in its tooltip
+DESCRIPTION_CHARS = 24
+
+VLAN_COLORS = (("newlab", "lightcoral"), ("oob", "moccasin"))
+UNTAGGED_COLOR = "lightsteelblue"
+DEFAULT_GROUP_COLOR = "#e8e8e8"
+
+DIGITS_RE = re.compile(r'(\d+)')
+
+# (header label, header fill colour, interfaces)
+Group = Tuple[str, str, List[Interface]]
+
+
+def port_sort_key(name: str) -> tuple:
+    """Natural order for interface names, so ge-1/0/2 follows ge-0/0/47 and precedes ge-1/0/10"""
+    return tuple(int(part) if part.isdigit() else part for part in DIGITS_RE.split(name))
+
+
+def interface_groups(device: Device) -> List[Group]:
+    """Interfaces grouped by type prefix (ge, xe, ...), as in the Graphviz interface diagram"""
+    groups = {}
+    for interface in device.interfaces:
+        interface_type = interface.name.split('-')[0] if '-' in interface.name else "other"
+        groups.setdefault(interface_type, []).append(interface)
+    return [
+        (f"{interface_type.upper()} Interfaces", DEFAULT_GROUP_COLOR,
+         sorted(interfaces, key=lambda i: port_sort_key(i.name)))
+        for interface_type, interfaces in groups.items()
+    ]
+
+
+def vlan_groups(device: Device) -> List[Group]:
+    """Interfaces under each configured VLAN, then every other port as untagged"""
+    vlans = (device.routing or {}).get("vlans", [])
+    members = {vlan.name: [] for vlan in vlans}
+    tagged = set()
+    for interface in device.interfaces:
+        for vlan_name in interface.vlan_members or []:
+            if vlan_name in members:
+                members[vlan_name].append(interface)
+                tagged.add(interface.name)
+
+    groups = []
+    for vlan in vlans:
+        label = f"VLAN {vlan.vlan_id} {vlan.name}"
+        if vlan.description:
+            label += f" - {vlan.description}"
+        color = next((fill for marker, fill in VLAN_COLORS if marker in vlan.name.lower()), DEFAULT_GROUP_COLOR)
+        groups.append((label, color, members[vlan.name]))
+    untagged = [interface for interface in device.interfaces if interface.name not in tagged]
+    if untagged:
+        groups.append(("Untagged Ports (Default VLAN)", UNTAGGED_COLOR, untagged))
+    return groups
+
+
+GROUPINGS = {"interfaces": interface_groups, "vlans": vlan_groups}
+
+
+def node_count(diagram_type: str, network: Network) -> int:
+    """Nodes the Graphviz version of a grid diagram would lay out"""
+    if diagram_type == "vlans":
+        count = 0
+        for device in network.devices:
+            groups = vlan_groups(device)
+            count += len(groups) + sum(len(interfaces) for _, _, interfaces in groups)
+        return count
+    return sum(len(device.interfaces) for device in network.devices)
+
+
+def _text(x: float, y: float, content: str, size: int = 11, weight: str = "normal", anchor: str = "start") -> str:
+    return (f'<text x="{x:g}" y="{y:g}" font-size="{size}" font-weight="{weight}" '
+            f'text-anchor="{anchor}">{escape(content)}</text>')
+
+
+def _port_cell(interface: Interface, x: float, y: float) -> List[str]:
+    lines = [interface.name]
+    if interface.ip:
+        lines.append(interface.ip)
+    tooltip = interface.name
+    if interface.description:
+        tooltip += f"\n{interface.description}"
+        description = interface.description
+        if len(description) > DESCRIPTION_CHARS:
+            description = description[:DESCRIPTION_CHARS - 1] + "…"
+        lines.append(description)
+    parts = [
+        '<g>',
+        f'<title>{escape(tooltip)}</title>',
+        f'<rect x="{x:g}" y="{y:g}" width="{CELL_WIDTH}" height="{CELL_HEIGHT}" rx="4" fill="white" stroke="#555"/>'
+    ]
+    for index, line in enumerate(lines[:3]):
+        parts.append(_text(x + 6, y + 14 + index * 13, line, size=11 if index == 0 else 10,
+                           weight="bold" if index == 0 else "normal"))
+    parts.append('</g>')
+    return parts
+
+
+def render_svg(title: str, devices: Sequence[Tuple[str, List[Group]]]) -> str:
+    """
+    Lay out devices as stacked panels of port groups and return SVG text.
+    Every coordinate follows from the group sizes alone, so the same input
+    always produces the same document, in time linear in the port count.
+    """
+    widest = max((len(group[2]) for _, groups in devices for group in groups), default=1)
+    columns = max(1, min(COLUMNS, widest))
+    inner_width = columns * (CELL_WIDTH + GAP) - GAP
+    width = inner_width + 4 * PADDING
+
+    body: List[str] = []
+    y = TITLE_HEIGHT
+    for hostname, groups in devices:
+        top = y
+        y += DEVICE_HEADER_HEIGHT
+        panel: List[str] = []
+        for label, color, interfaces in groups:
+            panel.append(f'<rect x="{2 * PADDING}" y="{y}" width="{inner_width}" height="{GROUP_HEADER_HEIGHT - 4}" '
+                         f'rx="3" fill="{color}"/>')
+            panel.append(_text(2 * PADDING + 6, y + 14, f"{label} ({len(interfaces)})", weight="bold"))
+            y += GROUP_HEADER_HEIGHT
+            for index, interface in enumerate(interfaces):
+                row, column = divmod(index, columns)
+                panel.extend(_port_cell(interface, 2 * PADDING + column * (CELL_WIDTH + GAP),
+                                        y + row * (CELL_HEIGHT + GAP)))
+            rows = -(-len(interfaces) // columns)
+            y += rows * (CELL_HEIGHT + GAP) + GAP
+        body.append(f'<rect x="{PADDING}" y="{top}" width="{width - 2 * PADDING}" height="{y - top}" '
+                    f'rx="6" fill="#fafafa" stroke="#999"/>')
+        body.append(_text(2 * PADDING, top + 20, f"Device: {hostname}", size=13, weight="bold"))
+        body.extend(panel)
+        y += PADDING
+
+    height = y + PADDING
+    return "".join([
+        '<?xml version="1.0" encoding="UTF-8"?>\n',
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}" font-family="Helvetica, Arial, sans-serif">',
+        f'<rect width="{width}" height="{height}" fill="white"/>',
+        _text(width / 2, 26, title, size=16, weight="bold", anchor="middle"),
+        *body,
+        '</svg>\n'
+    ])
+
+
+class RasterizerMissingError(RuntimeError):
+    """PNG was asked of the grid renderer without ``cairosvg`` installed"""
+
+
+class GridRenderer:
+    """
+    Renders the interface and VLAN diagrams straight from the Network model.
+    These diagrams are grids of ports grouped by type or VLAN, so they need
+    no graph layout; skipping Graphviz keeps them fast for chassis with
+    thousands of ports. PNG output needs the optional ``cairosvg`` package.
+    """
+
+    diagram_types = tuple(GROUPINGS)
+
+    def svg(self, diagram_type: str, title: str, network: Network) -> str:
+        grouping = GROUPINGS[diagram_type]
+        return render_svg(title, [(device.hostname, grouping(device)) for device in network.devices])
+
+    @staticmethod
+    def can_rasterize() -> bool:
+        return cairosvg is not None
+
+    def write(self, diagram_type: str, title: str, network: Network, base: str, formats: Sequence[str]) -> None:
+        """Write ``{base}.svg`` and/or ``{base}.png``; nothing is written when PNG cannot be"""
+        if "png" in formats and cairosvg is None:
+            raise RasterizerMissingError("PNG output from the grid renderer requires the cairosvg package")
+        svg = self.svg(diagram_type, title, network)
+        for outformat in formats:
+            if outformat == "svg":
+                with open(f"{base}.svg", "w", encoding="utf-8") as f:
+                    f.write(svg)
+            elif outformat == "png":
+                cairosvg.svg2png(bytestring=svg.encode("utf-8"), write_to=f"{base}.png")
+            else:
+                raise ValueError(f"Unsupported format: {outformat}")
@@ -0,0 +1,152 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from app.parsers.config_tree import parse_config_tree
+from app.parsers.juniper_parser import JuniperParser, NON_INTERFACE_KEYWORDS
+from app.parsers.lazy_config import CHILD_HEAD_RE, LazyConfig
+from app.parsers.set_parser import is_set_format
+
+# Stanzas each part of the model is extracted from
+ROUTE_STANZAS = {"routing-options", "routing-instances"}
+VLAN_STANZAS = {"vlans", "interfaces"}
+
+
+@dataclass
+class RevisionParse:
+    """A revision's network, built from its predecessor's, and what was reused"""
+    network: dict
+    stanzas_reused: List[str] = field(default_factory=list)
+    stanzas_reparsed: List[str] = field(default_factory=list)
+    interfaces_reused: int = 0
+    interfaces_reparsed: int = 0
+
+    def summary(self) -> dict:
+        return {
+            "stanzas_reused": self.stanzas_reused,
+            "stanzas_reparsed": self.stanzas_reparsed,
+            "interfaces_reused": self.interfaces_reused,
+            "interfaces_reparsed": self.interfaces_reparsed
+        }
+
+
+class _Member:
+    """The two interface fields VLAN membership is assigned from"""
+    __slots__ = ("name", "vlan_members")
+
+    def __init__(self, interface: dict):
+        self.name = interface["name"]
+        self.vlan_members = interface.get("vlan_members")
+
+
+def _interface_head(child_text: str) -> Optional[str]:
+    """The interface a child of ``interfaces`` defines, read from its head line, or None"""
+    head = CHILD_HEAD_RE.search(child_text)
+    if head is None or head.group(1) != "{":
+        return None
+    words = head.group(0).split("#")[0].strip()[:-1].split()
+    if words and words[0] == "protect:":
+        words = words[1:]
+    if len(words) != 1 or words[0] == "inactive:" or words[0] in NON_INTERFACE_KEYWORDS:
+        return None
+    return words[0]
+
+
+def _splice_interfaces(old: LazyConfig, new: LazyConfig, previous: List[dict],
+                       result: RevisionParse) -> Optional[List[dict]]:
+    """
+    Interfaces of the new revision, parsing only the interface blocks whose
+    text changed and reusing the previous model's entry for the rest.
+    Returns None when the stanzas cannot be split or do not line up with
+    the previous model.
+    """
+    old_split, new_split = old.split_section("interfaces"), new.split_section("interfaces")
+    if old_split is None or new_split is None:
+        return None
+    if any(line.strip() != "interfaces {" for line in (old_split[0] + "\n" + new_split[0]).split("\n")):
+        return None
+
+    # Pair the previous model's interfaces with the text they were parsed from
+    by_text: Dict[str, dict] = {}
+    other_text = set()
+    index = 0
+    for text in old_split[1]:
+        name = _interface_head(text)
+        if name is None:
+            other_text.add(text)
+            continue
+        if index >= len(previous) or previous[index]["name"] != name:
+            return None
+        by_text[text] = previous[index]
+        index += 1
+    if index != len(previous):
+        return None
+
+    parser = JuniperParser()
+    interfaces = []
+    for text in new_split[1]:
+        reused = by_text.get(text)
+        if reused is not None:
+            interfaces.append(reused)
+            result.interfaces_reused += 1
+        elif text not in other_text:
+            for node in parse_config_tree(text).children:
+                if node.is_block() and not node.inactive and node.keyword not in NON_INTERFACE_KEYWORDS:
+                    interfaces.append(parser._interface_from_block(node).model_dump(mode="json"))
+                    result.interfaces_reparsed += 1
+    return interfaces
+
+
+def parse_revision(config_text: str, previous_text: str, previous_network: dict) -> Optional[RevisionParse]:
+    """
+    Parse a new revision of a single-device config against its predecessor.
+    Stanzas whose text hash is unchanged are not parsed; the parts of the
+    model they feed are carried over from ``previous_network``. Within a
+    changed ``interfaces`` stanza only the changed interface blocks are
+    parsed. The result matches a full ``JuniperParser`` parse. Returns None
+    when the revision must be parsed in full instead: ``display set``
+    input, a multi-device predecessor, or a different hostname.
+    """
+    if len(previous_network["devices"]) != 1 or is_set_format(config_text) or is_set_format(previous_text):
+        return None
+    previous = previous_network["devices"][0]
+    old, new = LazyConfig(previous_text), LazyConfig(config_text)
+    parser = JuniperParser()
+    hostname = parser._hostname_from_tree(new)
+    if hostname != previous["hostname"]:
+        return None
+
+    names = new.section_names + [name for name in old.section_names if name not in new]
+    changed = {
+        name for name in names
+        if name not in old or name not in new or old.section_digest(name) != new.section_digest(name)
+    }
+    result = RevisionParse(network={})
+    result.stanzas_reused = [name for name in names if name not in changed]
+    result.stanzas_reparsed = [name for name in names if name in changed]
+
+    if "interfaces" not in changed:
+        interfaces = previous["interfaces"]
+        result.interfaces_reused = len(interfaces)
+    else:
+        interfaces = _splice_interfaces(old, new, previous["interfaces"], result)
+        if interfaces is None:
+            interfaces = [interface.model_dump(mode="json") for interface in parser._interfaces_from_tree(new)]
+            result.interfaces_reused = 0
+            result.interfaces_reparsed = len(interfaces)
+
+    routing = previous.get("routing") or {}
+    routes = routing.get("routes", [])
+    if changed & ROUTE_STANZAS:
+        routes = [route.model_dump(mode="json") for route in parser._routes_from_tree(new)]
+    vlans = routing.get("vlans", [])
+    if changed & VLAN_STANZAS:
+        # Membership comes from the interfaces too, so either stanza changing redoes the VLANs
+        members = [_Member(interface) for interface in interfaces]
+        vlans = [vlan.model_dump(mode="json") for vlan in parser._vlans_from_tree(new, members)]
+
+    result.network = {
+        "devices": [{"hostname": hostname, "interfaces": interfaces, "routing": {"routes": routes, "vlans": vlans}}],
+        "connections": [],
+        "topology": None
+    }
+    return result
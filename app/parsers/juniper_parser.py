@@ -1,207 +1,267 @@
-import re
 from app.models.network import Network, Interface, Device
 from app.models.juniper import VLAN, Route, JuniperConfig
-from typing import List, Dict, Optional
+from app.parsers.config_tree import Block, ConfigNode
+from app.parsers.lazy_config import LazyConfig
+from typing import List, Dict, Optional, Union
+
+# Extractors accept a fully parsed tree or a lazily parsed view of one
+ConfigView = Union[Block, LazyConfig]
+
+# Children of the ``interfaces`` stanza that are not interfaces themselves
+NON_INTERFACE_KEYWORDS = {"interface-range", "traceoptions", "interface-set"}
+
+# Keywords that stand in for a next-hop address in static routes
+ROUTE_ACTIONS = {"discard", "reject", "receive"}
 
 class JuniperParser:
     def __init__(self):
         self.config = None
-        
+        self.view = None
+
     def parse_config(self, config_text: str) -> Network:
         """Parse a complete Juniper configuration and return a Network model"""
-        self.config = config_text
-        
+        # ``display set`` output has its own line-oriented parser
+        from app.parsers.set_parser import SetConfigParser, is_set_format
+        if is_set_format(config_text):
+            return SetConfigParser().parse_config(config_text)
+
+        tree = self._get_view(config_text)
+
         # Extract hostname
-        hostname = self._extract_hostname(config_text)
-        
+        hostname = self._hostname_from_tree(tree)
+
         # Parse interfaces
-        interfaces = self.parse_interfaces(config_text)
-        
+        interfaces = self._interfaces_from_tree(tree)
+
         # Parse routing
-        routes = self.parse_routing(config_text)
-        
+        routes = self._routes_from_tree(tree)
+
         # Parse VLANs
-        vlans = self.parse_vlans(config_text)
-        
+        vlans = self._vlans_from_tree(tree, interfaces)
+
         # Create device
         device = Device(
             hostname=hostname,
             interfaces=interfaces,
             routing={"routes": routes, "vlans": vlans}
         )
-        
+
         return Network(devices=[device], connections=[])
-    
+
+    def _get_view(self, config_text: str) -> LazyConfig:
+        """
+        Index config text into a lazy view, reusing the last view for the same text.
+        Only the stanzas the extractors touch (system, interfaces, vlans,
+        routing-options, routing-instances) are ever parsed.
+        """
+        if self.view is None or self.config is not config_text:
+            self.config = config_text
+            self.view = LazyConfig(config_text)
+        return self.view
+
     def _extract_hostname(self, config_text: str) -> str:
         """Extract hostname from configuration"""
-        hostname_match = re.search(r'host-name\s+(\S+);', config_text)
-        return hostname_match.group(1) if hostname_match else "unknown"
-    
+        return self._hostname_from_tree(self._get_view(config_text))
+
+    def _hostname_from_tree(self, tree: ConfigView) -> str:
+        system = tree.find("system")
+        hostname = system.get_value("host-name") if system else None
+        if hostname:
+            return hostname
+
+        # Clustered devices keep the hostname in per-node groups
+        groups = tree.find("groups")
+        if groups:
+            for group in groups.iter_blocks():
+                group_system = group.find("system")
+                if group_system and group_system.get_value("host-name"):
+                    return group_system.get_value("host-name")
+        return "unknown"
+
     def parse_interfaces(self, config_text: str) -> List[Interface]:
         """Parse interface configurations from Juniper config"""
-        interfaces = []
-        
-        # Find all interface blocks - including VLAN interfaces
-        # Use a more sophisticated approach to handle nested blocks
-        interface_blocks = re.finditer(
-            r'(vlan|\w+-\d+/\d+/\d+)\s*\{',
-            config_text,
-            re.DOTALL
+        return self._interfaces_from_tree(self._get_view(config_text))
+
+    def _interfaces_from_tree(self, tree: ConfigView) -> List[Interface]:
+        interfaces_block = tree.find("interfaces")
+        if interfaces_block is None:
+            return []
+        return [
+            self._interface_from_block(block)
+            for block in interfaces_block.iter_blocks()
+            if block.keyword not in NON_INTERFACE_KEYWORDS
+        ]
+
+    def _interface_from_block(self, block: Block) -> Interface:
+        """Build an Interface model from an ``interfaces { <name> { ... } }`` block"""
+        units = list(block.iter_blocks("unit"))
+
+        # Extract description, falling back to the first unit that has one
+        description = block.get_value("description")
+        if description is None:
+            description = next((u.get_value("description") for u in units if u.has("description")), None)
+
+        # Extract IP address from the first family inet block
+        ip_address = None
+        for unit in units:
+            inet = unit.find("family inet")
+            address = inet.get("address") if inet else None
+            if address is not None:
+                ip_address = address.value
+                break
+
+        # Extract VLAN membership and port mode from ethernet-switching
+        vlan_members = []
+        port_mode = None
+        for unit in units:
+            switching = unit.find("family ethernet-switching")
+            if switching is None:
+                continue
+            vlan = switching.find("vlan")
+            if vlan:
+                for members in vlan.iter_nodes("members"):
+                    vlan_members.extend(members.args)
+            if port_mode is None:
+                port_mode = switching.get_value("port-mode") or switching.get_value("interface-mode")
+
+        # Extract status (enabled/disabled)
+        status = "enabled"
+        if block.has("disable") or any(unit.has("disable") for unit in units):
+            status = "disabled"
+
+        return Interface(
+            name=block.name,
+            ip=ip_address,
+            description=description,
+            status=status,
+            vlan_members=vlan_members,
+            port_mode=port_mode
         )
-        
-        for match in interface_blocks:
-            interface_name = match.group(1)
-            start_pos = match.end()
-            
-            # Find the matching closing brace by counting braces
-            brace_count = 1
-            end_pos = start_pos
-            while brace_count > 0 and end_pos < len(config_text):
-                if config_text[end_pos] == '{':
-                    brace_count += 1
-                elif config_text[end_pos] == '}':
-                    brace_count -= 1
-                end_pos += 1
-            
-            if brace_count == 0:
-                interface_config = config_text[start_pos:end_pos-1]  # -1 to exclude the closing brace
-                
-                # Extract description
-                desc_match = re.search(r'description\s+"([^"]+)";', interface_config)
-                description = desc_match.group(1) if desc_match else None
-                
-                # Extract IP address - look for family inet blocks
-                ip_match = re.search(r'family\s+inet\s*\{[^}]*address\s+(\d+\.\d+\.\d+\.\d+/\d+);[^}]*\}', interface_config, re.DOTALL)
-                ip_address = ip_match.group(1) if ip_match else None
-                
-                # Extract VLAN membership
-                vlan_members = []
-                vlan_matches = re.finditer(r'vlan\s*\{[^}]*members\s+(\w+);[^}]*\}', interface_config, re.DOTALL)
-                for vlan_match in vlan_matches:
-                    vlan_members.append(vlan_match.group(1))
-                
-                # Extract port mode
-                port_mode = None
-                port_mode_match = re.search(r'port-mode\s+(\w+);', interface_config)
-                if port_mode_match:
-                    port_mode = port_mode_match.group(1)
-                
-                # Extract status (enabled/disabled)
-                status = "enabled"
-                if re.search(r'disable;', interface_config):
-                    status = "disabled"
-                
-                interface = Interface(
-                    name=interface_name,
-                    ip=ip_address,
-                    description=description,
-                    status=status,
-                    vlan_members=vlan_members,
-                    port_mode=port_mode
-                )
-                interfaces.append(interface)
-        
-        return interfaces
-    
+
     def parse_routing(self, config_text: str) -> List[Route]:
         """Parse routing configurations"""
+        return self._routes_from_tree(self._get_view(config_text))
+
+    def _routes_from_tree(self, tree: ConfigView) -> List[Route]:
         routes = []
-        
-        # Parse static routes
-        static_routes = re.finditer(
-            r'route\s+(\d+\.\d+\.\d+\.\d+/\d+)\s+next-hop\s+(\d+\.\d+\.\d+\.\d+);',
-            config_text
-        )
-        
-        for match in static_routes:
-            route = Route(
-                destination=match.group(1),
-                next_hop=match.group(2),
-                protocol="static"
-            )
-            routes.append(route)
-        
+        for routing_options in self._iter_routing_options(tree):
+            static_blocks = list(routing_options.iter_blocks("static"))
+            for rib in routing_options.iter_blocks("rib"):
+                static_blocks.extend(rib.iter_blocks("static"))
+            for static in static_blocks:
+                for node in static.iter_nodes("route"):
+                    route = self._route_from_node(node)
+                    if route is not None:
+                        routes.append(route)
         return routes
-    
+
+    def _iter_routing_options(self, tree: ConfigView):
+        """Yield the global routing-options block and those of routing instances"""
+        routing_options = tree.find("routing-options")
+        if routing_options:
+            yield routing_options
+        instances = tree.find("routing-instances")
+        if instances:
+            for instance in instances.iter_blocks():
+                instance_options = instance.find("routing-options")
+                if instance_options:
+                    yield instance_options
+
+    def _route_from_node(self, node: ConfigNode) -> Optional[Route]:
+        """Build a Route from ``route <prefix> next-hop <addr>;`` or its block form"""
+        if node.value is None:
+            return None
+
+        # Flatten the block form so both spellings share one attribute scan
+        words = node.words[2:]
+        if node.is_block():
+            for child in node.iter_nodes():
+                words.extend(child.words)
+
+        next_hop = None
+        metric = None
+        preference = None
+        for index, word in enumerate(words):
+            following = words[index + 1] if index + 1 < len(words) else None
+            if word == "next-hop" and following and next_hop is None:
+                next_hop = following
+            elif word in ROUTE_ACTIONS and next_hop is None:
+                next_hop = word
+            elif word == "metric" and following and following.isdigit():
+                metric = int(following)
+            elif word == "preference" and following and following.isdigit():
+                preference = int(following)
+
+        if next_hop is None:
+            return None
+        return Route(
+            destination=node.value,
+            next_hop=next_hop,
+            protocol="static",
+            metric=metric,
+            preference=preference
+        )
+
     def parse_vlans(self, config_text: str) -> List[VLAN]:
         """Parse VLAN configurations and their member interfaces"""
+        tree = self._get_view(config_text)
+        return self._vlans_from_tree(tree, self._interfaces_from_tree(tree))
+
+    def _vlans_from_tree(self, tree: ConfigView, interfaces: List[Interface]) -> List[VLAN]:
+        vlans_block = tree.find("vlans")
+        if vlans_block is None:
+            return []
+
         vlans = []
-        
-        # First, find VLAN definitions
-        vlan_blocks = re.finditer(
-            r'(\w+)\s*\{[^}]*description\s+"([^"]+)";[^}]*vlan-id\s+(\d+);[^}]*\}',
-            config_text,
-            re.DOTALL
+        for block in vlans_block.iter_blocks():
+            vlan = self._vlan_from_block(block)
+            if vlan is not None:
+                vlans.append(vlan)
+
+        self._assign_vlan_members(vlans, interfaces)
+        return vlans
+
+    def _vlan_from_block(self, block: Block) -> Optional[VLAN]:
+        """Build a VLAN from a ``vlans { <name> { ... } }`` block"""
+        vlan_id = block.get_value("vlan-id")
+        if vlan_id is None or not vlan_id.isdigit():
+            return None
+
+        # Older EX releases list members inside the VLAN itself
+        members = []
+        for node in block.iter_nodes("interface"):
+            if node.value and node.value.split(".")[0] not in members:
+                members.append(node.value.split(".")[0])
+
+        return VLAN(
+            name=block.name,
+            vlan_id=int(vlan_id),
+            description=block.get_value("description"),
+            interfaces=members
         )
-        
-        # Create VLAN objects and build ID to name mapping
+
+    def _assign_vlan_members(self, vlans: List[VLAN], interfaces: List[Interface]) -> None:
+        """Attach interfaces to VLANs they reference by name or by ID"""
         vlan_map = {}
-        vlan_id_to_name = {}
-        for match in vlan_blocks:
-            vlan_name = match.group(1)
-            description = match.group(2)
-            vlan_id = int(match.group(3))
-            
-            vlan = VLAN(
-                name=vlan_name,
-                vlan_id=vlan_id,
-                description=description,
-                interfaces=[]
-            )
-            vlans.append(vlan)
-            vlan_map[vlan_name] = vlan
-            vlan_id_to_name[str(vlan_id)] = vlan_name
-        
-        # Now scan all interfaces to find VLAN memberships
-        interface_blocks = re.finditer(
-            r'(vlan|\w+-\d+/\d+/\d+)\s*\{',
-            config_text,
-            re.DOTALL
-        )
-        
-        for match in interface_blocks:
-            interface_name = match.group(1)
-            start_pos = match.end()
-            
-            # Find the matching closing brace by counting braces
-            brace_count = 1
-            end_pos = start_pos
-            while brace_count > 0 and end_pos < len(config_text):
-                if config_text[end_pos] == '{':
-                    brace_count += 1
-                elif config_text[end_pos] == '}':
-                    brace_count -= 1
-                end_pos += 1
-            
-            if brace_count == 0:
-                interface_config = config_text[start_pos:end_pos-1]  # -1 to exclude the closing brace
-                
-                # Look for VLAN memberships in this interface
-                vlan_matches = re.finditer(r'vlan\s*\{[^}]*members\s+(\w+);[^}]*\}', interface_config, re.DOTALL)
-                for vlan_match in vlan_matches:
-                    vlan_identifier = vlan_match.group(1)
-                    
-                    # Try to find the VLAN by name or ID
-                    target_vlan = None
-                    if vlan_identifier in vlan_map:
-                        # Direct name match
-                        target_vlan = vlan_map[vlan_identifier]
-                    elif vlan_identifier in vlan_id_to_name:
-                        # ID match - get the actual VLAN name
-                        vlan_name = vlan_id_to_name[vlan_identifier]
-                        target_vlan = vlan_map[vlan_name]
-                    
-                    if target_vlan:
-                        target_vlan.interfaces.append(interface_name)
-        
-        return vlans
-    
+        assigned = set()
+        for vlan in vlans:
+            vlan_map[vlan.name] = vlan
+            vlan_map.setdefault(str(vlan.vlan_id), vlan)
+            assigned.update((vlan.name, name) for name in vlan.interfaces)
+
+        for interface in interfaces:
+            for vlan_identifier in interface.vlan_members or []:
+                target_vlan = vlan_map.get(vlan_identifier)
+                if target_vlan and (target_vlan.name, interface.name) not in assigned:
+                    assigned.add((target_vlan.name, interface.name))
+                    target_vlan.interfaces.append(interface.name)
+
     def parse_security_zones(self, config_text: str) -> List[Dict]:
         """Parse security zones (placeholder for future implementation)"""
         # TODO: Implement security zone parsing
         return []
-    
+
     def parse_policies(self, config_text: str) -> List[Dict]:
         """Parse security policies (placeholder for future implementation)"""
         # TODO: Implement policy parsing
-        return [] 
\ No newline at end of file
+        return []
@@ -0,0 +1,184 @@
+import hashlib
+import re
+from typing import Dict, List, Optional, Tuple
+
+from app.parsers.config_tree import TOKEN_RE, Block, ConfigNode, parse_config_tree, INACTIVE_MARKER, PROTECT_MARKER
+
+# A top-level statement or block header: starts in column 0 and ends with ``{`` or ``;``.
+# ``show configuration`` output always indents nested lines, so these are stanza heads.
+STANZA_HEAD_RE = re.compile(
+    r'^(?:(?:inactive|protect): )?([A-Za-z][\w-]*)[^\n]*?([{;])[ \t]*(?:#[^\n]*)?$',
+    re.MULTILINE
+)
+STANZA_CLOSE_RE = re.compile(r'^\}', re.MULTILINE)
+# ``{master:0}`` style markers printed after the config by the CLI
+CLI_MARKER_RE = re.compile(r'^\{[\w:.-]+\}[ \t]*$', re.MULTILINE)
+# The same layout one level down: children of a stanza are indented four spaces
+CHILD_HEAD_RE = re.compile(r'^    (?! )[^\n]*?([{;])[ \t]*(?:#[^\n]*)?$', re.MULTILINE)
+CHILD_CLOSE_RE = re.compile(r'^    \}', re.MULTILINE)
+
+Span = Tuple[int, int]
+
+class LazyConfig:
+    """
+    Section-addressable view over configuration text.
+    Top-level stanza offsets are indexed up front; each stanza is parsed into
+    a tree only the first time it is requested and then memoized.
+    """
+
+    def __init__(self, config_text: str):
+        self.config_text = config_text
+        self._spans: Dict[str, List[Span]] = self._index_stanzas(config_text)
+        self._sections: Dict[str, Optional[ConfigNode]] = {}
+
+    @property
+    def section_names(self) -> List[str]:
+        """Top-level stanza keywords in config order"""
+        return list(self._spans)
+
+    @property
+    def parsed_sections(self) -> List[str]:
+        """Stanzas that have been parsed so far"""
+        return list(self._sections)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._spans
+
+    def section(self, name: str) -> Optional[ConfigNode]:
+        """Return the parsed stanza for a top-level keyword, parsing it on first access"""
+        if name not in self._sections:
+            self._sections[name] = self._parse_section(name)
+        return self._sections[name]
+
+    def section_text(self, name: str) -> str:
+        """Raw text of a stanza, concatenated if the keyword appears more than once"""
+        return "".join(self.config_text[start:end] for start, end in self._spans.get(name, []))
+
+    def section_digest(self, name: str) -> bytes:
+        """
+        Hash of a stanza's raw text, computed without parsing it. Equal
+        digests mean identical stanzas; unequal ones may still parse to the
+        same tree if only whitespace or comments differ.
+        """
+        return hashlib.blake2b(self.section_text(name).encode("utf-8"), digest_size=16).digest()
+
+    def split_section(self, name: str) -> Optional[Tuple[str, List[str]]]:
+        """
+        Split a block stanza into its header line(s) and the raw text of each
+        direct child, without parsing. Each child's text runs from the end of
+        the previous child, so leading comments and annotations stay with it.
+        Returns None when the stanza is not laid out the way Junos prints it.
+        """
+        text = self.config_text
+        headers, children = [], []
+        for start, end in self._spans.get(name, []):
+            line_end = text.find("\n", start, end)
+            if line_end == -1 or not text[start:line_end].rstrip().endswith("{"):
+                return None
+            headers.append(text[start:line_end])
+            body_end = end - 1
+            pos = line_end + 1
+            while True:
+                head = CHILD_HEAD_RE.search(text, pos, body_end)
+                if head is None:
+                    break
+                if head.group(1) == ";":
+                    child_end = head.end()
+                else:
+                    close = CHILD_CLOSE_RE.search(text, head.end(), body_end)
+                    if close is None:
+                        return None
+                    child_end = close.end()
+                child = text[pos:child_end]
+                if child.count("{") != child.count("}"):
+                    return None
+                children.append(child)
+                # The line break belongs to this child, so a child's text does not depend on its neighbours
+                pos = child_end + 1 if text.startswith("\n", child_end) else child_end
+            if any(char in text[pos:body_end] for char in "{};"):
+                return None
+        return "\n".join(headers), children
+
+    def find(self, *path: str) -> Optional[Block]:
+        """Same contract as ``Block.find`` on a fully parsed tree"""
+        if not path:
+            return None
+        first = path[0].split()
+        node = self.section(first[0])
+        if node is None or not node.is_block() or node.inactive or node.words != first:
+            return None
+        return node.find(*path[1:])
+
+    def _parse_section(self, name: str) -> Optional[ConfigNode]:
+        node = None
+        for start, end in self._spans.get(name, []):
+            children = parse_config_tree(self.config_text, start, end).children
+            if not children:
+                continue
+            if node is None:
+                node = children[0]
+            elif node.is_block() and children[0].is_block():
+                node.children.extend(children[0].children)
+        return node
+
+    @classmethod
+    def _index_stanzas(cls, config_text: str) -> Dict[str, List[Span]]:
+        """
+        Record the character span of every top-level stanza.
+        Uses column-0 heads and closing braces, which is a single regex pass;
+        falls back to a token-level depth scan when the text is not laid out
+        the way Junos prints it.
+        """
+        spans: Dict[str, List[Span]] = {}
+        covered_braces = 0
+        pos = 0
+        while True:
+            head = STANZA_HEAD_RE.search(config_text, pos)
+            if head is None:
+                break
+            if head.group(2) == ";":
+                end = head.end()
+            else:
+                close = STANZA_CLOSE_RE.search(config_text, head.end())
+                if close is None:
+                    return cls._index_stanzas_by_tokens(config_text)
+                end = close.end()
+                opened = config_text.count("{", head.start(), end)
+                if opened != config_text.count("}", head.start(), end):
+                    return cls._index_stanzas_by_tokens(config_text)
+                covered_braces += opened
+            spans.setdefault(head.group(1), []).append((head.start(), end))
+            pos = end
+
+        # Braces outside every stanza mean the layout heuristic missed something
+        stray_braces = config_text.count("{") - covered_braces - len(CLI_MARKER_RE.findall(config_text))
+        if stray_braces:
+            return cls._index_stanzas_by_tokens(config_text)
+        return spans
+
+    @staticmethod
+    def _index_stanzas_by_tokens(config_text: str) -> Dict[str, List[Span]]:
+        spans: Dict[str, List[Span]] = {}
+        depth = 0
+        start = None
+        keyword = None
+        for match in TOKEN_RE.finditer(config_text):
+            kind = match.lastgroup
+            if kind in ("word", "string") and depth == 0:
+                token = match.group()
+                if start is None:
+                    start = match.start()
+                if keyword is None and token not in (INACTIVE_MARKER, PROTECT_MARKER):
+                    keyword = token
+            elif kind == "open":
+                depth += 1
+            elif kind == "close":
+                depth = max(depth - 1, 0)
+                if depth == 0 and keyword is not None:
+                    spans.setdefault(keyword, []).append((start, match.end()))
+                    start, keyword = None, None
+            elif kind == "semi" and depth == 0:
+                if keyword is not None:
+                    spans.setdefault(keyword, []).append((start, match.end()))
+                start, keyword = None, None
+        return spans
@@ -3,10 +3,14 @@ from app.models.network import Network, Device, Interface
 from app.models.juniper import VLAN, Route
 from typing import List, Dict, Optional
 
+# Characters that may not appear in a Mermaid node ID
+UNSAFE_ID_RE = re.compile(r'[^a-zA-Z0-9_]')
+
 class MermaidGenerator:
-    def __init__(self):
-        self.node_id_counter = 0
-        self.edge_id_counter = 0
+    """
+    Builds Mermaid flowchart source for each diagram type. Node IDs depend
+    only on the model, so the same network always yields the same text.
+    """
     
     def generate_topology(self, network: Network) -> str:
         """Generate a physical topology diagram showing device connections"""
@@ -51,8 +55,28 @@ class MermaidGenerator:
                 else:
                     mermaid_lines.append(f'    class {interface_id} interface')
         
+        mermaid_lines.extend(self._connection_lines(network))
         return "\n".join(mermaid_lines)
     
+    def _connection_lines(self, network: Network) -> List[str]:
+        """Edges for inferred links; shared segments get a node of their own"""
+        lines = []
+        for index, connection in enumerate(network.connections or []):
+            endpoint_ids = []
+            for endpoint in connection["endpoints"]:
+                endpoint_id = self._sanitize_id(endpoint["device"])
+                if endpoint["interface"]:
+                    endpoint_id += f"_{endpoint['interface'].replace('-', '_')}"
+                endpoint_ids.append(endpoint_id)
+            label = connection.get("subnet") or "description"
+            if connection["kind"] == "shared-segment":
+                segment_id = f"segment_{index}"
+                lines.append(f'    {segment_id}(("{label}"))')
+                lines.extend(f'    {segment_id} --- {endpoint_id}' for endpoint_id in endpoint_ids)
+            else:
+                lines.append(f'    {endpoint_ids[0]} <-->|{label}| {endpoint_ids[1]}')
+        return lines
+    
     def generate_routing_diagram(self, network: Network) -> str:
         """Generate a logical routing diagram showing network paths"""
         mermaid_lines = ["graph LR"]
@@ -63,9 +87,8 @@ class MermaidGenerator:
             
             # Add routes
             if device.routing and "routes" in device.routing:
-                for route in device.routing["routes"]:
-                    route_id = f"{device_id}_route_{self.edge_id_counter}"
-                    self.edge_id_counter += 1
+                for index, route in enumerate(device.routing["routes"]):
+                    route_id = f"{device_id}_route_{index}"
                     mermaid_lines.append(f'    {route_id}["{route.destination}<br/>via {route.next_hop}"]')
                     mermaid_lines.append(f'    {device_id} -.-> {route_id}')
         
@@ -88,6 +111,7 @@ class MermaidGenerator:
             mermaid_lines.append(f'    class {device_id} device')
             
             # Add VLANs with their interface assignments
+            interfaces_by_name = {interface.name: interface for interface in device.interfaces}
             if device.routing and "vlans" in device.routing:
                 for vlan in device.routing["vlans"]:
                     vlan_id = f"{device_id}_vlan_{vlan.vlan_id}"
@@ -106,7 +130,7 @@ class MermaidGenerator:
                             interface_label = interface_name
                             
                             # Find the interface object to get additional info
-                            interface_obj = next((i for i in device.interfaces if i.name == interface_name), None)
+                            interface_obj = interfaces_by_name.get(interface_name)
                             if interface_obj and interface_obj.description:
                                 interface_label += f"<br/>{interface_obj.description}"
                             
@@ -219,7 +243,7 @@ class MermaidGenerator:
     def _sanitize_id(self, text: str) -> str:
         """Convert text to a valid Mermaid node ID"""
         # Remove special characters and replace with underscores
-        sanitized = re.sub(r'[^a-zA-Z0-9_]', '_', text)
+        sanitized = UNSAFE_ID_RE.sub('_', text)
         # Ensure it starts with a letter
         if sanitized and not sanitized[0].isalpha():
             sanitized = f"node_{sanitized}"
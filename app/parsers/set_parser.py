@@ -0,0 +1,279 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.models.network import Network, Interface, Device
+from app.models.juniper import VLAN, Route
+from app.parsers.config_tree import Statement
+from app.parsers.juniper_parser import JuniperParser, NON_INTERFACE_KEYWORDS
+
+# ``user@host> show configuration | display set`` and ``{master:0}`` lines
+PROMPT_RE = re.compile(r'^(?:[\w.-]+@[\w.-]+[>#%]|\{[\w:.-]+\}\s*$)')
+
+SET_COMMANDS = ("set ", "deactivate ")
+
+# Files with fewer lines than this are never split across processes
+PARALLEL_THRESHOLD = 200_000
+
+
+def sniff_set_format(config_text: str, final: bool = True) -> Optional[bool]:
+    """
+    Detect ``display set`` output from its first significant line.
+    With ``final=False`` the text is treated as a prefix of a longer stream,
+    and None is returned until a complete significant line has been seen.
+    """
+    pos = 0
+    length = len(config_text)
+    while pos < length:
+        end = config_text.find("\n", pos)
+        if end == -1:
+            if not final:
+                return None
+            end = length
+        line = config_text[pos:end].strip()
+        pos = end + 1
+        if not line or line.startswith("#") or PROMPT_RE.match(line):
+            continue
+        return line.startswith(SET_COMMANDS)
+    return None if not final else False
+
+
+def is_set_format(config_text: str) -> bool:
+    """Detect ``display set`` output from its first significant line"""
+    return bool(sniff_set_format(config_text))
+
+
+def split_set_line(line: str) -> List[str]:
+    """Split a set line into words, keeping quoted strings whole"""
+    if '"' not in line:
+        return line.split()
+    words = []
+    # Even-indexed pieces are outside quotes, odd-indexed pieces are quoted values
+    for index, piece in enumerate(line.split('"')):
+        if index % 2:
+            words.append(piece)
+        else:
+            words.extend(piece.split())
+    return words
+
+
+class SetAccumulator:
+    """
+    Per-entity state collected from set lines.
+    Plain dicts and lists only, so partial results from worker processes
+    pickle cheaply and merge in file order.
+    """
+
+    def __init__(self):
+        self.hostname: Optional[str] = None
+        self.group_hostname: Optional[str] = None
+        self.interfaces: Dict[str, dict] = {}
+        self.vlans: Dict[str, dict] = {}
+        # Keyed by (routing instance, destination); the instance is None for the global table
+        self.routes: Dict[Tuple[Optional[str], str], List[str]] = {}
+        self.inactive: set = set()
+
+    def add_lines(self, lines: Iterable[str]) -> None:
+        for line in lines:
+            if line.startswith(SET_COMMANDS):
+                self.add_words(split_set_line(line))
+
+    def add_words(self, words: List[str]) -> None:
+        if len(words) < 3:
+            return
+        if words[0] == "deactivate":
+            self.inactive.add(tuple(words[1:]))
+            return
+
+        stanza = words[1]
+        if stanza == "interfaces":
+            self._add_interface(words[2], words[3:])
+        elif stanza == "vlans":
+            self._add_vlan(words[2], words[3:])
+        elif stanza == "routing-options":
+            self._add_routing_options(words[2:])
+        elif stanza == "routing-instances" and len(words) > 4 and words[3] == "routing-options":
+            self._add_routing_options(words[4:], words[2])
+        elif stanza == "system" and words[2] == "host-name" and len(words) > 3:
+            self.hostname = words[3]
+        elif stanza == "groups" and len(words) > 5 and words[3:5] == ["system", "host-name"]:
+            self.group_hostname = self.group_hostname or words[5]
+
+    def _add_interface(self, name: str, rest: List[str]) -> None:
+        if name in NON_INTERFACE_KEYWORDS:
+            return
+        state = self.interfaces.get(name)
+        if state is None:
+            state = self.interfaces[name] = {
+                "description": None, "unit_description": None, "ip": None,
+                "vlan_members": [], "port_mode": None, "interface_mode": None, "disabled": False
+            }
+        if not rest:
+            return
+
+        if rest[0] == "description" and len(rest) > 1:
+            state["description"] = rest[1]
+        elif rest[0] == "disable":
+            state["disabled"] = True
+        elif rest[0] == "unit" and len(rest) > 2:
+            self._add_unit(state, rest[2:])
+
+    def _add_unit(self, state: dict, rest: List[str]) -> None:
+        head = rest[0]
+        if head == "description" and len(rest) > 1:
+            state["unit_description"] = state["unit_description"] or rest[1]
+        elif head == "disable":
+            state["disabled"] = True
+        elif head == "family" and len(rest) > 2:
+            family = rest[1]
+            attribute = rest[2]
+            if family == "inet" and attribute == "address" and len(rest) > 3:
+                state["ip"] = state["ip"] or rest[3]
+            elif family == "ethernet-switching":
+                if attribute == "vlan" and len(rest) > 4 and rest[3] == "members":
+                    state["vlan_members"].extend(word for word in rest[4:] if word not in ("[", "]"))
+                elif attribute == "port-mode" and len(rest) > 3:
+                    state["port_mode"] = state["port_mode"] or rest[3]
+                elif attribute == "interface-mode" and len(rest) > 3:
+                    state["interface_mode"] = state["interface_mode"] or rest[3]
+
+    def _add_vlan(self, name: str, rest: List[str]) -> None:
+        state = self.vlans.get(name)
+        if state is None:
+            state = self.vlans[name] = {"vlan_id": None, "description": None, "interfaces": []}
+        if len(rest) < 2:
+            return
+        if rest[0] == "vlan-id":
+            state["vlan_id"] = rest[1]
+        elif rest[0] == "description":
+            state["description"] = rest[1]
+        elif rest[0] == "interface":
+            member = rest[1].split(".")[0]
+            if member not in state["interfaces"]:
+                state["interfaces"].append(member)
+
+    def _add_routing_options(self, rest: List[str], instance: Optional[str] = None) -> None:
+        # ``static route ...`` or ``rib inet6.0 static route ...``
+        if rest and rest[0] == "rib":
+            rest = rest[2:]
+        if len(rest) > 3 and rest[0] == "static" and rest[1] == "route":
+            self.routes.setdefault((instance, rest[2]), []).extend(rest[3:])
+
+    def merge(self, other: "SetAccumulator") -> None:
+        """Fold in state from lines that followed this accumulator's lines"""
+        self.hostname = other.hostname or self.hostname
+        self.group_hostname = self.group_hostname or other.group_hostname
+        self.inactive |= other.inactive
+        for name, theirs in other.interfaces.items():
+            ours = self.interfaces.get(name)
+            if ours is None:
+                self.interfaces[name] = theirs
+                continue
+            ours["description"] = theirs["description"] or ours["description"]
+            for key in ("unit_description", "ip", "port_mode", "interface_mode"):
+                ours[key] = ours[key] or theirs[key]
+            ours["vlan_members"].extend(theirs["vlan_members"])
+            ours["disabled"] = ours["disabled"] or theirs["disabled"]
+        for name, theirs in other.vlans.items():
+            ours = self.vlans.get(name)
+            if ours is None:
+                self.vlans[name] = theirs
+                continue
+            ours["vlan_id"] = theirs["vlan_id"] or ours["vlan_id"]
+            ours["description"] = theirs["description"] or ours["description"]
+            ours["interfaces"].extend(i for i in theirs["interfaces"] if i not in ours["interfaces"])
+        for key, words in other.routes.items():
+            self.routes.setdefault(key, []).extend(words)
+
+
+def _scan_chunk(lines: List[str]) -> SetAccumulator:
+    """Worker entry point for chunked parallel parsing"""
+    accumulator = SetAccumulator()
+    accumulator.add_lines(lines)
+    return accumulator
+
+
+class SetConfigParser:
+    """
+    Parser for ``show configuration | display set`` output.
+    Each line is independent, so a line costs one ``split`` and a few
+    positional comparisons; no tree is built and nothing backtracks.
+    """
+
+    def __init__(self, workers: Optional[int] = None, parallel_threshold: int = PARALLEL_THRESHOLD):
+        self.workers = workers
+        self.parallel_threshold = parallel_threshold
+        self.tree_parser = JuniperParser()
+
+    def parse_config(self, config_text: str) -> Network:
+        """Parse set-format text and return a Network model"""
+        lines = config_text.splitlines()
+        workers = self.workers or 1
+        if workers > 1 and len(lines) >= self.parallel_threshold:
+            accumulator = self._scan_parallel(lines, workers)
+        else:
+            accumulator = _scan_chunk(lines)
+        return self.build(accumulator)
+
+    def _scan_parallel(self, lines: List[str], workers: int) -> SetAccumulator:
+        workers = min(workers, os.cpu_count() or 1)
+        chunk_size = -(-len(lines) // workers)
+        chunks = [lines[start:start + chunk_size] for start in range(0, len(lines), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            partials = list(executor.map(_scan_chunk, chunks))
+        accumulator = partials[0]
+        for partial in partials[1:]:
+            accumulator.merge(partial)
+        return accumulator
+
+    def build(self, accumulator: SetAccumulator) -> Network:
+        """Turn accumulated set-line state into the shared Network models"""
+        inactive = accumulator.inactive
+        interfaces = []
+        for name, state in accumulator.interfaces.items():
+            if ("interfaces", name) in inactive:
+                continue
+            interfaces.append(Interface(
+                name=name,
+                ip=state["ip"],
+                description=state["description"] or state["unit_description"],
+                status="disabled" if state["disabled"] else "enabled",
+                vlan_members=state["vlan_members"],
+                port_mode=state["port_mode"] or state["interface_mode"]
+            ))
+
+        vlans = []
+        for name, state in accumulator.vlans.items():
+            vlan_id = state["vlan_id"]
+            if ("vlans", name) in inactive or vlan_id is None or not vlan_id.isdigit():
+                continue
+            vlans.append(VLAN(
+                name=name,
+                vlan_id=int(vlan_id),
+                description=state["description"],
+                interfaces=list(state["interfaces"])
+            ))
+        self.tree_parser._assign_vlan_members(vlans, interfaces)
+
+        routes: List[Route] = []
+        # Global routes first, then each instance's, in the order the tree parser yields them
+        ordered = sorted(accumulator.routes.items(), key=lambda item: item[0][0] is not None)
+        for (instance, destination), words in ordered:
+            path = ("routing-options", "static", "route", destination)
+            if instance is not None:
+                if ("routing-instances", instance) in inactive:
+                    continue
+                path = ("routing-instances", instance, *path)
+            if path in inactive:
+                continue
+            route = self.tree_parser._route_from_node(Statement(["route", destination, *words]))
+            if route is not None:
+                routes.append(route)
+
+        device = Device(
+            hostname=accumulator.hostname or accumulator.group_hostname or "unknown",
+            interfaces=interfaces,
+            routing={"routes": routes, "vlans": vlans}
+        )
+        return Network(devices=[device], connections=[])
@@ -0,0 +1,262 @@
+import codecs
+from typing import Iterable, List, Optional
+
+from app.models.network import Network, Device, Interface
+from app.parsers.config_tree import Block, Statement, TreeBuilder
+from app.parsers.juniper_parser import JuniperParser, NON_INTERFACE_KEYWORDS
+from app.parsers.set_parser import SetAccumulator, SetConfigParser, is_set_format, sniff_set_format
+
+
+class ConfigTooLargeError(ValueError):
+    """Raised when streamed input exceeds the configured size limit"""
+
+
+class ConfigEventHandler:
+    """
+    Receives parse events from StreamingConfigParser.
+    ``block_close`` returns whether the finished block should stay attached to
+    its parent; returning False lets its subtree be freed immediately.
+    """
+
+    def block_open(self, block: Block, depth: int) -> None:
+        pass
+
+    def statement(self, node: Statement, depth: int) -> None:
+        pass
+
+    def block_close(self, block: Block, depth: int) -> bool:
+        return True
+
+
+class StreamingConfigParser(TreeBuilder):
+    """
+    Event-driven parser fed with text or UTF-8 bytes in arbitrary chunks.
+    Input is tokenized up to the last complete line of each chunk; the
+    remainder is carried over, so memory is bounded by the nesting depth
+    and whatever subtrees the handler chooses to retain.
+    """
+
+    def __init__(self, handler: ConfigEventHandler, max_bytes: Optional[int] = None):
+        super().__init__()
+        self.handler = handler
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+        self._pending = ""
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+
+    def on_statement(self, node: Statement, parent: Block) -> None:
+        self.handler.statement(node, len(self.stack))
+
+    def on_block_open(self, block: Block, parent: Block) -> None:
+        self.handler.block_open(block, len(self.stack))
+
+    def on_block_close(self, block: Block, parent: Block) -> None:
+        if not self.handler.block_close(block, len(self.stack)):
+            parent.children.pop()
+
+    def feed_bytes(self, chunk: bytes) -> None:
+        """Decode a chunk of UTF-8 bytes incrementally and feed it"""
+        self.bytes_read += len(chunk)
+        if self.max_bytes is not None and self.bytes_read > self.max_bytes:
+            raise ConfigTooLargeError(f"Configuration exceeds the {self.max_bytes} byte limit")
+        self.feed_text(self._decoder.decode(chunk))
+
+    def feed_text(self, text: str) -> None:
+        """Feed decoded text; only complete lines are tokenized"""
+        buffer = self._pending + text
+        cut = buffer.rfind("\n") + 1
+        # Quoted strings and /* */ annotations may span lines; wait for their end
+        if cut and not self._is_token_boundary(buffer, cut):
+            cut = 0
+        if cut:
+            self.feed(buffer, 0, cut)
+        self._pending = buffer[cut:]
+
+    def close(self) -> Block:
+        """Flush any buffered input and return the retained tree"""
+        tail = self._decoder.decode(b"", final=True)
+        buffer = self._pending + tail
+        self._pending = ""
+        if buffer:
+            self.feed(buffer)
+        return self.root
+
+    @staticmethod
+    def _is_token_boundary(buffer: str, cut: int) -> bool:
+        quotes = buffer.count('"', 0, cut) - buffer.count('\\"', 0, cut)
+        if quotes % 2:
+            return False
+        return buffer.count("/*", 0, cut) == buffer.count("*/", 0, cut)
+
+
+class NetworkBuilder(ConfigEventHandler):
+    """
+    Builds the Network model while a config streams in.
+    Each interface is converted to a model as soon as its block closes and
+    then dropped; only the small stanzas the extractors need at the end
+    (system, vlans, routing) are retained.
+    """
+
+    RETAINED_STANZAS = {"system", "groups", "vlans", "routing-options", "routing-instances"}
+
+    def __init__(self, parser: Optional[JuniperParser] = None):
+        self.parser = parser or JuniperParser()
+        self.interfaces: List[Interface] = []
+        self._in_interfaces = False
+
+    def block_open(self, block: Block, depth: int) -> None:
+        if depth == 1 and block.keyword == "interfaces" and not block.inactive:
+            self._in_interfaces = True
+
+    def block_close(self, block: Block, depth: int) -> bool:
+        if depth == 1:
+            if block.keyword == "interfaces":
+                self._in_interfaces = False
+                return False
+            return block.keyword in self.RETAINED_STANZAS
+        if depth == 2 and self._in_interfaces:
+            if not block.inactive and block.keyword not in NON_INTERFACE_KEYWORDS:
+                self.interfaces.append(self.parser._interface_from_block(block))
+            return False
+        return True
+
+    def build(self, tree: Block) -> Network:
+        """Assemble the Network from streamed interfaces and the retained stanzas"""
+        device = Device(
+            hostname=self.parser._hostname_from_tree(tree),
+            interfaces=self.interfaces,
+            routing={
+                "routes": self.parser._routes_from_tree(tree),
+                "vlans": self.parser._vlans_from_tree(tree, self.interfaces)
+            }
+        )
+        return Network(devices=[device], connections=[])
+
+
+class HostnameScanner(ConfigEventHandler):
+    """
+    Picks the host-name out of a streaming config and drops every block as
+    it closes. ``done`` turns true once the top-level system stanza has
+    closed with a host-name in it, since nothing later can change it.
+    """
+
+    def __init__(self):
+        self.hostname: Optional[str] = None
+        self.group_hostname: Optional[str] = None
+        self.done = False
+        # Keywords of the open blocks; None for an inactive one
+        self._path: List[Optional[str]] = []
+
+    def block_open(self, block: Block, depth: int) -> None:
+        self._path.append(None if block.inactive else block.keyword)
+
+    def statement(self, node: Statement, depth: int) -> None:
+        if node.keyword != "host-name" or node.inactive or None in self._path:
+            return
+        if self._path == ["system"]:
+            self.hostname = self.hostname or node.value
+        elif len(self._path) == 3 and self._path[0] == "groups" and self._path[2] == "system":
+            # Clustered devices keep the hostname in per-node groups
+            self.group_hostname = self.group_hostname or node.value
+
+    def block_close(self, block: Block, depth: int) -> bool:
+        self._path.pop()
+        if depth == 1 and block.keyword == "system" and self.hostname:
+            self.done = True
+        return False
+
+
+def scan_hostname(chunks: Iterable[bytes]) -> Optional[str]:
+    """
+    The host-name of a curly-brace config read from UTF-8 ``chunks``,
+    without building its tree or reading past the system stanza once the
+    name is known. None for ``display set`` output or a config without one.
+    """
+    scanner = HostnameScanner()
+    stream = StreamingConfigParser(scanner)
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    # Text is held back until the first significant line reveals the format
+    head: Optional[str] = ""
+    for chunk in chunks:
+        text = decoder.decode(chunk)
+        if head is not None:
+            head += text
+            is_set = sniff_set_format(head, final=False)
+            if is_set is None:
+                continue
+            if is_set:
+                return None
+            text, head = head, None
+        stream.feed_text(text)
+        if scanner.done:
+            return scanner.hostname
+    text = decoder.decode(b"", final=True)
+    if head is not None:
+        if is_set_format(head + text):
+            return None
+        text = head + text
+    stream.feed_text(text)
+    stream.close()
+    return scanner.hostname or scanner.group_hostname
+
+
+class StreamingNetworkParser:
+    """
+    Feed chunks, then ``close()`` to get the Network.
+    The format is sniffed from the first significant line: curly-brace
+    configs go through StreamingConfigParser, while ``display set`` output
+    is accumulated line by line by the set parser.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, parser: Optional[JuniperParser] = None):
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+        self.builder = NetworkBuilder(parser)
+        self.stream = StreamingConfigParser(self.builder)
+        self.set_lines: Optional[SetAccumulator] = None
+        self._format_known = False
+        self._pending = ""
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+
+    def feed_bytes(self, chunk: bytes) -> None:
+        """Decode a chunk of UTF-8 bytes incrementally and feed it"""
+        self.bytes_read += len(chunk)
+        if self.max_bytes is not None and self.bytes_read > self.max_bytes:
+            raise ConfigTooLargeError(f"Configuration exceeds the {self.max_bytes} byte limit")
+        self.feed_text(self._decoder.decode(chunk))
+
+    def feed_text(self, text: str) -> None:
+        if not self._format_known:
+            # Hold text back until the first significant line reveals the format
+            self._pending += text
+            is_set = sniff_set_format(self._pending, final=False)
+            if is_set is None:
+                return
+            self._select_format(is_set)
+            text, self._pending = self._pending, ""
+
+        if self.set_lines is None:
+            self.stream.feed_text(text)
+            return
+        buffer = self._pending + text
+        cut = buffer.rfind("\n") + 1
+        self.set_lines.add_lines(buffer[:cut].splitlines())
+        self._pending = buffer[cut:]
+
+    def close(self) -> Network:
+        self.feed_text(self._decoder.decode(b"", final=True))
+        if not self._format_known:
+            # No complete significant line arrived, so the held-back text is all there is
+            self._select_format(is_set_format(self._pending))
+            text, self._pending = self._pending, ""
+            self.feed_text(text)
+
+        if self.set_lines is not None:
+            self.set_lines.add_lines(self._pending.splitlines())
+            return SetConfigParser().build(self.set_lines)
+        return self.builder.build(self.stream.close())
+
+    def _select_format(self, is_set: bool) -> None:
+        self._format_known = True
+        if is_set:
+            self.set_lines = SetAccumulator()
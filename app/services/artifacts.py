@@ -0,0 +1,207 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional, Set, Tuple
+
+from app.services.compression import COMPRESSED_SUFFIXES
+
+# Files the store manages: renders named {type}_{digest}.{format}, their
+# pre-compressed copies ({name}.gz, .br, .zst) and temporary files of
+# interrupted renders. Anything else in the directory is left alone, including
+# the older per-upload {uuid}_{type}.{format} names that the sample diagrams
+# checked into the repository use.
+ARTIFACT_NAME_RE = re.compile(
+    r'^(?:[a-z]+_[0-9a-f]{32}\.[a-z]+(?:\.(?:gz|br|zst))?'
+    r'|\.[0-9a-f]{32}(?:\.[a-z]+){0,2})$'
+)
+
+
+def compressed_base(path: str) -> Optional[str]:
+    """The original a pre-compressed copy belongs to, or None if ``path`` is not one"""
+    for suffix in COMPRESSED_SUFFIXES:
+        if path.endswith(suffix):
+            return path[:-len(suffix)]
+    return None
+
+
+def _bundle_size(path: str) -> int:
+    # A file and its pre-compressed copies are tracked, evicted and deleted together
+    size = os.path.getsize(path)
+    for suffix in COMPRESSED_SUFFIXES:
+        try:
+            size += os.path.getsize(path + suffix)
+        except OSError:
+            pass
+    return size
+
+
+def _remove_bundle(path: str) -> bool:
+    removed = False
+    for candidate in (path, *(path + suffix for suffix in COMPRESSED_SUFFIXES)):
+        try:
+            os.remove(candidate)
+            removed = True
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+class ArtifactStore:
+    """
+    Size- and age-bounded index of the rendered diagram files in one directory.
+    Files are tracked in least-recently-used order of last access. Recording
+    a file or serving one evicts anything unused for longer than ``max_age``
+    seconds, then the least recently used files until the total fits in
+    ``max_bytes``. An evicted diagram is simply pending again and is
+    re-rendered on its next request. A file's pre-compressed copies count
+    towards its size and go with it. The index is rebuilt from the directory
+    at startup, using file modification times as the last access.
+    """
+
+    def __init__(self, directory: str, max_bytes: Optional[int] = None, max_age: Optional[float] = None):
+        self.directory = directory
+        self.max_bytes = max_bytes or None
+        self.max_age = max_age or None
+        # path -> (size, last access)
+        self._files: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.evicted_by_size = 0
+        self.evicted_by_age = 0
+        self.deleted = 0
+        self.orphans_removed = 0
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+
+    def _scan(self) -> None:
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if (entry.is_file() and not entry.name.startswith(".") and ARTIFACT_NAME_RE.match(entry.name)
+                        and compressed_base(entry.name) is None):
+                    try:
+                        entries.append((entry.stat().st_mtime, entry.path, _bundle_size(entry.path)))
+                    except OSError:
+                        continue
+        with self._lock:
+            for mtime, path, size in sorted(entries):
+                self._track(path, size, mtime)
+
+    def _track(self, path: str, size: int, accessed: float) -> None:
+        previous = self._files.pop(path, None)
+        if previous is not None:
+            self.total_bytes -= previous[0]
+        self._files[path] = (size, accessed)
+        self.total_bytes += size
+
+    def _forget(self, path: str) -> None:
+        size, _ = self._files.pop(path)
+        self.total_bytes -= size
+        _remove_bundle(path)
+
+    def record(self, paths: Iterable[str]) -> None:
+        """Track freshly rendered files, then evict to stay within the limits"""
+        paths = list(paths)
+        now = time.time()
+        with self._lock:
+            for path in paths:
+                try:
+                    size = _bundle_size(path)
+                except OSError:
+                    continue
+                self._track(path, size, now)
+            self._enforce(now, keep=set(paths))
+
+    def touch(self, path: str) -> None:
+        """Mark a file as just served"""
+        now = time.time()
+        with self._lock:
+            entry = self._files.get(path)
+            if entry is not None:
+                self._files[path] = (entry[0], now)
+                self._files.move_to_end(path)
+            elif os.path.exists(path):
+                # Rendered by another server process
+                self._track(path, _bundle_size(path), now)
+            self._enforce(now, keep={path})
+
+    def _enforce(self, now: float, keep: Set[str]) -> None:
+        # The least recently used files sit at the front, so both checks stop at the first survivor
+        if self.max_age is not None:
+            for path, (_, accessed) in list(self._files.items()):
+                if now - accessed <= self.max_age:
+                    break
+                if path not in keep:
+                    self._forget(path)
+                    self.evicted_by_age += 1
+        if self.max_bytes is not None:
+            for path in list(self._files):
+                if self.total_bytes <= self.max_bytes:
+                    break
+                if path not in keep:
+                    self._forget(path)
+                    self.evicted_by_size += 1
+
+    def remove(self, paths: Iterable[str]) -> int:
+        """Delete files outright, e.g. those only a deleted config referenced"""
+        removed = 0
+        with self._lock:
+            for path in paths:
+                if path in self._files:
+                    self._forget(path)
+                elif not _remove_bundle(path):
+                    # Possibly rendered by another server process, or already gone
+                    continue
+                removed += 1
+        self.deleted += removed
+        return removed
+
+    def sweep_orphans(self, referenced: Set[str], grace: float = 0.0) -> int:
+        """
+        Delete files that no stored config references, including temporary
+        files left by interrupted renders. Files modified within ``grace``
+        seconds are spared, since another server process may be writing them.
+        """
+        referenced = {os.path.normpath(path) for path in referenced}
+        cutoff = time.time() - grace
+        removed = 0
+        with os.scandir(self.directory) as it:
+            entries = [entry for entry in it if entry.is_file() and ARTIFACT_NAME_RE.match(entry.name)]
+        with self._lock:
+            for entry in entries:
+                owner = compressed_base(entry.path) or entry.path
+                if os.path.normpath(owner) in referenced:
+                    continue
+                try:
+                    if entry.stat().st_mtime > cutoff:
+                        continue
+                except FileNotFoundError:
+                    continue
+                if entry.path in self._files:
+                    self._forget(entry.path)
+                else:
+                    try:
+                        os.remove(entry.path)
+                    except FileNotFoundError:
+                        continue
+                removed += 1
+        self.orphans_removed += removed
+        return removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            oldest = next(iter(self._files.values()), None)
+        return {
+            "directory": self.directory,
+            "file_count": len(self._files),
+            "total_bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "max_age_seconds": self.max_age,
+            "oldest_access_age_seconds": round(time.time() - oldest[1], 1) if oldest else None,
+            "evicted_by_size": self.evicted_by_size,
+            "evicted_by_age": self.evicted_by_age,
+            "deleted": self.deleted,
+            "orphans_removed": self.orphans_removed
+        }
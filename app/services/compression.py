@@ -0,0 +1,168 @@
+import gzip
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # brotli and zstd encodings are optional
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Bodies smaller than this are not worth a compressed copy
+MIN_COMPRESS_BYTES = 1024
+# Rendered formats that get compressed siblings; PNG is compressed already
+PRECOMPRESSED_FORMATS = ("svg",)
+
+
+def _gzip(data: bytes) -> bytes:
+    # mtime=0 keeps the output, and so its ETag, stable across runs
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+# content-coding -> (file suffix, compressor), in server preference order. Everything is
+# compressed once, when the artifact is created, so the slowest settings are affordable.
+CODECS: "OrderedDict[str, Tuple[str, Callable[[bytes], bytes]]]" = OrderedDict()
+if brotli is not None:
+    CODECS["br"] = (".br", lambda data: brotli.compress(data, quality=11))
+if zstandard is not None:
+    CODECS["zstd"] = (".zst", zstandard.ZstdCompressor(level=19).compress)
+CODECS["gzip"] = (".gz", _gzip)
+
+COMPRESSED_SUFFIXES = (".gz", ".br", ".zst")
+
+
+def compress_all(data: bytes) -> Dict[str, bytes]:
+    """Every available encoding of ``data`` that is actually smaller than it"""
+    if len(data) < MIN_COMPRESS_BYTES:
+        return {}
+    encoded = {}
+    for encoding, (_, compress) in CODECS.items():
+        body = compress(data)
+        if len(body) < len(data):
+            encoded[encoding] = body
+    return encoded
+
+
+def precompress_file(path: str) -> List[str]:
+    """Write ``{path}{suffix}`` for each worthwhile encoding; returns the suffixes written"""
+    with open(path, "rb") as f:
+        data = f.read()
+    suffixes = []
+    for encoding, body in compress_all(data).items():
+        suffix = CODECS[encoding][0]
+        with open(path + suffix, "wb") as f:
+            f.write(body)
+        suffixes.append(suffix)
+    return suffixes
+
+
+def compressed_siblings(path: str) -> Dict[str, str]:
+    """encoding -> path of the pre-compressed copies of a file that exist on disk"""
+    return {
+        encoding: path + suffix for encoding, (suffix, _) in CODECS.items()
+        if os.path.exists(path + suffix)
+    }
+
+
+def negotiate(accept_encoding: Optional[str], available) -> Optional[str]:
+    """
+    Pick the content-coding to send from an ``Accept-Encoding`` header, or
+    None for the identity encoding. The client's q-values decide first and
+    server preference (``CODECS`` order) breaks ties.
+    """
+    if not accept_encoding or not available:
+        return None
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[coding.strip().lower()] = quality
+    best, best_quality = None, 0.0
+    for encoding in CODECS:
+        if encoding not in available:
+            continue
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressionStats:
+    """Responses and bytes sent per content-coding, against what identity would have sent"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._encodings: Dict[str, Dict[str, int]] = {}
+
+    def record(self, encoding: Optional[str], identity_bytes: int, sent_bytes: int) -> None:
+        with self._lock:
+            entry = self._encodings.setdefault(encoding or "identity",
+                                               {"responses": 0, "identity_bytes": 0, "sent_bytes": 0})
+            entry["responses"] += 1
+            entry["identity_bytes"] += identity_bytes
+            entry["sent_bytes"] += sent_bytes
+
+    def stats(self) -> dict:
+        with self._lock:
+            encodings = {name: dict(entry) for name, entry in self._encodings.items()}
+        identity = sum(entry["identity_bytes"] for entry in encodings.values())
+        sent = sum(entry["sent_bytes"] for entry in encodings.values())
+        return {
+            "available_encodings": list(CODECS),
+            "encodings": encodings,
+            "identity_bytes": identity,
+            "sent_bytes": sent,
+            "bytes_saved": identity - sent
+        }
+
+
+class CompressedBodies:
+    """
+    LRU of pre-compressed response bodies keyed by ETag, in front of the
+    encodings persisted with stored configs. A body is compressed once, when
+    it is first stored or served, and every later response in any encoding
+    is a lookup.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, etag: str) -> Optional[Dict[str, bytes]]:
+        with self._lock:
+            encoded = self._entries.get(etag)
+            if encoded is not None:
+                self._entries.move_to_end(etag)
+            return encoded
+
+    def put(self, etag: str, encoded: Dict[str, bytes]) -> None:
+        with self._lock:
+            self._entries[etag] = encoded
+            self._entries.move_to_end(etag)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compress(self, etag: str, body: bytes) -> Dict[str, bytes]:
+        encoded = self.get(etag)
+        if encoded is None:
+            encoded = compress_all(body)
+            self.put(etag, encoded)
+        return encoded
+        encoded = compress_all(body)
+        with self._lock:
+            self._entries[etag] = encoded
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return encoded
@@ -0,0 +1,111 @@
+import hashlib
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from functools import lru_cache
+from typing import Dict, Optional, Union
+
+from fastapi import Request
+from fastapi.responses import FileResponse, Response
+
+# Responses whose URL always names the same content: a stored config never changes
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+@lru_cache(maxsize=4096)
+def _file_digest(path: str, mtime_ns: int, size: int) -> str:
+    # Keyed on mtime and size too, so a re-rendered file is hashed again
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_etag(path: str, stat_result: Optional[os.stat_result] = None) -> str:
+    """Strong ETag from a file's content hash; each file version is read once"""
+    stat_result = stat_result or os.stat(path)
+    return f'"{_file_digest(path, stat_result.st_mtime_ns, stat_result.st_size)[:32]}"'
+
+
+def content_etag(content: Union[bytes, str]) -> str:
+    """Strong ETag from the content hash of a response body"""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+
+
+def encoded_etag(etag: str, encoding: Optional[str]) -> str:
+    """
+    The ETag of one content-coding of a representation; identity keeps the
+    plain tag. Each coding is its own representation with its own strong
+    ETag, ``"{digest}-{coding}"``
+    """
+    return etag if encoding is None else f'{etag[:-1]}-{encoding}"'
+
+
+def encoding_headers(encoding: Optional[str]) -> Dict[str, str]:
+    """Headers for a response negotiated on ``Accept-Encoding``"""
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return headers
+
+
+def not_modified(request: Request, etag: Optional[str], last_modified: Optional[float] = None) -> bool:
+    """
+    Whether the client's copy is current. ``If-None-Match`` wins when present
+    (compared weakly, as RFC 9110 requires for it); ``etag`` is that of the
+    encoding negotiated for this request, so only a copy in the same
+    encoding matches. Otherwise ``If-Modified-Since`` is checked against
+    ``last_modified``.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if etag is None:
+            return False
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        current = etag.removeprefix("W/")
+        return "*" in candidates or any(tag.removeprefix("W/") == current for tag in candidates)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+    # HTTP dates have one-second resolution
+    return int(last_modified) <= since
+
+
+def validator_headers(etag: str, last_modified: Optional[float] = None,
+                      cache_control: str = IMMUTABLE) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+    return headers
+
+
+def not_modified_response(etag: str, last_modified: Optional[float] = None,
+                          cache_control: str = IMMUTABLE, headers: Optional[Dict[str, str]] = None) -> Response:
+    return Response(status_code=304, headers={**validator_headers(etag, last_modified, cache_control), **(headers or {})})
+
+
+class CachedFileResponse(FileResponse):
+    """
+    FileResponse carrying a strong content ETag and ``Cache-Control``.
+    Range requests are served by FileResponse; ``If-Range`` is matched
+    against this response's own ETag rather than Starlette's stat-based one.
+    Extra ``headers``, such as a pre-compressed file's ``Content-Encoding``,
+    are added to the validators.
+    """
+
+    def __init__(self, path: str, stat_result: os.stat_result, etag: str, cache_control: str = IMMUTABLE,
+                 headers: Optional[Dict[str, str]] = None, **kwargs):
+        super().__init__(path, stat_result=stat_result,
+                         headers={**validator_headers(etag, stat_result.st_mtime, cache_control), **(headers or {})},
+                         **kwargs)
+        self.etag = etag
+
+    def _should_use_range(self, http_if_range: str, stat_result: os.stat_result) -> bool:
+        return http_if_range == self.etag or http_if_range == formatdate(stat_result.st_mtime, usegmt=True)
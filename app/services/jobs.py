@@ -0,0 +1,219 @@
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a job is submitted while the queue is at capacity"""
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancellation was requested"""
+
+
+class JobTimeout(Exception):
+    """Raised inside a job once its deadline has passed"""
+
+
+def _timestamp(value: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(value, timezone.utc).isoformat() if value is not None else None
+
+
+class Job:
+    """
+    A unit of background work.
+    The job function reports progress through ``stage``, which records the
+    time spent in each stage and is where cancellation and the timeout take
+    effect; a stage that is already running is never interrupted, so a job
+    can overrun its timeout by as long as its slowest stage takes.
+    ``on_finish`` is called with the job once it reaches any finished state,
+    including a cancellation before it started, and ``future`` resolves to
+    the job itself after that, whatever the outcome.
+    """
+
+    def __init__(self, kind: str, timeout: Optional[float] = None, metadata: Optional[dict] = None,
+                 on_finish: Optional[Callable[["Job"], None]] = None):
+        self.id = str(uuid.uuid4())
+        self.kind = kind
+        self.state = QUEUED
+        self.metadata = metadata or {}
+        self.timeout = timeout
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.current_stage: Optional[str] = None
+        self.stages: List[Dict[str, Any]] = []
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.exception: Optional[BaseException] = None
+        self.future: Future = Future()
+        self._cancel = threading.Event()
+        self._on_finish = on_finish
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def check(self) -> None:
+        """Raise if the job was cancelled or has run past its deadline"""
+        if self._cancel.is_set():
+            raise JobCancelled()
+        if self.timeout is not None and self.started_at is not None \
+                and time.time() - self.started_at > self.timeout:
+            raise JobTimeout(f"Job exceeded its {self.timeout:g}s timeout")
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a stage; cancellation and the timeout are checked before it starts"""
+        self.check()
+        self.current_stage = name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append({"name": name, "seconds": round(time.perf_counter() - start, 4)})
+            self.current_stage = None
+
+    def _finish(self, state: str, result: Any = None, exception: Optional[BaseException] = None) -> None:
+        self.state = state
+        self.result = result
+        self.exception = exception
+        if exception is not None and not isinstance(exception, JobCancelled):
+            self.error = str(exception) or type(exception).__name__
+        self.finished_at = time.time()
+        try:
+            if self._on_finish is not None:
+                self._on_finish(self)
+        finally:
+            self.future.set_result(self)
+
+    def to_dict(self) -> dict:
+        data = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "state": self.state,
+            "stage": self.current_stage,
+            "stages": list(self.stages),
+            "created_at": _timestamp(self.created_at),
+            "started_at": _timestamp(self.started_at),
+            "finished_at": _timestamp(self.finished_at),
+            **self.metadata
+        }
+        if self.started_at is not None:
+            data["elapsed_seconds"] = round((self.finished_at or time.time()) - self.started_at, 4)
+        if self.state == DONE:
+            data["result"] = self.result
+        if self.error:
+            data["error"] = self.error
+        return data
+
+
+class JobQueue:
+    """
+    Bounded queue drained by a fixed pool of worker threads.
+    Workers start on the first submission. Finished jobs are kept for
+    status queries, up to ``history`` of them, oldest dropped first.
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 64, timeout: Optional[float] = None,
+                 history: int = 1000):
+        self.workers = workers
+        self.timeout = timeout
+        self.history = history
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def submit(self, kind: str, fn: Callable[[Job], Any], metadata: Optional[dict] = None,
+               on_finish: Optional[Callable[[Job], None]] = None) -> Job:
+        """
+        Queue ``fn(job)``; raises QueueFullError when no slot is free.
+        ``on_finish(job)`` runs once the job is done, failed or cancelled,
+        so resources the job was handed can be released however it ends.
+        """
+        self._start()
+        job = Job(kind, timeout=self.timeout, metadata=metadata, on_finish=on_finish)
+        with self._lock:
+            try:
+                self._queue.put_nowait((job, fn))
+            except queue.Full:
+                raise QueueFullError("Job queue is full, try again later") from None
+            self._jobs[job.id] = job
+            self._trim()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Request cancellation; a queued job never starts, a running one stops at its next stage"""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        with self._lock:
+            if job.state == QUEUED:
+                job._finish(CANCELLED)
+            elif job.state == RUNNING:
+                job.cancel()
+        return job
+
+    def stats(self) -> dict:
+        states: Dict[str, int] = {}
+        for job in list(self._jobs.values()):
+            states[job.state] = states.get(job.state, 0) + 1
+        return {"workers": self.workers, "pending": self._queue.qsize(),
+                "max_pending": self._queue.maxsize, "states": states}
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"job-worker-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _trim(self) -> None:
+        excess = len(self._jobs) - self.history
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.state in FINISHED_STATES][:excess]:
+            del self._jobs[job_id]
+
+    def _work(self) -> None:
+        while True:
+            job, fn = self._queue.get()
+            try:
+                with self._lock:
+                    if job.state != QUEUED:
+                        # Cancelled while waiting in the queue
+                        continue
+                    job.state = RUNNING
+                    job.started_at = time.time()
+                try:
+                    result = fn(job)
+                except JobCancelled as e:
+                    job._finish(CANCELLED, exception=e)
+                except Exception as e:
+                    job._finish(FAILED, exception=e)
+                else:
+                    job._finish(DONE, result=result)
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,164 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from app.services.pagination import value_key
+
+TRUE_VALUES = ("1", "true", "yes")
+
+
+def _routing(device: dict) -> dict:
+    return device.get("routing") or {}
+
+
+# Rows are (hostname, entry) pairs that share the stored entries; a dict
+# with the ``device`` field added is only built for the rows of a page
+Row = Tuple[str, dict]
+Filter = Tuple[str, Callable[[object, str], bool]]
+
+
+def _interface_rows(network: dict) -> List[Row]:
+    return [(device["hostname"], interface) for device in network["devices"] for interface in device["interfaces"]]
+
+
+def _vlan_rows(network: dict) -> List[Row]:
+    return [(device["hostname"], vlan) for device in network["devices"] for vlan in _routing(device).get("vlans", [])]
+
+
+def _route_rows(network: dict) -> List[Row]:
+    return [(device["hostname"], route) for device in network["devices"] for route in _routing(device).get("routes", [])]
+
+
+def _field(row: Row, field: str):
+    return row[0] if field == "device" else row[1].get(field)
+
+
+def _equals(field: str) -> Filter:
+    return field, lambda value, wanted: str(value) == wanted
+
+
+def _starts_with(field: str) -> Filter:
+    return field, lambda value, wanted: (value or "").startswith(wanted)
+
+
+def _contains(field: str) -> Filter:
+    return field, lambda value, wanted: wanted in (value or [])
+
+
+class Resource(NamedTuple):
+    """A list inside a stored network that can be paged, filtered and sorted"""
+    rows: Callable[[dict], List[Row]]
+    sorts: Tuple[str, ...]
+    filters: Dict[str, Filter]
+
+
+RESOURCES: Dict[str, Resource] = {
+    "interfaces": Resource(_interface_rows, ("position", "name", "ip", "description", "status", "port_mode"), {
+        "device": _equals("device"),
+        "name": _starts_with("name"),
+        "status": _equals("status"),
+        "port_mode": _equals("port_mode"),
+        "vlan": _contains("vlan_members"),
+        "has_ip": ("ip", lambda value, wanted: bool(value) == (wanted.lower() in TRUE_VALUES)),
+        "description": ("description", lambda value, wanted: wanted.lower() in (value or "").lower())
+    }),
+    "vlans": Resource(_vlan_rows, ("position", "name", "vlan_id"), {
+        "device": _equals("device"),
+        "name": _starts_with("name"),
+        "vlan_id": _equals("vlan_id"),
+        "interface": _contains("interfaces")
+    }),
+    "routes": Resource(_route_rows, ("position", "destination", "next_hop", "protocol", "metric", "preference"), {
+        "device": _equals("device"),
+        "destination": _starts_with("destination"),
+        "next_hop": _equals("next_hop"),
+        "protocol": _equals("protocol")
+    })
+}
+
+
+class Listing(NamedTuple):
+    """Filtered rows of one resource, sorted ascending by their unique keys"""
+    keys: Sequence
+    items: List[Row]
+    last_modified: Optional[float]
+
+
+def page_items(rows: List[Row], fields: Optional[List[str]] = None) -> List[dict]:
+    """Response entries for a page of rows, with only ``fields`` when given"""
+    if fields is None:
+        return [{"device": hostname, **entry} for hostname, entry in rows]
+    return [{field: _field(row, field) for field in fields} for row in rows]
+
+
+def build_listing(resource: Resource, network: dict, sort: str, filters: Dict[str, str],
+                  last_modified: Optional[float] = None) -> Listing:
+    """
+    Filter and sort a resource's rows. Keys are the row's place in config
+    order, preceded by the sort value when sorting on a field, so they are
+    unique and a cursor can resume after any row.
+    """
+    checks = [(*resource.filters[name], value) for name, value in filters.items()]
+    rows = [row for row in resource.rows(network)
+            if all(matches(_field(row, field), value) for field, matches, value in checks)]
+    if sort == "position":
+        # Already in config order, so the keys are just the positions; a range allocates nothing per row
+        return Listing(range(len(rows)), rows, last_modified)
+    keyed = sorted(([*value_key(_field(row, sort)), position], row) for position, row in enumerate(rows))
+    return Listing([key for key, _ in keyed], [row for _, row in keyed], last_modified)
+
+
+def device_summaries(network: dict) -> List[dict]:
+    """Per-device counts for a config's detail view, without sending the model"""
+    return [{
+        "hostname": device["hostname"],
+        "interfaces": len(device["interfaces"]),
+        "interfaces_with_ip": sum(1 for interface in device["interfaces"] if interface.get("ip")),
+        "interfaces_with_vlans": sum(1 for interface in device["interfaces"] if interface.get("vlan_members")),
+        "vlans": len(_routing(device).get("vlans", [])),
+        "routes": len(_routing(device).get("routes", []))
+    } for device in network["devices"]]
+
+
+class ListingCache:
+    """
+    Sorted, filtered listings in an LRU keyed by config ID, resource, sort
+    and filters. A stored config never changes, so the first page builds
+    the listing and every later page is a bisect and a slice of it.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, Listing]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(config_id: str, resource: str, sort: str, filters: Dict[str, str]) -> tuple:
+        return (config_id, resource, sort, tuple(sorted(filters.items())))
+
+    def get(self, key: tuple) -> Optional[Listing]:
+        with self._lock:
+            listing = self._entries.get(key)
+            if listing is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return listing
+
+    def put(self, key: tuple, listing: Listing) -> None:
+        with self._lock:
+            self._entries[key] = listing
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, config_id: str) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == config_id]:
+                del self._entries[key]
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "max_entries": self.max_entries,
+                "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,60 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from app.models.network import network_from_dict
+from app.parsers.mermaid_generator import MermaidGenerator
+from app.services.render_cache import SingleFlight
+
+
+class MermaidCache:
+    """
+    Mermaid source for every diagram type of a config, generated together on
+    first request and kept in an LRU keyed by config ID. Generation is cheap
+    next to a Graphviz render, and a stored config never changes, so entries
+    only leave on eviction or when the config is deleted.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, config_id: str) -> Optional[Dict[str, str]]:
+        with self._lock:
+            sources = self._entries.get(config_id)
+            if sources is not None:
+                self._entries.move_to_end(config_id)
+                self.hits += 1
+            return sources
+
+    def get_or_generate(self, config_id: str, network: dict) -> Dict[str, str]:
+        """Return the cached sources, generating them once however many callers are waiting"""
+        sources = self.get(config_id)
+        if sources is not None:
+            return sources
+
+        def generate() -> Dict[str, str]:
+            sources = self.get(config_id)
+            if sources is not None:
+                return sources
+            sources = MermaidGenerator().generate_all_diagrams(network_from_dict(network))
+            with self._lock:
+                self.misses += 1
+                self._entries[config_id] = sources
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return sources
+
+        return self._flight.do(config_id, generate)
+
+    def discard(self, config_id: str) -> None:
+        with self._lock:
+            self._entries.pop(config_id, None)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "max_entries": self.max_entries,
+                "hits": self.hits, "misses": self.misses, "coalesced": self._flight.coalesced}
@@ -0,0 +1,91 @@
+import base64
+import json
+import re
+from bisect import bisect_left, bisect_right
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+DIGITS_RE = re.compile(r'(\d+)')
+
+
+def natural_key(text: str) -> list:
+    """Sort key that orders digit runs by value: ge-0/0/2 before ge-0/0/10"""
+    parts = DIGITS_RE.split(text)
+    parts[1::2] = [int(part) for part in parts[1::2]]
+    return parts
+
+
+def value_key(value) -> list:
+    """Sort key for a field value; missing values sort last"""
+    if value is None:
+        return [1, ""]
+    if isinstance(value, str):
+        return [0, natural_key(value)]
+    if isinstance(value, list):
+        return [0, [natural_key(str(item)) for item in value]]
+    return [0, value]
+
+
+def encode_cursor(sort: str, key: Any) -> str:
+    """Opaque cursor naming the sort order and the key of the last item returned"""
+    payload = json.dumps([sort, key], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def _is_key_part(value) -> bool:
+    if isinstance(value, list):
+        return all(_is_key_part(item) for item in value)
+    return value is None or (isinstance(value, (str, int, float)) and not isinstance(value, bool))
+
+
+def decode_cursor(cursor: str, sort: str) -> Any:
+    """
+    Key of the last item seen; raises ValueError for a malformed cursor or
+    one from another sort order. Keys are a position or a list of strings,
+    numbers, nulls and nested lists, as the listings build them
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        cursor_sort, key = payload
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor") from None
+    if cursor_sort != sort:
+        raise ValueError("Cursor belongs to a different sort order")
+    if isinstance(key, bool) or not isinstance(key, (int, list)) or not _is_key_part(key):
+        raise ValueError("Invalid cursor")
+    return key
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Comma-separated ``fields`` parameter; None keeps every field"""
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(",") if field.strip()]
+
+
+def project(items: Iterable[dict], fields: Optional[List[str]]) -> List[dict]:
+    if fields is None:
+        return list(items)
+    return [{field: item.get(field) for field in fields} for item in items]
+
+
+def paginate(keys: Sequence, items: List[Any], after: Any, limit: int,
+             descending: bool = False) -> Tuple[List[Any], Any]:
+    """
+    One page of ``items``, which are sorted ascending by their unique
+    ``keys``, starting after the item keyed ``after``. Descending pages
+    walk the same list backwards, so one sorted list serves both orders.
+    Returns the page and the key to resume from, or None on the last page.
+    """
+    try:
+        if descending:
+            end = len(keys) if after is None else bisect_left(keys, after)
+        else:
+            start = 0 if after is None else bisect_right(keys, after)
+    except TypeError:
+        # A cursor key whose values do not compare with this listing's
+        raise ValueError("Invalid cursor") from None
+    if descending:
+        start = max(end - limit, 0)
+        return items[start:end][::-1], (keys[start] if start > 0 else None)
+    end = start + limit
+    return items[start:end], (keys[end - 1] if end < len(keys) else None)
@@ -0,0 +1,205 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from app.models.compact import CompactNetwork
+from app.models.network import Network
+
+# Lines that change between captures of an unchanged config: the commit header,
+# ``user@host> show configuration`` prompts and ``{master:0}`` markers
+VOLATILE_LINE_RE = re.compile(rb'^(?:## Last (?:commit|changed):|[\w.-]+@[\w.-]+[>#%]|\{[\w:.-]+\}$)')
+
+
+class ConfigHasher:
+    """
+    Incremental hash of normalized config bytes.
+    Commit headers, CLI prompts, trailing whitespace and blank lines are left
+    out, so two captures of the same configuration share one digest.
+    """
+
+    def __init__(self):
+        self._hash = hashlib.sha256()
+        self._pending = b""
+        self.bytes_read = 0
+
+    def update(self, chunk: bytes) -> None:
+        self.bytes_read += len(chunk)
+        buffer = self._pending + chunk
+        cut = buffer.rfind(b"\n") + 1
+        self._add_lines(buffer[:cut])
+        self._pending = buffer[cut:]
+
+    def _add_lines(self, data: bytes) -> None:
+        for line in data.splitlines():
+            line = line.rstrip()
+            if line and not VOLATILE_LINE_RE.match(line.lstrip()):
+                self._hash.update(line)
+                self._hash.update(b"\n")
+
+    def hexdigest(self) -> str:
+        if self._pending:
+            self._add_lines(self._pending)
+            self._pending = b""
+        return self._hash.hexdigest()
+
+
+def config_digest(data: bytes) -> str:
+    """Normalized content digest of a whole config"""
+    hasher = ConfigHasher()
+    hasher.update(data)
+    return hasher.hexdigest()
+
+
+class ParseCache:
+    """
+    Digest -> (CompactNetwork, config_id) cache with an LRU memory tier and
+    an optional directory of JSON files behind it. ``config_id`` records the
+    upload whose diagrams were rendered from this parse, so a repeated upload
+    can reuse them while that upload is still stored. Networks are held in
+    their columnar form; callers build models with ``to_network`` only when
+    they need them.
+
+    The directory is bounded too: once its files pass ``max_disk_bytes`` the
+    least recently used are deleted. Its index is rebuilt at startup, using
+    file modification times as the last use.
+    """
+
+    def __init__(self, max_entries: int = 256, cache_dir: Optional[str] = None,
+                 max_disk_bytes: Optional[int] = None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes or None
+        self._entries: "OrderedDict[str, Tuple[CompactNetwork, Optional[str]]]" = OrderedDict()
+        # digest -> file size, least recently used first
+        self._files: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.disk_bytes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_evictions = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._scan()
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def _scan(self) -> None:
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(".json"):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, entry.name[:-len(".json")], stat.st_size))
+        with self._lock:
+            for _, digest, size in sorted(entries):
+                self._track(digest, size)
+            self._enforce(keep=None)
+
+    def get(self, digest: str) -> Optional[Tuple[CompactNetwork, Optional[str]]]:
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                self._entries.move_to_end(digest)
+                self.memory_hits += 1
+                return entry
+
+        entry = self._load(digest)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(digest, entry)
+            self._touch(digest)
+        return entry
+
+    def put(self, digest: str, network: Network, config_id: Optional[str] = None) -> None:
+        entry = (CompactNetwork.from_network(network), config_id)
+        with self._lock:
+            self._remember(digest, entry)
+        if self.cache_dir:
+            tmp_path = self._path(digest) + ".tmp"
+            with open(tmp_path, "w") as f:
+                f.write(json.dumps({"config_id": config_id, "network": network.model_dump(mode="json")}))
+            os.replace(tmp_path, self._path(digest))
+            with self._lock:
+                self._touch(digest)
+
+    def discard(self, digest: Optional[str]) -> None:
+        """Drop a digest from both tiers, e.g. once the config it points at is deleted"""
+        if not digest:
+            return
+        with self._lock:
+            self._entries.pop(digest, None)
+            if self.cache_dir:
+                self._forget(digest)
+
+    def _remember(self, digest: str, entry: Tuple[CompactNetwork, Optional[str]]) -> None:
+        self._entries[digest] = entry
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _track(self, digest: str, size: int) -> None:
+        self.disk_bytes += size - self._files.pop(digest, 0)
+        self._files[digest] = size
+
+    def _touch(self, digest: str) -> None:
+        # Also picks up files written by another server process
+        try:
+            os.utime(self._path(digest))
+            self._track(digest, os.path.getsize(self._path(digest)))
+        except OSError:
+            return
+        self._enforce(keep=digest)
+
+    def _forget(self, digest: str) -> None:
+        self.disk_bytes -= self._files.pop(digest, 0)
+        try:
+            os.remove(self._path(digest))
+        except FileNotFoundError:
+            pass
+
+    def _enforce(self, keep: Optional[str]) -> None:
+        if self.max_disk_bytes is None:
+            return
+        for digest in list(self._files):
+            if self.disk_bytes <= self.max_disk_bytes:
+                break
+            if digest != keep:
+                self._forget(digest)
+                self.disk_evictions += 1
+
+    def _load(self, digest: str) -> Optional[Tuple[CompactNetwork, Optional[str]]]:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._path(digest)) as f:
+                data = json.load(f)
+            return CompactNetwork.from_dict(data["network"]), data.get("config_id")
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "disk_files": len(self._files),
+            "disk_bytes": self.disk_bytes,
+            "max_disk_bytes": self.max_disk_bytes,
+            "disk_evictions": self.disk_evictions,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else 0.0
+        }
@@ -0,0 +1,80 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, List
+
+
+def stable_digest(data) -> str:
+    """sha256 of a canonical JSON encoding, stable across processes and runs"""
+    encoded = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one execution.
+    The first caller runs the function; callers arriving while it runs wait
+    for and share its result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], object]):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class RenderCache:
+    """
+    Content-addressed render outputs.
+    A render is identified by the paths it produces, which callers derive
+    from a digest of the model data the diagram draws plus its type and
+    format. Existing files are reused; missing ones are rendered once even
+    when several requests ask for them at the same time.
+    """
+
+    def __init__(self):
+        self.flight = SingleFlight()
+        self.hits = 0
+        self.renders = 0
+
+    def get_or_render(self, key: str, paths: List[str], render: Callable[[], None]) -> List[str]:
+        if all(os.path.exists(path) for path in paths):
+            self.hits += 1
+            return paths
+
+        def run():
+            # Re-check inside the flight: a render that just finished may have produced the files
+            if not all(os.path.exists(path) for path in paths):
+                render()
+                self.renders += 1
+            return paths
+
+        return self.flight.do(key, run)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "renders": self.renders, "coalesced": self.flight.coalesced}
@@ -0,0 +1,34 @@
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Optional
+
+
+class RenderPool:
+    """
+    Process pool shared by every in-flight upload.
+    ``max_workers`` caps how many diagrams render (or, for the batch pool,
+    archive members parse) at once across the whole server, however many
+    uploads are waiting on them. Workers are spawned
+    rather than forked, since the server process runs threads, and the
+    pool is only created on first use.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable, *args) -> Future:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+        return self._executor.submit(fn, *args)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
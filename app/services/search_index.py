@@ -0,0 +1,196 @@
+import ipaddress
+import re
+from typing import List, NamedTuple, Optional, Set, Tuple
+
+FIELDS = ("hostname", "interface", "description", "vlan", "port_mode", "ip")
+TEXT_MATCHES = ("exact", "prefix")
+IP_MATCHES = ("exact", "within", "contains")
+
+# Descriptions are indexed by word: "AP-3rd-floor" -> ap, 3rd, floor
+WORD_RE = re.compile(r'[a-z0-9]+')
+
+# Addresses are stored as 16-byte big-endian blobs, which sort like the integers they encode
+ADDRESS_BYTES = 16
+
+
+class TextEntry(NamedTuple):
+    field: str
+    term: str
+    hostname: str
+    interface: Optional[str]
+    value: str
+
+
+class IPEntry(NamedTuple):
+    """
+    An address or prefix in a config. ``address``..``top`` is the span it
+    occupies (one address for an interface or next-hop, the whole prefix
+    for a route) and ``network``/``prefixlen`` the network that contains it.
+    """
+    kind: str
+    hostname: str
+    interface: Optional[str]
+    value: str
+    version: int
+    address: bytes
+    top: bytes
+    network: bytes
+    prefixlen: int
+
+
+def tokenize(text: str) -> List[str]:
+    return WORD_RE.findall(text.lower())
+
+
+def pack(address: int) -> bytes:
+    return address.to_bytes(ADDRESS_BYTES, "big")
+
+
+def _interface_ip(text: str):
+    try:
+        return ipaddress.ip_interface(text)
+    except ValueError:
+        return None
+
+
+def text_entries(network: dict) -> Set[TextEntry]:
+    """Every searchable term of a stored network"""
+    entries: Set[TextEntry] = set()
+    for device in network["devices"]:
+        hostname = device["hostname"]
+        entries.add(TextEntry("hostname", hostname.lower(), hostname, None, hostname))
+        for interface in device["interfaces"]:
+            name = interface["name"]
+            entries.add(TextEntry("interface", name.lower(), hostname, name, name))
+            description = interface.get("description")
+            if description:
+                for word in set(tokenize(description)):
+                    entries.add(TextEntry("description", word, hostname, name, description))
+            if interface.get("port_mode"):
+                entries.add(TextEntry("port_mode", interface["port_mode"].lower(), hostname, name,
+                                      interface["port_mode"]))
+        vlans = (device.get("routing") or {}).get("vlans", [])
+        defined = set()
+        for vlan in vlans:
+            terms = (vlan["name"].lower(), str(vlan["vlan_id"]))
+            defined.update(terms)
+            for interface_name in [None, *(vlan.get("interfaces") or [])]:
+                for term in terms:
+                    entries.add(TextEntry("vlan", term, hostname, interface_name, vlan["name"]))
+        # Members naming a VLAN the config never defines are indexed as written
+        for interface in device["interfaces"]:
+            for member in interface.get("vlan_members") or []:
+                if member.lower() not in defined:
+                    entries.add(TextEntry("vlan", member.lower(), hostname, interface["name"], member))
+    return entries
+
+
+def ip_entries(network: dict) -> List[IPEntry]:
+    """Interface addresses, route destinations and next-hops of a stored network"""
+    entries = []
+    for device in network["devices"]:
+        hostname = device["hostname"]
+        for interface in device["interfaces"]:
+            ip = _interface_ip(interface.get("ip") or "")
+            if ip is not None:
+                entries.append(IPEntry("interface", hostname, interface["name"], interface["ip"], ip.version,
+                                       pack(int(ip.ip)), pack(int(ip.ip)), pack(int(ip.network.network_address)),
+                                       ip.network.prefixlen))
+        for route in (device.get("routing") or {}).get("routes", []):
+            destination = _interface_ip(route["destination"])
+            if destination is not None:
+                network_ = destination.network
+                entries.append(IPEntry("route", hostname, None, route["destination"], network_.version,
+                                       pack(int(network_.network_address)), pack(int(network_.broadcast_address)),
+                                       pack(int(network_.network_address)), network_.prefixlen))
+            next_hop = _interface_ip(route["next_hop"])
+            if next_hop is not None:
+                address = pack(int(next_hop.ip))
+                entries.append(IPEntry("next_hop", hostname, None, route["next_hop"], next_hop.version,
+                                       address, address, address, next_hop.ip.max_prefixlen))
+    return entries
+
+
+class SearchQuery:
+    """
+    A validated ``/search`` query. Text fields match a term exactly or by
+    prefix, case-insensitively; a description matches when it contains
+    every word of the query (the last one as a prefix in prefix mode). The
+    ``ip`` field takes an address or CIDR: ``exact`` finds that address or
+    prefix, ``within`` everything inside it and ``contains`` every subnet
+    and route covering it. Invalid queries raise ValueError.
+    """
+
+    def __init__(self, field: str, text: str, match: str = "exact"):
+        if field not in FIELDS:
+            raise ValueError(f"field must be one of: {', '.join(FIELDS)}")
+        allowed = IP_MATCHES if field == "ip" else TEXT_MATCHES
+        if match not in allowed:
+            raise ValueError(f"match for {field} must be one of: {', '.join(allowed)}")
+        text = text.strip()
+        if not text:
+            raise ValueError("query must not be empty")
+        self.field = field
+        self.text = text
+        self.match = match
+        self.prefix = match == "prefix"
+        if field == "ip":
+            try:
+                self.network = ipaddress.ip_network(text, strict=False)
+            except ValueError:
+                raise ValueError(f"'{text}' is not an IP address or CIDR prefix") from None
+            self.is_address = "/" not in text
+            self.low = pack(int(self.network.network_address))
+            self.high = pack(int(self.network.broadcast_address))
+            self._covering = None
+        elif field == "description":
+            self.words = tokenize(text)
+            if not self.words:
+                raise ValueError("query has no searchable words")
+        else:
+            self.term = text.lower()
+
+    def covering_networks(self) -> List[Tuple[bytes, int]]:
+        """Every (network, prefix length) that contains the queried network, for ``contains``"""
+        if self._covering is None:
+            self._covering = [
+                (pack(int(self.network.supernet(new_prefix=length).network_address)), length)
+                for length in range(self.network.prefixlen + 1)
+            ]
+        return self._covering
+
+    def exact_words(self) -> List[str]:
+        """Description words that must occur as written; in prefix mode the last one need only start a word"""
+        return self.words[:-1] if self.prefix else self.words
+
+    def matches_description(self, description: str) -> bool:
+        words = set(tokenize(description))
+        if not all(word in words for word in self.exact_words()):
+            return False
+        return not self.prefix or any(word.startswith(self.words[-1]) for word in words)
+
+    def matches_text(self, entry: TextEntry) -> bool:
+        if entry.field != self.field:
+            return False
+        if self.field == "description":
+            return self.matches_description(entry.value)
+        return entry.term.startswith(self.term) if self.prefix else entry.term == self.term
+
+    def matches_ip(self, entry: IPEntry) -> bool:
+        if entry.version != self.network.version:
+            return False
+        if self.match == "within":
+            return self.low <= entry.address and entry.top <= self.high
+        if self.match == "contains":
+            return (entry.network, entry.prefixlen) in self.covering_networks()
+        if self.is_address:
+            return entry.address == self.low and entry.kind != "route"
+        return entry.network == self.low and entry.prefixlen == self.network.prefixlen
+
+
+def text_result(field: str, config_id: str, hostname: str, interface: Optional[str], value: str) -> dict:
+    return {"config_id": config_id, "field": field, "hostname": hostname, "interface": interface, "value": value}
+
+
+def ip_result(config_id: str, kind: str, hostname: str, interface: Optional[str], value: str) -> dict:
+    return {**text_result("ip", config_id, hostname, interface, value), "kind": kind}
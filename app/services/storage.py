@@ -0,0 +1,611 @@
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.models.compact import CompactNetwork
+from app.services.pagination import paginate
+from app.services.serialization import dumps
+from app.services.search_index import (
+    IPEntry, SearchQuery, TextEntry, ip_entries, ip_result, text_entries, text_result
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS configs (
+    config_id TEXT PRIMARY KEY,
+    filename TEXT NOT NULL,
+    digest TEXT,
+    config_path TEXT,
+    uploaded_at REAL NOT NULL,
+    device_count INTEGER NOT NULL,
+    interface_count INTEGER NOT NULL,
+    diagrams TEXT NOT NULL,
+    network BLOB NOT NULL,
+    parent_id TEXT,
+    parse_etag TEXT
+);
+CREATE INDEX IF NOT EXISTS configs_filename ON configs (filename);
+CREATE INDEX IF NOT EXISTS configs_uploaded_at ON configs (uploaded_at);
+CREATE TABLE IF NOT EXISTS config_hosts (
+    config_id TEXT NOT NULL REFERENCES configs (config_id) ON DELETE CASCADE,
+    hostname TEXT NOT NULL,
+    PRIMARY KEY (config_id, hostname)
+);
+CREATE INDEX IF NOT EXISTS config_hosts_hostname ON config_hosts (hostname);
+CREATE TABLE IF NOT EXISTS config_artifacts (
+    config_id TEXT NOT NULL REFERENCES configs (config_id) ON DELETE CASCADE,
+    path TEXT NOT NULL,
+    PRIMARY KEY (config_id, path)
+);
+CREATE INDEX IF NOT EXISTS config_artifacts_path ON config_artifacts (path);
+CREATE TABLE IF NOT EXISTS encoded_bodies (
+    config_id TEXT NOT NULL REFERENCES configs (config_id) ON DELETE CASCADE,
+    etag TEXT NOT NULL,
+    encoding TEXT NOT NULL,
+    body BLOB NOT NULL,
+    PRIMARY KEY (config_id, etag, encoding)
+);
+CREATE INDEX IF NOT EXISTS encoded_bodies_etag ON encoded_bodies (etag);
+CREATE TABLE IF NOT EXISTS search_terms (
+    config_id TEXT NOT NULL REFERENCES configs (config_id) ON DELETE CASCADE,
+    field TEXT NOT NULL,
+    term TEXT NOT NULL,
+    hostname TEXT NOT NULL,
+    interface TEXT,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS search_terms_term ON search_terms (field, term, config_id, hostname, interface);
+CREATE INDEX IF NOT EXISTS search_terms_config ON search_terms (config_id);
+CREATE TABLE IF NOT EXISTS search_addresses (
+    config_id TEXT NOT NULL REFERENCES configs (config_id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    hostname TEXT NOT NULL,
+    interface TEXT,
+    value TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    address BLOB NOT NULL,
+    top BLOB NOT NULL,
+    network BLOB NOT NULL,
+    prefixlen INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS search_addresses_address ON search_addresses (version, address);
+CREATE INDEX IF NOT EXISTS search_addresses_network ON search_addresses (version, network, prefixlen);
+CREATE INDEX IF NOT EXISTS search_addresses_config ON search_addresses (config_id);
+"""
+
+# Columns ``list_page`` can sort by; each ties on config_id, so the pair is a unique cursor key
+LIST_SORTS = ("uploaded_at", "filename", "device_count", "interface_count")
+
+# Bumped when the search tables need rebuilding from the stored networks
+SEARCH_INDEX_VERSION = 1
+
+# Postings counted per word when choosing which description word to look up
+RARITY_CAP = 1000
+
+
+def _timestamp(value: float) -> str:
+    return datetime.fromtimestamp(value, timezone.utc).isoformat()
+
+
+def _summary(config_id: str, record: dict) -> dict:
+    """Listing entry for a record held with a CompactNetwork"""
+    return {
+        "config_id": config_id,
+        "filename": record["filename"],
+        "timestamp": record["timestamp"],
+        "device_count": len(record["network"].devices),
+        "interface_count": record["network"].interface_count,
+        "parent_id": record.get("parent_id")
+    }
+
+
+def _term_condition(alias: str, prefix: bool) -> str:
+    # A prefix is a range over the (field, term) index
+    return f"{alias}.term >= ? AND {alias}.term < ?" if prefix else f"{alias}.term = ?"
+
+
+def _term_params(term: str, prefix: bool) -> tuple:
+    # U+10FFFF sorts after every continuation of the prefix
+    return (term, term + "\U0010ffff") if prefix else (term,)
+
+
+def _check_sort(sort: str) -> None:
+    # Sort names are interpolated into SQL, so only known columns get through
+    if sort not in LIST_SORTS:
+        raise ValueError(f"sort must be one of: {', '.join(LIST_SORTS)}")
+
+
+def _check_after(after: Optional[list]) -> None:
+    # A listing key is [value, config_id]; the value is one column, never a list
+    if after is not None and not (isinstance(after, list) and len(after) == 2 and isinstance(after[1], str)
+                                  and not isinstance(after[0], (list, bool))):
+        raise ValueError("Invalid cursor")
+
+
+def diagram_paths(diagrams: dict) -> List[str]:
+    """Every file path named in a record's ``diagrams`` mapping"""
+    return [path for paths in diagrams.values() for path in paths.values()]
+
+
+def encode_network(network: dict, network_json: Optional[bytes] = None) -> bytes:
+    """
+    Compact blob form of a network dict: minified JSON, zlib-compressed.
+    Pass ``network_json`` when the JSON bytes were already produced.
+    """
+    return zlib.compress(network_json if network_json is not None else dumps(network))
+
+
+def network_json(blob: bytes) -> bytes:
+    """A blob's JSON bytes, ready to send without decoding them"""
+    return zlib.decompress(blob)
+
+
+def decode_network(blob: bytes) -> dict:
+    return json.loads(network_json(blob))
+
+
+class ConfigStore(ABC):
+    """
+    Storage for uploaded configurations.
+    A record is a dict with ``filename``, ``config_path``, ``digest``,
+    ``network`` (the network as a dict), ``diagrams`` and, for a new
+    revision of a device, the ``parent_id`` of the previous one. The store stamps
+    ``uploaded_at`` when it is missing and returns records with an ISO-8601
+    ``timestamp`` alongside it. A record may also carry ``network_json``,
+    the network already serialized, which is stored instead of encoding the
+    dict again, the ``parse_etag`` of its ``/parse`` body, and
+    ``encoded_bodies``, compressed response bodies as ``{etag: {encoding:
+    bytes}}``, which are kept beside the record rather than in it and
+    removed with it.
+    """
+
+    @abstractmethod
+    def put(self, config_id: str, record: dict) -> None:
+        """Insert or replace a record"""
+
+    @abstractmethod
+    def get(self, config_id: str) -> Optional[dict]:
+        """Return the record, or None"""
+
+    @abstractmethod
+    def get_serialized(self, config_id: str) -> Optional[dict]:
+        """The record with its network as ``network_json`` bytes in place of the dict, or None"""
+
+    @abstractmethod
+    def delete(self, config_id: str) -> Optional[dict]:
+        """Remove a record and return it, or None if it was not stored"""
+
+    @abstractmethod
+    def put_encoded(self, config_id: str, etag: str, encoded: Dict[str, bytes]) -> None:
+        """Keep compressed encodings of a response body derived from a stored config; ignored once it is deleted"""
+
+    @abstractmethod
+    def get_encoded(self, etag: str) -> Dict[str, bytes]:
+        """Stored encodings of the body with this ETag, empty when none were kept"""
+
+    @abstractmethod
+    def list_page(self, filename: Optional[str] = None, hostname: Optional[str] = None, sort: str = "uploaded_at",
+                  descending: bool = False, after: Optional[list] = None,
+                  limit: Optional[int] = None) -> Tuple[List[dict], Optional[list]]:
+        """
+        Summaries of stored configs ordered by ``sort`` (one of LIST_SORTS)
+        then config ID, optionally filtered, starting after the
+        ``[value, config_id]`` key ``after``. Returns at most ``limit``
+        summaries and the key to pass as ``after`` for the next page, or
+        None when there are no more. Raises ValueError for a key of any
+        other shape.
+        """
+
+    def list(self, filename: Optional[str] = None, hostname: Optional[str] = None) -> List[dict]:
+        """Summaries of stored configs, oldest upload first, optionally filtered"""
+        return self.list_page(filename=filename, hostname=hostname)[0]
+
+    @abstractmethod
+    def artifact_paths(self) -> Set[str]:
+        """Every diagram file referenced by a stored config"""
+
+    @abstractmethod
+    def referenced_artifacts(self, paths: Iterable[str]) -> Set[str]:
+        """The subset of ``paths`` still referenced by some stored config"""
+
+    @abstractmethod
+    def search(self, query: SearchQuery, limit: int) -> List[dict]:
+        """Up to ``limit`` hostnames, interfaces, VLANs or addresses across every stored config matching ``query``"""
+
+    def __contains__(self, config_id: str) -> bool:
+        return self.get(config_id) is not None
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryConfigStore(ConfigStore):
+    """
+    Records held in this process; lost on restart and not shared between
+    workers. Networks are kept as CompactNetworks and turned back into
+    dicts by ``get``.
+    """
+
+    def __init__(self):
+        self._records: "OrderedDict[str, dict]" = OrderedDict()
+        self._entries: Dict[str, Tuple[List[TextEntry], List[IPEntry]]] = {}
+        # Serialized networks, compressed as in the SQLite store
+        self._blobs: Dict[str, bytes] = {}
+        self._encoded: Dict[str, Dict[str, Dict[str, bytes]]] = {}
+        self._lock = threading.Lock()
+
+    def put(self, config_id: str, record: dict) -> None:
+        uploaded_at = record.get("uploaded_at") or time.time()
+        record = {**record, "uploaded_at": uploaded_at, "timestamp": _timestamp(uploaded_at)}
+        entries = (list(text_entries(record["network"])), ip_entries(record["network"]))
+        blob = encode_network(record["network"], record.pop("network_json", None))
+        encoded = dict(record.pop("encoded_bodies", None) or {})
+        record["network"] = CompactNetwork.from_dict(record["network"])
+        with self._lock:
+            self._records.pop(config_id, None)
+            self._records[config_id] = record
+            self._entries[config_id] = entries
+            self._blobs[config_id] = blob
+            self._encoded[config_id] = encoded
+
+    def put_encoded(self, config_id: str, etag: str, encoded: Dict[str, bytes]) -> None:
+        with self._lock:
+            if config_id in self._encoded:
+                self._encoded[config_id][etag] = encoded
+
+    def get_encoded(self, etag: str) -> Dict[str, bytes]:
+        with self._lock:
+            for bodies in self._encoded.values():
+                if etag in bodies:
+                    return bodies[etag]
+        return {}
+
+    @staticmethod
+    def _materialize(record: Optional[dict]) -> Optional[dict]:
+        return None if record is None else {**record, "network": record["network"].to_dict()}
+
+    def get(self, config_id: str) -> Optional[dict]:
+        return self._materialize(self._records.get(config_id))
+
+    def get_serialized(self, config_id: str) -> Optional[dict]:
+        with self._lock:
+            record, blob = self._records.get(config_id), self._blobs.get(config_id)
+        if record is None:
+            return None
+        record = {key: value for key, value in record.items() if key != "network"}
+        return {**record, "network_json": network_json(blob)}
+
+    def __contains__(self, config_id: str) -> bool:
+        return config_id in self._records
+
+    def delete(self, config_id: str) -> Optional[dict]:
+        with self._lock:
+            self._entries.pop(config_id, None)
+            self._blobs.pop(config_id, None)
+            self._encoded.pop(config_id, None)
+            return self._materialize(self._records.pop(config_id, None))
+
+    def list_page(self, filename: Optional[str] = None, hostname: Optional[str] = None, sort: str = "uploaded_at",
+                  descending: bool = False, after: Optional[list] = None,
+                  limit: Optional[int] = None) -> Tuple[List[dict], Optional[list]]:
+        _check_sort(sort)
+        _check_after(after)
+        with self._lock:
+            records = list(self._records.items())
+        keyed = []
+        for config_id, record in records:
+            if filename is not None and record["filename"] != filename:
+                continue
+            if hostname is not None and hostname not in record["network"].hostnames():
+                continue
+            summary = _summary(config_id, record)
+            value = record["uploaded_at"] if sort == "uploaded_at" else summary[sort]
+            keyed.append(([value, config_id], summary))
+        keyed.sort(key=lambda pair: pair[0])
+        return paginate([key for key, _ in keyed], [summary for _, summary in keyed], after,
+                        len(keyed) if limit is None else limit, descending)
+
+    def artifact_paths(self) -> Set[str]:
+        with self._lock:
+            records = list(self._records.values())
+        return {path for record in records for path in diagram_paths(record["diagrams"])}
+
+    def referenced_artifacts(self, paths: Iterable[str]) -> Set[str]:
+        return self.artifact_paths() & set(paths)
+
+    def search(self, query: SearchQuery, limit: int) -> List[dict]:
+        # A scan of the extracted entries; the SQLite store answers from indexes
+        with self._lock:
+            indexed = list(self._entries.items())
+        results = []
+        seen = set()
+        for config_id, (texts, ips) in indexed:
+            if query.field == "ip":
+                matches = [ip_result(config_id, entry.kind, entry.hostname, entry.interface, entry.value)
+                           for entry in ips if query.matches_ip(entry)]
+            else:
+                matches = [text_result(entry.field, config_id, entry.hostname, entry.interface, entry.value)
+                           for entry in texts if query.matches_text(entry)]
+            for match in matches:
+                key = (config_id, match["hostname"], match["interface"], match["value"], match.get("kind"))
+                if key not in seen:
+                    seen.add(key)
+                    results.append(match)
+                    if len(results) >= limit:
+                        return results
+        return results
+
+
+class SQLiteConfigStore(ConfigStore):
+    """
+    Records in an SQLite database, shared by every server process.
+    The database runs in WAL mode so readers never wait on the writer.
+    Networks are kept as compressed JSON blobs that are only decoded on
+    ``get``; listings come from indexed summary columns and a hostname
+    table, so they never touch the blobs. Each thread gets its own
+    connection.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(SCHEMA)
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(configs)")}
+        if "parent_id" not in columns:
+            # Databases created before revision chains
+            connection.execute("ALTER TABLE configs ADD COLUMN parent_id TEXT")
+        if "parse_etag" not in columns:
+            # Databases created before /parse bodies were serialized at ingest
+            connection.execute("ALTER TABLE configs ADD COLUMN parse_etag TEXT")
+        if connection.execute("PRAGMA user_version").fetchone()[0] < SEARCH_INDEX_VERSION:
+            self._rebuild_search_index(connection)
+
+    def _rebuild_search_index(self, connection: sqlite3.Connection) -> None:
+        """Index every stored network; databases created before the search index start out unindexed"""
+        with connection:
+            connection.execute("DELETE FROM search_terms")
+            connection.execute("DELETE FROM search_addresses")
+            for config_id, network in connection.execute("SELECT config_id, network FROM configs").fetchall():
+                self._index_network(connection, config_id, decode_network(network))
+            connection.execute(f"PRAGMA user_version = {SEARCH_INDEX_VERSION}")
+
+    @staticmethod
+    def _index_network(connection: sqlite3.Connection, config_id: str, network: dict) -> None:
+        connection.executemany(
+            "INSERT INTO search_terms (config_id, field, term, hostname, interface, value) VALUES (?, ?, ?, ?, ?, ?)",
+            [(config_id, *entry) for entry in text_entries(network)]
+        )
+        connection.executemany(
+            "INSERT INTO search_addresses (config_id, kind, hostname, interface, value, version, address, top,"
+            " network, prefixlen) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(config_id, *entry) for entry in ip_entries(network)]
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA foreign_keys=ON")
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def put(self, config_id: str, record: dict) -> None:
+        network = record["network"]
+        devices = network["devices"]
+        uploaded_at = record.get("uploaded_at") or time.time()
+        with self._connection() as connection:
+            connection.execute("DELETE FROM configs WHERE config_id = ?", (config_id,))
+            connection.execute(
+                "INSERT INTO configs (config_id, filename, digest, config_path, uploaded_at, device_count,"
+                " interface_count, diagrams, network, parent_id, parse_etag) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (config_id, record["filename"], record.get("digest"), record.get("config_path"), uploaded_at,
+                 len(devices), sum(len(device["interfaces"]) for device in devices), json.dumps(record["diagrams"]),
+                 encode_network(network, record.get("network_json")), record.get("parent_id"),
+                 record.get("parse_etag"))
+            )
+            connection.executemany(
+                "INSERT OR IGNORE INTO config_hosts (config_id, hostname) VALUES (?, ?)",
+                [(config_id, device["hostname"]) for device in devices]
+            )
+            connection.executemany(
+                "INSERT OR IGNORE INTO config_artifacts (config_id, path) VALUES (?, ?)",
+                [(config_id, path) for path in diagram_paths(record["diagrams"])]
+            )
+            self._index_network(connection, config_id, network)
+            for etag, encoded in (record.get("encoded_bodies") or {}).items():
+                self._insert_encoded(connection, config_id, etag, encoded)
+
+    @staticmethod
+    def _insert_encoded(connection: sqlite3.Connection, config_id: str, etag: str,
+                        encoded: Dict[str, bytes]) -> None:
+        connection.executemany(
+            "INSERT OR REPLACE INTO encoded_bodies (config_id, etag, encoding, body)"
+            " SELECT ?, ?, ?, ? WHERE EXISTS (SELECT 1 FROM configs WHERE config_id = ?)",
+            [(config_id, etag, encoding, body, config_id) for encoding, body in encoded.items()]
+        )
+
+    def put_encoded(self, config_id: str, etag: str, encoded: Dict[str, bytes]) -> None:
+        with self._connection() as connection:
+            self._insert_encoded(connection, config_id, etag, encoded)
+
+    def get_encoded(self, etag: str) -> Dict[str, bytes]:
+        rows = self._connection().execute(
+            "SELECT encoding, body FROM encoded_bodies WHERE etag = ?", (etag,)
+        ).fetchall()
+        return {encoding: body for encoding, body in rows}
+
+    def _get(self, config_id: str) -> Optional[Tuple[dict, bytes]]:
+        row = self._connection().execute(
+            "SELECT filename, digest, config_path, uploaded_at, diagrams, network, parent_id, parse_etag"
+            " FROM configs WHERE config_id = ?",
+            (config_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        filename, digest, config_path, uploaded_at, diagrams, network, parent_id, parse_etag = row
+        return {
+            "filename": filename,
+            "digest": digest,
+            "config_path": config_path,
+            "uploaded_at": uploaded_at,
+            "timestamp": _timestamp(uploaded_at),
+            "diagrams": json.loads(diagrams),
+            "parent_id": parent_id,
+            "parse_etag": parse_etag
+        }, network
+
+    def get(self, config_id: str) -> Optional[dict]:
+        found = self._get(config_id)
+        if found is None:
+            return None
+        record, blob = found
+        return {**record, "network": decode_network(blob)}
+
+    def get_serialized(self, config_id: str) -> Optional[dict]:
+        found = self._get(config_id)
+        if found is None:
+            return None
+        record, blob = found
+        return {**record, "network_json": network_json(blob)}
+
+    def __contains__(self, config_id: str) -> bool:
+        return self._connection().execute(
+            "SELECT 1 FROM configs WHERE config_id = ?", (config_id,)
+        ).fetchone() is not None
+
+    def delete(self, config_id: str) -> Optional[dict]:
+        record = self.get(config_id)
+        if record is not None:
+            with self._connection() as connection:
+                connection.execute("DELETE FROM configs WHERE config_id = ?", (config_id,))
+        return record
+
+    def list_page(self, filename: Optional[str] = None, hostname: Optional[str] = None, sort: str = "uploaded_at",
+                  descending: bool = False, after: Optional[list] = None,
+                  limit: Optional[int] = None) -> Tuple[List[dict], Optional[list]]:
+        _check_sort(sort)
+        _check_after(after)
+        query = f"SELECT config_id, filename, uploaded_at, device_count, interface_count, parent_id, {sort} FROM configs"
+        clauses = []
+        params: list = []
+        if filename is not None:
+            clauses.append("filename = ?")
+            params.append(filename)
+        if hostname is not None:
+            clauses.append("config_id IN (SELECT config_id FROM config_hosts WHERE hostname = ?)")
+            params.append(hostname)
+        if after is not None:
+            # Keyset pagination: resume after the last row seen instead of counting past an offset
+            clauses.append(f"({sort}, config_id) {'<' if descending else '>'} (?, ?)")
+            params.extend(after)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        direction = "DESC" if descending else "ASC"
+        query += f" ORDER BY {sort} {direction}, config_id {direction}"
+        if limit is not None:
+            # One extra row tells whether there is another page
+            query += " LIMIT ?"
+            params.append(limit + 1)
+        rows = self._connection().execute(query, params).fetchall()
+        next_key = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_key = [rows[-1][-1], rows[-1][0]]
+        return [
+            {"config_id": config_id, "filename": name, "timestamp": _timestamp(uploaded_at), "device_count": devices,
+             "interface_count": interfaces, "parent_id": parent_id}
+            for config_id, name, uploaded_at, devices, interfaces, parent_id, _ in rows
+        ], next_key
+
+    def artifact_paths(self) -> Set[str]:
+        return {path for (path,) in self._connection().execute("SELECT DISTINCT path FROM config_artifacts")}
+
+    def referenced_artifacts(self, paths: Iterable[str]) -> Set[str]:
+        connection = self._connection()
+        return {
+            path for path in set(paths)
+            if connection.execute("SELECT 1 FROM config_artifacts WHERE path = ? LIMIT 1", (path,)).fetchone()
+        }
+
+    def search(self, query: SearchQuery, limit: int) -> List[dict]:
+        connection = self._connection()
+        if query.field == "ip":
+            return self._search_addresses(connection, query, limit)
+        if query.field != "description":
+            terms = [(query.term, query.prefix)]
+        else:
+            # Start from the rarest word; the rest are probes of the index for the same interface
+            words = query.exact_words()
+            terms = [(word, False) for word in self._by_rarity(connection, words)]
+            if query.prefix:
+                terms.append((query.words[-1], True))
+        (term, prefix), others = terms[0], terms[1:]
+        sql = ("SELECT DISTINCT s.config_id, s.hostname, s.interface, s.value FROM search_terms s"
+               f" WHERE s.field = ? AND {_term_condition('s', prefix)}")
+        params = [query.field, *_term_params(term, prefix)]
+        for term, prefix in others:
+            sql += (" AND EXISTS (SELECT 1 FROM search_terms w WHERE w.field = s.field AND w.config_id = s.config_id"
+                    f" AND w.hostname = s.hostname AND w.interface = s.interface AND {_term_condition('w', prefix)})")
+            params.extend(_term_params(term, prefix))
+        rows = connection.execute(sql + " LIMIT ?", (*params, limit))
+        return [text_result(query.field, *row) for row in rows]
+
+    @staticmethod
+    def _by_rarity(connection: sqlite3.Connection, words: List[str]) -> List[str]:
+        """Distinct description words, fewest postings first, counting each only up to a cap"""
+        counts = {
+            word: connection.execute(
+                "SELECT COUNT(*) FROM (SELECT 1 FROM search_terms WHERE field = 'description' AND term = ? LIMIT ?)",
+                (word, RARITY_CAP)
+            ).fetchone()[0]
+            for word in set(words)
+        }
+        return sorted(counts, key=lambda word: (counts[word], -len(word)))
+
+    @staticmethod
+    def _search_addresses(connection: sqlite3.Connection, query: SearchQuery, limit: int) -> List[dict]:
+        version = query.network.version
+        sql = "SELECT DISTINCT config_id, kind, hostname, interface, value FROM search_addresses WHERE version = ? AND "
+        if query.match == "within":
+            rows = connection.execute(sql + "address BETWEEN ? AND ? AND top <= ? LIMIT ?",
+                                      (version, query.low, query.high, query.high, limit))
+        elif query.match == "contains":
+            # Only the networks on the path from the default route down can contain the query; each
+            # OR term is one probe of the (version, network, prefixlen) index
+            networks = query.covering_networks()
+            probes = " OR ".join("(version = ? AND network = ? AND prefixlen = ?)" for _ in networks)
+            rows = connection.execute(
+                "SELECT DISTINCT config_id, kind, hostname, interface, value FROM search_addresses"
+                f" WHERE {probes} LIMIT ?",
+                (*[value for network, length in networks for value in (version, network, length)], limit)
+            )
+        elif query.is_address:
+            rows = connection.execute(sql + "address = ? AND kind != 'route' LIMIT ?", (version, query.low, limit))
+        else:
+            rows = connection.execute(sql + "network = ? AND prefixlen = ? LIMIT ?",
+                                      (version, query.low, query.network.prefixlen, limit))
+        return [ip_result(*row) for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections = []
+        self._local = threading.local()
+
+
+def open_store(path: Optional[str]) -> ConfigStore:
+    """SQLite store at ``path``, or an in-memory store when no path is given"""
+    return SQLiteConfigStore(path) if path else MemoryConfigStore()
@@ -0,0 +1,79 @@
+"""Runtime settings, overridable through environment variables"""
+import os
+
+# Raw uploaded configs are spooled here so they never sit in memory whole
+UPLOAD_DIR = os.environ.get("MELTER_UPLOAD_DIR", "uploaded_configs")
+
+# Largest accepted upload, in bytes
+MAX_UPLOAD_BYTES = int(os.environ.get("MELTER_MAX_UPLOAD_BYTES", 64 * 1024 * 1024))
+
+# Largest total uncompressed size read from one batch archive, in bytes
+MAX_ARCHIVE_BYTES = int(os.environ.get("MELTER_MAX_ARCHIVE_BYTES", 1024 * 1024 * 1024))
+
+# Size of each read from the upload stream, in bytes
+UPLOAD_CHUNK_SIZE = int(os.environ.get("MELTER_UPLOAD_CHUNK_SIZE", 64 * 1024))
+
+# Most destinations accepted by one route lookup request
+MAX_LOOKUP_DESTINATIONS = int(os.environ.get("MELTER_MAX_LOOKUP_DESTINATIONS", 100_000))
+
+# Configs whose compiled route tables are kept in memory for lookups
+ROUTE_TABLE_CACHE_ENTRIES = int(os.environ.get("MELTER_ROUTE_TABLE_CACHE_ENTRIES", 64))
+
+# Most results returned by one /search request
+MAX_SEARCH_RESULTS = int(os.environ.get("MELTER_MAX_SEARCH_RESULTS", 1000))
+
+# Rows per page of /configs and config sub-resources, unless ?limit= says otherwise, and the most allowed
+PAGE_SIZE = int(os.environ.get("MELTER_PAGE_SIZE", 100))
+MAX_PAGE_SIZE = int(os.environ.get("MELTER_MAX_PAGE_SIZE", 1000))
+
+# Sorted, filtered sub-resource listings kept for paging through
+LISTING_CACHE_ENTRIES = int(os.environ.get("MELTER_LISTING_CACHE_ENTRIES", 64))
+
+# Parsed networks are cached by normalized content hash; set the directory
+# to an empty string to keep only the in-memory tier. The directory's least
+# recently used files are deleted once it holds more than PARSE_CACHE_MAX_BYTES
+# (0 disables the limit)
+PARSE_CACHE_DIR = os.environ.get("MELTER_PARSE_CACHE_DIR", "parse_cache")
+PARSE_CACHE_ENTRIES = int(os.environ.get("MELTER_PARSE_CACHE_ENTRIES", 256))
+PARSE_CACHE_MAX_BYTES = int(os.environ.get("MELTER_PARSE_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+# "lazy" stores only the parsed model at upload and renders each diagram on
+# first request; "eager" renders every diagram before the upload returns
+RENDER_MODE = os.environ.get("MELTER_RENDER_MODE", "lazy")
+
+# Background jobs: worker threads, queue capacity, and how long one job
+# (parse plus any rendering) or one dot run may take, in seconds. The job
+# timeout is checked between stages, so a running parse or render is never
+# cut short; RENDER_TIMEOUT is what bounds a single dot run
+JOB_WORKERS = int(os.environ.get("MELTER_JOB_WORKERS", 4))
+JOB_QUEUE_SIZE = int(os.environ.get("MELTER_JOB_QUEUE_SIZE", 64))
+JOB_TIMEOUT = float(os.environ.get("MELTER_JOB_TIMEOUT", 300))
+RENDER_TIMEOUT = float(os.environ.get("MELTER_RENDER_TIMEOUT", 120))
+
+# Diagrams render in a process pool shared by every upload; this caps how many
+# render at once across the server. 0 means one per available core, 1 renders
+# in the server process one after another
+RENDER_CONCURRENCY = int(os.environ.get("MELTER_RENDER_CONCURRENCY", 0))
+
+# Uploaded configs are stored in this SQLite database, shared by every server
+# process; set it to an empty string to keep them in memory instead
+STORAGE_PATH = os.environ.get("MELTER_STORAGE_PATH", "melter.db")
+
+# Rendered diagrams are written to this directory
+DIAGRAM_DIR = os.environ.get("MELTER_DIAGRAM_DIR", "generated_diagrams")
+
+# Rendered diagrams are evicted least recently used first once their total
+# size passes this many bytes, and once unused for this many seconds; 0
+# disables either limit. Evicted diagrams are re-rendered on request
+ARTIFACT_MAX_BYTES = int(os.environ.get("MELTER_ARTIFACT_MAX_BYTES", 1024 * 1024 * 1024))
+ARTIFACT_MAX_AGE = float(os.environ.get("MELTER_ARTIFACT_MAX_AGE", 7 * 24 * 3600))
+
+# Interface and VLAN diagrams with at least this many nodes are drawn by the
+# built-in grid renderer instead of Graphviz; a negative value disables it
+GRID_RENDER_THRESHOLD = int(os.environ.get("MELTER_GRID_RENDER_THRESHOLD", 200))
+
+# Configs whose generated Mermaid source is kept in memory
+MERMAID_CACHE_ENTRIES = int(os.environ.get("MELTER_MERMAID_CACHE_ENTRIES", 256))
+
+# JSON and Mermaid response bodies whose compressed encodings are kept in memory
+COMPRESSED_BODY_ENTRIES = int(os.environ.get("MELTER_COMPRESSED_BODY_ENTRIES", 256))
@@ -3,8 +3,16 @@
 // Global variables
 let currentConfigId = null;
 let currentDiagramTypes = [];
-let currentDiagramFormat = 'png'; // 'png' or 'svg'
+let currentDiagramFormat = 'png'; // 'png', 'svg' or 'mermaid' (rendered in the browser)
+const MERMAID_SCRIPT_URL = 'https://cdn.jsdelivr.net/npm/mermaid@10/dist/mermaid.min.js';
+let mermaidReady = null;
 let loadingModal = null;
+const CONFIG_PAGE_SIZE = 50;
+const INTERFACE_PAGE_SIZE = 200;
+const VLAN_SUMMARY_LIMIT = 20;
+let configsNextCursor = null;
+let interfaceTable = null;
+let interfaceFilterTimer = null;
 
 // Simple modal implementation
 class SimpleModal {
@@ -45,6 +53,96 @@ class SimpleModal {
     }
 }
 
+// Windowed table over a paged endpoint: pages are fetched by cursor as the
+// user scrolls, and only the rows in view (plus a few either side) are in the
+// DOM, so the first rows show as fast for 10,000 interfaces as for 10
+class VirtualTable {
+    constructor(viewport, renderRow, rowHeight = 28, overscan = 10) {
+        this.viewport = viewport;
+        this.renderRow = renderRow;
+        this.rowHeight = rowHeight;
+        this.overscan = overscan;
+        this.generation = 0;
+        this.frame = null;
+        this.spacer = document.createElement('div');
+        this.content = document.createElement('div');
+        this.content.className = 'virtual-table-rows';
+        viewport.replaceChildren(this.spacer, this.content);
+        viewport.addEventListener('scroll', () => this.scheduleRender());
+        this.reset(null);
+    }
+    
+    // Start over from the first page of url (without a cursor); null empties the table
+    reset(url) {
+        this.url = url;
+        this.rows = [];
+        this.total = 0;
+        this.nextCursor = null;
+        this.loading = false;
+        this.generation += 1;
+        this.viewport.scrollTop = 0;
+        this.render();
+        return url ? this.fetchPage() : Promise.resolve();
+    }
+    
+    async fetchPage() {
+        if (this.loading) {
+            return;
+        }
+        this.loading = true;
+        const generation = this.generation;
+        const separator = this.url.includes('?') ? '&' : '?';
+        const url = this.nextCursor ? `${this.url}${separator}cursor=${encodeURIComponent(this.nextCursor)}` : this.url;
+        try {
+            const response = await fetch(url);
+            if (!response.ok) {
+                throw new Error(`Failed to load ${url}`);
+            }
+            const page = await response.json();
+            if (generation !== this.generation) {
+                return; // The table was reset while this page was in flight
+            }
+            this.rows.push(...page.items);
+            this.total = page.total;
+            this.nextCursor = page.next_cursor;
+        } finally {
+            if (generation === this.generation) {
+                this.loading = false;
+            }
+        }
+        this.render();
+    }
+    
+    scheduleRender() {
+        if (this.frame === null) {
+            this.frame = requestAnimationFrame(() => {
+                this.frame = null;
+                this.render();
+            });
+        }
+    }
+    
+    render() {
+        const height = this.viewport.clientHeight;
+        const first = Math.max(0, Math.floor(this.viewport.scrollTop / this.rowHeight) - this.overscan);
+        const last = Math.min(this.total, Math.ceil((this.viewport.scrollTop + height) / this.rowHeight) + this.overscan);
+        this.spacer.style.height = `${this.total * this.rowHeight}px`;
+        this.content.style.transform = `translateY(${first * this.rowHeight}px)`;
+        this.content.innerHTML = this.rows.slice(first, last).map(this.renderRow).join('');
+        
+        // Rows in view that are not loaded yet: fetch the next page, which renders again
+        if (last > this.rows.length && this.nextCursor && !this.loading) {
+            this.fetchPage().catch(error => console.error('Error loading rows:', error));
+        }
+    }
+}
+
+function escapeHtml(text) {
+    return String(text ?? '').replace(/[&<>"']/g, ch => ({
+        '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+    })[ch]);
+}
+
 // Copy to clipboard functionality
 async function copyToClipboard(text) {
     try {
@@ -145,6 +243,36 @@ function setupEventListeners() {
         });
     });
     console.log('Format selection listeners added');
+    
+    // Configuration list: one delegated handler, so appended pages need no wiring
+    const configList = document.getElementById('configList');
+    if (configList) {
+        configList.addEventListener('click', function(e) {
+            const item = e.target.closest('.config-list-item');
+            // Don't trigger if clicking delete button
+            if (!item || e.target.classList.contains('delete-config-btn')) {
+                return;
+            }
+            loadConfiguration(item.dataset.configId);
+        });
+    }
+    const loadMoreConfigs = document.getElementById('loadMoreConfigs');
+    if (loadMoreConfigs) {
+        loadMoreConfigs.addEventListener('click', () => loadConfigurations(true));
+    }
+    
+    // Interface table: filtering and sorting happen on the server
+    const interfaceFilter = document.getElementById('interfaceFilter');
+    if (interfaceFilter) {
+        interfaceFilter.addEventListener('input', function() {
+            clearTimeout(interfaceFilterTimer);
+            interfaceFilterTimer = setTimeout(() => loadInterfaceTable(currentConfigId), 250);
+        });
+    }
+    const interfaceSort = document.getElementById('interfaceSort');
+    if (interfaceSort) {
+        interfaceSort.addEventListener('change', () => loadInterfaceTable(currentConfigId));
+    }
 }
 
 async function handleFileUpload(e) {
@@ -187,17 +315,7 @@ async function handleFileUpload(e) {
         formData.append('file', file);
         
         console.log('Uploading file to server...');
-        const response = await fetch('/upload', {
-            method: 'POST',
-            body: formData
-        });
-        
-        if (!response.ok) {
-            const errorData = await response.json();
-            throw new Error(errorData.detail || 'Upload failed');
-        }
-        
-        const result = await response.json();
+        const result = await uploadAndWait(formData);
         console.log('Upload successful:', result);
         
         // Store the config ID and diagram types
@@ -205,7 +323,7 @@ async function handleFileUpload(e) {
         currentDiagramTypes = result.diagram_types || [];
         
         // Show success message
-        showAlert(`Configuration uploaded successfully! Generated ${result.diagram_types?.length || 0} diagram types.`, 'success');
+        showAlert(`Configuration uploaded successfully! ${result.diagram_types?.length || 0} diagram types available.`, 'success');
         
         // Load configuration details
         await loadConfigurationDetails(currentConfigId);
@@ -244,24 +362,101 @@ async function handleFileUpload(e) {
     }
 }
 
+// Upload in the background and poll the job until parsing finishes
+async function uploadAndWait(formData) {
+    const response = await fetch('/upload?background=true', {
+        method: 'POST',
+        body: formData
+    });
+    
+    if (!response.ok) {
+        const errorData = await response.json();
+        throw new Error(errorData.detail || 'Upload failed');
+    }
+    
+    const upload = await response.json();
+    // An unchanged re-upload is answered straight from the cache, without a job
+    return upload.job_id ? waitForJob(upload.job_id) : upload;
+}
+
+async function waitForJob(jobId, intervalMs = 500) {
+    while (true) {
+        const response = await fetch(`/jobs/${jobId}`);
+        if (!response.ok) {
+            throw new Error('Lost track of the upload job');
+        }
+        
+        const job = await response.json();
+        if (job.state === 'done') {
+            console.log('Job stages:', job.stages);
+            return job.result;
+        }
+        if (job.state === 'failed' || job.state === 'cancelled') {
+            throw new Error(job.error || `Upload ${job.state}`);
+        }
+        
+        console.log(`Job ${jobId}: ${job.state}${job.stage ? ` (${job.stage})` : ''}`);
+        await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+}
+
 async function loadConfigurationDetails(configId) {
     try {
-        const response = await fetch(`/parse/${configId}`);
-        if (!response.ok) {
+        // Counts and the first few VLAN names, not the whole parsed model
+        const [summaryResponse, vlanResponse] = await Promise.all([
+            fetch(`/configs/${configId}`),
+            fetch(`/configs/${configId}/vlans?fields=name,vlan_id&limit=${VLAN_SUMMARY_LIMIT}`)
+        ]);
+        if (!summaryResponse.ok || !vlanResponse.ok) {
             throw new Error('Failed to load configuration details');
         }
         
-        const result = await response.json();
-        displayConfigurationDetails(result);
+        displayConfigurationDetails(await summaryResponse.json(), await vlanResponse.json());
+        await loadInterfaceTable(configId);
         
     } catch (error) {
         console.error('Error loading configuration details:', error);
     }
 }
 
-function displayConfigurationDetails(config) {
-    const network = config.network;
-    const device = network.devices[0]; // Assuming single device for now
+async function loadInterfaceTable(configId) {
+    const card = document.getElementById('interfaceTableCard');
+    const viewport = document.getElementById('interfaceTable');
+    if (!card || !viewport || !configId) {
+        return;
+    }
+    
+    card.style.display = 'block';
+    if (!interfaceTable) {
+        interfaceTable = new VirtualTable(viewport, iface => `
+            <div class="virtual-table-row">
+                <span>${escapeHtml(iface.name)}</span>
+                <span>${escapeHtml(iface.ip || '')}</span>
+                <span>${escapeHtml(iface.port_mode || '')}</span>
+                <span title="${escapeHtml(iface.description || '')}">${escapeHtml(iface.description || '')}</span>
+            </div>
+        `);
+    }
+    
+    const params = new URLSearchParams({
+        fields: 'name,ip,port_mode,description',
+        limit: INTERFACE_PAGE_SIZE,
+        sort: document.getElementById('interfaceSort')?.value || 'position'
+    });
+    const prefix = document.getElementById('interfaceFilter')?.value.trim();
+    if (prefix) {
+        params.set('name', prefix);
+    }
+    await interfaceTable.reset(`/configs/${configId}/interfaces?${params}`);
+    
+    const count = document.getElementById('interfaceCount');
+    if (count) {
+        count.textContent = `(${interfaceTable.total})`;
+    }
+}
+
+function displayConfigurationDetails(summary, vlanPage) {
+    const device = summary.devices[0]; // Assuming single device for now
     
     const deviceInfo = document.getElementById('deviceInfo');
     const networkSummary = document.getElementById('networkSummary');
@@ -276,27 +471,29 @@ function displayConfigurationDetails(config) {
     deviceInfo.innerHTML = `
         <div class="info-item">
             <span class="info-label">Hostname:</span>
-            <span class="info-value">${device.hostname}</span>
+            <span class="info-value">${escapeHtml(device.hostname)}</span>
         </div>
         <div class="info-item">
             <span class="info-label">Interfaces:</span>
-            <span class="info-value">${device.interfaces.length}</span>
+            <span class="info-value">${device.interfaces}</span>
         </div>
         <div class="info-item">
             <span class="info-label">VLANs:</span>
-            <span class="info-value">${device.routing?.vlans?.length || 0}</span>
+            <span class="info-value">${device.vlans}</span>
         </div>
         <div class="info-item">
             <span class="info-label">Routes:</span>
-            <span class="info-value">${device.routing?.routes?.length || 0}</span>
+            <span class="info-value">${device.routes}</span>
         </div>
     `;
     
     // Network summary
-    const vlans = device.routing?.vlans || [];
-    const vlanInfo = vlans.map(vlan => 
-        `${vlan.name} (ID: ${vlan.vlan_id})`
+    let vlanInfo = vlanPage.items.map(vlan => 
+        `${escapeHtml(vlan.name)} (ID: ${vlan.vlan_id})`
     ).join(', ') || 'None';
+    if (vlanPage.next_cursor) {
+        vlanInfo += ` and ${vlanPage.total - vlanPage.items.length} more`;
+    }
     
     networkSummary.innerHTML = `
         <div class="info-item">
@@ -305,11 +502,11 @@ function displayConfigurationDetails(config) {
         </div>
         <div class="info-item">
             <span class="info-label">Interfaces with IP:</span>
-            <span class="info-value">${device.interfaces.filter(i => i.ip).length}</span>
+            <span class="info-value">${device.interfaces_with_ip}</span>
         </div>
         <div class="info-item">
             <span class="info-label">Interfaces with VLANs:</span>
-            <span class="info-value">${device.interfaces.filter(i => i.vlan_members && i.vlan_members.length > 0).length}</span>
+            <span class="info-value">${device.interfaces_with_vlans}</span>
         </div>
     `;
     
@@ -360,6 +557,9 @@ function showDiagram(diagramType) {
 }
 
 async function loadDiagramImage(container, diagramType) {
+    if (currentDiagramFormat === 'mermaid') {
+        return loadMermaidDiagram(container, diagramType);
+    }
     try {
         const imageUrl = `/diagram/${currentConfigId}?diagram_type=${diagramType}&format=${currentDiagramFormat}`;
         console.log('Loading diagram from:', imageUrl);
@@ -427,6 +627,64 @@ async function loadDiagramImage(container, diagramType) {
     }
 }
 
+// Load the Mermaid library once, only when a diagram is first rendered client-side
+function loadMermaid() {
+    if (!mermaidReady) {
+        mermaidReady = new Promise((resolve, reject) => {
+            const script = document.createElement('script');
+            script.src = MERMAID_SCRIPT_URL;
+            script.onload = () => {
+                window.mermaid.initialize({ startOnLoad: false, maxTextSize: 10000000, maxEdges: 100000 });
+                resolve(window.mermaid);
+            };
+            script.onerror = () => {
+                mermaidReady = null;
+                reject(new Error('Could not load the Mermaid library'));
+            };
+            document.head.appendChild(script);
+        });
+    }
+    return mermaidReady;
+}
+
+async function loadMermaidDiagram(container, diagramType) {
+    const sourceUrl = `/diagram/${currentConfigId}?diagram_type=${diagramType}&format=mermaid`;
+    try {
+        const [response, mermaid] = await Promise.all([fetch(sourceUrl), loadMermaid()]);
+        if (!response.ok) {
+            throw new Error(`Server returned ${response.status}`);
+        }
+        const source = await response.text();
+        const { svg } = await mermaid.render(`mermaid-${diagramType}-${Date.now()}`, source);
+        
+        container.innerHTML = `
+            <div class="text-center">
+                <h5>${diagramType.charAt(0).toUpperCase() + diagramType.slice(1)} Diagram</h5>
+                <div class="alert alert-info">
+                    <p><strong>Network Diagram (Mermaid, rendered in your browser)</strong></p>
+                    <div class="diagram-container mermaid-diagram">${svg}</div>
+                    <div class="mt-3">
+                        <a href="${sourceUrl}" download="${currentConfigId}_${diagramType}.mmd" class="btn btn-primary">
+                            💾 Download Mermaid source
+                        </a>
+                    </div>
+                </div>
+            </div>
+        `;
+    } catch (error) {
+        console.error('Error rendering Mermaid diagram:', error);
+        container.innerHTML = `
+            <div class="text-center">
+                <div class="text-muted">
+                    <span style="font-size: 2em;">⚠️</span>
+                    <p>Failed to render Mermaid diagram</p>
+                    <p><small>${error.message}</small></p>
+                </div>
+            </div>
+        `;
+    }
+}
+
 // Global function for copying image URL
 window.copyImageUrl = async function(imageUrl) {
     const success = await copyToClipboard(imageUrl);
@@ -451,38 +709,49 @@ function updateActiveButton(activeButton) {
     activeButton.classList.add('active');
 }
 
-async function loadConfigurations() {
+// Load the first page of configurations, or with append the page after the last one shown
+async function loadConfigurations(append = false) {
     try {
-        const response = await fetch('/configs');
+        const params = new URLSearchParams({fields: 'config_id,filename,timestamp,device_count', limit: CONFIG_PAGE_SIZE});
+        if (append && configsNextCursor) {
+            params.set('cursor', configsNextCursor);
+        }
+        const response = await fetch(`/configs?${params}`);
         if (!response.ok) {
             throw new Error('Failed to load configurations');
         }
         
         const result = await response.json();
-        displayConfigurations(result.configs);
+        configsNextCursor = result.next_cursor;
+        displayConfigurations(result.configs, append);
+        
+        const loadMore = document.getElementById('loadMoreConfigs');
+        if (loadMore) {
+            loadMore.style.display = configsNextCursor ? 'block' : 'none';
+        }
         
     } catch (error) {
         console.error('Error loading configurations:', error);
     }
 }
 
-function displayConfigurations(configs) {
+function displayConfigurations(configs, append = false) {
     const configList = document.getElementById('configList');
     if (!configList) {
         console.error('Config list element not found');
         return;
     }
     
-    if (configs.length === 0) {
+    if (configs.length === 0 && !append) {
         configList.innerHTML = '<div class="text-muted">No configurations uploaded yet</div>';
         return;
     }
     
-    configList.innerHTML = configs.map(config => `
+    const items = configs.map(config => `
         <div class="config-list-item" data-config-id="${config.config_id}">
             <div class="config-info">
                 <div class="d-flex w-100 justify-content-between">
-                    <h6 class="mb-1">${config.filename}</h6>
+                    <h6 class="mb-1">${escapeHtml(config.filename)}</h6>
                     <small class="text-muted">${config.device_count} device(s)</small>
                 </div>
                 <small class="text-muted">${new Date(config.timestamp).toLocaleString()}</small>
@@ -492,19 +761,12 @@ function displayConfigurations(configs) {
             </div>
         </div>
     `).join('');
-    
-    // Add click handlers for configuration selection
-    configList.querySelectorAll('.config-list-item').forEach(item => {
-        item.addEventListener('click', function(e) {
-            // Don't trigger if clicking delete button
-            if (e.target.classList.contains('delete-config-btn')) {
-                return;
-            }
-            
-            const configId = this.dataset.configId;
-            loadConfiguration(configId);
-        });
-    });
+    // Clicks are handled by the list's delegated listener
+    if (append) {
+        configList.insertAdjacentHTML('beforeend', items);
+    } else {
+        configList.innerHTML = items;
+    }
 }
 
 // Global function for deleting configurations
@@ -542,6 +804,13 @@ window.deleteConfiguration = async function(configId, event) {
                 if (configDetails) {
                     configDetails.style.display = 'none';
                 }
+                const interfaceTableCard = document.getElementById('interfaceTableCard');
+                if (interfaceTableCard) {
+                    interfaceTableCard.style.display = 'none';
+                }
+                if (interfaceTable) {
+                    interfaceTable.reset(null);
+                }
             }
             
             // Refresh the configuration list
@@ -623,17 +892,7 @@ async function handleAutoLoad(event) {
         const formData = new FormData();
         formData.append('file', configFile);
         
-        const uploadResponse = await fetch('/upload', {
-            method: 'POST',
-            body: formData
-        });
-        
-        if (!uploadResponse.ok) {
-            const errorData = await uploadResponse.json();
-            throw new Error(errorData.detail || 'Upload failed');
-        }
-        
-        const result = await uploadResponse.json();
+        const result = await uploadAndWait(formData);
         console.log('Auto-load successful:', result);
         
         // Store the config ID and diagram types
@@ -641,7 +900,7 @@ async function handleAutoLoad(event) {
         currentDiagramTypes = result.diagram_types || [];
         
         // Show success message
-        showAlert(`Sample configuration loaded successfully! Generated ${result.diagram_types?.length || 0} diagram types.`, 'success');
+        showAlert(`Sample configuration loaded successfully! ${result.diagram_types?.length || 0} diagram types available.`, 'success');
         
         // Load configuration details and refresh the list
         await loadConfigurationDetails(currentConfigId);
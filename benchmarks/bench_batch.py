@@ -0,0 +1,27 @@
+"""
+Batch ingest throughput (configs/sec) against worker count.
+
+    python -m benchmarks.bench_batch
+"""
+from app.parsers.batch_parser import BatchParser, available_cores
+from benchmarks.synthetic import make_config
+
+CONFIG_COUNT = 300
+INTERFACES_PER_CONFIG = 52
+
+
+def main():
+    items = [
+        (f"sw{index}.conf", make_config(INTERFACES_PER_CONFIG, hostname=f"sw{index}").encode("utf-8"))
+        for index in range(CONFIG_COUNT)
+    ]
+    worker_counts = sorted({1, 2, 4, 8, available_cores()})
+    print(f"{CONFIG_COUNT} configs, {available_cores()} cores available")
+    print(f"{'workers':>8} {'seconds':>9} {'configs/s':>10}")
+    for workers in worker_counts:
+        result = BatchParser(workers=workers).parse(items)
+        print(f"{workers:>8} {result.elapsed:>9.3f} {result.configs_per_second:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Structural diff time for a one-line change as configs grow, against a full
+re-parse of both sides. Only the changed stanza is parsed and unchanged
+subtrees are skipped by digest, so the diff should stay well below the
+parse time.
+
+    python -m benchmarks.bench_config_diff
+"""
+import sys
+import time
+
+from app.analysis.config_diff import diff_configs
+from app.parsers.config_tree import parse_config_tree
+from benchmarks.synthetic import make_config
+
+SIZES = (500, 2000, 5000)
+
+
+def main():
+    print(f"{'interfaces':>10} {'lines':>7} {'parse ms':>9} {'diff ms':>8} {'compared':>9} {'skipped':>8}")
+    for size in SIZES:
+        old = make_config(size)
+        new = old.replace(f'"port {size // 2} to', f'"port {size // 2} moved to')
+        start = time.perf_counter()
+        parse_config_tree(old)
+        parse_config_tree(new)
+        parse_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        result = diff_configs(old, new)
+        diff_ms = (time.perf_counter() - start) * 1000
+        assert result["summary"]["changed"] == 1
+        stats = result["stats"]
+        print(f"{size:>10} {old.count(chr(10)):>7} {parse_ms:>9.1f} {diff_ms:>8.1f} "
+              f"{stats['nodes_compared']:>9} {stats['subtrees_skipped']:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+"""
+Interface and VLAN diagram render time with the built-in grid renderer as
+ports grow. Graphviz is not needed; the SVG is built in memory.
+
+    python -m benchmarks.bench_grid_render
+"""
+import sys
+import time
+
+from app.parsers.grid_renderer import GridRenderer, node_count
+from app.parsers.juniper_parser import JuniperParser
+from benchmarks.synthetic import make_config
+
+SIZES = (200, 1000, 5000, 20000)
+
+
+def main():
+    renderer = GridRenderer()
+    print(f"{'interfaces':>10} {'diagram':>10} {'nodes':>7} {'ms':>8} {'svg KiB':>8}")
+    for size in SIZES:
+        network = JuniperParser().parse_config(make_config(size))
+        for diagram_type in GridRenderer.diagram_types:
+            start = time.perf_counter()
+            svg = renderer.svg(diagram_type, diagram_type, network)
+            elapsed = time.perf_counter() - start
+            print(f"{size:>10} {diagram_type:>10} {node_count(diagram_type, network):>7} "
+                  f"{elapsed * 1000:>8.1f} {len(svg) / 1024:>8.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""
+Link inference scaling: a leaf/spine fabric with /31 uplinks, a shared
+management segment and descriptions naming the far end.
+
+    python -m benchmarks.bench_links
+"""
+import gc
+import time
+
+from app.analysis.links import infer_connections
+from app.models.network import Device, Interface
+
+SPINES = 8
+PORTS_PER_LEAF = 48
+
+
+def make_fabric(leaf_count: int):
+    spines = [Device(hostname=f"spine{s}", interfaces=[]) for s in range(SPINES)]
+    leaves = []
+    link = 0
+    for leaf in range(leaf_count):
+        hostname = f"leaf{leaf}"
+        interfaces = [Interface(name="me0", ip=f"172.16.{leaf // 250}.{leaf % 250 + 1}/16")]
+        for s, spine in enumerate(spines):
+            base = link * 2
+            address = f"10.{base >> 16 & 255}.{base >> 8 & 255}.{base & 255}"
+            peer = f"10.{base >> 16 & 255}.{base >> 8 & 255}.{(base & 255) + 1}"
+            interfaces.append(Interface(name=f"xe-0/1/{s}", ip=f"{address}/31", description=f"to spine{s}"))
+            spine.interfaces.append(Interface(name=f"xe-0/0/{leaf}", ip=f"{peer}/31", description=f"{hostname} uplink"))
+            link += 1
+        for port in range(PORTS_PER_LEAF):
+            interfaces.append(Interface(name=f"ge-0/0/{port}", description=f"server {leaf}-{port}"))
+        leaves.append(Device(hostname=hostname, interfaces=interfaces))
+    return spines + leaves
+
+
+def main():
+    print(f"{'devices':>8} {'interfaces':>11} {'links':>7} {'seconds':>9} {'us/iface':>9}")
+    for leaf_count in (25, 50, 100, 200, 350):
+        devices = make_fabric(leaf_count)
+        interface_count = sum(len(device.interfaces) for device in devices)
+        gc.collect()
+        start = time.perf_counter()
+        connections = infer_connections(devices)
+        elapsed = time.perf_counter() - start
+        print(f"{len(devices):>8} {interface_count:>11} {len(connections):>7} {elapsed:>9.3f} "
+              f"{elapsed / interface_count * 1e6:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
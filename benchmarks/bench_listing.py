@@ -0,0 +1,53 @@
+"""
+Cost of the first page of a config's interfaces, against sending the
+whole parsed model, as chassis grow.
+
+    python -m benchmarks.bench_listing
+"""
+import json
+import time
+
+from app.parsers.juniper_parser import JuniperParser
+from app.services.listings import RESOURCES, build_listing, page_items
+from app.services.pagination import paginate
+from benchmarks.synthetic import make_config
+
+PAGE = 200
+FIELDS = ["name", "ip", "port_mode", "description"]
+
+
+def first_page(network: dict, sort: str) -> bytes:
+    listing = build_listing(RESOURCES["interfaces"], network, sort, {})
+    items, _ = paginate(listing.keys, listing.items, None, PAGE)
+    return json.dumps({"items": page_items(items, FIELDS), "total": len(listing.items)}).encode("utf-8")
+
+
+def main():
+    print(f"{'interfaces':>10} {'model KB':>9} {'model ms':>9} {'page KB':>8} {'cold ms':>8} {'sorted ms':>10} {'next ms':>8}")
+    for count in (500, 2_000, 10_000, 40_000):
+        network = JuniperParser().parse_config(make_config(count)).model_dump(mode="json")
+        start = time.perf_counter()
+        model = json.dumps({"network": network}).encode("utf-8")
+        model_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        page = first_page(network, "position")
+        cold_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        first_page(network, "name")
+        sorted_ms = (time.perf_counter() - start) * 1000
+
+        # Later pages come from the cached listing: a bisect and a slice
+        listing = build_listing(RESOURCES["interfaces"], network, "name", {})
+        _, after = paginate(listing.keys, listing.items, None, PAGE)
+        start = time.perf_counter()
+        for _ in range(100):
+            items, _ = paginate(listing.keys, listing.items, after, PAGE)
+            json.dumps({"items": page_items(items, FIELDS)})
+        next_ms = (time.perf_counter() - start) * 10
+        print(f"{count:>10} {len(model) / 1024:>9.0f} {model_ms:>9.1f} {len(page) / 1024:>8.1f} {cold_ms:>8.1f}"
+              f" {sorted_ms:>10.1f} {next_ms:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
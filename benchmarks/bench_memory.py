@@ -0,0 +1,52 @@
+"""
+Memory held per interface by a parsed network as pydantic models, as the
+stored dict form and as a CompactNetwork, and what it costs to turn the
+compact form back into the other two.
+
+    python -m benchmarks.bench_memory
+"""
+import gc
+import json
+import time
+import tracemalloc
+
+from app.models.compact import CompactNetwork
+from app.models.network import network_from_dict
+from app.parsers.juniper_parser import JuniperParser
+from benchmarks.synthetic import make_config
+
+
+def retained(build):
+    """Bytes still allocated by ``build`` once its temporaries are freed"""
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, size
+
+
+def main():
+    print(f"{'interfaces':>10} {'model B/if':>11} {'dict B/if':>10} {'compact B/if':>13} {'to_dict ms':>11}"
+          f" {'to_network ms':>14}")
+    for count in (500, 2_000, 10_000, 40_000):
+        text = json.dumps(JuniperParser().parse_config(make_config(count)).model_dump(mode="json"))
+        # Each form is built from a fresh decode, so no form shares strings with another
+        model, model_bytes = retained(lambda: network_from_dict(json.loads(text)))
+        data, dict_bytes = retained(lambda: json.loads(text))
+        compact, compact_bytes = retained(lambda: CompactNetwork.from_dict(json.loads(text)))
+        del model, data
+
+        start = time.perf_counter()
+        compact.to_dict()
+        to_dict_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        compact.to_network()
+        to_network_ms = (time.perf_counter() - start) * 1000
+        print(f"{count:>10} {model_bytes / count:>11.0f} {dict_bytes / count:>10.0f} {compact_bytes / count:>13.0f}"
+              f" {to_dict_ms:>11.1f} {to_network_ms:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+Mermaid source generation time for all five diagram types as interfaces grow.
+Time per interface should stay flat.
+
+    python -m benchmarks.bench_mermaid
+"""
+import sys
+import time
+
+from app.parsers.juniper_parser import JuniperParser
+from app.parsers.mermaid_generator import MermaidGenerator
+from benchmarks.synthetic import make_config
+
+SIZES = (500, 2000, 8000)
+
+
+def main():
+    print(f"{'interfaces':>10} {'ms':>9} {'us/interface':>13} {'KiB':>7}")
+    for size in SIZES:
+        network = JuniperParser().parse_config(make_config(size))
+        start = time.perf_counter()
+        diagrams = MermaidGenerator().generate_all_diagrams(network)
+        elapsed = time.perf_counter() - start
+        text_size = sum(len(text) for text in diagrams.values())
+        print(f"{size:>10} {elapsed * 1000:>9.1f} {elapsed * 1e6 / size:>13.1f} {text_size / 1024:>7.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""
+Server-side cost of a /parse body from the SQLite store: decoding the
+stored network and encoding it again for every request, against splicing
+the JSON bytes kept since ingest around a stored ETag.
+
+    python -m benchmarks.bench_parse_response
+"""
+import os
+import tempfile
+import time
+
+from fastapi.responses import JSONResponse
+
+from app.parsers.juniper_parser import JuniperParser
+from app.services.http_cache import content_etag
+from app.services.serialization import model_json, parse_body
+from app.services.storage import SQLiteConfigStore
+from benchmarks.synthetic import make_config
+
+REPEATS = 20
+
+
+def per_request_ms(respond) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        respond()
+    return (time.perf_counter() - start) * 1000 / REPEATS
+
+
+def main():
+    print(f"{'interfaces':>10} {'body KB':>8} {'re-encode ms':>13} {'stored ms':>10} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteConfigStore(os.path.join(tmp, "bench.db"))
+        for count in (500, 2_000, 10_000, 40_000):
+            network = JuniperParser().parse_config(make_config(count))
+            network_json = model_json(network)
+            body = parse_body("bench", "bench.conf", network_json)
+            store.put("bench", {"filename": "bench.conf", "diagrams": {}, "network": network.model_dump(mode="json"),
+                                "network_json": network_json, "parse_etag": content_etag(body)})
+
+            def re_encode():
+                record = store.get("bench")
+                response = JSONResponse({"config_id": "bench", "filename": record["filename"],
+                                         "network": record["network"]})
+                return content_etag(response.body)
+
+            def stored():
+                record = store.get_serialized("bench")
+                parse_body("bench", record["filename"], record["network_json"])
+                return record["parse_etag"]
+
+            before, after = per_request_ms(re_encode), per_request_ms(stored)
+            print(f"{count:>10} {len(body) / 1024:>8.0f} {before:>13.2f} {after:>10.2f} {before / after:>7.1f}x")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Parser scaling benchmark.
+
+Parses synthetic configs of increasing size and reports time per line.
+A flat microseconds-per-line column means parse time grows linearly.
+
+    python -m benchmarks.bench_parser
+"""
+import gc
+import time
+
+from app.parsers.juniper_parser import JuniperParser
+from benchmarks.synthetic import make_config
+
+SIZES = [250, 500, 1000, 2000, 4000]
+REPEATS = 3
+
+
+def time_parse(config_text: str) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        parser = JuniperParser()
+        gc.collect()
+        start = time.perf_counter()
+        parser.parse_config(config_text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print(f"{'interfaces':>10} {'lines':>8} {'seconds':>9} {'us/line':>8}")
+    for size in SIZES:
+        config_text = make_config(size)
+        line_count = config_text.count("\n")
+        elapsed = time_parse(config_text)
+        print(f"{size:>10} {line_count:>8} {elapsed:>9.4f} {elapsed / line_count * 1e6:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
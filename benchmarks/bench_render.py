@@ -0,0 +1,53 @@
+"""
+Per-upload render time: one dot run per format (the old behaviour) against
+one layout emitting PNG and SVG together. Requires Graphviz ``dot``.
+
+    python -m benchmarks.bench_render
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from app.parsers.diagrams_generator import DIAGRAM_LAYOUTS, DiagramsGenerator
+from app.parsers.juniper_parser import JuniperParser
+from benchmarks.synthetic import make_config
+
+FORMATS = ("png", "svg")
+
+
+def render_upload(network, separate_layouts: bool) -> float:
+    with tempfile.TemporaryDirectory() as output_dir:
+        generator = DiagramsGenerator(output_dir)
+        start = time.perf_counter()
+        for diagram_type in DIAGRAM_LAYOUTS:
+            base = os.path.join(output_dir, diagram_type)
+            if separate_layouts:
+                for outformat in FORMATS:
+                    generator._draw(diagram_type, network, base, [outformat])
+            else:
+                generator._draw(diagram_type, network, base, FORMATS)
+        return time.perf_counter() - start
+
+
+def main():
+    if shutil.which("dot") is None:
+        print("Graphviz 'dot' not found on PATH; install graphviz to run this benchmark")
+        return 1
+
+    with open("test-configs/ex3300-1.conf") as f:
+        samples = [("ex3300-1.conf", f.read())]
+    samples.append(("synthetic 200 interfaces", make_config(200)))
+
+    print(f"{'config':<26} {'dot runs':>8} {'before s':>9} {'after s':>8} {'speedup':>8}")
+    for name, text in samples:
+        network = JuniperParser().parse_config(text)
+        before = render_upload(network, separate_layouts=True)
+        after = render_upload(network, separate_layouts=False)
+        print(f"{name:<26} {'10 -> 5':>8} {before:>9.2f} {after:>8.2f} {before / after:>7.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
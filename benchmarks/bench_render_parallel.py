@@ -0,0 +1,59 @@
+"""
+Wall-clock time to render all five diagram types for one upload, serially
+in this process against fanned out over the shared render pool. Requires
+Graphviz ``dot``.
+
+    python -m benchmarks.bench_render_parallel [--workers N]
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+
+from app.parsers.batch_parser import available_cores
+from app.parsers.diagrams_generator import DiagramsGenerator
+from app.parsers.juniper_parser import JuniperParser
+from app.services.render_pool import RenderPool
+from benchmarks.synthetic import make_config
+
+
+def render_all(network, render_pool) -> float:
+    with tempfile.TemporaryDirectory() as output_dir:
+        generator = DiagramsGenerator(output_dir, render_pool=render_pool)
+        start = time.perf_counter()
+        generator.generate_all_diagrams(network, "bench")
+        return time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--workers", type=int, default=available_cores())
+    args = arg_parser.parse_args()
+
+    if shutil.which("dot") is None:
+        print("Graphviz 'dot' not found on PATH; install graphviz to run this benchmark")
+        return 1
+
+    with open("test-configs/ex3300-1.conf") as f:
+        samples = [("ex3300-1.conf", f.read())]
+    samples.append(("synthetic 500 interfaces", make_config(500)))
+
+    pool = RenderPool(args.workers)
+    # Start the workers before timing so process spawn is not counted
+    pool.submit(time.time).result()
+    try:
+        print(f"workers: {args.workers}")
+        print(f"{'config':<26} {'serial s':>9} {'parallel s':>11} {'speedup':>8}")
+        for name, text in samples:
+            network = JuniperParser().parse_config(text)
+            serial = render_all(network, None)
+            parallel = render_all(network, pool)
+            print(f"{name:<26} {serial:>9.2f} {parallel:>11.2f} {serial / parallel:>7.2f}x")
+    finally:
+        pool.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
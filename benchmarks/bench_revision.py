@@ -0,0 +1,36 @@
+"""
+Re-ingest time for a one-line change: a full parse of the new revision
+against an incremental parse that reuses the previous revision's model.
+
+    python -m benchmarks.bench_revision
+"""
+import sys
+import time
+
+from app.parsers.incremental import parse_revision
+from app.parsers.juniper_parser import JuniperParser
+from benchmarks.synthetic import make_config
+
+SIZES = (500, 2000, 5000)
+
+
+def main():
+    print(f"{'interfaces':>10} {'lines':>7} {'full ms':>8} {'incremental ms':>15} {'reparsed':>9}")
+    for size in SIZES:
+        old = make_config(size)
+        new = old.replace(f'"port {size // 2} to', f'"port {size // 2} moved to')
+        previous = JuniperParser().parse_config(old).model_dump(mode="json")
+        start = time.perf_counter()
+        expected = JuniperParser().parse_config(new).model_dump(mode="json")
+        full_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        revision = parse_revision(new, old, previous)
+        incremental_ms = (time.perf_counter() - start) * 1000
+        assert revision.network == expected
+        print(f"{size:>10} {new.count(chr(10)):>7} {full_ms:>8.1f} {incremental_ms:>15.1f} "
+              f"{revision.interfaces_reparsed:>9}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""
+Route lookup cost per destination against tables of increasing size.
+
+    python -m benchmarks.bench_route_lookup
+"""
+import gc
+import random
+import time
+
+from app.analysis.route_lookup import RouteTable, address_to_int
+from app.models.juniper import Route
+from app.models.network import Device, Interface
+
+LOOKUPS = 200_000
+
+
+def make_device(route_count: int, rng: random.Random) -> Device:
+    interfaces = [Interface(name=f"xe-0/0/{index}", ip=f"10.255.{index}.1/24") for index in range(32)]
+    routes = [Route(destination="0.0.0.0/0", next_hop="10.255.0.254")]
+    for _ in range(route_count):
+        length = rng.choice((8, 16, 20, 22, 24, 24, 24, 28, 32))
+        address = rng.getrandbits(32) >> (32 - length) << (32 - length)
+        destination = ".".join(str(address >> shift & 255) for shift in (24, 16, 8, 0))
+        routes.append(Route(destination=f"{destination}/{length}", next_hop=f"10.255.{rng.randrange(32)}.2"))
+    return Device(hostname="bench-r1", interfaces=interfaces, routing={"routes": routes})
+
+
+def main():
+    rng = random.Random(7)
+    destinations = [".".join(str(rng.randrange(256)) for _ in range(4)) for _ in range(LOOKUPS)]
+    values = [address_to_int(destination)[1] for destination in destinations]
+    # ns/match excludes address parsing and result dicts: the bare prefix match
+    print(f"{'routes':>8} {'build s':>8} {'ns/lookup':>10} {'ns/match':>9}")
+    for route_count in (100, 1_000, 10_000, 100_000):
+        start = time.perf_counter()
+        table = RouteTable.from_device(make_device(route_count, rng))
+        build = time.perf_counter() - start
+        gc.collect()
+        start = time.perf_counter()
+        table.lookup_many(destinations)
+        elapsed = time.perf_counter() - start
+        match = table.families[4].lookup
+        start = time.perf_counter()
+        for value in values:
+            match(value)
+        matched = time.perf_counter() - start
+        print(f"{route_count:>8} {build:>8.3f} {elapsed / LOOKUPS * 1e9:>10.0f} {matched / LOOKUPS * 1e9:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
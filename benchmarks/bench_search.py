@@ -0,0 +1,68 @@
+"""
+Fleet search latency from the SQLite store's index, against scanning
+every stored network, for thousands of single-device configs.
+
+    python -m benchmarks.bench_search
+"""
+import copy
+import os
+import tempfile
+import time
+
+from app.parsers.juniper_parser import JuniperParser
+from app.services.search_index import SearchQuery
+from app.services.storage import MemoryConfigStore, SQLiteConfigStore
+from benchmarks.synthetic import make_config
+
+DEVICES = 2_000
+REPEATS = 20
+
+QUERIES = [
+    ("hostname", "bench-sw1234", "exact"),
+    ("interface", "ge-0/0/4", "prefix"),
+    ("description", "peer 3", "exact"),
+    ("vlan", "vlan7", "exact"),
+    ("ip", "10.17.0.0/16", "within"),
+    ("ip", "10.5.3.9", "contains"),
+]
+
+
+def make_network(template: dict, index: int) -> dict:
+    network = copy.deepcopy(template)
+    device = network["devices"][0]
+    device["hostname"] = f"bench-sw{index}"
+    second = index % 250
+    for interface in device["interfaces"]:
+        if interface.get("ip"):
+            interface["ip"] = f"10.{second}.{index // 250}.1/24"
+    for number, route in enumerate(device["routing"]["routes"]):
+        route["destination"] = f"10.{second}.{number}.0/24"
+    return network
+
+
+def main():
+    template = JuniperParser().parse_config(make_config(48, route_count=8)).model_dump(mode="json")
+    with tempfile.TemporaryDirectory() as tmp:
+        stores = {"index": SQLiteConfigStore(os.path.join(tmp, "bench.db")), "scan": MemoryConfigStore()}
+        for name, store in stores.items():
+            start = time.perf_counter()
+            for index in range(DEVICES):
+                store.put(f"config-{index}", {"filename": f"sw{index}.conf", "diagrams": {},
+                                              "network": make_network(template, index)})
+            print(f"{name}: stored {DEVICES} devices in {time.perf_counter() - start:.2f}s")
+
+        print(f"{'field':>12} {'match':>9} {'query':>14} {'results':>8} {'index ms':>9} {'scan ms':>8}")
+        for field, text, match in QUERIES:
+            query = SearchQuery(field, text, match)
+            timings = {}
+            for name, store in stores.items():
+                start = time.perf_counter()
+                for _ in range(REPEATS):
+                    results = store.search(query, 1001)
+                timings[name] = (time.perf_counter() - start) / REPEATS * 1000
+            print(f"{field:>12} {match:>9} {text:>14} {len(results):>8} {timings['index']:>9.2f} {timings['scan']:>8.1f}")
+        stores["index"].close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+Throughput of the ``display set`` parser, serial and chunked across processes.
+
+    python -m benchmarks.bench_set_parser
+"""
+import os
+import time
+
+from app.parsers.set_parser import SetConfigParser
+from benchmarks.synthetic import make_set_config
+
+SIZES = [1000, 10000, 100000]
+
+
+def time_parse(parser: SetConfigParser, config_text: str) -> float:
+    start = time.perf_counter()
+    parser.parse_config(config_text)
+    return time.perf_counter() - start
+
+
+def main():
+    workers = os.cpu_count() or 1
+    print(f"{'interfaces':>10} {'lines':>8} {'serial s':>9} {'lines/s':>10} {f'{workers} procs s':>12}")
+    for size in SIZES:
+        config_text = make_set_config(size)
+        line_count = config_text.count("\n")
+        serial = time_parse(SetConfigParser(), config_text)
+        parallel = time_parse(SetConfigParser(workers=workers, parallel_threshold=1), config_text)
+        print(f"{size:>10} {line_count:>8} {serial:>9.3f} {line_count / serial:>10.0f} {parallel:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Peak memory of a full-text parse versus the streaming parser.
+
+The streaming column still grows with the size of the resulting Network
+model, but not with the raw text or its config tree.
+
+    python -m benchmarks.bench_streaming
+"""
+import tracemalloc
+
+from app.parsers.juniper_parser import JuniperParser
+from app.parsers.streaming_parser import StreamingNetworkParser
+from benchmarks.synthetic import make_config
+
+SIZES = [500, 2000, 8000]
+CHUNK_SIZE = 64 * 1024
+
+
+def peak_full(config_bytes: bytes) -> int:
+    tracemalloc.start()
+    JuniperParser().parse_config(config_bytes.decode("utf-8"))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def peak_streaming(config_bytes: bytes) -> int:
+    tracemalloc.start()
+    stream = StreamingNetworkParser()
+    for start in range(0, len(config_bytes), CHUNK_SIZE):
+        # Slicing stands in for reading a chunk from the upload spool
+        stream.feed_bytes(config_bytes[start:start + CHUNK_SIZE])
+    stream.close()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    print(f"{'interfaces':>10} {'input MB':>9} {'full MB':>8} {'stream MB':>10}")
+    for size in SIZES:
+        config_bytes = make_config(size).encode("utf-8")
+        mb = 1024 * 1024
+        print(f"{size:>10} {len(config_bytes) / mb:>9.2f} "
+              f"{peak_full(config_bytes) / mb:>8.2f} {peak_streaming(config_bytes) / mb:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Synthetic Junos configurations for benchmarks"""
+
+
+def make_config(interface_count: int, hostname: str = "bench-sw1", vlan_count: int = 32,
+                route_count: int = 16, subnet_base: int = 10) -> str:
+    """Build a curly-brace config with the requested number of interfaces"""
+    lines = [
+        f"## Last commit: 2025-06-12 04:38:03 EDT by root",
+        "version 15.1R7.9;",
+        "system {",
+        f"    host-name {hostname};",
+        "}",
+        "interfaces {",
+    ]
+    for index in range(interface_count):
+        fpc, port = divmod(index, 48)
+        lines.extend([
+            f"    ge-{fpc}/0/{port} {{",
+            f"        description \"port {index} to {hostname}-peer-{index % 7}\";",
+            "        unit 0 {",
+            "            family ethernet-switching {",
+            "                port-mode access;",
+            "                vlan {",
+            f"                    members vlan{index % vlan_count};",
+            "                }",
+            "            }",
+            "        }",
+            "    }",
+        ])
+    lines.extend([
+        "    vlan {",
+        "        unit 0 {",
+        "            family inet {",
+        f"                address {subnet_base}.0.0.1/24;",
+        "            }",
+        "        }",
+        "    }",
+        "}",
+        "routing-options {",
+        "    static {",
+    ])
+    for index in range(route_count):
+        lines.append(f"        route {subnet_base}.{index + 1}.0.0/16 next-hop {subnet_base}.0.0.254;")
+    lines.extend(["    }", "}", "vlans {"])
+    for index in range(vlan_count):
+        lines.extend([
+            f"    vlan{index} {{",
+            f"        description \"vlan {index}\";",
+            f"        vlan-id {index + 100};",
+            "    }",
+        ])
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def make_set_config(interface_count: int, hostname: str = "bench-sw1", vlan_count: int = 32,
+                    route_count: int = 16) -> str:
+    """Build the ``display set`` equivalent of ``make_config``"""
+    lines = [f"set version 15.1R7.9", f"set system host-name {hostname}"]
+    for index in range(interface_count):
+        fpc, port = divmod(index, 48)
+        name = f"ge-{fpc}/0/{port}"
+        lines.extend([
+            f"set interfaces {name} description \"port {index} to {hostname}-peer-{index % 7}\"",
+            f"set interfaces {name} unit 0 family ethernet-switching port-mode access",
+            f"set interfaces {name} unit 0 family ethernet-switching vlan members vlan{index % vlan_count}",
+        ])
+    lines.append("set interfaces vlan unit 0 family inet address 10.0.0.1/24")
+    for index in range(route_count):
+        lines.append(f"set routing-options static route 10.{index + 1}.0.0/16 next-hop 10.0.0.254")
+    for index in range(vlan_count):
+        lines.extend([
+            f"set vlans vlan{index} description \"vlan {index}\"",
+            f"set vlans vlan{index} vlan-id {index + 100}",
+        ])
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,28 @@
+"""
+Every file the app writes during the test run goes to one temporary
+directory. The settings are read from the environment when ``app.settings``
+is first imported, which happens after this file is loaded, so the
+database, parse cache, spooled uploads and diagrams never touch the
+working tree.
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+TEST_ROOT = tempfile.mkdtemp(prefix="melter-tests-")
+os.environ["MELTER_STORAGE_PATH"] = os.path.join(TEST_ROOT, "melter.db")
+os.environ["MELTER_PARSE_CACHE_DIR"] = os.path.join(TEST_ROOT, "parse_cache")
+os.environ["MELTER_UPLOAD_DIR"] = os.path.join(TEST_ROOT, "uploaded_configs")
+os.environ["MELTER_DIAGRAM_DIR"] = os.path.join(TEST_ROOT, "generated_diagrams")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def isolated_storage():
+    yield TEST_ROOT
+    main = sys.modules.get("app.main")
+    if main is not None:
+        main.config_storage.close()
+    shutil.rmtree(TEST_ROOT, ignore_errors=True)
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.services.artifacts import ArtifactStore
+from app.services.storage import MemoryConfigStore
+
+class TestArtifactStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, size=100, age=0.0):
+        # Artifact-style name: {type}_{digest}.{format}
+        if not name.startswith("."):
+            stem, outformat = name.split(".")
+            name = f"{stem}_{sum(map(ord, stem)):032x}.{outformat}"
+        path = os.path.join(self.dir, name)
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+        if age:
+            stamp = time.time() - age
+            os.utime(path, (stamp, stamp))
+        return path
+
+    def test_size_limit_evicts_least_recently_used(self):
+        store = ArtifactStore(self.dir, max_bytes=250)
+        a, b = self.write("a.svg"), self.write("b.svg")
+        store.record([a])
+        store.record([b])
+        store.touch(a)
+        store.record([self.write("c.svg")])
+        self.assertTrue(os.path.exists(a))
+        self.assertFalse(os.path.exists(b))
+        self.assertEqual(store.stats()["evicted_by_size"], 1)
+        self.assertEqual(store.total_bytes, 200)
+
+    def test_age_limit(self):
+        store = ArtifactStore(self.dir, max_age=60)
+        old = self.write("old.svg")
+        store.record([old])
+        with mock.patch("app.services.artifacts.time.time", return_value=time.time() + 120):
+            store.record([self.write("new.svg")])
+        self.assertFalse(os.path.exists(old))
+        self.assertEqual(store.stats()["evicted_by_age"], 1)
+
+    def test_startup_scan_and_orphan_sweep(self):
+        kept = self.write("kept.svg", age=3600)
+        orphan = self.write("orphan.svg", age=3600)
+        temp = self.write(f".{'ab' * 16}.svg", age=3600)
+        fresh = self.write("fresh.svg")
+        unrelated = self.write(".keep", age=3600)
+        sample = os.path.join(self.dir, "8dceb768-6b9a-46cc-b0e2-dcd6b0aa95be_interfaces.png")
+        with open(sample, "wb") as f:
+            f.write(b"x")
+        os.utime(sample, (time.time() - 3600, time.time() - 3600))
+        store = ArtifactStore(self.dir)
+        self.assertEqual(store.stats()["file_count"], 3)
+        self.assertEqual(store.sweep_orphans({kept}, grace=60), 2)
+        self.assertTrue(os.path.exists(kept))
+        self.assertTrue(os.path.exists(fresh))
+        self.assertFalse(os.path.exists(orphan))
+        self.assertFalse(os.path.exists(temp))
+        self.assertTrue(os.path.exists(unrelated))
+        # Sample diagrams under the older per-upload names are not the store's to delete
+        self.assertTrue(os.path.exists(sample))
+        self.assertEqual(store.stats()["file_count"], 2)
+
+    def test_delete_keeps_shared_diagrams(self):
+        """Deleting a config removes only the files no other config references"""
+        shared, own = self.write("shared.svg"), self.write("own.svg")
+        store = MemoryConfigStore()
+        network = {"devices": []}
+        store.put("a", {"filename": "a.conf", "network": network,
+                        "diagrams": {"topology": {"svg": shared}, "vlans": {"svg": own}}})
+        store.put("b", {"filename": "b.conf", "network": network, "diagrams": {"topology": {"svg": shared}}})
+        artifacts = ArtifactStore(self.dir)
+        client = TestClient(main.app)
+        with mock.patch.object(main, "config_storage", store), mock.patch.object(main, "artifacts", artifacts):
+            self.assertEqual(client.delete("/config/a").status_code, 200)
+            self.assertEqual(client.get("/artifacts/stats").json()["deleted"], 1)
+        self.assertTrue(os.path.exists(shared))
+        self.assertFalse(os.path.exists(own))
+
+if __name__ == '__main__':
+    unittest.main()
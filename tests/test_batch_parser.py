@@ -0,0 +1,128 @@
+import io
+import os
+import tarfile
+import tempfile
+import unittest
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.parsers.batch_parser import ArchiveLimitError, BatchParser, iter_archive, iter_directory
+
+BROKEN = b"\xff\xfe not utf-8"
+
+class TestBatchParser(unittest.TestCase):
+    def setUp(self):
+        config_path = os.path.join(os.path.dirname(__file__), '..', 'test-configs', 'ex3300-1.conf')
+        with open(config_path, 'r') as f:
+            self.config_text = f.read()
+        self.second = self.config_text.replace("host-name ex3300;", "host-name ex3300-2;")
+        self.members = [
+            ("site/ex3300-1.conf", self.config_text.encode("utf-8")),
+            ("site/ex3300-2.conf", self.second.encode("utf-8")),
+            ("site/broken.conf", BROKEN),
+            ("site/README.md", b"not a config"),
+        ]
+
+    def _tar(self) -> io.BytesIO:
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+            for name, data in self.members:
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+        buffer.seek(0)
+        return buffer
+
+    def _zip(self) -> io.BytesIO:
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            for name, data in self.members:
+                archive.writestr(name, data)
+        buffer.seek(0)
+        return buffer
+
+    def test_archives_yield_config_members(self):
+        """Tar and zip archives yield the same config members and skip other files"""
+        tar_names = [name for name, _ in iter_archive(self._tar(), "site.tar.gz")]
+        zip_names = [name for name, _ in iter_archive(self._zip(), "site.zip")]
+        self.assertEqual(tar_names, ["site/ex3300-1.conf", "site/ex3300-2.conf", "site/broken.conf"])
+        self.assertEqual(zip_names, tar_names)
+
+    def test_member_size_limit(self):
+        """An oversized member is reported in place and the rest of the archive is still read"""
+        for archive, filename in ((self._zip(), "site.zip"), (self._tar(), "site.tar.gz")):
+            items = list(iter_archive(archive, filename, max_member_bytes=100))
+            self.assertEqual([name for name, _ in items], ["site/ex3300-1.conf", "site/ex3300-2.conf", "site/broken.conf"])
+            self.assertIsInstance(items[0][1], ArchiveLimitError)
+            self.assertIsInstance(items[1][1], ArchiveLimitError)
+            self.assertEqual(items[2][1], BROKEN)
+
+    def test_total_size_limit(self):
+        """Reading stops at the member that takes the archive past its total limit"""
+        limit = len(self.members[0][1]) + 10
+        for archive, filename in ((self._zip(), "site.zip"), (self._tar(), "site.tar.gz")):
+            items = list(iter_archive(archive, filename, max_total_bytes=limit))
+            self.assertEqual([name for name, _ in items], ["site/ex3300-1.conf", "site/ex3300-2.conf"])
+            self.assertIn("byte limit", str(items[1][1]))
+
+        result = BatchParser(workers=2).parse(iter_archive(self._tar(), "site.tar.gz", max_total_bytes=limit))
+        self.assertEqual([device.hostname for device in result.network.devices], ["ex3300"])
+        self.assertEqual(result.errors[0]["file"], "site/ex3300-2.conf")
+        self.assertTrue(result.errors[0]["error"].startswith("ArchiveLimitError"))
+
+    def test_errors_do_not_abort_batch(self):
+        """A broken file is reported while the rest merge into one network"""
+        result = BatchParser(workers=1).parse(iter_archive(self._tar(), "site.tar.gz"))
+        hostnames = [device.hostname for device in result.network.devices]
+        self.assertEqual(hostnames, ["ex3300", "ex3300-2"])
+        self.assertEqual(len(result.errors), 1)
+        self.assertEqual(result.errors[0]["file"], "site/broken.conf")
+        self.assertEqual(result.summary()["file_count"], 3)
+
+    def test_process_pool_matches_serial(self):
+        """Pooled parsing keeps file order and matches the serial result"""
+        items = [(name, data) for name, data in self.members[:3]]
+        serial = BatchParser(workers=1).parse(items)
+        pooled = BatchParser(workers=2).parse(items)
+        self.assertEqual(pooled.network.model_dump(), serial.network.model_dump())
+        self.assertEqual(pooled.files, serial.files)
+
+    def test_directory_iteration(self):
+        """Directories are walked in sorted order"""
+        with tempfile.TemporaryDirectory() as root:
+            for name, data in self.members:
+                path = os.path.join(root, name)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "wb") as f:
+                    f.write(data)
+            names = [name for name, _ in iter_directory(root)]
+        self.assertEqual(names, [os.path.join("site", n) for n in ("broken.conf", "ex3300-1.conf", "ex3300-2.conf")])
+
+    def test_shared_pool_is_reused(self):
+        """Batches given a long-lived pool submit to it and leave it running"""
+        items = [(name, data) for name, data in self.members[:3]]
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            first = BatchParser(workers=2, pool=pool).parse(items)
+            second = BatchParser(workers=2, pool=pool).parse(items)
+        self.assertEqual(first.network.model_dump(), BatchParser(workers=1).parse(items).network.model_dump())
+        self.assertEqual(second.files, first.files)
+
+    def test_batch_workers_are_capped(self):
+        """Asking a batch upload for more workers than the shared pool has is rejected"""
+        client = TestClient(main.app)
+        response = client.post("/upload/batch", params={"workers": main.batch_pool.max_workers + 1},
+                               files={"file": ("site.tar.gz", self._tar().getvalue())})
+        self.assertEqual(response.status_code, 422)
+        with mock.patch.object(main, "BatchParser", wraps=BatchParser) as parser:
+            response = client.post("/upload/batch", params={"workers": 1},
+                                   files={"file": ("site.tar.gz", self._tar().getvalue())})
+        self.assertEqual(response.status_code, 200)
+        self.assertIs(parser.call_args.kwargs["pool"], main.batch_pool)
+        client.delete(f"/config/{response.json()['config_id']}")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import json
+import os
+import unittest
+
+from app.models.compact import CompactNetwork
+from app.parsers.juniper_parser import JuniperParser
+from app.services.storage import MemoryConfigStore
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'test-configs', 'ex3300-1.conf')
+
+class TestCompactNetwork(unittest.TestCase):
+    def setUp(self):
+        with open(CONFIG_PATH, 'r') as f:
+            self.network = JuniperParser().parse_config(f.read())
+        self.data = self.network.model_dump(mode="json")
+
+    def test_round_trip(self):
+        """The dict form comes back byte-for-byte and the models compare equal"""
+        for compact in (CompactNetwork.from_network(self.network), CompactNetwork.from_dict(self.data)):
+            self.assertEqual(json.dumps(compact.to_dict()), json.dumps(self.data))
+            self.assertEqual(compact.to_network(), self.network)
+        self.assertEqual(compact.hostnames(), ["ex3300"])
+        self.assertEqual(compact.interface_count, 57)
+
+    def test_addresses_are_packed(self):
+        interfaces = CompactNetwork.from_dict(self.data).devices[0].interfaces
+        ips = interfaces.columns[1]
+        self.assertEqual(ips.text, {})
+        self.assertEqual([ip for ip in interfaces.column("ip") if ip], ["192.168.254.9/24"])
+
+    def test_strings_are_shared_between_configs(self):
+        first, second = (CompactNetwork.from_dict(json.loads(json.dumps(self.data))) for _ in range(2))
+        self.assertIs(first.devices[0].interfaces.column("name")[0], second.devices[0].interfaces.column("name")[0])
+
+    def test_values_that_do_not_pack_survive(self):
+        data = {
+            "devices": [{
+                "hostname": "edge",
+                "interfaces": [
+                    {"name": "a", "ip": "2001:db8::1/64", "vlan_members": []},
+                    {"name": "b", "ip": "10.1/8"},
+                    {"name": "c", "ip": "10.0.0.1/024"},
+                    {"name": "d", "ip": "10.0.0.1/-1"}
+                ],
+                "routing": {"routes": [{"destination": "0.0.0.0/0", "next_hop": "discard", "protocol": "static",
+                                        "metric": None, "preference": 5}],
+                            "vlans": None, "policy": {"name": "p"}}
+            }, {"hostname": "bare", "interfaces": [], "routing": None}],
+            "connections": [{"a": "edge", "b": "bare"}],
+            "topology": None
+        }
+        restored = CompactNetwork.from_dict(data).to_dict()
+        interfaces = restored["devices"][0]["interfaces"]
+        self.assertEqual([interface["ip"] for interface in interfaces],
+                         ["2001:db8::1/64", "10.1/8", "10.0.0.1/024", "10.0.0.1/-1"])
+        self.assertEqual([interface["vlan_members"] for interface in interfaces], [[], None, None, None])
+        self.assertEqual(restored["devices"][0]["routing"], data["devices"][0]["routing"])
+        self.assertIsNone(restored["devices"][1]["routing"])
+        self.assertEqual(restored["connections"], data["connections"])
+
+    def test_memory_store_holds_compact_networks(self):
+        store = MemoryConfigStore()
+        store.put("a", {"filename": "a.conf", "diagrams": {}, "network": self.data})
+        self.assertIsInstance(store._records["a"]["network"], CompactNetwork)
+        self.assertEqual(store.get("a")["network"], self.data)
+        self.assertEqual(store.list(hostname="ex3300")[0]["interface_count"], 57)
+        self.assertEqual(store.delete("a")["network"], self.data)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+import gzip
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.parsers.juniper_parser import JuniperParser
+from app.services.artifacts import ArtifactStore
+from app.services.compression import (
+    CompressedBodies, CompressionStats, compress_all, compressed_siblings, negotiate, precompress_file
+)
+from app.services.mermaid_cache import MermaidCache
+from app.services.storage import MemoryConfigStore
+
+class TestCompression(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_negotiate(self):
+        available = {"gzip": b""}
+        self.assertEqual(negotiate("gzip, deflate", available), "gzip")
+        self.assertEqual(negotiate("br;q=1.0, gzip;q=0.5", available), "gzip")
+        self.assertEqual(negotiate("*", available), "gzip")
+        self.assertIsNone(negotiate("gzip;q=0", available))
+        self.assertIsNone(negotiate("identity", available))
+        self.assertIsNone(negotiate(None, available))
+        self.assertIsNone(negotiate("gzip", {}))
+
+    def test_small_bodies_are_not_compressed(self):
+        self.assertEqual(compress_all(b"{}"), {})
+        body = b'{"interfaces": []}' * 200
+        self.assertEqual(gzip.decompress(compress_all(body)["gzip"]), body)
+
+    def test_precompressed_file_siblings(self):
+        path = os.path.join(self.tmp.name, "interfaces.svg")
+        with open(path, "wb") as f:
+            f.write(b"<svg>" + b"<rect/>" * 1000 + b"</svg>")
+        self.assertIn(".gz", precompress_file(path))
+        siblings = compressed_siblings(path)
+        self.assertEqual(siblings["gzip"], path + ".gz")
+        with open(path, "rb") as f, gzip.open(siblings["gzip"]) as g:
+            self.assertEqual(f.read(), g.read())
+
+    def test_bodies_compressed_once_per_etag(self):
+        bodies = CompressedBodies(max_entries=1)
+        body = b"x" * 4096
+        with mock.patch("app.services.compression.compress_all", wraps=compress_all) as compress:
+            first = bodies.get_or_compress('"a"', body)
+            self.assertIs(bodies.get_or_compress('"a"', body), first)
+            self.assertEqual(compress.call_count, 1)
+            bodies.get_or_compress('"b"', body)
+            bodies.get_or_compress('"a"', body)
+            self.assertEqual(compress.call_count, 3)
+
+    def test_stats_report_bytes_saved(self):
+        stats = CompressionStats()
+        stats.record("gzip", 1000, 200)
+        stats.record(None, 50, 50)
+        report = stats.stats()
+        self.assertEqual(report["bytes_saved"], 800)
+        self.assertEqual(report["encodings"]["identity"]["responses"], 1)
+
+    def test_artifact_store_keeps_siblings_with_their_file(self):
+        name = f"interfaces_{'a' * 32}.svg"
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "wb") as f:
+            f.write(b"<svg>" + b"<rect/>" * 1000 + b"</svg>")
+        precompress_file(path)
+        store = ArtifactStore(self.tmp.name)
+        self.assertEqual(store.stats()["file_count"], 1)
+        self.assertEqual(store.total_bytes, os.path.getsize(path) + os.path.getsize(path + ".gz"))
+        self.assertEqual(store.sweep_orphans({path}), 0)
+        self.assertTrue(os.path.exists(path + ".gz"))
+        store.remove([path])
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+class TestCompressedResponses(unittest.TestCase):
+    def setUp(self):
+        config_path = os.path.join(os.path.dirname(__file__), '..', 'test-configs', 'ex3300-1.conf')
+        with open(config_path, 'r') as f:
+            network = JuniperParser().parse_config(f.read()).model_dump(mode="json")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.svg = os.path.join(self.tmp.name, f"interfaces_{'b' * 32}.svg")
+        with open(self.svg, "wb") as f:
+            f.write(b"<svg>" + b"<rect/>" * 5000 + b"</svg>")
+        precompress_file(self.svg)
+        self.store = store = MemoryConfigStore()
+        store.put("a", {"filename": "a.conf", "config_path": config_path, "network": network,
+                        "diagrams": {"interfaces": {"svg": self.svg}}})
+        self.stats = CompressionStats()
+        self.client = TestClient(main.app)
+        patches = [mock.patch.object(main, "config_storage", store),
+                   mock.patch.object(main, "artifacts", ArtifactStore(self.tmp.name)),
+                   mock.patch.object(main, "compression_stats", self.stats),
+                   mock.patch.object(main, "compressed_bodies", CompressedBodies()),
+                   mock.patch.object(main, "mermaid_cache", MermaidCache())]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def get_svg(self, **headers):
+        return self.client.get("/diagram/a", params={"diagram_type": "interfaces", "format": "svg"}, headers=headers)
+
+    def test_svg_served_precompressed(self):
+        with open(self.svg, "rb") as f:
+            original = f.read()
+        encoded = self.get_svg(**{"Accept-Encoding": "gzip"})
+        self.assertEqual(encoded.headers["content-encoding"], "gzip")
+        self.assertEqual(encoded.headers["vary"], "Accept-Encoding")
+        self.assertTrue(encoded.headers["etag"].endswith('-gzip"'))
+        self.assertEqual(encoded.content, original)
+        self.assertEqual(encoded.num_bytes_downloaded, os.path.getsize(self.svg + ".gz"))
+
+        plain = self.get_svg(**{"Accept-Encoding": "identity"})
+        self.assertNotIn("content-encoding", plain.headers)
+        self.assertEqual(plain.num_bytes_downloaded, len(original))
+        # A copy only validates the encoding it was sent in
+        repeat = self.get_svg(**{"Accept-Encoding": "gzip", "If-None-Match": encoded.headers["etag"]})
+        self.assertEqual(repeat.status_code, 304)
+        self.assertEqual(repeat.headers["etag"], encoded.headers["etag"])
+        self.assertEqual(repeat.headers["vary"], "Accept-Encoding")
+        switched = self.get_svg(**{"Accept-Encoding": "gzip", "If-None-Match": plain.headers["etag"]})
+        self.assertEqual(switched.status_code, 200)
+        self.assertEqual(switched.headers["content-encoding"], "gzip")
+        self.assertEqual(switched.content, original)
+        self.assertGreater(self.stats.stats()["bytes_saved"], 0)
+
+    def test_parse_served_compressed(self):
+        plain = self.client.get("/parse/a", headers={"Accept-Encoding": "identity"})
+        encoded = self.client.get("/parse/a", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(encoded.headers["content-encoding"], "gzip")
+        self.assertEqual(encoded.json(), plain.json())
+        self.assertLess(encoded.num_bytes_downloaded, plain.num_bytes_downloaded)
+        self.assertEqual(self.stats.stats()["encodings"]["gzip"]["responses"], 1)
+        self.assertIn("compression", self.client.get("/cache/stats").json())
+
+        # A client holding the gzip body that now only accepts identity gets the body, not a 304
+        revalidated = self.client.get("/parse/a", headers={"Accept-Encoding": "identity",
+                                                           "If-None-Match": encoded.headers["etag"]})
+        self.assertEqual(revalidated.status_code, 200)
+        self.assertEqual(revalidated.headers["etag"], plain.headers["etag"])
+        self.assertEqual(revalidated.json(), plain.json())
+
+if __name__ == '__main__':
+    unittest.main()
+
+    def test_encodings_persisted_with_the_config(self):
+        """Bodies compressed once stay with the config, so an emptied LRU never compresses on a request"""
+        record = {"filename": "b.conf", "config_path": None, "network": self.store.get("a")["network"],
+                  "diagrams": {}}
+        record["network_json"] = main.dumps(record["network"])
+        main._precompress_parse("b", record)
+        self.store.put("b", record)
+        self.assertIn("gzip", self.store.get_encoded(record["parse_etag"]))
+
+        mermaid = {"diagram_type": "interfaces", "format": "mermaid"}
+        with mock.patch.object(main, "run_in_threadpool", wraps=main.run_in_threadpool) as threadpool:
+            # "a" was stored without encodings: its /parse body is compressed off the loop, then kept
+            self.client.get("/parse/a", headers={"Accept-Encoding": "gzip"})
+            self.assertEqual(threadpool.call_count, 1)
+        self.client.get("/diagram/a", params=mermaid, headers={"Accept-Encoding": "gzip"})
+
+        with mock.patch.object(main, "compressed_bodies", CompressedBodies()), \
+                mock.patch.object(main, "compress_all") as compress:
+            for path in ("/parse/a", "/parse/b"):
+                encoded = self.client.get(path, headers={"Accept-Encoding": "gzip"})
+                self.assertEqual(encoded.headers["content-encoding"], "gzip")
+                self.assertEqual(encoded.json()["config_id"], path[-1])
+            encoded = self.client.get("/diagram/a", params=mermaid, headers={"Accept-Encoding": "gzip"})
+            self.assertEqual(encoded.headers["content-encoding"], "gzip")
+            compress.assert_not_called()
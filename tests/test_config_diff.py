@@ -0,0 +1,165 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.analysis.config_diff import TreeDiff, diff_configs, model_effects
+from app.parsers.config_tree import parse_config_tree
+from app.parsers.juniper_parser import JuniperParser
+from app.services.storage import MemoryConfigStore
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'test-configs', 'ex3300-1.conf')
+
+class TestConfigDiff(unittest.TestCase):
+    def setUp(self):
+        with open(CONFIG_PATH, 'r') as f:
+            self.old = f.read()
+
+    def test_subtree_digests(self):
+        """Equal subtrees hash equal; comments and layout do not count, markers do"""
+        a = parse_config_tree("interfaces {\n    ge-0/0/0 {\n        disable;\n    }\n}\n")
+        b = parse_config_tree("# note\ninterfaces { ge-0/0/0 { disable; } }")
+        c = parse_config_tree("interfaces {\n    inactive: ge-0/0/0 {\n        disable;\n    }\n}\n")
+        self.assertEqual(a.digest, b.digest)
+        self.assertNotEqual(a.digest, c.digest)
+        self.assertEqual(a.children[0].children[0].children[0].digest, c.children[0].children[0].children[0].digest)
+
+    def test_layout_only_changes(self):
+        """Children whose text changed but whose tree did not are parsed and then skipped by digest"""
+        result = diff_configs(self.old, self.old.replace("\n", "\n\n", 5))
+        self.assertEqual(result["changes"], [])
+        stats = result["stats"]
+        self.assertEqual(stats["stanzas"] - stats["stanzas_unchanged"], 1)
+        self.assertEqual(stats["nodes_compared"], stats["subtrees_skipped"])
+
+    def test_changed_statement_skips_unchanged_subtrees(self):
+        new = self.old.replace('description "uplink to edge router";', 'description "uplink to core";')
+        result = diff_configs(self.old, new)
+        self.assertEqual(result["changes"], [{"change": "changed", "path": ["interfaces", "ge-0/0/0"],
+                                              "old": "description uplink to edge router",
+                                              "new": "description uplink to core"}])
+        # Only ge-0/0/0 of the changed stanza is parsed
+        stats = result["stats"]
+        self.assertEqual(stats["stanzas"] - stats["stanzas_unchanged"], 1)
+        self.assertEqual(stats["children_unchanged"], 56)
+        self.assertEqual((stats["nodes_compared"], stats["subtrees_skipped"]), (4, 2))
+
+    def test_unusual_layout_falls_back_to_full_parse(self):
+        result = diff_configs("interfaces { ge-0/0/0 { disable; } }\n", "interfaces { ge-0/0/0 { mtu 9000; } }\n")
+        self.assertEqual([(change["change"], change["path"], change["node"]) for change in result["changes"]],
+                         [("removed", ["interfaces", "ge-0/0/0"], "disable"), ("added", ["interfaces", "ge-0/0/0"], "mtu 9000")])
+
+    def test_added_removed_and_deactivated(self):
+        new = self.old.replace("    ge-0/0/23 {", "    inactive: ge-0/0/23 {")
+        new = new.replace("members oob;", "members oob;\n                    members 200;", 1)
+        new = new.replace("static {", "static {\n        route 10.0.0.0/8 discard;")
+        changes = diff_configs(self.old, new)["changes"]
+        self.assertIn({"change": "changed", "path": ["interfaces"],
+                       "old": "ge-0/0/23", "new": "inactive: ge-0/0/23"}, changes)
+        # The existing member is matched by value, so only the new one is reported
+        self.assertIn({"change": "added", "path": ["interfaces", "ge-0/0/24", "unit 0", "family ethernet-switching", "vlan"],
+                       "node": "members 200"}, changes)
+        self.assertIn({"change": "added", "path": ["routing-options", "static"],
+                       "node": "route 10.0.0.0/8 discard"}, changes)
+        self.assertEqual(len(changes), 3)
+
+    def test_split_stanzas_match_full_tree_diff(self):
+        """Dropping unchanged children before parsing keys repeated keywords as a full-tree diff does"""
+        old = ("system {\n    host-name a;\n    name-server 10.0.0.1;\n    name-server 10.0.0.2;\n"
+               "    domain-name x.net;\n}\n")
+        cases = [
+            old.replace("10.0.0.2", "10.0.0.3"),
+            old.replace("    name-server 10.0.0.2;\n", ""),
+            old.replace("x.net", "y.net"),
+            self.old.replace("members oob;", "members 200;", 1),
+        ]
+        for index, new in enumerate(cases):
+            base = self.old if index == 3 else old
+            full = TreeDiff()
+            full.compare(parse_config_tree(base).children, parse_config_tree(new).children)
+            result = diff_configs(base, new)
+            self.assertGreater(result["stats"]["children_unchanged"], 0)
+            self.assertEqual(result["changes"], full.changes)
+        self.assertEqual(diff_configs(old, cases[0])["changes"], [
+            {"change": "removed", "path": ["system"], "node": "name-server 10.0.0.2"},
+            {"change": "added", "path": ["system"], "node": "name-server 10.0.0.3"}
+        ])
+
+    def test_set_format_diff(self):
+        """display set configs are diffed line by line rather than reported unchanged"""
+        old = ("root@sw> show configuration | display set\n"
+               "set system host-name sw\n"
+               "set system name-server 10.0.0.1\n"
+               "set system name-server 10.0.0.2\n"
+               "set interfaces ge-0/0/1 description NAS\n"
+               "set interfaces ge-0/0/1 unit 0 family ethernet-switching vlan members oob\n"
+               "set interfaces ge-0/0/2 disable\n")
+        new = (old.replace("members oob", "members 200").replace("10.0.0.2", "10.0.0.3")
+               .replace("set interfaces ge-0/0/2 disable\n", "")
+               + 'set interfaces ge-0/0/3 description "new port"\ndeactivate interfaces ge-0/0/3\n')
+        result = diff_configs(old, new)
+        self.assertEqual(result["changes"], [
+            {"change": "removed", "path": ["system"], "node": "name-server 10.0.0.2"},
+            {"change": "changed", "path": ["interfaces"],
+             "old": "ge-0/0/1 unit 0 family ethernet-switching vlan members oob",
+             "new": "ge-0/0/1 unit 0 family ethernet-switching vlan members 200"},
+            {"change": "removed", "path": ["interfaces"], "node": "ge-0/0/2 disable"},
+            {"change": "added", "path": ["system"], "node": "name-server 10.0.0.3"},
+            {"change": "added", "path": ["interfaces"], "node": "ge-0/0/3 description new port"},
+            {"change": "added", "path": ["interfaces"], "node": "inactive: ge-0/0/3"},
+        ])
+        self.assertEqual(result["summary"], {"added": 3, "removed": 2, "changed": 1})
+        self.assertEqual(result["stats"]["children_unchanged"], 3)
+        self.assertEqual(diff_configs(old, old)["changes"], [])
+        with self.assertRaises(ValueError):
+            diff_configs(old, self.old)
+
+    def test_model_effects(self):
+        new = self.old.replace("members oob;", "members 200;", 1)
+        new = new.replace("next-hop 192.168.254.254", "next-hop 192.168.254.1")
+        new = new.replace('description NAS;', 'description "NAS 2";')
+        parser = JuniperParser()
+        effects = model_effects(parser.parse_config(self.old).model_dump(mode="json"),
+                                parser.parse_config(new).model_dump(mode="json"))
+        self.assertEqual([(item["interface"], list(item["fields"])) for item in effects["interfaces"]["changed"]],
+                         [("ge-0/0/11", ["description"]), ("ge-0/0/24", ["vlan_members"])])
+        memberships = {item["vlan"]: (item["added"], item["removed"]) for item in effects["vlan_memberships"]}
+        self.assertEqual(memberships["oob"], ([], ["ge-0/0/24"]))
+        self.assertEqual([route["next_hop"] for route in effects["routes"]["added"]], ["192.168.254.1"])
+        self.assertEqual([route["next_hop"] for route in effects["routes"]["removed"]], ["192.168.254.254"])
+
+    def test_diff_endpoint(self):
+        new = self.old.replace('description NAS;', 'description "NAS 2";')
+        parser = JuniperParser()
+        with tempfile.TemporaryDirectory() as tmp:
+            new_path = os.path.join(tmp, "new.conf")
+            with open(new_path, "w") as f:
+                f.write(new)
+            store = MemoryConfigStore()
+            for config_id, path, text in (("old", CONFIG_PATH, self.old), ("new", new_path, new)):
+                store.put(config_id, {"filename": "a.conf", "config_path": path, "diagrams": {},
+                                      "network": parser.parse_config(text).model_dump(mode="json")})
+            client = TestClient(main.app)
+            with mock.patch.object(main, "config_storage", store):
+                response = client.get("/diff/old/new")
+                self.assertEqual(response.status_code, 200)
+                body = response.json()
+                self.assertEqual(body["summary"], {"added": 0, "removed": 0, "changed": 1})
+                self.assertEqual(body["effects"]["interfaces"]["changed"][0]["interface"], "ge-0/0/11")
+                repeat = client.get("/diff/old/new", headers={"If-None-Match": response.headers["etag"]})
+                self.assertEqual(repeat.status_code, 304)
+                self.assertEqual(client.get("/diff/old/missing").status_code, 404)
+
+            set_path = os.path.join(tmp, "set.conf")
+            with open(set_path, "w") as f:
+                f.write("set system host-name ex3300\n")
+            store.put("set", {"filename": "set.conf", "config_path": set_path, "diagrams": {},
+                              "network": store.get("old")["network"]})
+            with mock.patch.object(main, "config_storage", store):
+                self.assertEqual(client.get("/diff/old/set").status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
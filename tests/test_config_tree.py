@@ -0,0 +1,117 @@
+import unittest
+import os
+from app.parsers.config_tree import parse_config_tree, Block, Statement
+from app.parsers.lazy_config import LazyConfig
+from app.parsers.juniper_parser import JuniperParser
+
+SAMPLE = '''root@lab> show configuration
+## Last commit: 2025-06-12 04:38:03 EDT by root
+version 15.1R7.9;
+system {
+    host-name lab-sw1;
+    root-authentication {
+        encrypted-password "$1$abc"; ## SECRET-DATA
+    }
+}
+interfaces {
+    /* uplink to core */
+    ge-0/0/0 {
+        description "uplink \\"core\\"";
+        unit 0 {
+            family ethernet-switching {
+                vlan {
+                    members [ 100 200 ];
+                }
+            }
+        }
+    }
+    inactive: ge-0/0/1 {
+        disable;
+    }
+}
+
+{master:0}
+'''
+
+class TestConfigTree(unittest.TestCase):
+    def setUp(self):
+        self.tree = parse_config_tree(SAMPLE)
+
+    def test_top_level_structure(self):
+        """Prompt lines are skipped and top-level stanzas become children"""
+        self.assertEqual([child.keyword for child in self.tree.children], ["version", "system", "interfaces"])
+        self.assertIsInstance(self.tree.children[0], Statement)
+        self.assertIsInstance(self.tree.children[1], Block)
+
+    def test_find_and_values(self):
+        """Blocks can be addressed by path and statements read by keyword"""
+        system = self.tree.find("system")
+        self.assertEqual(system.get_value("host-name"), "lab-sw1")
+        vlan = self.tree.find("interfaces", "ge-0/0/0", "unit 0", "family ethernet-switching", "vlan")
+        self.assertEqual(vlan.get("members").args, ["100", "200"])
+        self.assertIsNone(self.tree.find("interfaces", "ge-9/9/9"))
+
+    def test_quoted_strings(self):
+        """Quoted strings are unquoted and unescaped"""
+        interface = self.tree.find("interfaces", "ge-0/0/0")
+        self.assertEqual(interface.get_value("description"), 'uplink "core"')
+
+    def test_comments_and_annotations(self):
+        """Trailing comments attach to their statement, annotations to the next node"""
+        version = self.tree.children[0]
+        self.assertEqual(version.comments, ["Last commit: 2025-06-12 04:38:03 EDT by root"])
+        password = self.tree.find("system", "root-authentication").get("encrypted-password")
+        self.assertEqual(password.comments, ["SECRET-DATA"])
+        self.assertEqual(self.tree.find("interfaces", "ge-0/0/0").annotation, "uplink to core")
+
+    def test_inactive_marker(self):
+        """inactive: nodes are flagged and hidden from default lookups"""
+        interfaces = self.tree.find("interfaces")
+        self.assertEqual([b.name for b in interfaces.iter_blocks()], ["ge-0/0/0"])
+        all_blocks = list(interfaces.iter_blocks(include_inactive=True))
+        self.assertEqual(len(all_blocks), 2)
+        self.assertTrue(all_blocks[1].inactive)
+
+    def test_sample_config(self):
+        """The bundled sample parses into the expected stanzas"""
+        config_path = os.path.join(os.path.dirname(__file__), '..', 'test-configs', 'ex3300-1.conf')
+        with open(config_path, 'r') as f:
+            tree = parse_config_tree(f.read())
+        self.assertIn("vlans", [child.keyword for child in tree.children])
+        self.assertEqual(len(list(tree.find("vlans").iter_blocks())), 3)
+
+class TestLazyConfig(unittest.TestCase):
+    def test_sections_indexed_without_parsing(self):
+        """Stanza offsets are indexed up front but nothing is parsed yet"""
+        view = LazyConfig(SAMPLE)
+        self.assertEqual(view.section_names, ["version", "system", "interfaces"])
+        self.assertEqual(view.parsed_sections, [])
+
+    def test_section_parsed_once(self):
+        """A stanza is parsed on first access and memoized"""
+        view = LazyConfig(SAMPLE)
+        system = view.section("system")
+        self.assertEqual(system.get_value("host-name"), "lab-sw1")
+        self.assertIs(view.section("system"), system)
+        self.assertEqual(view.parsed_sections, ["system"])
+        self.assertEqual(view.find("interfaces", "ge-0/0/0").get_value("description"), 'uplink "core"')
+
+    def test_token_fallback_matches_fast_index(self):
+        """Unindented input falls back to a token scan with the same stanzas"""
+        flat = "system { host-name flat; } interfaces { ge-0/0/0 { disable; } }"
+        view = LazyConfig(flat)
+        self.assertEqual(view.section_names, ["system", "interfaces"])
+        self.assertEqual(view.find("system").get_value("host-name"), "flat")
+
+    def test_parser_skips_unused_stanzas(self):
+        """parse_config never parses stanzas the extractors do not read"""
+        config_path = os.path.join(os.path.dirname(__file__), '..', 'test-configs', 'ex3300-1.conf')
+        with open(config_path, 'r') as f:
+            config_text = f.read()
+        parser = JuniperParser()
+        parser.parse_config(config_text)
+        self.assertNotIn("protocols", parser.view.parsed_sections)
+        self.assertNotIn("snmp", parser.view.parsed_sections)
+
+if __name__ == '__main__':
+    unittest.main()
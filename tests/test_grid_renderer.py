@@ -0,0 +1,104 @@
+import os
+import tempfile
+import time
+import unittest
+import xml.etree.ElementTree as ET
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.parsers import grid_renderer
+from app.parsers.diagrams_generator import DiagramsGenerator
+from app.parsers.grid_renderer import GridRenderer, RasterizerMissingError, node_count, port_sort_key
+from app.parsers.juniper_parser import JuniperParser
+from app.services.storage import MemoryConfigStore
+from benchmarks.synthetic import make_config
+
+SVG_NS = "{http://www.w3.org/2000/svg}"
+
+class TestGridRenderer(unittest.TestCase):
+    def setUp(self):
+        config_path = os.path.join(os.path.dirname(__file__), '..', 'test-configs', 'ex3300-1.conf')
+        with open(config_path, 'r') as f:
+            self.network = JuniperParser().parse_config(f.read())
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_svg_lists_every_interface(self):
+        svg = GridRenderer().svg("interfaces", "Interface Diagram", self.network)
+        root = ET.fromstring(svg.encode("utf-8"))
+        titles = {element.text.split("\n")[0] for element in root.iter(f"{SVG_NS}title")}
+        self.assertEqual(titles, {interface.name for interface in self.network.devices[0].interfaces})
+
+    def test_vlan_groups_cover_all_ports(self):
+        svg = GridRenderer().svg("vlans", "VLAN Diagram", self.network)
+        root = ET.fromstring(svg.encode("utf-8"))
+        cells = [element for element in root.iter(f"{SVG_NS}title")]
+        self.assertGreaterEqual(len(cells), len(self.network.devices[0].interfaces))
+        self.assertIn("Untagged Ports (Default VLAN)", svg)
+
+    def test_output_is_deterministic(self):
+        renderer = GridRenderer()
+        self.assertEqual(renderer.svg("vlans", "t", self.network), renderer.svg("vlans", "t", self.network))
+
+    def test_natural_port_order(self):
+        names = ["ge-1/0/10", "ge-0/0/47", "ge-1/0/2", "ge-0/0/3"]
+        self.assertEqual(sorted(names, key=port_sort_key), ["ge-0/0/3", "ge-0/0/47", "ge-1/0/2", "ge-1/0/10"])
+
+    def test_thousands_of_interfaces_in_under_a_second(self):
+        network = JuniperParser().parse_config(make_config(4000))
+        renderer = GridRenderer()
+        start = time.perf_counter()
+        for diagram_type in ("interfaces", "vlans"):
+            renderer.svg(diagram_type, diagram_type, network)
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+    def test_generator_switches_to_grid_above_threshold(self):
+        """Above the threshold the SVG is written without Graphviz"""
+        count = node_count("interfaces", self.network)
+        small = DiagramsGenerator(self.tmp.name, grid_threshold=count + 1)
+        large = DiagramsGenerator(self.tmp.name, grid_threshold=count)
+        self.assertFalse(small._uses_grid("interfaces", self.network))
+        self.assertTrue(large._uses_grid("interfaces", self.network))
+        self.assertFalse(large._uses_grid("topology", self.network))
+        self.assertNotEqual(small.diagram_paths(self.network, "interfaces"), large.diagram_paths(self.network, "interfaces"))
+        
+        with mock.patch("app.parsers.diagrams_generator.LayoutOnceDiagram") as graphviz:
+            paths = large.generate_interface_diagram(self.network, "a")
+            graphviz.assert_not_called()
+        self.assertTrue(os.path.exists(paths["svg"]))
+        # Compressed once, alongside the render
+        self.assertTrue(os.path.exists(paths["svg"] + ".gz"))
+        # PNG is left for the first request
+        self.assertFalse(os.path.exists(paths["png"]))
+
+    def test_png_requires_cairosvg(self):
+        with mock.patch.object(grid_renderer, "cairosvg", None):
+            self.assertFalse(GridRenderer.can_rasterize())
+            with self.assertRaises(RasterizerMissingError):
+                GridRenderer().write("interfaces", "t", self.network, os.path.join(self.tmp.name, "x"), ["svg", "png"])
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_large_png_never_falls_back_to_graphviz(self):
+        """Without cairosvg a grid diagram's PNG is refused rather than laid out by Graphviz"""
+        generator = DiagramsGenerator(self.tmp.name, grid_threshold=node_count("interfaces", self.network))
+        paths = generator.diagram_paths(self.network, "interfaces")
+        store = MemoryConfigStore()
+        store.put("a", {"filename": "a.conf", "config_path": None, "network": self.network.model_dump(mode="json"),
+                        "diagrams": {"interfaces": paths}})
+        with mock.patch.object(grid_renderer, "cairosvg", None), \
+                mock.patch("app.parsers.diagrams_generator.LayoutOnceDiagram") as graphviz, \
+                mock.patch.object(main, "generator", generator), mock.patch.object(main, "config_storage", store):
+            client = TestClient(main.app)
+            png = client.get("/diagram/a", params={"diagram_type": "interfaces", "format": "png"})
+            self.assertEqual(png.status_code, 415)
+            svg = client.get("/diagram/a", params={"diagram_type": "interfaces", "format": "svg"})
+            self.assertEqual(svg.status_code, 200)
+            graphviz.assert_not_called()
+        self.assertFalse(os.path.exists(paths["png"]))
+
+if __name__ == '__main__':
+    unittest.main()
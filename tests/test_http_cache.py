@@ -0,0 +1,85 @@
+import os
+import tempfile
+import time
+import unittest
+from email.utils import formatdate
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.parsers.juniper_parser import JuniperParser
+from app.services.artifacts import ArtifactStore
+from app.services.http_cache import file_etag
+from app.services.storage import MemoryConfigStore
+
+class TestHttpCache(unittest.TestCase):
+    def setUp(self):
+        config_path = os.path.join(os.path.dirname(__file__), '..', 'test-configs', 'ex3300-1.conf')
+        with open(config_path, 'r') as f:
+            network = JuniperParser().parse_config(f.read()).model_dump(mode="json")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.png = os.path.join(self.tmp.name, "topology.png")
+        with open(self.png, "wb") as f:
+            f.write(os.urandom(64 * 1024))
+        store = MemoryConfigStore()
+        store.put("a", {"filename": "a.conf", "config_path": config_path, "network": network,
+                        "diagrams": {"topology": {"png": self.png}}})
+        self.client = TestClient(main.app)
+        patches = [mock.patch.object(main, "config_storage", store),
+                   mock.patch.object(main, "artifacts", ArtifactStore(self.tmp.name))]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def get_diagram(self, **headers):
+        return self.client.get("/diagram/a", params={"diagram_type": "topology", "format": "png"}, headers=headers)
+
+    def test_repeat_diagram_fetch_transfers_no_body(self):
+        first = self.get_diagram()
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(len(first.content), 64 * 1024)
+        self.assertIn("immutable", first.headers["cache-control"])
+        etag = first.headers["etag"]
+        self.assertEqual(etag, file_etag(self.png))
+        
+        for headers in ({"If-None-Match": etag}, {"If-None-Match": f'"other", W/{etag}'},
+                        {"If-Modified-Since": first.headers["last-modified"]}):
+            repeat = self.get_diagram(**headers)
+            self.assertEqual(repeat.status_code, 304)
+            self.assertEqual(repeat.content, b"")
+            self.assertEqual(repeat.headers["etag"], etag)
+        
+        self.assertEqual(self.get_diagram(**{"If-None-Match": '"stale"'}).status_code, 200)
+        old = formatdate(time.time() - 86400 * 365, usegmt=True)
+        self.assertEqual(self.get_diagram(**{"If-Modified-Since": old}).status_code, 200)
+
+    def test_range_requests(self):
+        etag = self.get_diagram().headers["etag"]
+        partial = self.get_diagram(Range="bytes=0-99")
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(len(partial.content), 100)
+        self.assertEqual(self.get_diagram(Range="bytes=100-199", **{"If-Range": etag}).status_code, 206)
+        self.assertEqual(self.get_diagram(Range="bytes=100-199", **{"If-Range": '"stale"'}).status_code, 200)
+
+    def test_etag_follows_file_content(self):
+        etag = file_etag(self.png)
+        with open(self.png, "wb") as f:
+            f.write(b"re-rendered")
+        self.assertNotEqual(file_etag(self.png), etag)
+
+    def test_parse_conditional_requests(self):
+        first = self.client.get("/parse/a")
+        etag = first.headers["etag"]
+        repeat = self.client.get("/parse/a", headers={"If-None-Match": etag})
+        self.assertEqual(repeat.status_code, 304)
+        self.assertEqual(repeat.content, b"")
+        projection = self.client.get("/parse/a", params={"sections": "vlans"}, headers={"If-None-Match": etag})
+        self.assertEqual(projection.status_code, 200)
+        self.assertNotEqual(projection.headers["etag"], etag)
+
+if __name__ == '__main__':
+    unittest.main()
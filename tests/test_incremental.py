@@ -0,0 +1,100 @@
+import os
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.parsers.incremental import parse_revision
+from app.parsers.juniper_parser import JuniperParser
+from app.services.parse_cache import ParseCache
+from app.services.storage import MemoryConfigStore
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'test-configs', 'ex3300-1.conf')
+
+def full_parse(config_text):
+    return JuniperParser().parse_config(config_text).model_dump(mode="json")
+
+class TestIncrementalParse(unittest.TestCase):
+    def setUp(self):
+        with open(CONFIG_PATH, 'r') as f:
+            self.old = f.read()
+        self.previous = full_parse(self.old)
+
+    def test_matches_full_parse(self):
+        """Every kind of edit gives the same model as parsing the new revision from scratch"""
+        edits = {
+            "description": lambda t: t.replace('description NAS;', 'description "NAS 2";'),
+            "vlan member": lambda t: t.replace("members oob;", "members 200;", 1),
+            "route": lambda t: t.replace("next-hop 192.168.254.254", "next-hop 192.168.254.1"),
+            "deactivated": lambda t: t.replace("    ge-0/0/23 {", "    inactive: ge-0/0/23 {"),
+            "added": lambda t: t.replace("interfaces {\n", "interfaces {\n    ge-9/0/0 {\n        disable;\n    }\n", 1),
+            "vlan": lambda t: t.replace("vlans {\n", "vlans {\n    lab {\n        vlan-id 300;\n    }\n", 1),
+            "unmodelled": lambda t: t.replace("snmp {", "snmp {\n    contact noc;"),
+        }
+        for name, edit in edits.items():
+            with self.subTest(name):
+                new = edit(self.old)
+                self.assertNotEqual(new, self.old)
+                revision = parse_revision(new, self.old, self.previous)
+                self.assertEqual(revision.network, full_parse(new))
+
+    def test_only_changed_interfaces_are_parsed(self):
+        new = self.old.replace('description NAS;', 'description "NAS 2";')
+        summary = parse_revision(new, self.old, self.previous).summary()
+        self.assertEqual(summary["stanzas_reparsed"], ["interfaces"])
+        self.assertEqual((summary["interfaces_reused"], summary["interfaces_reparsed"]), (56, 1))
+
+        unmodelled = parse_revision(self.old.replace("snmp {", "snmp {\n    contact noc;"), self.old, self.previous)
+        self.assertEqual(unmodelled.summary()["interfaces_reparsed"], 0)
+
+    def test_full_parse_needed(self):
+        self.assertIsNone(parse_revision(self.old.replace("host-name ex3300;", "host-name other;"), self.old, self.previous))
+        self.assertIsNone(parse_revision("set system host-name ex3300\n", self.old, self.previous))
+
+class TestRevisionChain(unittest.TestCase):
+    def test_upload_links_and_reuses_previous_revision(self):
+        with open(CONFIG_PATH, 'rb') as f:
+            first_bytes = f.read()
+        second_bytes = first_bytes.replace(b'description NAS;', b'description "NAS 2";')
+        client = TestClient(main.app)
+        with mock.patch.object(main, "config_storage", MemoryConfigStore()), \
+                mock.patch.object(main, "parse_cache", ParseCache(max_entries=8)):
+            first = client.post("/upload?render=lazy", files={"file": ("a.conf", first_bytes)}).json()
+            self.assertNotIn("revision", first)
+            second = client.post("/upload?render=lazy", files={"file": ("a.conf", second_bytes)}).json()
+            revision = second["revision"]
+            self.assertEqual(revision["parent_id"], first["config_id"])
+            self.assertTrue(revision["incremental"])
+            self.assertEqual(revision["interfaces_reparsed"], 1)
+            # Descriptions are not drawn on the overview or routing diagrams
+            self.assertEqual(sorted(revision["diagrams_changed"]), ["interfaces", "topology", "vlans"])
+            self.assertEqual(sorted(revision["diagrams_reused"]), ["overview", "routing"])
+
+            configs = client.get("/configs", params={"hostname": "ex3300"}).json()["configs"]
+            self.assertEqual([(c["config_id"], c["parent_id"]) for c in configs],
+                             [(first["config_id"], None), (second["config_id"], first["config_id"])])
+            self.assertEqual(client.get(f"/parse/{second['config_id']}").json()["network"],
+                             full_parse(second_bytes.decode("utf-8")))
+            for uploaded in (first, second):
+                client.delete(f"/config/{uploaded['config_id']}")
+
+    def test_configs_without_hostname_are_not_linked(self):
+        with open(CONFIG_PATH, 'rb') as f:
+            first_bytes = f.read().replace(b"host-name ex3300;", b"")
+        second_bytes = first_bytes.replace(b'description NAS;', b'description "NAS 2";')
+        client = TestClient(main.app)
+        with mock.patch.object(main, "config_storage", MemoryConfigStore()), \
+                mock.patch.object(main, "parse_cache", ParseCache(max_entries=8)), \
+                mock.patch.object(main, "parse_revision", wraps=parse_revision) as incremental:
+            first = client.post("/upload?render=lazy", files={"file": ("a.conf", first_bytes)}).json()
+            second = client.post("/upload?render=lazy", files={"file": ("b.conf", second_bytes)}).json()
+            self.assertNotIn("revision", second)
+            incremental.assert_not_called()
+            configs = client.get("/configs").json()["configs"]
+            self.assertEqual([c["parent_id"] for c in configs], [None, None])
+            for uploaded in (first, second):
+                client.delete(f"/config/{uploaded['config_id']}")
+
+if __name__ == '__main__':
+    unittest.main()
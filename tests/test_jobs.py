@@ -0,0 +1,141 @@
+import os
+import threading
+import time
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.services.jobs import JobQueue, QueueFullError, DONE, FAILED, CANCELLED
+
+def wait(job, timeout=5):
+    return job.future.result(timeout=timeout)
+
+class TestJobQueue(unittest.TestCase):
+    def test_stages_and_result(self):
+        """A finished job reports its result and a timing per stage"""
+        jobs = JobQueue(workers=1)
+
+        def work(job):
+            with job.stage("parse"):
+                pass
+            with job.stage("render"):
+                return 42
+
+        job = wait(jobs.submit("test", work))
+        data = job.to_dict()
+        self.assertEqual(data["state"], DONE)
+        self.assertEqual(data["result"], 42)
+        self.assertEqual([stage["name"] for stage in data["stages"]], ["parse", "render"])
+
+    def test_failure_is_recorded(self):
+        """Exceptions mark the job failed without killing the worker"""
+        jobs = JobQueue(workers=1)
+        failed = wait(jobs.submit("test", lambda job: 1 / 0))
+        self.assertEqual(failed.state, FAILED)
+        self.assertIn("division", failed.error)
+        self.assertEqual(wait(jobs.submit("test", lambda job: "ok")).result, "ok")
+
+    def test_cancel_queued_and_running(self):
+        """Queued jobs never start; running ones stop at their next stage"""
+        jobs = JobQueue(workers=1)
+        release = threading.Event()
+        started = threading.Event()
+
+        def blocking(job):
+            with job.stage("first"):
+                started.set()
+                release.wait(5)
+            with job.stage("second"):
+                return "unreachable"
+
+        running = jobs.submit("test", blocking)
+        queued = jobs.submit("test", lambda job: "never")
+        started.wait(5)
+        self.assertEqual(jobs.cancel(queued.id).state, CANCELLED)
+        jobs.cancel(running.id)
+        release.set()
+        self.assertEqual(wait(running).state, CANCELLED)
+        self.assertEqual([stage["name"] for stage in running.stages], ["first"])
+
+    def test_on_finish_runs_for_every_outcome(self):
+        """on_finish sees each job once it is done, failed or cancelled before it started"""
+        jobs = JobQueue(workers=1)
+        release = threading.Event()
+        finished = []
+        blocker = jobs.submit("test", lambda job: release.wait(5), on_finish=finished.append)
+        failing = jobs.submit("test", lambda job: 1 / 0, on_finish=finished.append)
+        queued = jobs.submit("test", lambda job: "never", on_finish=finished.append)
+        jobs.cancel(queued.id)
+        self.assertEqual(finished, [queued])
+        release.set()
+        wait(blocker)
+        wait(failing)
+        self.assertEqual([(job, job.state) for job in finished],
+                         [(queued, CANCELLED), (blocker, DONE), (failing, FAILED)])
+
+    def test_timeout(self):
+        """A job past its deadline fails at the next stage boundary"""
+        jobs = JobQueue(workers=1, timeout=0.01)
+
+        def slow(job):
+            with job.stage("first"):
+                time.sleep(0.05)
+            with job.stage("second"):
+                pass
+
+        job = wait(jobs.submit("test", slow))
+        self.assertEqual(job.state, FAILED)
+        self.assertIn("timeout", job.error)
+
+    def test_bounded_queue(self):
+        """Submissions beyond capacity are refused"""
+        jobs = JobQueue(workers=1, max_pending=1)
+        release = threading.Event()
+        started = threading.Event()
+        jobs.submit("test", lambda job: (started.set(), release.wait(5)))
+        started.wait(5)
+        jobs.submit("test", lambda job: None)
+        with self.assertRaises(QueueFullError):
+            jobs.submit("test", lambda job: None)
+        release.set()
+
+    def test_background_upload(self):
+        """A background upload returns 202 and the job carries the upload result"""
+        config_path = os.path.join(os.path.dirname(__file__), '..', 'test-configs', 'ex3300-1.conf')
+        with open(config_path, 'rb') as f:
+            config_bytes = f.read().replace(b"host-name ex3300;", b"host-name jobs-test;")
+        client = TestClient(main.app)
+        response = client.post("/upload?background=true&render=lazy", files={"file": ("a.conf", config_bytes)})
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()["job_id"]
+        wait(main.jobs.get(job_id))
+        job = client.get(f"/jobs/{job_id}").json()
+        self.assertEqual(job["state"], DONE)
+        self.assertEqual([stage["name"] for stage in job["stages"]], ["parse", "plan", "store"])
+        self.assertEqual(job["result"]["config_id"], job["config_id"])
+        client.delete(f"/config/{job['config_id']}")
+        self.assertEqual(client.get("/jobs/missing").status_code, 404)
+
+    def test_cancelled_upload_removes_spooled_file(self):
+        """An upload cancelled while queued leaves no spooled file behind"""
+        config_path = os.path.join(os.path.dirname(__file__), '..', 'test-configs', 'ex3300-1.conf')
+        with open(config_path, 'rb') as f:
+            config_bytes = f.read().replace(b"host-name ex3300;", b"host-name cancel-test;")
+        jobs = JobQueue(workers=1)
+        release = threading.Event()
+        blocker = jobs.submit("test", lambda job: release.wait(5))
+        with mock.patch.object(main, "jobs", jobs):
+            client = TestClient(main.app)
+            response = client.post("/upload?background=true", files={"file": ("a.conf", config_bytes)})
+            job = response.json()
+            spooled = os.path.join(main.settings.UPLOAD_DIR, f"{job['config_id']}.conf")
+            self.assertTrue(os.path.exists(spooled))
+            self.assertEqual(client.post(f"/jobs/{job['job_id']}/cancel").json()["state"], CANCELLED)
+        release.set()
+        wait(blocker)
+        self.assertFalse(os.path.exists(spooled))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+
+from app.analysis.links import infer_connections, build_segments
+from app.models.network import Device, Interface, Network
+from app.parsers.mermaid_generator import MermaidGenerator
+
+def device(hostname, *interfaces):
+    return Device(hostname=hostname, interfaces=[
+        Interface(name=name, ip=ip, description=description) for name, ip, description in interfaces
+    ])
+
+class TestLinkInference(unittest.TestCase):
+    def setUp(self):
+        self.devices = [
+            device("core1",
+                   ("xe-0/0/0", "10.1.0.0/31", "to leaf1"),
+                   ("xe-0/0/1", "10.1.0.2/30", None),
+                   ("irb", "192.168.10.1/24", None),
+                   ("lo0", "10.255.0.1/32", None),
+                   ("xe-0/0/5", None, "uplink-to-border1.example.net")),
+            device("leaf1",
+                   ("xe-0/0/48", "10.1.0.1/31", "core1 xe-0/0/0"),
+                   ("irb", "192.168.10.2/24", None),
+                   ("lo0", "10.255.0.1/32", None)),
+            device("leaf2",
+                   ("xe-0/0/48", "10.1.0.3/31", None),
+                   ("irb", "192.168.10.3/24", None)),
+            device("border1.example.net",
+                   ("ge-0/0/0", None, "core1")),
+        ]
+
+    def _by_subnet(self, connections):
+        return {connection["subnet"]: connection for connection in connections if connection["subnet"]}
+
+    def test_point_to_point_links(self):
+        """A /31 pair links, and a /30 against a /31 still pairs up"""
+        links = self._by_subnet(infer_connections(self.devices))
+        p2p = links["10.1.0.0/31"]
+        self.assertEqual(p2p["kind"], "point-to-point")
+        self.assertEqual([e["device"] for e in p2p["endpoints"]], ["core1", "leaf1"])
+        mismatched = links["10.1.0.0/30"]
+        self.assertEqual({e["device"] for e in mismatched["endpoints"]}, {"core1", "leaf2"})
+
+    def test_shared_segment_and_host_routes(self):
+        """Three devices on one /24 form a segment; identical loopbacks are ignored"""
+        links = self._by_subnet(infer_connections(self.devices))
+        segment = links["192.168.10.0/24"]
+        self.assertEqual(segment["kind"], "shared-segment")
+        self.assertEqual(len(segment["endpoints"]), 3)
+        self.assertNotIn("10.255.0.1/32", links)
+
+    def test_descriptions_corroborate_and_add_links(self):
+        """Descriptions naming a neighbor confirm subnet links or add new ones"""
+        connections = infer_connections(self.devices)
+        p2p = self._by_subnet(connections)["10.1.0.0/31"]
+        self.assertEqual(p2p["evidence"], ["subnet", "description"])
+
+        described = [c for c in connections if c["evidence"] == ["description"]]
+        self.assertEqual(len(described), 1)
+        endpoints = {e["device"]: e["interface"] for e in described[0]["endpoints"]}
+        self.assertEqual(endpoints, {"border1.example.net": "ge-0/0/0", "core1": "xe-0/0/5"})
+
+    def test_single_device(self):
+        """A lone device has no connections"""
+        self.assertEqual(infer_connections(self.devices[:1]), [])
+
+    def test_segments_are_sorted_sweep(self):
+        """Segments come out in address order regardless of input order"""
+        segments = build_segments(list(reversed(self.devices)))
+        starts = [segment.start for segment in segments]
+        self.assertEqual(starts, sorted(starts))
+
+    def test_mermaid_topology_draws_links(self):
+        """Inferred links appear as edges in the Mermaid topology"""
+        network = Network(devices=self.devices, connections=infer_connections(self.devices))
+        topology = MermaidGenerator().generate_topology(network)
+        self.assertIn("core1_xe_0/0/0 <-->|10.1.0.0/31| leaf1_xe_0/0/48", topology)
+        self.assertIn('segment_', topology)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.parsers.juniper_parser import JuniperParser
+from app.services.listings import ListingCache
+from app.services.pagination import decode_cursor, encode_cursor, natural_key, paginate
+from app.services.storage import MemoryConfigStore, SQLiteConfigStore
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'test-configs', 'ex3300-1.conf')
+
+class TestPagination(unittest.TestCase):
+    def test_natural_order(self):
+        names = ["ge-0/0/10", "xe-0/1/0", "ge-0/0/2", "ae0", "ge-0/0/1"]
+        self.assertEqual(sorted(names, key=natural_key), ["ae0", "ge-0/0/1", "ge-0/0/2", "ge-0/0/10", "xe-0/1/0"])
+
+    def test_pages_in_both_directions(self):
+        keys = range(7)
+        items = [{"n": value} for value in range(7)]
+        for descending in (False, True):
+            seen, after = [], None
+            while True:
+                page, after = paginate(keys, items, after, 3, descending)
+                seen.extend(item["n"] for item in page)
+                if after is None:
+                    break
+            self.assertEqual(seen, sorted(range(7), reverse=descending))
+
+    def test_cursor_is_tied_to_its_sort(self):
+        cursor = encode_cursor("name:asc", [0, ["ge-", 0], 3])
+        self.assertEqual(decode_cursor(cursor, "name:asc"), [0, ["ge-", 0], 3])
+        for bad in ("name:desc", "position:asc"):
+            with self.assertRaises(ValueError):
+                decode_cursor(cursor, bad)
+        with self.assertRaises(ValueError):
+            decode_cursor("not a cursor", "name:asc")
+        with self.assertRaises(ValueError):
+            paginate([[1], [2]], [{}, {}], ["x"], 1)
+        for key in ({"a": 1}, "x", True, 1.5, [0, {"a": 1}]):
+            with self.assertRaises(ValueError):
+                decode_cursor(encode_cursor("name:asc", key), "name:asc")
+
+class TestListingEndpoints(unittest.TestCase):
+    def setUp(self):
+        with open(CONFIG_PATH, 'r') as f:
+            self.network = JuniperParser().parse_config(f.read()).model_dump(mode="json")
+        self.store = MemoryConfigStore()
+        for index in range(5):
+            self.store.put(f"c{index}", {"filename": f"f{4 - index}.conf", "diagrams": {}, "network": self.network,
+                                         "uploaded_at": float(index + 1)})
+        self.client = TestClient(main.app)
+        patches = [mock.patch.object(main, "config_storage", self.store),
+                   mock.patch.object(main, "listing_cache", ListingCache(max_entries=8))]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def walk(self, url, **params):
+        """Every item of a paged endpoint, following next_cursor"""
+        items, key = [], "configs" if url == "/configs" else "items"
+        while True:
+            body = self.client.get(url, params=params).json()
+            items.extend(body[key])
+            if body["next_cursor"] is None:
+                return items
+            params["cursor"] = body["next_cursor"]
+
+    def test_configs_pages(self):
+        body = self.client.get("/configs", params={"limit": 2, "fields": "config_id,filename"}).json()
+        self.assertEqual(body["configs"], [{"config_id": "c0", "filename": "f4.conf"},
+                                           {"config_id": "c1", "filename": "f3.conf"}])
+        by_name = self.walk("/configs", sort="filename", order="desc", limit=2, fields="filename")
+        self.assertEqual([c["filename"] for c in by_name], [f"f{index}.conf" for index in range(4, -1, -1)])
+        other_sort = self.client.get("/configs", params={"sort": "filename", "cursor": body["next_cursor"]})
+        self.assertEqual(other_sort.status_code, 400)
+        self.assertEqual(self.client.get("/configs", params={"sort": "network"}).status_code, 422)
+
+    def test_configs_rejects_tampered_cursors(self):
+        """A cursor whose key is not [value, config_id] is a 400 from either store, not a 500"""
+        with tempfile.TemporaryDirectory() as tmp:
+            sqlite_store = SQLiteConfigStore(os.path.join(tmp, "configs.db"))
+            for config_id in ("c0", "c1"):
+                sqlite_store.put(config_id, {**self.store.get(config_id), "network": self.network})
+            for store in (self.store, sqlite_store):
+                with mock.patch.object(main, "config_storage", store):
+                    for key in (3, [1.0], [1.0, 2], [[1], "c0"], [1.0, "c0", "x"]):
+                        cursor = encode_cursor("uploaded_at:asc", key)
+                        self.assertEqual(self.client.get("/configs", params={"cursor": cursor}).status_code, 400)
+                    cursor = encode_cursor("uploaded_at:asc", [1.0, "c0"])
+                    body = self.client.get("/configs", params={"cursor": cursor}).json()
+                    self.assertEqual(body["configs"][0]["config_id"], "c1")
+            sqlite_store.close()
+
+    def test_config_summary(self):
+        body = self.client.get("/configs/c1").json()
+        self.assertEqual(body["devices"], [{"hostname": "ex3300", "interfaces": 57, "interfaces_with_ip": 1,
+                                            "interfaces_with_vlans": 8, "vlans": 2, "routes": 1}])
+        self.assertNotIn("network", body)
+        self.assertEqual(self.client.get("/configs/missing").status_code, 404)
+
+    def test_interface_pages(self):
+        """Pages joined up equal the whole sorted list, in either order"""
+        names = [interface["name"] for interface in self.network["devices"][0]["interfaces"]]
+        in_order = self.walk("/configs/c1/interfaces", limit=10, fields="name")
+        self.assertEqual([item["name"] for item in in_order], names)
+        self.assertEqual(in_order[0], {"name": names[0]})
+        by_name = self.walk("/configs/c1/interfaces", sort="name", order="desc", limit=7, fields="name")
+        self.assertEqual([item["name"] for item in by_name], sorted(names, key=natural_key, reverse=True))
+        # The listing is built once and paged from the cache
+        self.assertEqual(main.listing_cache.stats()["misses"], 2)
+
+    def test_filters(self):
+        members = self.client.get("/configs/c1/interfaces", params={"vlan": "oob", "fields": "name"}).json()
+        self.assertEqual((members["total"], members["items"]), (2, [{"name": "ge-0/0/24"}, {"name": "ge-0/0/25"}]))
+        with_ip = self.client.get("/configs/c1/interfaces", params={"has_ip": "true"}).json()
+        self.assertEqual([item["ip"] for item in with_ip["items"]], ["192.168.254.9/24"])
+        vlans = self.client.get("/configs/c1/vlans", params={"sort": "vlan_id", "order": "desc", "fields": "name"}).json()
+        self.assertEqual(vlans["items"], [{"name": "oob"}, {"name": "newlab200"}])
+        routes = self.client.get("/configs/c1/routes", params={"destination": "0.0."}).json()
+        self.assertEqual([route["next_hop"] for route in routes["items"]], ["192.168.254.254"])
+
+    def test_rejects_bad_requests(self):
+        self.assertEqual(self.client.get("/configs/c1/interfaces", params={"serial": "x"}).status_code, 400)
+        self.assertEqual(self.client.get("/configs/c1/interfaces", params={"sort": "vlan_id"}).status_code, 400)
+        self.assertEqual(self.client.get("/configs/c1/interfaces", params={"cursor": "zz"}).status_code, 400)
+        self.assertEqual(self.client.get("/configs/c1/widgets").status_code, 404)
+        self.assertEqual(self.client.get("/configs/missing/interfaces").status_code, 404)
+
+    def test_pages_are_cacheable(self):
+        response = self.client.get("/configs/c1/interfaces", params={"limit": 5})
+        repeat = self.client.get("/configs/c1/interfaces", params={"limit": 5},
+                                 headers={"If-None-Match": response.headers["etag"]})
+        self.assertEqual(repeat.status_code, 304)
+        self.client.delete("/config/c1")
+        self.assertEqual(self.client.get("/configs/c1/interfaces").status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.parsers.juniper_parser import JuniperParser
+from app.services.mermaid_cache import MermaidCache
+from app.services.storage import MemoryConfigStore
+
+class TestMermaidCache(unittest.TestCase):
+    def setUp(self):
+        config_path = os.path.join(os.path.dirname(__file__), '..', 'test-configs', 'ex3300-1.conf')
+        with open(config_path, 'r') as f:
+            self.network = JuniperParser().parse_config(f.read()).model_dump(mode="json")
+
+    def test_generated_once_per_config(self):
+        cache = MermaidCache(max_entries=1)
+        with mock.patch("app.services.mermaid_cache.MermaidGenerator") as generator:
+            generator.return_value.generate_all_diagrams.return_value = {"topology": "graph LR"}
+            cache.get_or_generate("a", self.network)
+            cache.get_or_generate("a", self.network)
+            self.assertEqual(generator.return_value.generate_all_diagrams.call_count, 1)
+            cache.get_or_generate("b", self.network)
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_vlan_diagram_uses_interface_descriptions(self):
+        sources = MermaidCache().get_or_generate("a", self.network)
+        described = [
+            interface for interface in self.network["devices"][0]["interfaces"]
+            if interface["description"] and interface["vlan_members"]
+        ]
+        self.assertTrue(described)
+        self.assertIn(described[0]["description"], sources["vlans"])
+
+    def test_mermaid_endpoints(self):
+        store = MemoryConfigStore()
+        store.put("a", {"filename": "a.conf", "network": self.network, "diagrams": {}})
+        client = TestClient(main.app)
+        with mock.patch.object(main, "config_storage", store), \
+                mock.patch.object(main, "mermaid_cache", MermaidCache()) as cache:
+            response = client.get("/diagram/a", params={"diagram_type": "vlans", "format": "mermaid"})
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.headers["content-type"].startswith("text/vnd.mermaid"))
+            self.assertTrue(response.text.startswith("graph LR"))
+            
+            bulk = client.get("/diagrams/a/mermaid").json()
+            self.assertEqual(set(bulk["diagrams"]), {"topology", "interfaces", "vlans", "routing", "overview"})
+            self.assertEqual(bulk["diagrams"]["vlans"], response.text)
+            self.assertEqual(cache.stats()["misses"], 1)
+            
+            self.assertEqual(client.get("/diagram/a", params={"diagram_type": "nope", "format": "mermaid"}).status_code, 400)
+            self.assertEqual(client.get("/diagrams/missing/mermaid").status_code, 404)
+            client.delete("/config/a")
+            self.assertIsNone(cache.get("a"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.models.juniper import Route, VLAN
+from app.parsers.juniper_parser import JuniperParser
+from app.services.parse_cache import ConfigHasher, ParseCache, config_digest
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        config_path = os.path.join(os.path.dirname(__file__), '..', 'test-configs', 'ex3300-1.conf')
+        with open(config_path, 'rb') as f:
+            self.config_bytes = f.read()
+        self.network = JuniperParser().parse_config(self.config_bytes.decode("utf-8"))
+
+    def test_digest_ignores_volatile_lines(self):
+        """Commit headers, prompts, CRLF and chunking do not change the digest"""
+        recaptured = (b"root@ex3300> show configuration | no-more\r\n"
+                      + self.config_bytes.replace(b"## Last commit: 2025", b"## Last commit: 2026").replace(b"\n", b"\r\n")
+                      + b"\r\n{master:0}\r\n")
+        self.assertEqual(config_digest(recaptured), config_digest(self.config_bytes))
+
+        hasher = ConfigHasher()
+        for start in range(0, len(self.config_bytes), 7):
+            hasher.update(self.config_bytes[start:start + 7])
+        self.assertEqual(hasher.hexdigest(), config_digest(self.config_bytes))
+
+        changed = self.config_bytes.replace(b"host-name ex3300;", b"host-name ex3301;")
+        self.assertNotEqual(config_digest(changed), config_digest(self.config_bytes))
+
+    def test_lru_eviction_and_counters(self):
+        """The memory tier keeps the most recently used entries"""
+        cache = ParseCache(max_entries=2)
+        cache.put("a", self.network, "id-a")
+        cache.put("b", self.network, "id-b")
+        cache.get("a")
+        cache.put("c", self.network, "id-c")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a")[1], "id-a")
+        stats = cache.stats()
+        self.assertEqual((stats["memory_hits"], stats["misses"], stats["entries"]), (2, 1, 2))
+
+    def test_disk_tier_restores_models(self):
+        """Entries evicted from memory come back from disk with Route and VLAN models"""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            ParseCache(cache_dir=cache_dir).put("digest", self.network, "id-1")
+            cache = ParseCache(cache_dir=cache_dir)
+            compact, config_id = cache.get("digest")
+        self.assertEqual(config_id, "id-1")
+        network = compact.to_network()
+        self.assertEqual(cache.stats()["disk_hits"], 1)
+        routing = network.devices[0].routing
+        self.assertIsInstance(routing["routes"][0], Route)
+        self.assertIsInstance(routing["vlans"][0], VLAN)
+        self.assertEqual(network.model_dump(), self.network.model_dump())
+
+    def test_disk_tier_evicts_least_recently_used(self):
+        """The directory stays within its byte limit, dropping the least recently used files first"""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            ParseCache(cache_dir=cache_dir).put("size", self.network, "id-s")
+            size = os.path.getsize(os.path.join(cache_dir, "size.json"))
+            os.remove(os.path.join(cache_dir, "size.json"))
+
+            cache = ParseCache(max_entries=1, cache_dir=cache_dir, max_disk_bytes=2 * size)
+            cache.put("a", self.network, "id-a")
+            cache.put("b", self.network, "id-b")
+            self.assertEqual(cache.get("a")[1], "id-a")  # from disk, so "a" is now the most recent
+            cache.put("c", self.network, "id-c")
+            self.assertEqual(sorted(os.listdir(cache_dir)), ["a.json", "c.json"])
+            stats = cache.stats()
+            self.assertEqual((stats["disk_files"], stats["disk_bytes"], stats["disk_evictions"]), (2, 2 * size, 1))
+
+            # A tighter limit at startup trims what the directory already holds, oldest first
+            os.utime(os.path.join(cache_dir, "a.json"), (0, 0))
+            restarted = ParseCache(cache_dir=cache_dir, max_disk_bytes=size)
+            self.assertEqual(os.listdir(cache_dir), ["c.json"])
+            self.assertIsNone(restarted.get("a"))
+
+            restarted.discard("c")
+            self.assertEqual(os.listdir(cache_dir), [])
+            self.assertEqual(restarted.stats()["disk_bytes"], 0)
+
+    def test_deleted_config_leaves_the_cache(self):
+        """Deleting a config drops its parse, so a re-upload is parsed and stored afresh"""
+        client = TestClient(main.app)
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                mock.patch.object(main, "parse_cache", ParseCache(cache_dir=cache_dir)):
+            first = client.post("/upload", files={"file": ("a.conf", self.config_bytes)}).json()
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            client.delete(f"/config/{first['config_id']}")
+            self.assertEqual(os.listdir(cache_dir), [])
+            self.assertIsNone(main.parse_cache.get(config_digest(self.config_bytes)))
+            second = client.post("/upload", files={"file": ("a.conf", self.config_bytes)}).json()
+            self.assertFalse(second["cached"])
+            self.assertNotEqual(second["config_id"], first["config_id"])
+            client.delete(f"/config/{second['config_id']}")
+
+    def test_repeat_upload_reuses_config(self):
+        """A repeated upload returns the stored config without parsing or rendering"""
+        client = TestClient(main.app)
+        with mock.patch.object(main, "parse_cache", ParseCache()), \
+                mock.patch.object(main.generator, "generate_all_diagrams", return_value={}) as render:
+            first = client.post("/upload?render=eager", files={"file": ("a.conf", self.config_bytes)}).json()
+            with mock.patch.object(main, "_parse_spooled_config") as parse:
+                second = client.post("/upload?render=eager", files={"file": ("b.conf", b"\n" + self.config_bytes)}).json()
+                parse.assert_not_called()
+            self.assertEqual(render.call_count, 1)
+            self.assertEqual(second["config_id"], first["config_id"])
+            self.assertTrue(second["cached"])
+            client.delete(f"/config/{first['config_id']}")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -139,6 +139,13 @@ class TestMermaidGenerator(unittest.TestCase):
         self.assertIn("0.0.0.0/0", diagram)
         self.assertIn("192.168.254.254", diagram)
     
+    def test_generation_is_deterministic(self):
+        """Repeated generation yields identical text, even from one generator instance"""
+        first = self.generator.generate_all_diagrams(self.network)
+        second = self.generator.generate_all_diagrams(self.network)
+        self.assertEqual(first, second)
+        self.assertEqual(first, MermaidGenerator().generate_all_diagrams(self.network))
+    
     def test_interface_diagram_generation(self):
         """Test interface diagram generation"""
         diagram = self.generator.generate_interface_diagram(self.network)
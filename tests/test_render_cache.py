@@ -0,0 +1,143 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.models.juniper import Route
+from app.parsers.diagrams_generator import DiagramsGenerator
+from app.parsers.juniper_parser import JuniperParser
+from app.services.render_cache import RenderCache, SingleFlight
+
+def fake_draw(diagram_type, network, base, formats):
+    for outformat in formats:
+        with open(f"{base}.{outformat}", "w") as f:
+            f.write(diagram_type)
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        config_path = os.path.join(os.path.dirname(__file__), '..', 'test-configs', 'ex3300-1.conf')
+        with open(config_path, 'r') as f:
+            self.network = JuniperParser().parse_config(f.read())
+        self.tmp = tempfile.TemporaryDirectory()
+        self.generator = DiagramsGenerator(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_single_flight_coalesces(self):
+        """Concurrent calls for one key run the function once and share the result"""
+        flight = SingleFlight()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.05)
+            return "done"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flight.do("k", slow))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["done"] * 5)
+        self.assertEqual(flight.coalesced, 4)
+
+    def test_identical_networks_reuse_renders(self):
+        """A second upload of the same network renders nothing"""
+        with mock.patch.object(self.generator, "_draw", side_effect=fake_draw) as draw:
+            first = self.generator.generate_all_diagrams(self.network, "a")
+            self.assertEqual(draw.call_count, 5)
+            second = self.generator.generate_all_diagrams(self.network, "b")
+            self.assertEqual(draw.call_count, 5)
+        self.assertEqual(first, second)
+        self.assertEqual(self.generator.render_cache.stats()["hits"], 5)
+
+    def test_route_change_only_invalidates_routing(self):
+        """Keys cover only the model subset a diagram draws"""
+        with mock.patch.object(self.generator, "_draw", side_effect=fake_draw) as draw:
+            before = self.generator.generate_all_diagrams(self.network, "a")
+            self.network.devices[0].routing["routes"].append(Route(destination="10.9.0.0/16", next_hop="192.168.254.1"))
+            after = self.generator.generate_all_diagrams(self.network, "b")
+            rendered = {call.args[0] for call in draw.call_args_list[5:]}
+        self.assertEqual(rendered, {"routing"})
+        self.assertNotEqual(before["routing"], after["routing"])
+        self.assertEqual(before["vlans"], after["vlans"])
+
+    def test_failed_render_is_not_cached(self):
+        """An exception propagates and the next request retries"""
+        cache = RenderCache()
+        path = os.path.join(self.tmp.name, "out.svg")
+        with self.assertRaises(RuntimeError):
+            cache.get_or_render("k", [path], mock.Mock(side_effect=RuntimeError("dot failed")))
+        cache.get_or_render("k", [path], lambda: open(path, "w").close())
+        self.assertEqual(cache.stats()["renders"], 1)
+
+    def test_formats_share_one_layout(self):
+        """PNG and SVG come from a single dot invocation, and only missing formats are drawn"""
+        with mock.patch("app.parsers.diagrams_generator.subprocess.run") as run:
+            run.side_effect = lambda command, **kwargs: [
+                open(command[index + 1], "w").close() for index, word in enumerate(command) if word == "-o"
+            ]
+            paths = self.generator.generate_routing_diagram(self.network, "a")
+            self.assertEqual(run.call_count, 1)
+            command = run.call_args.args[0]
+            self.assertEqual([word for word in command if word.startswith("-T")], ["-Tpng", "-Tsvg"])
+            self.assertTrue(all(os.path.exists(path) for path in paths.values()))
+
+            os.remove(paths["svg"])
+            self.generator.generate_routing_diagram(self.network, "a")
+            command = run.call_args.args[0]
+            self.assertEqual([word for word in command if word.startswith("-T")], ["-Tsvg"])
+    def test_concurrent_formats_do_not_share_a_flight(self):
+        """An svg request arriving during a png render gets its own render, not the png's result"""
+        started = threading.Event()
+
+        def slow_draw(diagram_type, network, base, formats):
+            if formats == ["png"]:
+                started.set()
+                time.sleep(0.1)
+            fake_draw(diagram_type, network, base, formats)
+
+        results = {}
+        with mock.patch.object(self.generator, "_draw", side_effect=slow_draw):
+            png = threading.Thread(target=lambda: results.update(
+                png=self.generator.generate_diagram(self.network, "interfaces", ("png",))))
+            png.start()
+            started.wait(5)
+            results["svg"] = self.generator.generate_diagram(self.network, "interfaces", ("svg",))
+            png.join()
+        self.assertTrue(os.path.exists(results["svg"]["svg"]))
+        self.assertTrue(os.path.exists(results["png"]["png"]))
+
+    def test_lazy_upload_renders_on_first_access(self):
+        """A lazy upload renders nothing until a diagram is requested"""
+        client = TestClient(main.app)
+        config_path = os.path.join(os.path.dirname(__file__), '..', 'test-configs', 'ex3300-1.conf')
+        with open(config_path, 'rb') as f:
+            config_bytes = f.read()
+        with mock.patch.object(main, "generator", self.generator), \
+                mock.patch.object(self.generator, "_draw", side_effect=fake_draw) as draw:
+            config_id = client.post("/upload?render=lazy", files={"file": ("a.conf", config_bytes)}).json()["config_id"]
+            status = client.get(f"/diagrams/{config_id}").json()["status"]
+            self.assertEqual(status["vlans"], {"png": "pending", "svg": "pending"})
+            self.assertEqual(draw.call_count, 0)
+
+            response = client.get(f"/diagram/{config_id}?diagram_type=vlans&format=svg")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(draw.call_args.args[3], ["svg"])
+            status = client.get(f"/diagrams/{config_id}").json()["status"]
+            self.assertEqual(status["vlans"], {"png": "pending", "svg": "materialized"})
+
+            client.get(f"/diagram/{config_id}?diagram_type=vlans&format=svg")
+            self.assertEqual(draw.call_count, 1)
+            client.delete(f"/config/{config_id}")
+
+if __name__ == '__main__':
+    unittest.main()
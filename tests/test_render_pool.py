@@ -0,0 +1,84 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from app.parsers.diagrams_generator import DiagramsGenerator
+from app.parsers.juniper_parser import JuniperParser
+from app.services.render_pool import RenderPool
+
+class _Tracker:
+    """Draw stand-in that records how many draws overlap"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.types = []
+
+    def draw(self, generator, diagram_type, network, base, formats):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.types.append(diagram_type)
+        time.sleep(0.05)
+        for outformat in formats:
+            with open(f"{base}.{outformat}", "w") as f:
+                f.write(diagram_type)
+        with self.lock:
+            self.active -= 1
+
+class TestRenderPool(unittest.TestCase):
+    def setUp(self):
+        config_path = os.path.join(os.path.dirname(__file__), '..', 'test-configs', 'ex3300-1.conf')
+        with open(config_path, 'r') as f:
+            self.network = JuniperParser().parse_config(f.read())
+        self.tmp = tempfile.TemporaryDirectory()
+        self.tracker = _Tracker()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _patched_draw(self):
+        tracker = self.tracker
+        return mock.patch.object(DiagramsGenerator, "_draw", autospec=True, side_effect=tracker.draw)
+
+    def test_pool_runs_in_worker_process(self):
+        pool = RenderPool(1)
+        try:
+            self.assertNotEqual(pool.submit(os.getpid).result(timeout=60), os.getpid())
+        finally:
+            pool.shutdown()
+
+    def test_all_diagrams_render_concurrently(self):
+        """The five types are submitted together instead of one after another"""
+        with ThreadPoolExecutor(max_workers=5) as pool, self._patched_draw():
+            generator = DiagramsGenerator(self.tmp.name, render_pool=pool)
+            result = generator.generate_all_diagrams(self.network, "a")
+        self.assertEqual(sorted(self.tracker.types), sorted(result))
+        self.assertGreater(self.tracker.peak, 1)
+        for paths in result.values():
+            self.assertTrue(all(os.path.exists(path) for path in paths.values()))
+
+    def test_concurrency_cap_is_shared(self):
+        """Two uploads rendering at once never exceed the pool's size together"""
+        second = self.network.model_copy(deep=True)
+        second.devices[0].hostname = "other"
+        with ThreadPoolExecutor(max_workers=2) as pool, self._patched_draw():
+            generator = DiagramsGenerator(self.tmp.name, render_pool=pool)
+            threads = [
+                threading.Thread(target=generator.generate_all_diagrams, args=(network, config_id))
+                for network, config_id in ((self.network, "a"), (second, "b"))
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(self.tracker.peak, 2)
+        self.assertEqual(len(self.tracker.types), 10)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import asyncio
+import os
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.analysis.route_lookup import RouteTable, RouteTableCache
+from app.models.juniper import Route
+from app.models.network import Device, Interface
+from app.parsers.juniper_parser import JuniperParser
+from app.services.storage import MemoryConfigStore
+
+class TestRouteLookup(unittest.TestCase):
+    def setUp(self):
+        config_path = os.path.join(os.path.dirname(__file__), '..', 'test-configs', 'ex3300-1.conf')
+        with open(config_path, 'r') as f:
+            self.device = JuniperParser().parse_config(f.read()).devices[0]
+        self.table = RouteTable.from_device(self.device)
+
+    def test_sample_config(self):
+        """Connected subnet beats the default route, which resolves to its egress interface"""
+        connected = self.table.lookup("192.168.254.20")
+        self.assertEqual((connected["prefix"], connected["protocol"], connected["interface"]),
+                         ("192.168.254.0/24", "direct", "vlan"))
+        default = self.table.lookup("8.8.8.8")
+        self.assertEqual((default["prefix"], default["next_hop"], default["interface"]),
+                         ("0.0.0.0/0", "192.168.254.254", "vlan"))
+        self.assertEqual(self.table.lookup("192.168.254.9")["protocol"], "local")
+
+    def test_longest_prefix_wins(self):
+        """More specific prefixes win, and preference breaks ties on the same prefix"""
+        device = Device(hostname="r1", interfaces=[Interface(name="ge-0/0/0", ip="10.0.0.1/30")], routing={"routes": [
+            Route(destination="10.4.0.0/16", next_hop="10.0.0.2"),
+            Route(destination="10.4.7.0/24", next_hop="discard"),
+            Route(destination="10.4.7.0/24", next_hop="10.0.0.2", preference=1),
+            Route(destination="2001:db8::/32", next_hop="reject"),
+        ]})
+        table = RouteTable.from_device(device)
+        self.assertEqual(table.lookup("10.4.7.9")["next_hop"], "10.0.0.2")
+        self.assertEqual(table.lookup("10.4.7.9")["prefix"], "10.4.7.0/24")
+        self.assertEqual(table.lookup("10.4.8.1")["prefix"], "10.4.0.0/16")
+        self.assertEqual(table.lookup("2001:db8::1")["next_hop"], "reject")
+        self.assertIsNone(table.lookup("172.16.0.1"))
+
+    def test_batch_lookup_reports_bad_input(self):
+        """Batch lookups keep order and flag invalid destinations without failing"""
+        results = self.table.lookup_many(["8.8.8.8", "not-an-ip", "::1"])
+        self.assertEqual([r["destination"] for r in results], ["8.8.8.8", "not-an-ip", "::1"])
+        self.assertIn("error", results[1])
+        self.assertIsNone(results[2]["prefix"])
+
+    def test_stored_dict_form(self):
+        """Tables build the same from the serialized network kept in storage"""
+        table = RouteTable.from_device(self.device.model_dump())
+        self.assertEqual(table.lookup("8.8.8.8"), self.table.lookup("8.8.8.8"))
+
+    def test_table_cache_is_bounded(self):
+        """Compiled tables are kept for the most recently used configs only"""
+        cache = RouteTableCache(max_entries=2)
+        for config_id in ("a", "b"):
+            cache.put(config_id, {"ex3300": self.table})
+        self.assertIs(cache.get("a")["ex3300"], self.table)
+        cache.put("c", {"ex3300": self.table})
+        self.assertIsNone(cache.get("b"))
+        cache.discard("a")
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats(), {"entries": 1, "max_entries": 2, "hits": 1, "misses": 2})
+
+    def test_endpoint_works_off_the_event_loop(self):
+        """Tables are built and searched on a worker thread, never inside the event loop"""
+        store = MemoryConfigStore()
+        store.put("a", {"filename": "a.conf", "config_path": None, "diagrams": {},
+                        "network": {"devices": [self.device.model_dump(mode="json")], "connections": []}})
+        build, loops = RouteTable.from_device, []
+        def from_device(device):
+            try:
+                loops.append(asyncio.get_running_loop())
+            except RuntimeError:
+                loops.append(None)
+            return build(device)
+        with mock.patch.object(main, "config_storage", store), \
+                mock.patch.object(main, "route_tables", RouteTableCache()), \
+                mock.patch.object(main.RouteTable, "from_device", side_effect=from_device), \
+                mock.patch.object(main, "run_in_threadpool", wraps=main.run_in_threadpool) as threadpool:
+            client = TestClient(main.app)
+            response = client.post("/routes/a/lookup", json={"destinations": ["8.8.8.8"]})
+            self.assertEqual(response.status_code, 200)
+            result = response.json()["results"][self.device.hostname][0]
+            self.assertEqual(result, self.table.lookup_many(["8.8.8.8"])[0])
+            self.assertEqual(client.post("/routes/b/lookup", json={"destinations": []}).status_code, 404)
+            self.assertEqual(threadpool.call_count, 2)
+        self.assertEqual(loops, [None])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.parsers.juniper_parser import JuniperParser
+from app.services.search_index import SearchQuery
+from app.services.storage import MemoryConfigStore, SQLiteConfigStore, encode_network
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'test-configs', 'ex3300-1.conf')
+
+ROUTER = {
+    "devices": [{
+        "hostname": "core-r1",
+        "interfaces": [
+            {"name": "xe-0/0/0", "ip": "10.1.0.1/30", "description": "Uplink to EX3300", "port_mode": None},
+            {"name": "lo0", "ip": "2001:db8::1/128", "description": None, "port_mode": None},
+            {"name": "ge-0/0/9", "ip": None, "description": "spare", "port_mode": "trunk",
+             "vlan_members": ["all"]}
+        ],
+        "routing": {
+            "routes": [{"destination": "10.20.0.0/16", "next_hop": "10.1.0.2"},
+                       {"destination": "10.20.5.0/24", "next_hop": "discard"}],
+            "vlans": []
+        }
+    }],
+    "connections": [],
+    "topology": None
+}
+
+def locations(results):
+    return sorted((r["config_id"], r["hostname"], r["interface"] or "") for r in results)
+
+class SearchTests:
+    """Queries answered the same way by every ConfigStore implementation"""
+
+    def make_store(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        with open(CONFIG_PATH, 'r') as f:
+            self.switch = JuniperParser().parse_config(f.read()).model_dump(mode="json")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = self.make_store()
+        for config_id, network in (("sw", self.switch), ("r", ROUTER)):
+            self.store.put(config_id, {"filename": f"{config_id}.conf", "diagrams": {}, "network": network})
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def search(self, field, text, match="exact", limit=1000):
+        return self.store.search(SearchQuery(field, text, match), limit)
+
+    def test_hostnames_and_interfaces(self):
+        self.assertEqual(locations(self.search("hostname", "EX3300")), [("sw", "ex3300", "")])
+        self.assertEqual(locations(self.search("hostname", "core", "prefix")), [("r", "core-r1", "")])
+        self.assertEqual(len(self.search("interface", "ge-0/0/1", "prefix")), 11)
+        self.assertEqual(locations(self.search("interface", "xe-0/0/0")), [("r", "core-r1", "xe-0/0/0")])
+        self.assertEqual(locations(self.search("port_mode", "TRUNK")), [("r", "core-r1", "ge-0/0/9")])
+
+    def test_descriptions_match_every_word(self):
+        self.assertEqual(locations(self.search("description", "ex3300 uplink")), [("r", "core-r1", "xe-0/0/0")])
+        self.assertEqual(self.search("description", "uplink missing"), [])
+        ports = self.search("description", "r610 po", "prefix")
+        self.assertEqual({r["value"] for r in ports}, {"r610 - port 1", "r610 - port 2", "r610 - port 3", "r610 - port 4"})
+
+    def test_vlans_by_name_and_id(self):
+        """A VLAN is found with the interfaces assigned to it, by name or by id"""
+        by_name = locations(self.search("vlan", "oob"))
+        self.assertEqual(by_name, [("sw", "ex3300", ""), ("sw", "ex3300", "ge-0/0/24"), ("sw", "ex3300", "ge-0/0/25")])
+        self.assertEqual(locations(self.search("vlan", "4000")), by_name)
+        self.assertIn(("sw", "ex3300", "ge-0/0/19"), locations(self.search("vlan", "200")))
+        # Members that name no defined VLAN are indexed as written
+        self.assertEqual(locations(self.search("vlan", "all")), [("r", "core-r1", "ge-0/0/9")])
+
+    def test_cidr_containment(self):
+        within = {(r["kind"], r["value"]) for r in self.search("ip", "10.0.0.0/8", "within")}
+        self.assertEqual(within, {("interface", "10.1.0.1/30"), ("route", "10.20.0.0/16"),
+                                  ("route", "10.20.5.0/24"), ("next_hop", "10.1.0.2")})
+        contains = {(r["config_id"], r["value"]) for r in self.search("ip", "10.20.5.77", "contains")}
+        # The switch's default route covers every address
+        self.assertEqual(contains, {("r", "10.20.0.0/16"), ("r", "10.20.5.0/24"), ("sw", "0.0.0.0/0")})
+        # The switch's management subnet and default route both cover its gateway
+        gateway = {(r["config_id"], r["kind"]) for r in self.search("ip", "192.168.254.254", "contains")}
+        self.assertEqual(gateway, {("sw", "interface"), ("sw", "route"), ("sw", "next_hop")})
+        self.assertEqual([r["interface"] for r in self.search("ip", "2001:db8::/32", "within")], ["lo0"])
+        self.assertEqual([r["kind"] for r in self.search("ip", "10.20.0.0/16")], ["route"])
+        self.assertEqual([r["interface"] for r in self.search("ip", "10.1.0.1")], ["xe-0/0/0"])
+
+    def test_limit_and_delete(self):
+        self.assertEqual(len(self.search("interface", "ge-", "prefix", limit=5)), 5)
+        self.store.delete("sw")
+        self.assertEqual(self.search("hostname", "ex3300"), [])
+        self.assertEqual(self.search("ip", "192.168.254.0/24", "within"), [])
+
+class TestMemorySearch(SearchTests, unittest.TestCase):
+    def make_store(self):
+        return MemoryConfigStore()
+
+class TestSQLiteSearch(SearchTests, unittest.TestCase):
+    def make_store(self):
+        return SQLiteConfigStore(os.path.join(self.tmp.name, "configs.db"))
+
+    def test_queries_use_indexes(self):
+        connection = self.store._connection()
+        plans = [
+            "SELECT * FROM search_terms WHERE field = 'interface' AND term >= 'ge' AND term < 'gf'",
+            "SELECT * FROM search_addresses WHERE version = 4 AND address BETWEEN x'00' AND x'ff'",
+            "SELECT * FROM search_addresses WHERE (version = 4 AND network = x'00' AND prefixlen = 0)"
+            " OR (version = 4 AND network = x'0a' AND prefixlen = 8)"
+        ]
+        for sql in plans:
+            with self.subTest(sql):
+                plan = " ".join(row[-1] for row in connection.execute("EXPLAIN QUERY PLAN " + sql))
+                self.assertIn("USING INDEX", plan)
+                self.assertNotIn("SCAN search", plan)
+
+    def test_indexes_configs_stored_before_search(self):
+        path = os.path.join(self.tmp.name, "old.db")
+        connection = sqlite3.connect(path)
+        connection.execute(
+            "CREATE TABLE configs (config_id TEXT PRIMARY KEY, filename TEXT NOT NULL, digest TEXT, config_path TEXT,"
+            " uploaded_at REAL NOT NULL, device_count INTEGER NOT NULL, interface_count INTEGER NOT NULL,"
+            " diagrams TEXT NOT NULL, network BLOB NOT NULL)"
+        )
+        connection.execute("INSERT INTO configs VALUES ('old', 'r.conf', NULL, NULL, 1.0, 1, 3, '{}', ?)",
+                           (encode_network(ROUTER),))
+        connection.commit()
+        connection.close()
+        store = SQLiteConfigStore(path)
+        try:
+            self.assertEqual(locations(store.search(SearchQuery("hostname", "core-r1"), 10)), [("old", "core-r1", "")])
+        finally:
+            store.close()
+
+class TestSearchEndpoint(unittest.TestCase):
+    def test_search(self):
+        store = MemoryConfigStore()
+        store.put("r", {"filename": "r.conf", "diagrams": {}, "network": ROUTER})
+        client = TestClient(main.app)
+        with mock.patch.object(main, "config_storage", store):
+            body = client.get("/search", params={"field": "ip", "q": "10.20.1.1", "match": "contains"}).json()
+            self.assertEqual([r["value"] for r in body["results"]], ["10.20.0.0/16"])
+            self.assertFalse(body["truncated"])
+            body = client.get("/search", params={"field": "interface", "q": "", "match": "prefix"})
+            self.assertEqual(body.status_code, 400)
+            truncated = client.get("/search", params={"field": "ip", "q": "10.0.0.0/8", "match": "within", "limit": 1})
+            self.assertEqual((len(truncated.json()["results"]), truncated.json()["truncated"]), (1, True))
+            self.assertEqual(client.get("/search", params={"field": "ip", "q": "10.0.0.0/8", "match": "prefix"}).status_code, 400)
+            self.assertEqual(client.get("/search", params={"field": "ip", "q": "not-an-ip"}).status_code, 400)
+            self.assertEqual(client.get("/search", params={"field": "serial", "q": "x"}).status_code, 400)
+            self.assertTrue(client.get("/search", params={"q": "core-r1"}).json()["results"])
+
+if __name__ == '__main__':
+    unittest.main()
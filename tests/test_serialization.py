@@ -0,0 +1,48 @@
+import json
+import os
+import unittest
+from unittest import mock
+
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.parsers.juniper_parser import JuniperParser
+from app.services import serialization
+from app.services.http_cache import content_etag
+from app.services.serialization import dumps, model_json, parse_body
+from app.services.storage import MemoryConfigStore
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'test-configs', 'ex3300-1.conf')
+
+class TestSerialization(unittest.TestCase):
+    def setUp(self):
+        with open(CONFIG_PATH, 'r') as f:
+            self.network = JuniperParser().parse_config(f.read())
+        self.data = self.network.model_dump(mode="json")
+
+    def test_bytes_match_json_response(self):
+        """Every path produces the bytes JSONResponse would, so bodies and ETags agree"""
+        expected = JSONResponse({"config_id": "a", "filename": "é.conf", "network": self.data}).body
+        self.assertEqual(parse_body("a", "é.conf", model_json(self.network)), expected)
+        self.assertEqual(parse_body("a", "é.conf", dumps(self.data)), expected)
+        with mock.patch.object(serialization, "orjson", None):
+            self.assertEqual(parse_body("a", "é.conf", dumps(self.data)), expected)
+
+    def test_parse_is_served_from_stored_bytes(self):
+        with open(CONFIG_PATH, 'rb') as f:
+            config_bytes = f.read()
+        client = TestClient(main.app)
+        with mock.patch.object(main, "config_storage", MemoryConfigStore()), \
+                mock.patch.object(main.parse_cache, "get", return_value=None):
+            config_id = client.post("/upload", files={"file": ("ex.conf", config_bytes)}).json()["config_id"]
+            # Neither the stored dict nor a model is needed to answer
+            with mock.patch("app.services.storage.CompactNetwork.to_dict", side_effect=AssertionError):
+                response = client.get(f"/parse/{config_id}", headers={"Accept-Encoding": "identity"})
+            self.assertEqual(response.headers["etag"], content_etag(response.content))
+            self.assertEqual(json.loads(response.content)["network"], self.data)
+            self.assertEqual(response.headers["content-type"], "application/json")
+            client.delete(f"/config/{config_id}")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+import os
+import tempfile
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.parsers.config_tree import parse_config_tree
+from app.parsers.juniper_parser import JuniperParser
+from app.parsers.set_parser import SetConfigParser, SetAccumulator, is_set_format, split_set_line
+from app.parsers.streaming_parser import StreamingNetworkParser
+from app.services.storage import MemoryConfigStore
+
+def to_set_lines(block, path=()):
+    """Render a config tree as ``display set`` lines"""
+    lines = []
+    for child in block.iter_nodes(include_inactive=True):
+        words = [f'"{word}"' if " " in word or not word else word for word in child.words]
+        child_path = path + tuple(words)
+        if child.is_block() and child.children:
+            lines.extend(to_set_lines(child, child_path))
+        else:
+            lines.append("set " + " ".join(child_path))
+        if child.inactive:
+            lines.append("deactivate " + " ".join(child_path))
+    return lines
+
+class TestSetParser(unittest.TestCase):
+    def setUp(self):
+        config_path = os.path.join(os.path.dirname(__file__), '..', 'test-configs', 'ex3300-1.conf')
+        with open(config_path, 'r') as f:
+            self.config_text = f.read()
+        lines = to_set_lines(parse_config_tree(self.config_text))
+        self.set_text = "root@ex3300> show configuration | display set\n" + "\n".join(lines) + "\n\n{master:0}\n"
+
+    def test_format_detection(self):
+        """Set output is detected past prompts and comments; brace output is not"""
+        self.assertTrue(is_set_format(self.set_text))
+        self.assertFalse(is_set_format(self.config_text))
+        self.assertTrue(is_set_format("## Last commit\n\nset system host-name a"))
+
+    def test_split_keeps_quoted_values(self):
+        """Quoted descriptions survive the single split"""
+        words = split_set_line('set interfaces ge-0/0/0 description "uplink to core"')
+        self.assertEqual(words, ["set", "interfaces", "ge-0/0/0", "description", "uplink to core"])
+
+    def test_matches_curly_brace_parse(self):
+        """Both formats of the same config yield the same Network"""
+        expected = JuniperParser().parse_config(self.config_text)
+        self.assertEqual(JuniperParser().parse_config(self.set_text), expected)
+
+    def test_streaming_detects_set_format(self):
+        """The streaming parser switches to line mode for set input"""
+        expected = JuniperParser().parse_config(self.config_text)
+        stream = StreamingNetworkParser()
+        data = self.set_text.encode("utf-8")
+        for start in range(0, len(data), 50):
+            stream.feed_bytes(data[start:start + 50])
+        self.assertEqual(stream.close(), expected)
+
+    def test_chunked_merge_matches_single_pass(self):
+        """Accumulators for consecutive chunks merge to the single-pass result"""
+        lines = self.set_text.splitlines()
+        whole = SetAccumulator()
+        whole.add_lines(lines)
+        merged = SetAccumulator()
+        merged.add_lines(lines[:200])
+        tail = SetAccumulator()
+        tail.add_lines(lines[200:])
+        merged.merge(tail)
+        parser = SetConfigParser()
+        self.assertEqual(parser.build(merged), parser.build(whole))
+
+    def test_deactivated_interface_skipped(self):
+        """deactivate lines hide the entity they name"""
+        text = "set interfaces ge-0/0/1 description x\ndeactivate interfaces ge-0/0/1\nset interfaces ge-0/0/2 disable\n"
+        device = SetConfigParser().parse_config(text).devices[0]
+        self.assertEqual([i.name for i in device.interfaces], ["ge-0/0/2"])
+        self.assertEqual(device.interfaces[0].status, "disabled")
+
+    def test_same_prefix_in_each_routing_instance(self):
+        """A prefix routed in several instances keeps one route per instance, as the tree parser does"""
+        config_text = """
+routing-options { static { route 0.0.0.0/0 next-hop 10.0.0.1; } }
+routing-instances {
+    blue { routing-options { static { route 0.0.0.0/0 next-hop 10.1.0.1; } } }
+    red { routing-options { static { route 0.0.0.0/0 next-hop 10.2.0.1; } } }
+}
+"""
+        set_text = "\n".join([
+            "set routing-instances blue routing-options static route 0.0.0.0/0 next-hop 10.1.0.1",
+            "set routing-instances red routing-options static route 0.0.0.0/0 next-hop 10.2.0.1",
+            "set routing-options static route 0.0.0.0/0 next-hop 10.0.0.1",
+            "set routing-options static route 192.0.2.0/24 discard",
+            "deactivate routing-instances red routing-options static route 0.0.0.0/0",
+        ])
+        expected = JuniperParser().parse_config(config_text).devices[0].routing["routes"]
+        self.assertEqual([route.next_hop for route in expected], ["10.0.0.1", "10.1.0.1", "10.2.0.1"])
+        routes = SetConfigParser().parse_config(set_text).devices[0].routing["routes"]
+        self.assertEqual([(route.destination, route.next_hop) for route in routes],
+                         [("0.0.0.0/0", "10.0.0.1"), ("192.0.2.0/24", "discard"), ("0.0.0.0/0", "10.1.0.1")])
+
+    def test_sections_rejected_for_set_uploads(self):
+        """Stanza trees cannot be rebuilt from set lines, so a projection is refused rather than all nulls"""
+        with tempfile.NamedTemporaryFile("w", suffix=".conf", delete=False) as f:
+            f.write(self.set_text)
+        self.addCleanup(os.remove, f.name)
+        store = MemoryConfigStore()
+        store.put("a", {"filename": "a.conf", "config_path": f.name, "diagrams": {},
+                        "network": JuniperParser().parse_config(self.set_text).model_dump(mode="json")})
+        with mock.patch.object(main, "config_storage", store):
+            client = TestClient(main.app)
+            self.assertEqual(client.get("/parse/a", params={"sections": "interfaces"}).status_code, 400)
+            self.assertEqual(client.get("/parse/a").status_code, 200)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,182 @@
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.parsers.juniper_parser import JuniperParser
+from app.services.serialization import dumps
+from app.services.storage import SCHEMA, MemoryConfigStore, SQLiteConfigStore
+
+class StoreTests:
+    """Behaviour shared by every ConfigStore implementation"""
+
+    def make_store(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        config_path = os.path.join(os.path.dirname(__file__), '..', 'test-configs', 'ex3300-1.conf')
+        with open(config_path, 'r') as f:
+            self.network = JuniperParser().parse_config(f.read()).model_dump(mode="json")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = self.make_store()
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def record(self, filename="a.conf", **extra):
+        return {"filename": filename, "config_path": None, "digest": "d", "network": self.network,
+                "diagrams": {"topology": {"png": "x.png"}}, **extra}
+
+    def test_round_trip(self):
+        before = time.time()
+        self.store.put("a", self.record())
+        record = self.store.get("a")
+        self.assertEqual(record["network"], self.network)
+        self.assertEqual(record["diagrams"], {"topology": {"png": "x.png"}})
+        self.assertGreaterEqual(record["uploaded_at"], before)
+        self.assertAlmostEqual(datetime.fromisoformat(record["timestamp"]).timestamp(), record["uploaded_at"], places=3)
+        self.assertIn("a", self.store)
+        self.assertIsNone(self.store.get("missing"))
+
+    def test_serialized_network(self):
+        """The network comes back as its stored JSON bytes, and bytes given at put are kept as they are"""
+        self.store.put("a", self.record())
+        serialized = self.store.get_serialized("a")
+        self.assertNotIn("network", serialized)
+        self.assertEqual(serialized["network_json"], dumps(self.network))
+        self.store.put("b", self.record(network_json=dumps(self.network), parse_etag='"e"'))
+        self.assertEqual(self.store.get_serialized("b")["network_json"], dumps(self.network))
+        self.assertEqual(self.store.get_serialized("b")["parse_etag"], '"e"')
+        self.assertEqual(self.store.get("b")["network"], self.network)
+        self.assertIsNone(self.store.get_serialized("missing"))
+
+    def test_list_filters(self):
+        self.store.put("a", self.record("a.conf", uploaded_at=1.0))
+        self.store.put("b", self.record("b.conf", uploaded_at=2.0))
+        self.assertEqual([c["config_id"] for c in self.store.list()], ["a", "b"])
+        self.assertEqual([c["config_id"] for c in self.store.list(filename="b.conf")], ["b"])
+        self.assertEqual(len(self.store.list(hostname="ex3300")), 2)
+        self.assertEqual(self.store.list(hostname="nope"), [])
+        self.assertEqual(self.store.list()[0]["device_count"], 1)
+
+    def test_revision_link(self):
+        self.store.put("a", self.record(uploaded_at=1.0))
+        self.store.put("b", self.record(uploaded_at=2.0, parent_id="a"))
+        self.assertEqual(self.store.get("b")["parent_id"], "a")
+        self.assertEqual([c["parent_id"] for c in self.store.list(hostname="ex3300")], [None, "a"])
+
+    def test_list_pages(self):
+        """Keyset pages in either order cover every config exactly once"""
+        for index, filename in enumerate(["c.conf", "a.conf", "b.conf", "a.conf", "d.conf"]):
+            self.store.put(f"id{index}", self.record(filename, uploaded_at=float(index + 1)))
+        for descending in (False, True):
+            seen, after = [], None
+            while True:
+                page, after = self.store.list_page(sort="filename", descending=descending, after=after, limit=2)
+                seen.extend((c["filename"], c["config_id"]) for c in page)
+                if after is None:
+                    break
+            self.assertEqual(seen, sorted(seen, reverse=descending))
+            self.assertEqual(len(seen), 5)
+        page, after = self.store.list_page(sort="interface_count", limit=10)
+        self.assertIsNone(after)
+        self.assertEqual(page[0]["interface_count"], 57)
+        self.assertEqual(self.store.list_page(filename="a.conf", limit=1)[1], [2.0, "id1"])
+        with self.assertRaises(ValueError):
+            self.store.list_page(sort="network")
+
+    def test_encoded_bodies(self):
+        """Encodings are kept beside the record, found by ETag, and go when it is deleted"""
+        self.store.put("a", self.record(encoded_bodies={'"p"': {"gzip": b"pz"}}))
+        self.assertNotIn("encoded_bodies", self.store.get("a"))
+        self.assertEqual(self.store.get_encoded('"p"'), {"gzip": b"pz"})
+        self.store.put_encoded("a", '"m"', {"gzip": b"mz"})
+        self.store.put_encoded("missing", '"x"', {"gzip": b"xz"})
+        self.assertEqual(self.store.get_encoded('"m"'), {"gzip": b"mz"})
+        self.assertEqual(self.store.get_encoded('"x"'), {})
+        self.store.delete("a")
+        self.assertEqual(self.store.get_encoded('"p"'), {})
+        self.assertEqual(self.store.get_encoded('"m"'), {})
+
+    def test_delete(self):
+        self.store.put("a", self.record())
+        self.assertEqual(self.store.delete("a")["filename"], "a.conf")
+        self.assertNotIn("a", self.store)
+        self.assertIsNone(self.store.delete("a"))
+        self.assertEqual(self.store.list(hostname="ex3300"), [])
+
+class TestMemoryConfigStore(StoreTests, unittest.TestCase):
+    def make_store(self):
+        return MemoryConfigStore()
+
+class TestSQLiteConfigStore(StoreTests, unittest.TestCase):
+    def make_store(self):
+        return SQLiteConfigStore(os.path.join(self.tmp.name, "configs.db"))
+
+    def test_persists_across_instances(self):
+        """A second store on the same file, as another server process would open, sees the record"""
+        self.store.put("a", self.record())
+        other = SQLiteConfigStore(self.store.path)
+        try:
+            self.assertEqual(other.get("a")["network"], self.network)
+        finally:
+            other.close()
+
+    def test_adds_new_columns_to_older_databases(self):
+        path = os.path.join(self.tmp.name, "old.db")
+        connection = sqlite3.connect(path)
+        connection.executescript(SCHEMA.replace(",\n    parent_id TEXT,\n    parse_etag TEXT", ""))
+        connection.close()
+        store = SQLiteConfigStore(path)
+        try:
+            store.put("a", self.record(parent_id="z", parse_etag='"e"'))
+            self.assertEqual(store.get("a")["parent_id"], "z")
+            self.assertEqual(store.get("a")["parse_etag"], '"e"')
+        finally:
+            store.close()
+
+    def test_wal_and_indexed_listing(self):
+        connection = self.store._connection()
+        self.assertEqual(connection.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        plan = " ".join(row[-1] for row in connection.execute(
+            "EXPLAIN QUERY PLAN SELECT config_id FROM config_hosts WHERE hostname = ?", ("ex3300",)
+        ))
+        self.assertIn("INDEX", plan)
+
+    def test_network_blob_is_compact(self):
+        self.store.put("a", self.record())
+        size = self.store._connection().execute("SELECT length(network) FROM configs").fetchone()[0]
+        self.assertLess(size, len(repr(self.network)) / 3)
+
+class TestConfigsEndpoint(unittest.TestCase):
+    def test_configs_have_real_timestamps(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        store = SQLiteConfigStore(os.path.join(tmp.name, "configs.db"))
+        self.addCleanup(store.close)
+        config_path = os.path.join(os.path.dirname(__file__), '..', 'test-configs', 'ex3300-1.conf')
+        with open(config_path, 'rb') as f:
+            config_bytes = f.read()
+        
+        client = TestClient(main.app)
+        with mock.patch.object(main, "config_storage", store), \
+                mock.patch.object(main.parse_cache, "get", return_value=None):
+            uploaded = client.post("/upload", files={"file": ("ex.conf", config_bytes)}).json()
+            configs = client.get("/configs", params={"hostname": "ex3300"}).json()["configs"]
+            self.assertEqual([c["config_id"] for c in configs], [uploaded["config_id"]])
+            self.assertNotEqual(configs[0]["timestamp"], "2024-01-01T00:00:00Z")
+            self.assertEqual(client.get("/configs", params={"filename": "other.conf"}).json()["configs"], [])
+            self.assertEqual(client.get(f"/parse/{uploaded['config_id']}").json()["network"]["devices"][0]["hostname"],
+                             "ex3300")
+            client.delete(f"/config/{uploaded['config_id']}")
+            self.assertEqual(client.get("/configs").json()["configs"], [])
+
+if __name__ == '__main__':
+    unittest.main()
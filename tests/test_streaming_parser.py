@@ -0,0 +1,90 @@
+import unittest
+import os
+from app.parsers.juniper_parser import JuniperParser
+from app.parsers.streaming_parser import (
+    StreamingNetworkParser, StreamingConfigParser, ConfigEventHandler, ConfigTooLargeError, scan_hostname
+)
+
+class RecordingHandler(ConfigEventHandler):
+    def __init__(self):
+        self.events = []
+
+    def block_open(self, block, depth):
+        self.events.append(("open", block.name, depth))
+
+    def statement(self, node, depth):
+        self.events.append(("statement", node.name, depth))
+
+    def block_close(self, block, depth):
+        self.events.append(("close", block.name, depth))
+        return False
+
+class TestStreamingParser(unittest.TestCase):
+    def setUp(self):
+        config_path = os.path.join(os.path.dirname(__file__), '..', 'test-configs', 'ex3300-1.conf')
+        with open(config_path, 'rb') as f:
+            self.config_bytes = f.read()
+
+    def test_matches_full_parse_for_any_chunking(self):
+        """Streaming in small chunks yields the same Network as a full parse"""
+        expected = JuniperParser().parse_config(self.config_bytes.decode('utf-8'))
+        for chunk_size in (1, 13, 4096):
+            stream = StreamingNetworkParser()
+            for start in range(0, len(self.config_bytes), chunk_size):
+                stream.feed_bytes(self.config_bytes[start:start + chunk_size])
+            self.assertEqual(stream.close(), expected)
+
+    def test_multibyte_characters_split_across_chunks(self):
+        """Incremental decoding handles UTF-8 sequences split between chunks"""
+        data = 'system {\n    host-name "café-sw";\n}\n'.encode('utf-8')
+        stream = StreamingNetworkParser()
+        for start in range(len(data)):
+            stream.feed_bytes(data[start:start + 1])
+        self.assertEqual(stream.close().devices[0].hostname, "café-sw")
+
+    def test_events_and_discarded_subtrees(self):
+        """Handlers see open/statement/close events and can drop finished blocks"""
+        handler = RecordingHandler()
+        stream = StreamingConfigParser(handler)
+        stream.feed_text("system {\n    host-name a;\n}\n")
+        root = stream.close()
+        self.assertEqual(handler.events, [
+            ("open", "system", 1),
+            ("statement", "host-name a", 2),
+            ("close", "system", 1),
+        ])
+        self.assertEqual(root.children, [])
+
+    def test_unterminated_final_line(self):
+        """A config with no newline after its only significant line is still parsed when the stream closes"""
+        for text in ("system { host-name sw1; } interfaces { ge-0/0/0 { description uplink; } }",
+                     "# comment\nsystem { host-name sw1; } interfaces { ge-0/0/0 { description uplink; } }",
+                     "set system host-name sw1"):
+            stream = StreamingNetworkParser()
+            stream.feed_bytes(text.encode("utf-8"))
+            network = stream.close()
+            self.assertEqual(network, JuniperParser().parse_config(text))
+            self.assertEqual(network.devices[0].hostname, "sw1")
+
+    def test_max_size_guard(self):
+        """Input beyond max_bytes is rejected"""
+        stream = StreamingNetworkParser(max_bytes=100)
+        with self.assertRaises(ConfigTooLargeError):
+            stream.feed_bytes(self.config_bytes[:4096])
+
+    def test_scan_hostname_stops_after_system(self):
+        """The scan reads no further than the system stanza once it has the host-name"""
+        chunks = [self.config_bytes[i:i + 64] for i in range(0, len(self.config_bytes), 64)]
+        read = []
+        def reader():
+            for chunk in chunks:
+                read.append(chunk)
+                yield chunk
+        self.assertEqual(scan_hostname(reader()), "ex3300")
+        self.assertLess(len(read), len(chunks) // 4)
+        self.assertEqual(scan_hostname([b"groups {\n node0 {\n system {\n host-name n0;\n }\n }\n}\n"]), "n0")
+        self.assertIsNone(scan_hostname([b"set system host-name sw1\n"]))
+        self.assertIsNone(scan_hostname([b"interfaces {\n ge-0/0/0 {\n description a;\n }\n}\n"]))
+
+if __name__ == '__main__':
+    unittest.main()